@@ -100,6 +100,20 @@ class ExpiringLocalCache(AbstractCache):
 
         self._cron_task = loop.create_task(self._start_clear_cron())
 
+    async def stop(self):
+        """
+        停止定时清理任务，等待任务真正结束，避免事件循环关闭时任务还处于 pending 状态
+        :return:
+        """
+        if self._cron_task is None:
+            return
+        self._cron_task.cancel()
+        try:
+            await self._cron_task
+        except asyncio.CancelledError:
+            pass
+        self._cron_task = None
+
     def _clear(self):
         """
         根据过期时间清理缓存
@@ -22,6 +22,41 @@ from redis import Redis
 
 from cache.abs_cache import AbstractCache
 from config import db_config
+from tools import json_codec
+
+# 缓存值的第一个字节标记序列化方式
+JSON_MARKER = b"J"
+PICKLE_MARKER = b"P"
+
+
+def serialize_value(value: Any) -> bytes:
+    """
+    序列化缓存值，默认使用 json，json 无法表示的值使用 pickle
+    注意：json 序列化后元组会变成列表，字典的非字符串键会变成字符串，需要保留这些类型时使用 pickle
+    :param value:
+    :return:
+    """
+    if db_config.CACHE_SERIALIZER == "json":
+        try:
+            return JSON_MARKER + json_codec.dumps_bytes(value)
+        except (TypeError, ValueError):
+            pass
+    return PICKLE_MARKER + pickle.dumps(value)
+
+
+def deserialize_value(data: bytes) -> Any:
+    """
+    反序列化缓存值
+    :param data:
+    :return:
+    """
+    marker, payload = data[:1], data[1:]
+    if marker == JSON_MARKER:
+        return json_codec.loads(payload)
+    if marker == PICKLE_MARKER:
+        return pickle.loads(payload)
+    # 没有标记的是旧版本直接写入的 pickle 数据
+    return pickle.loads(data)
 
 
 class RedisCache(AbstractCache):
@@ -52,7 +87,7 @@ class RedisCache(AbstractCache):
         value = self._redis_client.get(key)
         if value is None:
             return None
-        return pickle.loads(value)
+        return deserialize_value(value)
 
     def set(self, key: str, value: Any, expire_time: int) -> None:
         """
@@ -62,7 +97,7 @@ class RedisCache(AbstractCache):
         :param expire_time:
         :return:
         """
-        self._redis_client.set(key, pickle.dumps(value), ex=expire_time)
+        self._redis_client.set(key, serialize_value(value), ex=expire_time)
 
     def keys(self, pattern: str) -> List[str]:
         """
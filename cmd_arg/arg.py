@@ -12,7 +12,8 @@
 import argparse
 
 import config
-from tools.utils import str2bool
+from tools import utils
+from tools.utils import str2bool, str2log_levels
 
 
 async def parse_cmd():
@@ -36,6 +37,21 @@ async def parse_cmd():
                         help='where to save the data (csv or db or json)', choices=['csv', 'db', 'json'], default=config.SAVE_DATA_OPTION)
     parser.add_argument('--cookies', type=str,
                         help='cookies used for cookie login type', default=config.COOKIES)
+    parser.add_argument('--log_level', type=str.upper, help='log level (DEBUG | INFO | WARNING | ERROR)',
+                        choices=["DEBUG", "INFO", "WARNING", "ERROR"], default=config.LOG_LEVEL)
+    parser.add_argument('--log_levels', type=str2log_levels,
+                        help='log level of components, e.g. store=WARNING,store.xhs=DEBUG', default="")
+    parser.add_argument('--log_payload_max_chars', type=int,
+                        help='max chars of payloads in log messages, 0 means no truncation',
+                        default=config.LOG_PAYLOAD_MAX_CHARS)
+    parser.add_argument('--log_sample_every', type=int,
+                        help='output one of every N per-item log messages', default=config.LOG_ITEM_SAMPLE_EVERY)
+    parser.add_argument('--profile', type=str, nargs='?', const='sample',
+                        help='profile the crawl (sample | cprofile), sample when no mode is given',
+                        choices=['sample', 'cprofile'], default=config.PROFILE_MODE or None)
+    parser.add_argument('--trace_tasks', '--trace-tasks', type=str2bool,
+                        help='trace asyncio task lifetimes, cpu time and semaphore waits', nargs='?', const=True,
+                        default=config.ENABLE_TASK_TRACE)
 
     args = parser.parse_args()
 
@@ -49,3 +65,10 @@ async def parse_cmd():
     config.ENABLE_GET_SUB_COMMENTS = args.get_sub_comment
     config.SAVE_DATA_OPTION = args.save_data_option
     config.COOKIES = args.cookies
+    config.LOG_LEVEL = args.log_level
+    config.LOG_LEVELS.update(args.log_levels)
+    config.LOG_PAYLOAD_MAX_CHARS = args.log_payload_max_chars
+    config.LOG_ITEM_SAMPLE_EVERY = args.log_sample_every
+    config.PROFILE_MODE = args.profile or ""
+    config.ENABLE_TASK_TRACE = args.trace_tasks
+    utils.configure_logging()
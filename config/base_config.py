@@ -92,6 +92,173 @@ MAX_CONCURRENCY_NUM = 1
 # 是否开启爬图片模式, 默认不开启爬图片
 ENABLE_GET_IMAGES = False
 
+# 是否开启媒体文件内容寻址存储（按内容hash保存，跨帖子去重），默认关闭
+# 开启后图片/视频保存在 MEDIA_STORE_PATH/blobs 下，(平台, 帖子ID, 文件名) -> hash 的映射保存在 MEDIA_STORE_PATH/media_index.db
+# 历史的 data/xhs/images 等目录可以用 python -m store.media_store --platform xhs 迁移
+ENABLE_MEDIA_DEDUP = False
+
+# 内容寻址存储的根目录
+MEDIA_STORE_PATH = "data/media"
+
+# 是否开启独立的媒体下载流水线（暂时仅支持小红书、B站），默认关闭
+# 开启后图片/视频的下载放到独立的后台worker中执行，不再阻塞帖子元数据的爬取与保存
+ENABLE_MEDIA_PIPELINE = False
+
+# 媒体下载的worker数量（下载并发数），与 MAX_CONCURRENCY_NUM 相互独立
+MEDIA_DOWNLOAD_WORKERS = 2
+
+# 媒体下载的带宽限制，单位字节/秒，0 表示不限制
+MEDIA_DOWNLOAD_MAX_BYTES_PER_SEC = 0
+
+# 待下载媒体队列的持久化目录，程序中断后或者下载失败的任务下次启动会继续下载
+MEDIA_DOWNLOAD_QUEUE_DIR = "data/media/queue"
+
+# 内存中待下载队列的长度上限，超出的任务只保存在持久化队列文件中，worker 空闲时再从文件中读取
+MEDIA_DOWNLOAD_QUEUE_SIZE = 1000
+
+# 媒体下载进度日志的打印间隔，单位秒
+MEDIA_DOWNLOAD_PROGRESS_INTERVAL = 10
+
+# 单个视频文件的大小上限，单位字节，0 表示不限制（暂时仅对小红书、B站视频有效）
+MEDIA_MAX_BYTES = 0
+
+# 单个视频的时长上限，单位秒，0 表示不限制（暂时仅对小红书、B站视频有效）
+MEDIA_MAX_DURATION_SEC = 0
+
+# 平台接口没有返回文件大小时，是否在下载前发送HEAD请求探测文件大小
+ENABLE_MEDIA_SIZE_PROBE = False
+
+# 超过上限的视频的处理方式：skip(直接跳过) | defer(记录下来留待以后下载)
+# 两种处理结果都会记录到 MEDIA_STORE_PATH/media_index.db 的 media_decision 表中
+MEDIA_OVERSIZE_ACTION = "skip"
+
+# 媒体下载流水线启动时，是否把之前 defer 的视频中符合当前上限的重新加入下载队列，调大上限后开启
+# 平台的视频地址有时效，时间太久的地址会下载失败
+MEDIA_RESUME_DEFERRED = False
+
+# 是否开启图片后处理（生成缩略图/统一格式），默认关闭（暂时仅对小红书、微博图片有效）
+# 图片保存后在独立的进程池中处理，不占用爬虫的事件循环
+ENABLE_IMAGE_POSTPROCESS = False
+
+# 后处理结果的保存目录，按 平台/帖子ID/文件名 组织
+IMAGE_POSTPROCESS_PATH = "data/thumbnails"
+
+# 缩略图的最大宽高，保持原图比例，设置为 None 表示不生成缩略图
+IMAGE_THUMBNAIL_SIZE = (320, 320)
+
+# 统一转换成的图片格式：JPEG | PNG | WEBP，设置为 None 表示不转换格式
+IMAGE_NORMALIZE_FORMAT = None
+
+# 图片后处理的进程数
+IMAGE_POSTPROCESS_WORKERS = 2
+
+# 存储流水线使用的索引文件目录（近似重复检测等）
+STORE_INDEX_PATH = "data/index"
+
+# 是否开启近似重复内容检测，基于 MinHash-LSH 识别跨关键词、跨平台的搬运帖和小幅改动的刷屏评论
+# 也可以离线检测已保存的数据：python -m store.near_duplicate --platform xhs --type comments --source json --path data/xhs/json
+ENABLE_NEAR_DUP_DETECTION = False
+
+# 近似重复数据的处理方式，tag: 照常保存，只在索引中记录重复关系；suppress: 不再保存
+NEAR_DUP_ACTION = "tag"
+
+# 判定为近似重复的最低相似度（字符 n-gram 集合的 Jaccard 相似度估计值）
+NEAR_DUP_THRESHOLD = 0.7
+
+# MinHash 签名长度和 LSH 分段数，签名长度必须能被分段数整除，分段越多召回越高、候选越多
+NEAR_DUP_NUM_PERM = 64
+NEAR_DUP_BANDS = 16
+
+# 归一化后少于这个长度的文本不做检测，避免"哈哈哈"之类的短评论被误判
+NEAR_DUP_MIN_TEXT_LENGTH = 10
+
+# 计算签名时使用的字符 n-gram 长度
+NEAR_DUP_SHINGLE_SIZE = 3
+
+# 是否开启本地全文检索索引（SQLite FTS5 + jieba 分词），跨平台检索已爬取的内容和评论
+# 检索：python -m store.fulltext_index 红烧肉 --platform xhs wb --type comments
+# 导入已保存的数据：python -m store.fulltext_index --build data/xhs/json --platform xhs --type comments
+ENABLE_FULLTEXT_INDEX = False
+
+# 全文索引每批写入的条数，攒够一批后在后台线程中分词并写入
+FULLTEXT_BATCH_SIZE = 200
+
+# 是否记录互动数据历史，重复爬取同一内容时只记录发生变化的点赞/收藏/评论/分享数，保留增长曲线
+# 查询：python -m store.metrics_history --platform xhs --id 笔记ID 或 --metric liked_count --since 时间戳
+ENABLE_METRICS_HISTORY = False
+
+# 是否开启评论楼层索引，写入评论时记录根评论、层级和路径，按内容ID一次查询还原完整的评论树
+# 导出：python -m store.comment_thread --platform xhs --id 笔记ID --output comment_trees.jsonl
+ENABLE_COMMENT_THREAD_INDEX = False
+
+# 是否对解析出来的数据模型（贴吧、知乎）做完整的 pydantic 校验，默认关闭，解析代码保证字段类型
+# 排查解析问题时可以打开，字段类型不对时会直接抛出 ValidationError
+VALIDATE_PARSED_MODELS = False
+
+# 是否把大页面的解析（贴吧/知乎页面、小红书笔记详情页的 __INITIAL_STATE__）放到进程池中执行，默认关闭
+# 并发较高时页面解析会占用事件循环，影响网络请求
+ENABLE_EXTRACT_PROCESS_POOL = False
+
+# 页面解析的进程数
+EXTRACT_PROCESS_WORKERS = 2
+
+# 页面大于该字符数时才放到进程池中解析，小页面的进程间传输开销大于解析本身，直接在事件循环中解析
+EXTRACT_PROCESS_MIN_SIZE = 100 * 1024
+
+# 平台接口的 HTTP 录制/回放：为空表示正常请求；record 录制请求和响应；replay 不访问网络，使用录制的响应回放
+# 抖音接口使用 requests 发送请求，不支持录制/回放
+HTTP_CASSETTE_MODE = ""
+
+# 录制文件目录，默认每个平台一个文件：data/cassettes/xhs.jsonl
+HTTP_CASSETTE_PATH = "data/cassettes"
+
+# 指定录制文件，为空时使用 HTTP_CASSETTE_PATH 下对应平台的文件
+HTTP_CASSETTE_FILE = ""
+
+# 匹配请求时忽略的查询参数（签名、时间戳等每次请求都会变化的参数）
+HTTP_CASSETTE_IGNORE_PARAMS = ["a_bogus", "msToken", "X-Bogus", "w_rid", "wts", "_", "t", "timestamp", "ts",
+                               "__NS_sig3", "signature"]
+
+# 是否开启运行指标统计（接口请求数/耗时、解析耗时、存储耗时和批大小、并发等待时间、下载字节数），关闭时埋点直接返回
+ENABLE_METRICS = False
+
+# Prometheus 文本格式的指标接口端口，0 表示不开启，开启后访问 http://127.0.0.1:端口/metrics
+METRICS_HTTP_PORT = 0
+
+# 指标接口监听的地址
+METRICS_HTTP_HOST = "127.0.0.1"
+
+# 定期把指标以 json 格式写入的文件，为空表示不写入，程序结束时会写入最后一次
+METRICS_DUMP_FILE = ""
+
+# 指标写入 json 文件的间隔（秒）
+METRICS_DUMP_INTERVAL_SEC = 60
+
+# 日志级别：DEBUG / INFO / WARNING / ERROR，接口原始响应只在 DEBUG 级别输出
+LOG_LEVEL = "INFO"
+
+# 按组件设置日志级别，组件为 MediaCrawler 下的子 logger，例如 {"store": "WARNING", "store.xhs": "DEBUG"}
+LOG_LEVELS = {}
+
+# 日志中接口响应、待存储数据等大对象最多输出的字符数，0 表示不截断
+LOG_PAYLOAD_MAX_CHARS = 512
+
+# 每条数据一条的日志（存储的每条内容/评论）每多少条输出一条，1 表示全部输出
+LOG_ITEM_SAMPLE_EVERY = 1
+
+# 性能分析模式：""（关闭）/ "cprofile"（确定性分析，输出 .prof，可以用 snakeviz 等工具查看，开销较大）/
+# "sample"（定时采样主线程调用栈，输出 flamegraph.pl、speedscope 可以直接读取的 .folded 折叠栈文件）
+PROFILE_MODE = ""
+
+# sample 模式的采样间隔（秒）
+PROFILE_SAMPLE_INTERVAL_SEC = 0.005
+
+# 是否记录 asyncio 任务的生命周期、每个协程的 CPU 时间和信号量等待时间，输出 Chrome trace 格式（chrome://tracing、Perfetto 查看）
+ENABLE_TASK_TRACE = False
+
+# 性能分析结果的输出目录，每次运行一组文件
+PROFILE_PATH = "data/profile"
+
 # 是否开启爬评论模式, 默认开启爬评论
 ENABLE_GET_COMMENTS = True
 
@@ -210,6 +377,19 @@ CUSTOM_WORDS = {
 # 停用(禁用)词文件路径
 STOP_WORDS_FILE = "./docs/hit_stopwords.txt"
 
+# 词频文件的写入间隔，单位秒，期间新增的评论只在内存中累加词频，程序结束时会写入最后的结果
+WORDCLOUD_FLUSH_INTERVAL_SEC = 5
+
+# 词云图的生成间隔，单位秒，0 表示只在程序结束时生成一次，词云图在单独的子进程中生成
+WORDCLOUD_RENDER_INTERVAL_SEC = 60
+
+# jieba 分词的进程数，0 表示直接在爬虫进程中分词（会阻塞事件循环）
+# 也可以离线统计已保存数据的词频：python -m tools.word_segment --input data/xhs/json/xxx.json --output xxx_word_freq.json
+WORD_SEGMENT_WORKERS = 2
+
+# 每个分词任务包含的文本条数，大批量文本会按这个大小切分后并行分词
+WORD_SEGMENT_CHUNK_SIZE = 200
+
 # 中文字体文件路径
 FONT_PATH = "./docs/STZHONGS.TTF"
 
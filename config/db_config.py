@@ -27,4 +27,7 @@ REDIS_DB_NUM = os.getenv("REDIS_DB_NUM", 0)  # your redis db num
 
 # cache type
 CACHE_TYPE_REDIS = "redis"
-CACHE_TYPE_MEMORY = "memory"
\ No newline at end of file
+CACHE_TYPE_MEMORY = "memory"
+
+# redis 缓存值的序列化方式：json | pickle，json 无法表示的值（bytes、自定义对象等）自动使用 pickle
+CACHE_SERIALIZER = os.getenv("CACHE_SERIALIZER", "json")
\ No newline at end of file
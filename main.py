@@ -10,38 +10,34 @@
 
 
 import asyncio
+import importlib
 import sys
 from typing import Optional
 
 import cmd_arg
 import config
-import db
 from base.base_crawler import AbstractCrawler
-from media_platform.bilibili import BilibiliCrawler
-from media_platform.douyin import DouYinCrawler
-from media_platform.kuaishou import KuaishouCrawler
-from media_platform.tieba import TieBaCrawler
-from media_platform.weibo import WeiboCrawler
-from media_platform.xhs import XiaoHongShuCrawler
-from media_platform.zhihu import ZhihuCrawler
 
 
 class CrawlerFactory:
+    # 只导入选中的平台，避免启动时加载所有平台的依赖（playwright、execjs、pandas 等）
     CRAWLERS = {
-        "xhs": XiaoHongShuCrawler,
-        "dy": DouYinCrawler,
-        "ks": KuaishouCrawler,
-        "bili": BilibiliCrawler,
-        "wb": WeiboCrawler,
-        "tieba": TieBaCrawler,
-        "zhihu": ZhihuCrawler
+        "xhs": "media_platform.xhs:XiaoHongShuCrawler",
+        "dy": "media_platform.douyin:DouYinCrawler",
+        "ks": "media_platform.kuaishou:KuaishouCrawler",
+        "bili": "media_platform.bilibili:BilibiliCrawler",
+        "wb": "media_platform.weibo:WeiboCrawler",
+        "tieba": "media_platform.tieba:TieBaCrawler",
+        "zhihu": "media_platform.zhihu:ZhihuCrawler"
     }
 
     @staticmethod
     def create_crawler(platform: str) -> AbstractCrawler:
-        crawler_class = CrawlerFactory.CRAWLERS.get(platform)
-        if not crawler_class:
+        crawler_path = CrawlerFactory.CRAWLERS.get(platform)
+        if not crawler_path:
             raise ValueError("Invalid Media Platform Currently only supported xhs or dy or ks or bili ...")
+        module_name, class_name = crawler_path.split(":")
+        crawler_class = getattr(importlib.import_module(module_name), class_name)
         return crawler_class()
 
 async def main():
@@ -51,19 +47,60 @@ async def main():
 
     # init db
     if config.SAVE_DATA_OPTION == "db":
+        import db
         await db.init_db()
 
-    crawler = CrawlerFactory.create_crawler(platform=config.PLATFORM)
-    await crawler.start()
+    if config.ENABLE_METRICS:
+        from tools.metrics import start_metrics_exporter
+        await start_metrics_exporter()
 
-    if config.SAVE_DATA_OPTION == "db":
-        await db.close()
+    if config.PROFILE_MODE or config.ENABLE_TASK_TRACE:
+        from tools.profiler import start_profiling
+        start_profiling()
+
+    try:
+        crawler = CrawlerFactory.create_crawler(platform=config.PLATFORM)
+        await crawler.start()
+
+        if config.ENABLE_GET_COMMENTS and config.ENABLE_GET_WORDCLOUD:
+            from tools import words
+            await words.flush_word_cloud()
+
+        if config.ENABLE_IMAGE_POSTPROCESS:
+            from tools.image_processor import shutdown_image_processor
+            await shutdown_image_processor()
+
+        if config.ENABLE_EXTRACT_PROCESS_POOL:
+            from tools.extract_executor import shutdown_extract_executor
+            shutdown_extract_executor()
+
+        from store.pipeline import close_store_stages
+        await close_store_stages()
+
+        if config.SAVE_DATA_OPTION == "db":
+            import db
+            await db.close()
+    finally:
+        # 爬取出错或者 Ctrl+C 中断时也要写入性能分析结果和最后一次指标
+        if config.PROFILE_MODE or config.ENABLE_TASK_TRACE:
+            from tools.profiler import stop_profiling
+            stop_profiling()
+
+        if config.ENABLE_METRICS:
+            from tools.metrics import stop_metrics_exporter
+            await stop_metrics_exporter()
 
-    
 
 if __name__ == '__main__':
+    loop = asyncio.get_event_loop()
+    main_task = loop.create_task(main())
     try:
-        # asyncio.run(main())
-        asyncio.get_event_loop().run_until_complete(main())
+        loop.run_until_complete(main_task)
     except KeyboardInterrupt:
+        # Ctrl+C 通常打断的是事件循环而不是 main，取消 main 并等它执行完 finally 中的收尾
+        main_task.cancel()
+        try:
+            loop.run_until_complete(main_task)
+        except (asyncio.CancelledError, KeyboardInterrupt):
+            pass
         sys.exit()
@@ -14,11 +14,11 @@ import random
 from typing import Dict, List, Optional
 from urllib.parse import urlencode
 
-import httpx
 from playwright.async_api import BrowserContext
 
 from base.base_crawler import AbstractApiClient
-from tools import utils
+from tools import json_codec, utils
+from tools.http_cassette import create_async_client
 from .exception import DataFetchError, NetworkError, RateLimitError
 from .field import SearchSortType, SearchFilterType
 from .help import generate_search_id
@@ -60,7 +60,7 @@ class AiqichaClient(AbstractApiClient):
         Returns:
             响应数据字典
         """
-        async with httpx.AsyncClient(proxies=self.proxies, timeout=self.timeout) as client:
+        async with create_async_client(proxies=self.proxies, timeout=self.timeout) as client:
             response = await client.request(
                 method, url, headers=self.headers, **kwargs
             )
@@ -68,7 +68,7 @@ class AiqichaClient(AbstractApiClient):
                 raise NetworkError(f"Request failed with status code: {response.status_code}")
             
             try:
-                return response.json()
+                return json_codec.response_json(response)
             except json.JSONDecodeError:
                 raise DataFetchError(f"Failed to decode JSON response: {response.text}")
 
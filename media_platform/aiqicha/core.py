@@ -22,6 +22,7 @@ from base.base_crawler import AbstractCrawler
 from proxy.proxy_ip_pool import IpInfoModel, create_ip_pool
 from tools import utils
 from tools.cdp_browser import CDPBrowserManager
+from tools.metrics import TimedSemaphore
 from var import crawler_type_var, source_keyword_var
 
 from .client import AiqichaClient
@@ -151,7 +152,7 @@ class AiqichaCrawler(AbstractCrawler):
                         break
                     
                     # 并发获取企业详情
-                    semaphore = asyncio.Semaphore(config.MAX_CONCURRENCY_NUM)
+                    semaphore = TimedSemaphore(config.MAX_CONCURRENCY_NUM)
                     task_list = [
                         self.get_company_detail_async_task(
                             company_id=item.get("id"),
@@ -191,7 +192,7 @@ class AiqichaCrawler(AbstractCrawler):
             utils.logger.info("[AiqichaCrawler.get_specified_companies] No specified companies found")
             return
         
-        semaphore = asyncio.Semaphore(config.MAX_CONCURRENCY_NUM)
+        semaphore = TimedSemaphore(config.MAX_CONCURRENCY_NUM)
         task_list = []
         
         for company_item in company_list:
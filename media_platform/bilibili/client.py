@@ -18,12 +18,13 @@ import json
 from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 from urllib.parse import urlencode
 
-import httpx
 from playwright.async_api import BrowserContext, Page
 
 import config
 from base.base_crawler import AbstractApiClient
-from tools import utils
+from tools import json_codec, utils
+from tools.http_cassette import create_async_client
+from tools.media_downloader import ChunkCallback, fetch_media
 
 from .exception import DataFetchError
 from .field import CommentOrderType, SearchOrderType
@@ -48,12 +49,12 @@ class BilibiliClient(AbstractApiClient):
         self.cookie_dict = cookie_dict
 
     async def request(self, method, url, **kwargs) -> Any:
-        async with httpx.AsyncClient(proxies=self.proxies) as client:
+        async with create_async_client(proxies=self.proxies) as client:
             response = await client.request(
                 method, url, timeout=self.timeout,
                 **kwargs
             )
-        data: Dict = response.json()
+        data: Dict = json_codec.response_json(response)
         if data.get("code") != 0:
             raise DataFetchError(data.get("message", "unkonw error"))
         else:
@@ -192,14 +193,9 @@ class BilibiliClient(AbstractApiClient):
 
         return await self.get(uri, params, enable_params_sign=True)
 
-    async def get_video_media(self, url: str) -> Union[bytes, None]:
-        async with httpx.AsyncClient(proxies=self.proxies) as client:
-            response = await client.request("GET", url, timeout=self.timeout, headers=self.headers)
-            if not response.reason_phrase == "OK":
-                utils.logger.error(f"[BilibiliClient.get_video_media] request {url} err, res:{response.text}")
-                return None
-            else:
-                return response.content
+    async def get_video_media(self, url: str, on_chunk: Optional[ChunkCallback] = None) -> Union[bytes, None]:
+        return await fetch_media(url, headers=self.headers, proxies=self.proxies, timeout=self.timeout,
+                                 on_chunk=on_chunk)
 
     async def get_video_comments(self,
                                  video_id: str,
@@ -20,7 +20,6 @@ import random
 from asyncio import Task
 from typing import Dict, List, Optional, Tuple, Union
 from datetime import datetime, timedelta
-import pandas as pd
 
 from playwright.async_api import (BrowserContext, BrowserType, Page, Playwright, async_playwright)
 
@@ -30,6 +29,8 @@ from proxy.proxy_ip_pool import IpInfoModel, create_ip_pool
 from store import bilibili as bilibili_store
 from tools import utils
 from tools.cdp_browser import CDPBrowserManager
+from tools.media_downloader import MediaDownloadPipeline, MediaTask, preflight_media
+from tools.metrics import TimedSemaphore
 from var import crawler_type_var, source_keyword_var
 
 from .client import BilibiliClient
@@ -43,11 +44,13 @@ class BilibiliCrawler(AbstractCrawler):
     bili_client: BilibiliClient
     browser_context: BrowserContext
     cdp_manager: Optional[CDPBrowserManager]
+    media_pipeline: Optional[MediaDownloadPipeline]
 
     def __init__(self):
         self.index_url = "https://www.bilibili.com"
         self.user_agent = utils.get_user_agent()
         self.cdp_manager = None
+        self.media_pipeline = None
 
     async def start(self):
         playwright_proxy_format, httpx_proxy_format = None, None
@@ -93,6 +96,12 @@ class BilibiliCrawler(AbstractCrawler):
                 await login_obj.begin()
                 await self.bili_client.update_cookies(browser_context=self.browser_context)
 
+            if config.ENABLE_GET_IMAGES and config.ENABLE_MEDIA_PIPELINE:
+                self.media_pipeline = MediaDownloadPipeline(
+                    platform="bili", fetcher=self.bili_client.get_video_media, saver=self.save_media_task
+                )
+                await self.media_pipeline.start()
+
             crawler_type_var.set(config.CRAWLER_TYPE)
             if config.CRAWLER_TYPE == "search":
                 # Search for video and retrieve their comment information.
@@ -108,6 +117,10 @@ class BilibiliCrawler(AbstractCrawler):
                     await self.get_all_creator_details(config.BILI_CREATOR_ID_LIST)
             else:
                 pass
+
+            if self.media_pipeline:
+                await self.media_pipeline.close()
+
             utils.logger.info(
                 "[BilibiliCrawler.start] Bilibili Crawler finished ...")
 
@@ -175,7 +188,7 @@ class BilibiliCrawler(AbstractCrawler):
                     )
                     video_list: List[Dict] = videos_res.get("result")
 
-                    semaphore = asyncio.Semaphore(config.MAX_CONCURRENCY_NUM)
+                    semaphore = TimedSemaphore(config.MAX_CONCURRENCY_NUM)
                     task_list = []
                     try:
                         task_list = [self.get_video_info_task(aid=video_item.get("aid"), bvid="", semaphore=semaphore) for video_item in video_list]
@@ -192,6 +205,8 @@ class BilibiliCrawler(AbstractCrawler):
                     await self.batch_get_video_comments(video_id_list)
             # 按照 START_DAY 至 END_DAY 按照每一天进行筛选，这样能够突破 1000 条视频的限制，最大程度爬取该关键词下每一天的所有视频
             else:
+                # pandas 很重，只在按天爬取时才导入
+                import pandas as pd
                 for day in pd.date_range(start=config.START_DAY, end=config.END_DAY, freq='D'):
                     # 按照每一天进行爬取的时间戳参数
                     pubtime_begin_s, pubtime_end_s = await self.get_pubtime_datetime(start=day.strftime('%Y-%m-%d'), end=day.strftime('%Y-%m-%d'))
@@ -220,7 +235,7 @@ class BilibiliCrawler(AbstractCrawler):
                             )
                             video_list: List[Dict] = videos_res.get("result")
 
-                            semaphore = asyncio.Semaphore(config.MAX_CONCURRENCY_NUM)
+                            semaphore = TimedSemaphore(config.MAX_CONCURRENCY_NUM)
                             task_list = [self.get_video_info_task(aid=video_item.get("aid"), bvid="", semaphore=semaphore) for video_item in video_list]
                             video_items = await asyncio.gather(*task_list)
                             for video_item in video_items:
@@ -249,7 +264,7 @@ class BilibiliCrawler(AbstractCrawler):
 
         utils.logger.info(
             f"[BilibiliCrawler.batch_get_video_comments] video ids:{video_id_list}")
-        semaphore = asyncio.Semaphore(config.MAX_CONCURRENCY_NUM)
+        semaphore = TimedSemaphore(config.MAX_CONCURRENCY_NUM)
         task_list: List[Task] = []
         for video_id in video_id_list:
             task = asyncio.create_task(self.get_comments(
@@ -304,7 +319,7 @@ class BilibiliCrawler(AbstractCrawler):
         get specified videos info
         :return:
         """
-        semaphore = asyncio.Semaphore(config.MAX_CONCURRENCY_NUM)
+        semaphore = TimedSemaphore(config.MAX_CONCURRENCY_NUM)
         task_list = [
             self.get_video_info_task(aid=0, bvid=video_id, semaphore=semaphore) for video_id in
             bvids_list
@@ -509,12 +524,31 @@ class BilibiliCrawler(AbstractCrawler):
             utils.logger.info("[BilibiliCrawler.get_bilibili_video] get video url failed")
             return
 
+        task = MediaTask(platform="bili", note_id=str(aid), url=video_url, slot="video.mp4")
+        if not await preflight_media(task, size=max_size, duration=video_item_view.get("duration"),
+                                     headers=self.bili_client.headers, proxies=self.bili_client.proxies):
+            return
+
+        if self.media_pipeline:
+            await self.media_pipeline.submit(task)
+            return
+
         content = await self.bili_client.get_video_media(video_url)
         if content is None:
             return
         extension_file_name = f"video.mp4"
         await bilibili_store.store_video(aid, content, extension_file_name)
 
+    @staticmethod
+    async def save_media_task(task: MediaTask, content: bytes):
+        """
+        media pipeline saver, save downloaded video
+        :param task:
+        :param content:
+        :return:
+        """
+        await bilibili_store.store_video(task.note_id, content, task.slot)
+
     async def get_all_creator_details(self, creator_id_list: List[int]):
         """
         creator_id_list: get details for creator from creator_id_list
@@ -524,7 +558,7 @@ class BilibiliCrawler(AbstractCrawler):
         utils.logger.info(
             f"[BilibiliCrawler.get_creator_details] creator ids:{creator_id_list}")
 
-        semaphore = asyncio.Semaphore(config.MAX_CONCURRENCY_NUM)
+        semaphore = TimedSemaphore(config.MAX_CONCURRENCY_NUM)
         task_list: List[Task] = []
         try:
             for creator_id in creator_id_list:
@@ -19,7 +19,7 @@ import requests
 from playwright.async_api import BrowserContext
 
 from base.base_crawler import AbstractApiClient
-from tools import utils
+from tools import json_codec, utils
 from var import request_keyword_var
 
 from .exception import *
@@ -101,7 +101,7 @@ class DOUYINClient(AbstractApiClient):
             if response.text == "" or response.text == "blocked":
                 utils.logger.error(f"request params incrr, response.text: {response.text}")
                 raise Exception("account blocked")
-            return response.json()
+            return json_codec.response_json(response)
         except Exception as e:
             raise DataFetchError(f"{e}, {response.text}")
 
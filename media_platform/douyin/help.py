@@ -20,7 +20,9 @@ import random
 import execjs
 from playwright.async_api import Page
 
-douyin_sign_obj = execjs.compile(open('libs/douyin.js', encoding='utf-8-sig').read())
+# 第一次签名时才编译 libs/douyin.js，避免导入模块时就启动js运行环境
+DOUYIN_SIGN_OBJ = None
+
 
 def get_web_id():
     """
@@ -64,7 +66,11 @@ def get_a_bogus_from_js(url: str, params: str, user_agent: str):
     sign_js_name = "sign_datail"
     if "/reply" in url:
         sign_js_name = "sign_reply"
-    return douyin_sign_obj.call(sign_js_name, params, user_agent)
+    global DOUYIN_SIGN_OBJ
+    if not DOUYIN_SIGN_OBJ:
+        with open('libs/douyin.js', encoding='utf-8-sig') as f:
+            DOUYIN_SIGN_OBJ = execjs.compile(f.read())
+    return DOUYIN_SIGN_OBJ.call(sign_js_name, params, user_agent)
 
 
 
@@ -15,12 +15,12 @@ import json
 from typing import Any, Callable, Dict, List, Optional
 from urllib.parse import urlencode
 
-import httpx
 from playwright.async_api import BrowserContext, Page
 
 import config
 from base.base_crawler import AbstractApiClient
-from tools import utils
+from tools import json_codec, utils
+from tools.http_cassette import create_async_client
 
 from .exception import DataFetchError
 from .graphql import KuaiShouGraphQL
@@ -45,9 +45,9 @@ class KuaiShouClient(AbstractApiClient):
         self.graphql = KuaiShouGraphQL()
 
     async def request(self, method, url, **kwargs) -> Any:
-        async with httpx.AsyncClient(proxies=self.proxies) as client:
+        async with create_async_client(proxies=self.proxies) as client:
             response = await client.request(method, url, timeout=self.timeout, **kwargs)
-        data: Dict = response.json()
+        data: Dict = json_codec.response_json(response)
         if data.get("errors"):
             raise DataFetchError(data.get("errors", "unkonw error"))
         else:
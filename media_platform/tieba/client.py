@@ -14,7 +14,6 @@ import json
 from typing import Any, Callable, Dict, List, Optional, Union
 from urllib.parse import urlencode
 
-import httpx
 from playwright.async_api import BrowserContext
 from tenacity import RetryError, retry, stop_after_attempt, wait_fixed
 
@@ -22,7 +21,9 @@ import config
 from base.base_crawler import AbstractApiClient
 from model.m_baidu_tieba import TiebaComment, TiebaCreator, TiebaNote
 from proxy.proxy_ip_pool import ProxyIpPool
-from tools import utils
+from tools import json_codec, utils
+from tools.http_cassette import create_async_client
+from tools.extract_executor import get_extract_executor
 
 from .field import SearchNoteType, SearchSortType
 from .help import TieBaExtractor
@@ -60,7 +61,7 @@ class BaiduTieBaClient(AbstractApiClient):
 
         """
         actual_proxies = proxies if proxies else self.default_ip_proxy
-        async with httpx.AsyncClient(proxies=actual_proxies) as client:
+        async with create_async_client(proxies=actual_proxies) as client:
             response = await client.request(
                 method, url, timeout=self.timeout,
                 headers=self.headers, **kwargs
@@ -78,7 +79,7 @@ class BaiduTieBaClient(AbstractApiClient):
         if return_ori_content:
             return response.text
 
-        return response.json()
+        return json_codec.response_json(response)
 
     async def get(self, uri: str, params=None, return_ori_content=False, **kwargs) -> Any:
         """
@@ -138,7 +139,7 @@ class BaiduTieBaClient(AbstractApiClient):
         try:
             uri = "/mo/q/sync"
             res: Dict = await self.get(uri)
-            utils.logger.info(f"[BaiduTieBaClient.pong] res: {res}")
+            utils.logger.debug("[BaiduTieBaClient.pong] res: %s", utils.log_payload(res))
             if res and res.get("no") == 0:
                 ping_flag = True
             else:
@@ -188,7 +189,7 @@ class BaiduTieBaClient(AbstractApiClient):
             "only_thread": note_type.value
         }
         page_content = await self.get(uri, params=params, return_ori_content=True)
-        return self._page_extractor.extract_search_note_list(page_content)
+        return await get_extract_executor().run(self._page_extractor.extract_search_note_list, page_content)
 
     async def get_note_by_id(self, note_id: str) -> TiebaNote:
         """
@@ -201,7 +202,7 @@ class BaiduTieBaClient(AbstractApiClient):
         """
         uri = f"/p/{note_id}"
         page_content = await self.get(uri, return_ori_content=True)
-        return self._page_extractor.extract_note_detail(page_content)
+        return await get_extract_executor().run(self._page_extractor.extract_note_detail, page_content)
 
     async def get_note_all_comments(self, note_detail: TiebaNote, crawl_interval: float = 1.0,
                                     callback: Optional[Callable] = None,
@@ -225,8 +226,8 @@ class BaiduTieBaClient(AbstractApiClient):
                 "pn": current_page
             }
             page_content = await self.get(uri, params=params, return_ori_content=True)
-            comments = self._page_extractor.extract_tieba_note_parment_comments(page_content,
-                                                                                note_id=note_detail.note_id)
+            comments = await get_extract_executor().run(self._page_extractor.extract_tieba_note_parment_comments,
+                                                        page_content, note_detail.note_id)
             if not comments:
                 break
             if len(result) + len(comments) > max_count:
@@ -275,8 +276,8 @@ class BaiduTieBaClient(AbstractApiClient):
                     "pn": current_page  # 页码
                 }
                 page_content = await self.get(uri, params=params, return_ori_content=True)
-                sub_comments = self._page_extractor.extract_tieba_note_sub_comments(page_content,
-                                                                                    parent_comment=parment_comment)
+                sub_comments = await get_extract_executor().run(
+                    self._page_extractor.extract_tieba_note_sub_comments, page_content, parment_comment)
 
                 if not sub_comments:
                     break
@@ -299,7 +300,7 @@ class BaiduTieBaClient(AbstractApiClient):
         """
         uri = f"/f?kw={tieba_name}&pn={page_num}"
         page_content = await self.get(uri, return_ori_content=True)
-        return self._page_extractor.extract_tieba_note_list(page_content)
+        return await get_extract_executor().run(self._page_extractor.extract_tieba_note_list, page_content)
 
     async def get_creator_info_by_url(self, creator_url: str) -> str:
         """
@@ -26,6 +26,8 @@ from store import tieba as tieba_store
 from tools import utils
 from tools.cdp_browser import CDPBrowserManager
 from tools.crawler_util import format_proxy_info
+from tools.extract_executor import get_extract_executor
+from tools.metrics import TimedSemaphore
 from var import crawler_type_var, source_keyword_var
 
 from .client import BaiduTieBaClient
@@ -158,7 +160,7 @@ class TieBaCrawler(AbstractCrawler):
         Returns:
 
         """
-        semaphore = asyncio.Semaphore(config.MAX_CONCURRENCY_NUM)
+        semaphore = TimedSemaphore(config.MAX_CONCURRENCY_NUM)
         task_list = [
             self.get_note_detail_async_task(note_id=note_id, semaphore=semaphore) for note_id in note_id_list
         ]
@@ -209,7 +211,7 @@ class TieBaCrawler(AbstractCrawler):
         if not config.ENABLE_GET_COMMENTS:
             return
 
-        semaphore = asyncio.Semaphore(config.MAX_CONCURRENCY_NUM)
+        semaphore = TimedSemaphore(config.MAX_CONCURRENCY_NUM)
         task_list: List[Task] = []
         for note_detail in note_detail_list:
             task = asyncio.create_task(self.get_comments_async_task(note_detail, semaphore), name=note_detail.note_id)
@@ -244,9 +246,10 @@ class TieBaCrawler(AbstractCrawler):
         utils.logger.info("[WeiboCrawler.get_creators_and_notes] Begin get weibo creators")
         for creator_url in config.TIEBA_CREATOR_URL_LIST:
             creator_page_html_content = await self.tieba_client.get_creator_info_by_url(creator_url=creator_url)
-            creator_info: TiebaCreator = self._page_extractor.extract_creator_info(creator_page_html_content)
+            creator_info: TiebaCreator = await get_extract_executor().run(
+                self._page_extractor.extract_creator_info, creator_page_html_content)
             if creator_info:
-                utils.logger.info(f"[WeiboCrawler.get_creators_and_notes] creator info: {creator_info}")
+                utils.logger.info("[WeiboCrawler.get_creators_and_notes] creator info: %s", utils.log_payload(creator_info))
                 if not creator_info:
                     raise Exception("Get creator info error")
 
@@ -16,15 +16,110 @@ import re
 from typing import Dict, List, Tuple
 from urllib.parse import parse_qs, unquote
 
-from parsel import Selector
+from lxml import etree
+from lxml.html import HTMLParser
 
 from constant import baidu_tieba as const
+from model import build_model
 from model.m_baidu_tieba import TiebaComment, TiebaCreator, TiebaNote
 from tools import utils
 
 GENDER_MALE = "sex_male"
 GENDER_FEMALE = "sex_female"
 
+# 所有 xpath 在模块加载时编译好，页面只解析一次，解析函数中不再重复编译表达式
+# 关键词搜索结果页
+SEARCH_POST_XPATH = etree.XPath("//div[@class='s_post']")
+SEARCH_POST_ID_XPATH = etree.XPath(".//span[@class='p_title']/a/@data-tid")
+SEARCH_POST_TITLE_XPATH = etree.XPath(".//span[@class='p_title']/a/text()")
+SEARCH_POST_HREF_XPATH = etree.XPath(".//span[@class='p_title']/a/@href")
+SEARCH_POST_DESC_XPATH = etree.XPath(".//div[@class='p_content']/text()")
+SEARCH_POST_USER_NAME_XPATH = etree.XPath(".//a[starts-with(@href, '/home/main')]/font/text()")
+SEARCH_POST_USER_LINK_XPATH = etree.XPath(".//a[starts-with(@href, '/home/main')]/@href")
+SEARCH_POST_FORUM_NAME_XPATH = etree.XPath(".//a[@class='p_forum']/font/text()")
+SEARCH_POST_FORUM_LINK_XPATH = etree.XPath(".//a[@class='p_forum']/@href")
+SEARCH_POST_DATE_XPATH = etree.XPath(".//font[@class='p_green p_date']/text()")
+
+# 贴吧帖子列表页
+THREAD_LIST_XPATH = etree.XPath("//ul[@id='thread_list']/li")
+THREAD_TITLE_XPATH = etree.XPath(".//a[@class='j_th_tit ']/text()")
+THREAD_DESC_XPATH = etree.XPath(".//div[@class='threadlist_abs threadlist_abs_onlyline ']/text()")
+THREAD_AUTHOR_LINK_XPATH = etree.XPath(".//a[@class='frs-author-name j_user_card ']/@href")
+
+# 贴吧名称和链接，整个页面只有一个，在循环外取一次
+FORUM_NAME_XPATH = etree.XPath("//a[@class='card_title_fname']/text()")
+FORUM_LINK_XPATH = etree.XPath("//a[@class='card_title_fname']/@href")
+
+# 帖子详情页
+NOTE_FIRST_FLOOR_XPATH = etree.XPath("//div[@class='p_postlist'][1]")
+NOTE_ONLY_AUTHOR_LINK_XPATH = etree.XPath("//*[@id='lzonly_cntn']/@href")
+NOTE_REPLY_NUM_XPATH = etree.XPath("//div[@id='thread_theme_5']//li[@class='l_reply_num']//span[@class='red']")
+NOTE_TITLE_XPATH = etree.XPath("//title/text()")
+NOTE_DESC_XPATH = etree.XPath("//meta[@name='description']/@content")
+POST_TAIL_XPATH = etree.XPath(".//div[@class='post-tail-wrap']")
+AUTHOR_FACE_LINK_XPATH = etree.XPath(".//a[@class='p_author_face ']/@href")
+AUTHOR_FACE_IMG_XPATH = etree.XPath(".//a[@class='p_author_face ']/img/@src")
+AUTHOR_NAME_XPATH = etree.XPath(".//a[@class='p_author_name j_user_card']/text()")
+TEXT_XPATH = etree.XPath("./text()")
+
+# 一级评论
+COMMENT_POST_XPATH = etree.XPath("//div[@class='l_post l_post_bright j_l_post clearfix  ']")
+
+# 二级评论，第一条评论的 class 不同
+SUB_COMMENT_FIRST_XPATH = etree.XPath("//li[@class='lzl_single_post j_lzl_s_p first_no_border']")
+SUB_COMMENT_XPATH = etree.XPath("//li[@class='lzl_single_post j_lzl_s_p ']")
+SUB_COMMENT_USER_XPATH = etree.XPath("./a[@class='j_user_card lzl_p_p']")
+SUB_COMMENT_CONTENT_XPATH = etree.XPath(".//span[@class='lzl_content_main']")
+SUB_COMMENT_TIME_XPATH = etree.XPath(".//span[@class='lzl_time']/text()")
+HREF_XPATH = etree.XPath("./@href")
+IMG_SRC_XPATH = etree.XPath("./img/@src")
+
+# 创作者主页
+CREATOR_LINK_XPATH = etree.XPath("//p[@class='space']/a/@href")
+CREATOR_USERDATA_XPATH = etree.XPath("//div[@class='userinfo_userdata']")
+CREATOR_CONCERN_NUM_XPATH = etree.XPath("//span[@class='concern_num']")
+CREATOR_NICKNAME_XPATH = etree.XPath(".//span[@class='userinfo_username ']/text()")
+CREATOR_AVATAR_XPATH = etree.XPath(".//div[@class='userinfo_left_head']//img/@src")
+CREATOR_THREAD_URL_XPATH = etree.XPath("//ul[@class='new_list clearfix']//div[@class='thread_name']/a[1]/@href")
+
+PUB_TIME_PATTERN = re.compile(r'<span class="tail-info">(\d{4}-\d{2}-\d{2} \d{2}:\d{2})</span>')
+IP_PATTERN = re.compile(r'IP属地:(\S+)</span>')
+CONCERN_NUM_PATTERN = re.compile(r'<span class="concern_num">\(<a[^>]*>(\d+)</a>\)</span>')
+REGISTRATION_DURATION_PATTERN = re.compile(r'<span>吧龄:(\S+)</span>')
+
+
+def parse_html(page_content: str) -> etree._Element:
+    """
+    解析页面，和 parsel.Selector 使用相同的 lxml 解析参数，解析结果保持一致
+    Args:
+        page_content: 页面内容的HTML字符串
+
+    Returns:
+        文档根节点
+    """
+    body = page_content.strip().replace("\x00", "").encode("utf8") or b"<html/>"
+    parser = HTMLParser(recover=True, encoding="utf8", huge_tree=True)
+    root = etree.fromstring(body, parser=parser)
+    if root is None:
+        root = etree.fromstring(b"<html/>", parser=parser)
+    return root
+
+
+def first_text(results: List) -> str:
+    """
+    xpath 字符串结果的第一个，转换成普通的 str，不再引用解析出来的文档
+    """
+    return str(results[0]) if results else ""
+
+
+def outer_html(elements: List[etree._Element]) -> str:
+    """
+    第一个节点序列化后的HTML（不包括节点后面的文本）
+    """
+    if not elements:
+        return ""
+    return etree.tostring(elements[0], method="html", encoding="unicode", with_tail=False)
+
 
 class TieBaExtractor:
     def __init__(self):
@@ -40,23 +135,17 @@ class TieBaExtractor:
         Returns:
             包含帖子信息的字典列表
         """
-        xpath_selector = "//div[@class='s_post']"
-        post_list = Selector(text=page_content).xpath(xpath_selector)
         result: List[TiebaNote] = []
-        for post in post_list:
-            tieba_note = TiebaNote(note_id=post.xpath(".//span[@class='p_title']/a/@data-tid").get(default='').strip(),
-                                   title=post.xpath(".//span[@class='p_title']/a/text()").get(default='').strip(),
-                                   desc=post.xpath(".//div[@class='p_content']/text()").get(default='').strip(),
-                                   note_url=const.TIEBA_URL + post.xpath(".//span[@class='p_title']/a/@href").get(
-                                       default=''),
-                                   user_nickname=post.xpath(".//a[starts-with(@href, '/home/main')]/font/text()").get(
-                                       default='').strip(), user_link=const.TIEBA_URL + post.xpath(
-                    ".//a[starts-with(@href, '/home/main')]/@href").get(default=''),
-                                   tieba_name=post.xpath(".//a[@class='p_forum']/font/text()").get(default='').strip(),
-                                   tieba_link=const.TIEBA_URL + post.xpath(".//a[@class='p_forum']/@href").get(
-                                       default=''),
-                                   publish_time=post.xpath(".//font[@class='p_green p_date']/text()").get(
-                                       default='').strip(), )
+        for post in SEARCH_POST_XPATH(parse_html(page_content)):
+            tieba_note = build_model(TiebaNote, note_id=first_text(SEARCH_POST_ID_XPATH(post)).strip(),
+                                     title=first_text(SEARCH_POST_TITLE_XPATH(post)).strip(),
+                                     desc=first_text(SEARCH_POST_DESC_XPATH(post)).strip(),
+                                     note_url=const.TIEBA_URL + first_text(SEARCH_POST_HREF_XPATH(post)),
+                                     user_nickname=first_text(SEARCH_POST_USER_NAME_XPATH(post)).strip(),
+                                     user_link=const.TIEBA_URL + first_text(SEARCH_POST_USER_LINK_XPATH(post)),
+                                     tieba_name=first_text(SEARCH_POST_FORUM_NAME_XPATH(post)).strip(),
+                                     tieba_link=const.TIEBA_URL + first_text(SEARCH_POST_FORUM_LINK_XPATH(post)),
+                                     publish_time=first_text(SEARCH_POST_DATE_XPATH(post)).strip(), )
             result.append(tieba_note)
         return result
 
@@ -69,29 +158,24 @@ class TieBaExtractor:
         Returns:
 
         """
-        page_content = page_content.replace('<!--', "")
-        content_selector = Selector(text=page_content)
-        xpath_selector = "//ul[@id='thread_list']/li"
-        post_list = content_selector.xpath(xpath_selector)
+        root = parse_html(page_content.replace('<!--', ""))
+        tieba_name = first_text(FORUM_NAME_XPATH(root)).strip()
+        tieba_link = const.TIEBA_URL + first_text(FORUM_LINK_XPATH(root))
         result: List[TiebaNote] = []
-        for post_selector in post_list:
-            post_field_value: Dict = self.extract_data_field_value(post_selector)
+        for post in THREAD_LIST_XPATH(root):
+            post_field_value: Dict = self.extract_data_field_value(post)
             if not post_field_value:
                 continue
             note_id = str(post_field_value.get("id"))
-            tieba_note = TiebaNote(note_id=note_id,
-                                   title=post_selector.xpath(".//a[@class='j_th_tit ']/text()").get(default='').strip(),
-                                   desc=post_selector.xpath(
-                                       ".//div[@class='threadlist_abs threadlist_abs_onlyline ']/text()").get(
-                                       default='').strip(), note_url=const.TIEBA_URL + f"/p/{note_id}",
-                                   user_link=const.TIEBA_URL + post_selector.xpath(
-                                       ".//a[@class='frs-author-name j_user_card ']/@href").get(default='').strip(),
-                                   user_nickname=post_field_value.get("authoer_nickname") or post_field_value.get(
-                                       "author_name"),
-                                   tieba_name=content_selector.xpath("//a[@class='card_title_fname']/text()").get(
-                                       default='').strip(), tieba_link=const.TIEBA_URL + content_selector.xpath(
-                    "//a[@class='card_title_fname']/@href").get(default=''),
-                                   total_replay_num=post_field_value.get("reply_num", 0))
+            tieba_note = build_model(TiebaNote, note_id=note_id,
+                                     title=first_text(THREAD_TITLE_XPATH(post)).strip(),
+                                     desc=first_text(THREAD_DESC_XPATH(post)).strip(),
+                                     note_url=const.TIEBA_URL + f"/p/{note_id}",
+                                     user_link=const.TIEBA_URL + first_text(THREAD_AUTHOR_LINK_XPATH(post)).strip(),
+                                     user_nickname=post_field_value.get("authoer_nickname") or post_field_value.get(
+                                         "author_name") or "",
+                                     tieba_name=tieba_name, tieba_link=tieba_link,
+                                     total_replay_num=int(post_field_value.get("reply_num") or 0))
             result.append(tieba_note)
         return result
 
@@ -104,31 +188,29 @@ class TieBaExtractor:
         Returns:
 
         """
-        content_selector = Selector(text=page_content)
-        first_floor_selector = content_selector.xpath("//div[@class='p_postlist'][1]")
-        only_view_author_link = content_selector.xpath("//*[@id='lzonly_cntn']/@href").get(default='').strip()
+        root = parse_html(page_content)
+        first_floor = NOTE_FIRST_FLOOR_XPATH(root)[:1]
+        only_view_author_link = first_text(NOTE_ONLY_AUTHOR_LINK_XPATH(root)).strip()
         note_id = only_view_author_link.split("?")[0].split("/")[-1]
         # 帖子回复数、回复页数
-        thread_num_infos = content_selector.xpath(
-            "//div[@id='thread_theme_5']//li[@class='l_reply_num']//span[@class='red']")
+        thread_num_infos = NOTE_REPLY_NUM_XPATH(root)
         # IP地理位置、发表时间
-        other_info_content = content_selector.xpath(".//div[@class='post-tail-wrap']").get(default="").strip()
+        other_info_content = outer_html(POST_TAIL_XPATH(root)).strip()
         ip_location, publish_time = self.extract_ip_and_pub_time(other_info_content)
-        note = TiebaNote(note_id=note_id, title=content_selector.xpath("//title/text()").get(default='').strip(),
-                         desc=content_selector.xpath("//meta[@name='description']/@content").get(default='').strip(),
-                         note_url=const.TIEBA_URL + f"/p/{note_id}",
-                         user_link=const.TIEBA_URL + first_floor_selector.xpath(
-                             ".//a[@class='p_author_face ']/@href").get(default='').strip(),
-                         user_nickname=first_floor_selector.xpath(
-                             ".//a[@class='p_author_name j_user_card']/text()").get(default='').strip(),
-                         user_avatar=first_floor_selector.xpath(".//a[@class='p_author_face ']/img/@src").get(
-                             default='').strip(),
-                         tieba_name=content_selector.xpath("//a[@class='card_title_fname']/text()").get(
-                             default='').strip(), tieba_link=const.TIEBA_URL + content_selector.xpath(
-                "//a[@class='card_title_fname']/@href").get(default=''), ip_location=ip_location,
-                         publish_time=publish_time,
-                         total_replay_num=thread_num_infos[0].xpath("./text()").get(default='').strip(),
-                         total_replay_page=thread_num_infos[1].xpath("./text()").get(default='').strip(), )
+        note = build_model(TiebaNote, note_id=note_id, title=first_text(NOTE_TITLE_XPATH(root)).strip(),
+                           desc=first_text(NOTE_DESC_XPATH(root)).strip(),
+                           note_url=const.TIEBA_URL + f"/p/{note_id}",
+                           user_link=const.TIEBA_URL + first_text(
+                               [href for floor in first_floor for href in AUTHOR_FACE_LINK_XPATH(floor)]).strip(),
+                           user_nickname=first_text(
+                               [name for floor in first_floor for name in AUTHOR_NAME_XPATH(floor)]).strip(),
+                           user_avatar=first_text(
+                               [src for floor in first_floor for src in AUTHOR_FACE_IMG_XPATH(floor)]).strip(),
+                           tieba_name=first_text(FORUM_NAME_XPATH(root)).strip(),
+                           tieba_link=const.TIEBA_URL + first_text(FORUM_LINK_XPATH(root)),
+                           ip_location=ip_location, publish_time=publish_time,
+                           total_replay_num=int(first_text(TEXT_XPATH(thread_num_infos[0])).strip() or 0),
+                           total_replay_page=int(first_text(TEXT_XPATH(thread_num_infos[1])).strip() or 0), )
         note.title = note.title.replace(f"【{note.tieba_name}】_百度贴吧", "")
         return note
 
@@ -142,30 +224,26 @@ class TieBaExtractor:
         Returns:
 
         """
-        xpath_selector = "//div[@class='l_post l_post_bright j_l_post clearfix  ']"
-        comment_list = Selector(text=page_content).xpath(xpath_selector)
+        root = parse_html(page_content)
+        tieba_name = first_text(FORUM_NAME_XPATH(root)).strip()
         result: List[TiebaComment] = []
-        for comment_selector in comment_list:
-            comment_field_value: Dict = self.extract_data_field_value(comment_selector)
+        for comment in COMMENT_POST_XPATH(root):
+            comment_field_value: Dict = self.extract_data_field_value(comment)
             if not comment_field_value:
                 continue
-            tieba_name = comment_selector.xpath("//a[@class='card_title_fname']/text()").get(default='').strip()
-            other_info_content = comment_selector.xpath(".//div[@class='post-tail-wrap']").get(default="").strip()
+            other_info_content = outer_html(POST_TAIL_XPATH(comment)).strip()
             ip_location, publish_time = self.extract_ip_and_pub_time(other_info_content)
-            tieba_comment = TiebaComment(comment_id=str(comment_field_value.get("content").get("post_id")),
-                                         sub_comment_count=comment_field_value.get("content").get("comment_num"),
-                                         content=utils.extract_text_from_html(
-                                             comment_field_value.get("content").get("content")),
-                                         note_url=const.TIEBA_URL + f"/p/{note_id}",
-                                         user_link=const.TIEBA_URL + comment_selector.xpath(
-                                             ".//a[@class='p_author_face ']/@href").get(default='').strip(),
-                                         user_nickname=comment_selector.xpath(
-                                             ".//a[@class='p_author_name j_user_card']/text()").get(default='').strip(),
-                                         user_avatar=comment_selector.xpath(
-                                             ".//a[@class='p_author_face ']/img/@src").get(default='').strip(),
-                                         tieba_id=str(comment_field_value.get("content").get("forum_id", "")),
-                                         tieba_name=tieba_name, tieba_link=f"https://tieba.baidu.com/f?kw={tieba_name}",
-                                         ip_location=ip_location, publish_time=publish_time, note_id=note_id, )
+            comment_content: Dict = comment_field_value.get("content")
+            tieba_comment = build_model(TiebaComment, comment_id=str(comment_content.get("post_id")),
+                                        sub_comment_count=int(comment_content.get("comment_num") or 0),
+                                        content=utils.extract_text_from_html(comment_content.get("content")),
+                                        note_url=const.TIEBA_URL + f"/p/{note_id}",
+                                        user_link=const.TIEBA_URL + first_text(AUTHOR_FACE_LINK_XPATH(comment)).strip(),
+                                        user_nickname=first_text(AUTHOR_NAME_XPATH(comment)).strip(),
+                                        user_avatar=first_text(AUTHOR_FACE_IMG_XPATH(comment)).strip(),
+                                        tieba_id=str(comment_content.get("forum_id", "")),
+                                        tieba_name=tieba_name, tieba_link=f"https://tieba.baidu.com/f?kw={tieba_name}",
+                                        ip_location=ip_location, publish_time=publish_time, note_id=note_id, )
             result.append(tieba_comment)
         return result
 
@@ -179,23 +257,20 @@ class TieBaExtractor:
         Returns:
 
         """
-        selector = Selector(page_content)
+        root = parse_html(page_content)
         comments = []
-        comment_ele_list = selector.xpath("//li[@class='lzl_single_post j_lzl_s_p first_no_border']")
-        comment_ele_list.extend(selector.xpath("//li[@class='lzl_single_post j_lzl_s_p ']"))
-        for comment_ele in comment_ele_list:
+        for comment_ele in SUB_COMMENT_FIRST_XPATH(root) + SUB_COMMENT_XPATH(root):
             comment_value = self.extract_data_field_value(comment_ele)
             if not comment_value:
                 continue
-            comment_user_a_selector = comment_ele.xpath("./a[@class='j_user_card lzl_p_p']")[0]
-            content = utils.extract_text_from_html(
-                comment_ele.xpath(".//span[@class='lzl_content_main']").get(default=""))
-            comment = TiebaComment(
-                comment_id=str(comment_value.get("spid")), content=content,
-                user_link=comment_user_a_selector.xpath("./@href").get(default=""),
-                user_nickname=comment_value.get("showname"),
-                user_avatar=comment_user_a_selector.xpath("./img/@src").get(default=""),
-                publish_time=comment_ele.xpath(".//span[@class='lzl_time']/text()").get(default="").strip(),
+            comment_user_a = SUB_COMMENT_USER_XPATH(comment_ele)[0]
+            content = utils.extract_text_from_html(outer_html(SUB_COMMENT_CONTENT_XPATH(comment_ele)))
+            comment = build_model(
+                TiebaComment, comment_id=str(comment_value.get("spid")), content=content,
+                user_link=first_text(HREF_XPATH(comment_user_a)),
+                user_nickname=comment_value.get("showname") or "",
+                user_avatar=first_text(IMG_SRC_XPATH(comment_user_a)),
+                publish_time=first_text(SUB_COMMENT_TIME_XPATH(comment_ele)).strip(),
                 parent_comment_id=parent_comment.comment_id,
                 note_id=parent_comment.note_id, note_url=parent_comment.note_url,
                 tieba_id=parent_comment.tieba_id, tieba_name=parent_comment.tieba_name,
@@ -213,29 +288,26 @@ class TieBaExtractor:
         Returns:
 
         """
-        selector = Selector(text=html_content)
-        user_link_selector = selector.xpath("//p[@class='space']/a")
-        user_link: str = user_link_selector.xpath("./@href").get(default='')
+        root = parse_html(html_content)
+        user_link: str = first_text(CREATOR_LINK_XPATH(root))
         user_link_params: Dict = parse_qs(unquote(user_link.split("?")[-1]))
         user_name = user_link_params.get("un")[0] if user_link_params.get("un") else ""
         user_id = user_link_params.get("id")[0] if user_link_params.get("id") else ""
-        userinfo_userdata_selector = selector.xpath("//div[@class='userinfo_userdata']")
-        follow_fans_selector = selector.xpath("//span[@class='concern_num']")
+        follow_fans_elements = CREATOR_CONCERN_NUM_XPATH(root)
         follows, fans = 0, 0
-        if len(follow_fans_selector) == 2:
-            follows, fans = self.extract_follow_and_fans(follow_fans_selector)
-        user_content = userinfo_userdata_selector.get(default='')
-        return TiebaCreator(user_id=user_id, user_name=user_name,
-                            nickname=selector.xpath(".//span[@class='userinfo_username ']/text()").get(
-                                default='').strip(),
-                            avatar=selector.xpath(".//div[@class='userinfo_left_head']//img/@src").get(
-                                default='').strip(),
-                            gender=self.extract_gender(user_content),
-                            ip_location=self.extract_ip(user_content),
-                            follows=follows,
-                            fans=fans,
-                            registration_duration=self.extract_registration_duration(user_content)
-                            )
+        if len(follow_fans_elements) == 2:
+            follows, fans = self.extract_follow_and_fans(
+                [outer_html([element]) for element in follow_fans_elements])
+        user_content = outer_html(CREATOR_USERDATA_XPATH(root))
+        return build_model(TiebaCreator, user_id=user_id, user_name=user_name,
+                           nickname=first_text(CREATOR_NICKNAME_XPATH(root)).strip(),
+                           avatar=first_text(CREATOR_AVATAR_XPATH(root)).strip(),
+                           gender=self.extract_gender(user_content),
+                           ip_location=self.extract_ip(user_content),
+                           follows=int(follows),
+                           fans=int(fans),
+                           registration_duration=self.extract_registration_duration(user_content)
+                           )
 
     @staticmethod
     def extract_tieba_thread_id_list_from_creator_page(
@@ -249,13 +321,8 @@ class TieBaExtractor:
         Returns:
 
         """
-        selector = Selector(text=html_content)
         thread_id_list = []
-        xpath_selector = (
-            "//ul[@class='new_list clearfix']//div[@class='thread_name']/a[1]/@href"
-        )
-        thread_url_list = selector.xpath(xpath_selector).getall()
-        for thread_url in thread_url_list:
+        for thread_url in CREATOR_THREAD_URL_XPATH(parse_html(html_content)):
             thread_id = thread_url.split("?")[0].split("/")[-1]
             thread_id_list.append(thread_id)
         return thread_id_list
@@ -269,8 +336,7 @@ class TieBaExtractor:
         Returns:
 
         """
-        pattern_pub_time = re.compile(r'<span class="tail-info">(\d{4}-\d{2}-\d{2} \d{2}:\d{2})</span>')
-        time_match = pattern_pub_time.search(html_content)
+        time_match = PUB_TIME_PATTERN.search(html_content)
         pub_time = time_match.group(1) if time_match else ""
         return self.extract_ip(html_content), pub_time
 
@@ -284,8 +350,7 @@ class TieBaExtractor:
         Returns:
 
         """
-        pattern_ip = re.compile(r'IP属地:(\S+)</span>')
-        ip_match = pattern_ip.search(html_content)
+        ip_match = IP_PATTERN.search(html_content)
         ip = ip_match.group(1) if ip_match else ""
         return ip
 
@@ -306,18 +371,17 @@ class TieBaExtractor:
         return '未知'
 
     @staticmethod
-    def extract_follow_and_fans(selectors: List[Selector]) -> Tuple[str, str]:
+    def extract_follow_and_fans(concern_num_htmls: List[str]) -> Tuple[str, str]:
         """
         提取关注数和粉丝数
         Args:
-            selectors:
+            concern_num_htmls: 关注数、粉丝数两个 concern_num 节点的HTML
 
         Returns:
 
         """
-        pattern = re.compile(r'<span class="concern_num">\(<a[^>]*>(\d+)</a>\)</span>')
-        follow_match = pattern.findall(selectors[0].get())
-        fans_match = pattern.findall(selectors[1].get())
+        follow_match = CONCERN_NUM_PATTERN.findall(concern_num_htmls[0])
+        fans_match = CONCERN_NUM_PATTERN.findall(concern_num_htmls[1])
         follows = follow_match[0] if follow_match else 0
         fans = fans_match[0] if fans_match else 0
         return follows, fans
@@ -329,21 +393,20 @@ class TieBaExtractor:
         Returns: 1.9年
 
         """
-        pattern = re.compile(r'<span>吧龄:(\S+)</span>')
-        match = pattern.search(html_content)
+        match = REGISTRATION_DURATION_PATTERN.search(html_content)
         return match.group(1) if match else ""
 
     @staticmethod
-    def extract_data_field_value(selector: Selector) -> Dict:
+    def extract_data_field_value(element: etree._Element) -> Dict:
         """
         提取data-field的值
         Args:
-            selector:
+            element:
 
         Returns:
 
         """
-        data_field_value = selector.xpath("./@data-field").get(default='').strip()
+        data_field_value = element.get("data-field", "").strip()
         if not data_field_value or data_field_value == "{}":
             return {}
         try:
@@ -21,12 +21,12 @@ import re
 from typing import Callable, Dict, List, Optional, Union
 from urllib.parse import parse_qs, unquote, urlencode
 
-import httpx
 from httpx import Response
 from playwright.async_api import BrowserContext, Page
 
 import config
-from tools import utils
+from tools import json_codec, utils
+from tools.http_cassette import create_async_client
 
 from .exception import DataFetchError
 from .field import SearchType
@@ -52,7 +52,7 @@ class WeiboClient:
 
     async def request(self, method, url, **kwargs) -> Union[Response, Dict]:
         enable_return_response = kwargs.pop("return_response", False)
-        async with httpx.AsyncClient(proxies=self.proxies) as client:
+        async with create_async_client(proxies=self.proxies) as client:
             response = await client.request(
                 method, url, timeout=self.timeout,
                 **kwargs
@@ -61,7 +61,7 @@ class WeiboClient:
         if enable_return_response:
             return response
 
-        data: Dict = response.json()
+        data: Dict = json_codec.response_json(response)
         ok_code = data.get("ok")
         if ok_code == 0:  # response error
             utils.logger.error(f"[WeiboClient.request] request {method}:{url} err, res:{data}")
@@ -219,7 +219,7 @@ class WeiboClient:
         :return:
         """
         url = f"{self._host}/detail/{note_id}"
-        async with httpx.AsyncClient(proxies=self.proxies) as client:
+        async with create_async_client(proxies=self.proxies) as client:
             response = await client.request(
                 "GET", url, timeout=self.timeout, headers=self.headers
             )
@@ -252,7 +252,7 @@ class WeiboClient:
         # 微博图床对外存在防盗链，所以需要代理访问
         # 由于微博图片是通过 i1.wp.com 来访问的，所以需要拼接一下
         final_uri = (f"{self._image_agent_host}" f"{image_url}")
-        async with httpx.AsyncClient(proxies=self.proxies) as client:
+        async with create_async_client(proxies=self.proxies) as client:
             response = await client.request("GET", final_uri, timeout=self.timeout)
             if not response.reason_phrase == "OK":
                 utils.logger.error(f"[WeiboClient.get_note_image] request {final_uri} err, res:{response.text}")
@@ -27,6 +27,8 @@ from proxy.proxy_ip_pool import IpInfoModel, create_ip_pool
 from store import xhs as xhs_store
 from tools import utils
 from tools.cdp_browser import CDPBrowserManager
+from tools.media_downloader import MediaDownloadPipeline, MediaTask, preflight_media
+from tools.metrics import TimedSemaphore
 from var import crawler_type_var, source_keyword_var
 
 from .client import XiaoHongShuClient
@@ -41,12 +43,14 @@ class XiaoHongShuCrawler(AbstractCrawler):
     xhs_client: XiaoHongShuClient
     browser_context: BrowserContext
     cdp_manager: Optional[CDPBrowserManager]
+    media_pipeline: Optional[MediaDownloadPipeline]
 
     def __init__(self) -> None:
         self.index_url = "https://www.xiaohongshu.com"
         # self.user_agent = utils.get_user_agent()
         self.user_agent = config.UA if config.UA else "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0.0.0 Safari/537.36"
         self.cdp_manager = None
+        self.media_pipeline = None
 
     async def start(self) -> None:
         playwright_proxy_format, httpx_proxy_format = None, None
@@ -105,6 +109,12 @@ class XiaoHongShuCrawler(AbstractCrawler):
                     browser_context=self.browser_context
                 )
 
+            if config.ENABLE_GET_IMAGES and config.ENABLE_MEDIA_PIPELINE:
+                self.media_pipeline = MediaDownloadPipeline(
+                    platform="xhs", fetcher=self.xhs_client.get_note_media, saver=self.save_media_task
+                )
+                await self.media_pipeline.start()
+
             crawler_type_var.set(config.CRAWLER_TYPE)
             if config.CRAWLER_TYPE == "search":
                 # Search for notes and retrieve their comment information.
@@ -118,6 +128,9 @@ class XiaoHongShuCrawler(AbstractCrawler):
             else:
                 pass
 
+            if self.media_pipeline:
+                await self.media_pipeline.close()
+
             utils.logger.info("[XiaoHongShuCrawler.start] Xhs Crawler finished ...")
 
     async def search(self) -> None:
@@ -160,13 +173,13 @@ class XiaoHongShuCrawler(AbstractCrawler):
                             else SearchSortType.GENERAL
                         ),
                     )
-                    utils.logger.info(
-                        f"[XiaoHongShuCrawler.search] Search notes res:{notes_res}"
+                    utils.logger.debug(
+                        "[XiaoHongShuCrawler.search] Search notes res:%s", utils.log_payload(notes_res)
                     )
                     if not notes_res or not notes_res.get("has_more", False):
                         utils.logger.info("No more content!")
                         break
-                    semaphore = asyncio.Semaphore(config.MAX_CONCURRENCY_NUM)
+                    semaphore = TimedSemaphore(config.MAX_CONCURRENCY_NUM)
                     task_list = [
                         self.get_note_detail_async_task(
                             note_id=post_item.get("id"),
@@ -185,8 +198,8 @@ class XiaoHongShuCrawler(AbstractCrawler):
                             note_ids.append(note_detail.get("note_id"))
                             xsec_tokens.append(note_detail.get("xsec_token"))
                     page += 1
-                    utils.logger.info(
-                        f"[XiaoHongShuCrawler.search] Note details: {note_details}"
+                    utils.logger.debug(
+                        "[XiaoHongShuCrawler.search] Note details: %s", utils.log_payload(note_details)
                     )
                     await self.batch_get_note_comments(note_ids, xsec_tokens)
                 except DataFetchError:
@@ -231,7 +244,7 @@ class XiaoHongShuCrawler(AbstractCrawler):
         """
         Concurrently obtain the specified post list and save the data
         """
-        semaphore = asyncio.Semaphore(config.MAX_CONCURRENCY_NUM)
+        semaphore = TimedSemaphore(config.MAX_CONCURRENCY_NUM)
         task_list = [
             self.get_note_detail_async_task(
                 note_id=post_item.get("note_id"),
@@ -264,7 +277,7 @@ class XiaoHongShuCrawler(AbstractCrawler):
                 note_id=note_url_info.note_id,
                 xsec_source=note_url_info.xsec_source,
                 xsec_token=note_url_info.xsec_token,
-                semaphore=asyncio.Semaphore(config.MAX_CONCURRENCY_NUM),
+                semaphore=TimedSemaphore(config.MAX_CONCURRENCY_NUM),
             )
             get_note_detail_task_list.append(crawler_task)
 
@@ -359,7 +372,7 @@ class XiaoHongShuCrawler(AbstractCrawler):
         utils.logger.info(
             f"[XiaoHongShuCrawler.batch_get_note_comments] Begin batch get note comments, note list: {note_list}"
         )
-        semaphore = asyncio.Semaphore(config.MAX_CONCURRENCY_NUM)
+        semaphore = TimedSemaphore(config.MAX_CONCURRENCY_NUM)
         task_list: List[Task] = []
         for index, note_id in enumerate(note_list):
             task = asyncio.create_task(
@@ -529,6 +542,11 @@ class XiaoHongShuCrawler(AbstractCrawler):
             url = pic.get("url")
             if not url:
                 continue
+            if self.media_pipeline:
+                await self.media_pipeline.submit(
+                    MediaTask(platform="xhs", note_id=note_id, url=url, slot=f"{picNum}.jpg"))
+                picNum += 1
+                continue
             content = await self.xhs_client.get_note_media(url)
             if content is None:
                 continue
@@ -550,11 +568,31 @@ class XiaoHongShuCrawler(AbstractCrawler):
 
         if not videos:
             return
+        duration = xhs_store.get_video_duration(note_item)
         videoNum = 0
         for url in videos:
+            task = MediaTask(platform="xhs", note_id=note_id, url=url, slot=f"{videoNum}.mp4")
+            if not await preflight_media(task, duration=duration, headers=self.xhs_client.headers,
+                                         proxies=self.xhs_client.proxies):
+                videoNum += 1
+                continue
+            if self.media_pipeline:
+                await self.media_pipeline.submit(task)
+                videoNum += 1
+                continue
             content = await self.xhs_client.get_note_media(url)
             if content is None:
                 continue
             extension_file_name = f"{videoNum}.mp4"
             videoNum += 1
             await xhs_store.update_xhs_note_image(note_id, content, extension_file_name)
+
+    @staticmethod
+    async def save_media_task(task: MediaTask, content: bytes):
+        """
+        media pipeline saver, save downloaded image or video
+        :param task:
+        :param content:
+        :return:
+        """
+        await xhs_store.update_xhs_note_image(task.note_id, content, task.slot)
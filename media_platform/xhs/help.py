@@ -12,11 +12,16 @@
 import ctypes
 import json
 import random
+import re
 import time
 import urllib.parse
+from typing import Dict
 
 from model.m_xiaohongshu import NoteUrlInfo
-from tools.crawler_util import extract_url_params_to_dict
+from tools import json_codec
+from tools.crawler_util import camel_to_underscore, extract_url_params_to_dict, transform_json_keys
+
+INITIAL_STATE_PATTERN = re.compile(r"window.__INITIAL_STATE__=({.*})</script>")
 
 
 def sign(a1="", b1="", x_s="", x_t=""):
@@ -306,6 +311,37 @@ def parse_note_info_from_note_url(url: str) -> NoteUrlInfo:
     return NoteUrlInfo(note_id=note_id, xsec_token=xsec_token, xsec_source=xsec_source)
 
 
+def get_note_dict(html: str, note_id: str) -> Dict:
+    """
+    从笔记详情页HTML的 window.__INITIAL_STATE__ 中提取笔记详情，
+    模块级函数，可以交给 tools.extract_executor 在进程池中执行
+    Args:
+        html: 笔记详情页HTML
+        note_id: 笔记ID
+
+    Returns:
+        笔记详情，页面中没有数据时为空字典
+    """
+    state = INITIAL_STATE_PATTERN.search(html).group(1).replace("undefined", '""')
+
+    if state != "{}":
+        # 页面状态里还有推荐流等大量数据，只转换笔记详情这一部分的键
+        note_detail_map = _get_by_transformed_key(_get_by_transformed_key(json_codec.loads(state), "note"),
+                                                  "note_detail_map")
+        return transform_json_keys(_get_by_transformed_key(note_detail_map, note_id))["note"]
+    return {}
+
+
+def _get_by_transformed_key(data: Dict, key: str):
+    """
+    按转换后的键取值，和先转换整个字典再取值的结果一致（多个键转换后相同时取最后一个）
+    """
+    matched = [value for raw_key, value in data.items() if camel_to_underscore(raw_key) == key]
+    if not matched:
+        raise KeyError(key)
+    return matched[-1]
+
+
 if __name__ == '__main__':
     _img_url = "https://sns-img-bd.xhscdn.com/7a3abfaf-90c1-a828-5de7-022c80b92aa3"
     # 获取一个图片地址在多个cdn下的url地址
@@ -12,10 +12,10 @@
 # -*- coding: utf-8 -*-
 import asyncio
 import json
+from functools import partial
 from typing import Any, Callable, Dict, List, Optional, Union
 from urllib.parse import urlencode
 
-import httpx
 from httpx import Response
 from playwright.async_api import BrowserContext, Page
 from tenacity import retry, stop_after_attempt, wait_fixed
@@ -24,7 +24,9 @@ import config
 from base.base_crawler import AbstractApiClient
 from constant import zhihu as zhihu_constant
 from model.m_zhihu import ZhihuComment, ZhihuContent, ZhihuCreator
-from tools import utils
+from tools import json_codec, utils
+from tools.http_cassette import create_async_client
+from tools.extract_executor import get_extract_executor
 
 from .exception import DataFetchError, ForbiddenError
 from .field import SearchSort, SearchTime, SearchType
@@ -79,7 +81,7 @@ class ZhiHuClient(AbstractApiClient):
         # return response.text
         return_response = kwargs.pop('return_response', False)
 
-        async with httpx.AsyncClient(proxies=self.proxies, ) as client:
+        async with create_async_client(proxies=self.proxies, ) as client:
             response = await client.request(
                 method, url, timeout=self.timeout,
                 **kwargs
@@ -97,7 +99,7 @@ class ZhiHuClient(AbstractApiClient):
         if return_response:
             return response.text
         try:
-            data: Dict = response.json()
+            data: Dict = json_codec.response_json(response)
             if data.get("error"):
                 utils.logger.error(f"[ZhiHuClient.request] Request error: {data}")
                 raise DataFetchError(data.get("error", {}).get("message"))
@@ -210,7 +212,7 @@ class ZhiHuClient(AbstractApiClient):
             "vertical": note_type.value,
         }
         search_res = await self.get(uri, params)
-        utils.logger.info(f"[ZhiHuClient.get_note_by_keyword] Search result: {search_res}")
+        utils.logger.debug("[ZhiHuClient.get_note_by_keyword] Search result: %s", utils.log_payload(search_res))
         return self._extractor.extract_contents_from_search(search_res)
 
     async def get_root_comments(self, content_id: str, content_type: str, offset: str = "", limit: int = 10,
@@ -349,7 +351,7 @@ class ZhiHuClient(AbstractApiClient):
         """
         uri = f"/people/{url_token}"
         html_content: str = await self.get(uri, return_response=True)
-        return self._extractor.extract_creator(url_token, html_content)
+        return await get_extract_executor().run(partial(self._extractor.extract_creator, url_token), html_content)
 
     async def get_creator_answers(self, url_token: str, offset: int = 0, limit: int = 20) -> Dict:
         """
@@ -432,7 +434,8 @@ class ZhiHuClient(AbstractApiClient):
             res = await self.get_creator_answers(creator.url_token, offset, limit)
             if not res:
                 break
-            utils.logger.info(f"[ZhiHuClient.get_all_anwser_by_creator] Get creator {creator.url_token} answers: {res}")
+            utils.logger.debug("[ZhiHuClient.get_all_anwser_by_creator] Get creator %s answers: %s", creator.url_token,
+                               utils.log_payload(res))
             paging_info = res.get("paging", {})
             is_end = paging_info.get("is_end")
             contents = self._extractor.extract_content_list_from_creator(res.get("data"))
@@ -520,7 +523,7 @@ class ZhiHuClient(AbstractApiClient):
         """
         uri = f"/question/{question_id}/answer/{answer_id}"
         response_html = await self.get(uri, return_response=True)
-        return self._extractor.extract_answer_content_from_html(response_html)
+        return await get_extract_executor().run(self._extractor.extract_answer_content_from_html, response_html)
 
     async def get_article_info(self, article_id: str) -> Optional[ZhihuContent]:
         """
@@ -533,7 +536,7 @@ class ZhiHuClient(AbstractApiClient):
         """
         uri = f"/p/{article_id}"
         response_html = await self.get(uri, return_response=True)
-        return self._extractor.extract_article_content_from_html(response_html)
+        return await get_extract_executor().run(self._extractor.extract_article_content_from_html, response_html)
 
     async def get_video_info(self, video_id: str) -> Optional[ZhihuContent]:
         """
@@ -546,4 +549,4 @@ class ZhiHuClient(AbstractApiClient):
         """
         uri = f"/zvideo/{video_id}"
         response_html = await self.get(uri, return_response=True)
-        return self._extractor.extract_zvideo_content_from_html(response_html)
+        return await get_extract_executor().run(self._extractor.extract_zvideo_content_from_html, response_html)
@@ -18,6 +18,7 @@ import execjs
 from parsel import Selector
 
 from constant import zhihu as zhihu_constant
+from model import build_model
 from model.m_zhihu import ZhihuComment, ZhihuContent, ZhihuCreator
 from tools.crawler_util import extract_text_from_html
 
@@ -95,7 +96,7 @@ class ZhihuExtractor:
 
         Returns:
         """
-        res = ZhihuContent()
+        res = build_model(ZhihuContent)
         res.content_id = answer.get("id")
         res.content_type = answer.get("type")
         res.content_text = extract_text_from_html(answer.get("content", ""))
@@ -126,7 +127,7 @@ class ZhihuExtractor:
         Returns:
 
         """
-        res = ZhihuContent()
+        res = build_model(ZhihuContent)
         res.content_id = article.get("id")
         res.content_type = article.get("type")
         res.content_text = extract_text_from_html(article.get("content"))
@@ -156,7 +157,7 @@ class ZhihuExtractor:
         Returns:
 
         """
-        res = ZhihuContent()
+        res = build_model(ZhihuContent)
 
         if "video" in zvideo and isinstance(zvideo.get("video"), dict): # 说明是从创作者主页的视频列表接口来的
             res.content_url = f"{zhihu_constant.ZHIHU_URL}/zvideo/{res.content_id}"
@@ -191,7 +192,7 @@ class ZhihuExtractor:
         Returns:
 
         """
-        res = ZhihuCreator()
+        res = build_model(ZhihuCreator)
         try:
             if not author:
                 return res
@@ -238,7 +239,7 @@ class ZhihuExtractor:
         Returns:
 
         """
-        res = ZhihuComment()
+        res = build_model(ZhihuComment)
         res.comment_id = str(comment.get("id", ""))
         res.parent_comment_id = comment.get("reply_comment_id")
         res.content = extract_text_from_html(comment.get("content"))
@@ -341,7 +342,7 @@ class ZhihuExtractor:
         if not creator_info:
             return None
 
-        res = ZhihuCreator()
+        res = build_model(ZhihuCreator)
         res.user_id = creator_info.get("id")
         res.user_link = f"{zhihu_constant.ZHIHU_URL}/people/{user_url_token}"
         res.user_nickname = creator_info.get("name")
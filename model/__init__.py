@@ -10,3 +10,58 @@
 
 
 # -*- coding: utf-8 -*-
+from typing import Dict, FrozenSet, Optional, Tuple, Type, TypeVar
+
+from pydantic import BaseModel
+
+import config
+
+ModelType = TypeVar("ModelType", bound=BaseModel)
+
+# 模型类 -> (所有字段按定义顺序的默认值, 必填字段)，不能走快速构造的模型类为 None
+_construct_templates: Dict[Type[BaseModel], Optional[Tuple[Dict, FrozenSet[str]]]] = {}
+
+
+def _get_construct_template(model_class: Type[BaseModel]) -> Optional[Tuple[Dict, FrozenSet[str]]]:
+    if model_class not in _construct_templates:
+        fields = model_class.model_fields
+        if model_class.__private_attributes__ or any(field.default_factory for field in fields.values()):
+            _construct_templates[model_class] = None
+        else:
+            _construct_templates[model_class] = (
+                {name: field.default for name, field in fields.items()},
+                frozenset(name for name, field in fields.items() if field.is_required()),
+            )
+    return _construct_templates[model_class]
+
+
+def build_model(model_class: Type[ModelType], **values) -> ModelType:
+    """
+    构造爬虫解析出来的数据模型，字段类型由解析代码保证，默认跳过 pydantic 校验直接填充字段；
+    config.VALIDATE_PARSED_MODELS 为 True 时走完整校验，用于排查解析代码产生的类型问题。
+    pydantic v2 的 model_construct 是纯 python 实现，比 rust 实现的校验还慢，
+    这里按字段顺序预先生成默认值模板，复制模板后直接设置 __dict__，model_dump 的字段顺序和校验构造的一致
+    Args:
+        model_class: 数据模型类
+        **values: 字段值，没有传的字段使用默认值
+
+    Returns:
+
+    """
+    if config.VALIDATE_PARSED_MODELS:
+        return model_class(**values)
+    template = _get_construct_template(model_class)
+    if template is None or not template[1] <= values.keys():
+        return model_class.model_construct(**values)
+    defaults = template[0]
+    fields_values = defaults.copy()
+    fields_values.update(values)
+    if len(fields_values) != len(defaults):
+        # 传入了模型之外的字段，交给 model_construct 处理
+        return model_class.model_construct(**values)
+    model = model_class.__new__(model_class)
+    object.__setattr__(model, "__dict__", fields_values)
+    object.__setattr__(model, "__pydantic_fields_set__", set(values))
+    object.__setattr__(model, "__pydantic_extra__", None)
+    object.__setattr__(model, "__pydantic_private__", None)
+    return model
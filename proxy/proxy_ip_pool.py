@@ -14,7 +14,7 @@
 # @Time    : 2023/12/2 13:45
 # @Desc    : ip代理池实现
 import random
-from typing import Dict, List
+from typing import Callable, Dict, List
 
 import httpx
 from tenacity import retry, stop_after_attempt, wait_fixed
@@ -96,9 +96,10 @@ class ProxyIpPool:
         await self.load_proxies()
 
 
-IpProxyProvider: Dict[str, ProxyProvider] = {
-    ProviderNameEnum.JISHU_HTTP_PROVIDER.value: new_jisu_http_proxy(),
-    ProviderNameEnum.KUAI_DAILI_PROVIDER.value: new_kuai_daili_proxy()
+# 创建代理池时才创建用到的代理商，代理商的 IP 缓存会开启定时清理任务，导入模块时创建的话任务不在爬虫的事件循环里
+IpProxyProvider: Dict[str, Callable[[], ProxyProvider]] = {
+    ProviderNameEnum.JISHU_HTTP_PROVIDER.value: new_jisu_http_proxy,
+    ProviderNameEnum.KUAI_DAILI_PROVIDER.value: new_kuai_daili_proxy
 }
 
 
@@ -109,9 +110,10 @@ async def create_ip_pool(ip_pool_count: int, enable_validate_ip: bool) -> ProxyI
     :param enable_validate_ip: 是否开启验证IP代理
     :return:
     """
+    new_ip_provider = IpProxyProvider.get(config.IP_PROXY_PROVIDER_NAME)
     pool = ProxyIpPool(ip_pool_count=ip_pool_count,
                        enable_validate_ip=enable_validate_ip,
-                       ip_provider=IpProxyProvider.get(config.IP_PROXY_PROVIDER_NAME)
+                       ip_provider=new_ip_provider() if new_ip_provider else None
                        )
     await pool.load_proxies()
     return pool
@@ -17,12 +17,18 @@
 from typing import List
 
 import config
+from store.pipeline import observe_batch, wrap_store
+from store.records import BilibiliVideoCommentRecord, BilibiliVideoRecord
+from tools import utils
 from var import source_keyword_var
 
 from .bilibili_store_impl import *
 from .bilibilli_store_video import *
 
 
+logger = utils.get_logger("store.bilibili", sampled=True)
+
+
 class BiliStoreFactory:
     STORES = {
         "csv": BiliCsvStoreImplement,
@@ -37,7 +43,7 @@ class BiliStoreFactory:
             raise ValueError(
                 "[BiliStoreFactory.create_store] Invalid save option only supported csv or db or json ..."
             )
-        return store_class()
+        return wrap_store("bili", store_class())
 
 
 async def update_bilibili_video(video_item: Dict):
@@ -45,31 +51,30 @@ async def update_bilibili_video(video_item: Dict):
     video_user_info: Dict = video_item_view.get("owner")
     video_item_stat: Dict = video_item_view.get("stat")
     video_id = str(video_item_view.get("aid"))
-    save_content_item = {
-        "video_id": video_id,
-        "video_type": "video",
-        "title": video_item_view.get("title", "")[:500],
-        "desc": video_item_view.get("desc", "")[:500],
-        "create_time": video_item_view.get("pubdate"),
-        "user_id": str(video_user_info.get("mid")),
-        "nickname": video_user_info.get("name"),
-        "avatar": video_user_info.get("face", ""),
-        "liked_count": str(video_item_stat.get("like", "")),
-        "disliked_count": str(video_item_stat.get("dislike", "")),
-        "video_play_count": str(video_item_stat.get("view", "")),
-        "video_favorite_count": str(video_item_stat.get("favorite", "")),
-        "video_share_count": str(video_item_stat.get("share", "")),
-        "video_coin_count": str(video_item_stat.get("coin", "")),
-        "video_danmaku": str(video_item_stat.get("danmaku", "")),
-        "video_comment": str(video_item_stat.get("reply", "")),
-        "last_modify_ts": utils.get_current_timestamp(),
-        "video_url": f"https://www.bilibili.com/video/av{video_id}",
-        "video_cover_url": video_item_view.get("pic", ""),
-        "source_keyword": source_keyword_var.get(),
-    }
-    utils.logger.info(
-        f"[store.bilibili.update_bilibili_video] bilibili video id:{video_id}, title:{save_content_item.get('title')}"
+    save_content_item = BilibiliVideoRecord(
+        video_id=video_id,
+        video_type="video",
+        title=video_item_view.get("title", "")[:500],
+        desc=video_item_view.get("desc", "")[:500],
+        create_time=video_item_view.get("pubdate"),
+        user_id=str(video_user_info.get("mid")),
+        nickname=video_user_info.get("name"),
+        avatar=video_user_info.get("face", ""),
+        liked_count=str(video_item_stat.get("like", "")),
+        disliked_count=str(video_item_stat.get("dislike", "")),
+        video_play_count=str(video_item_stat.get("view", "")),
+        video_favorite_count=str(video_item_stat.get("favorite", "")),
+        video_share_count=str(video_item_stat.get("share", "")),
+        video_coin_count=str(video_item_stat.get("coin", "")),
+        video_danmaku=str(video_item_stat.get("danmaku", "")),
+        video_comment=str(video_item_stat.get("reply", "")),
+        last_modify_ts=utils.get_current_timestamp(),
+        video_url=f"https://www.bilibili.com/video/av{video_id}",
+        video_cover_url=video_item_view.get("pic", ""),
+        source_keyword=source_keyword_var.get(),
     )
+    logger.info("[store.bilibili.update_bilibili_video] bilibili video id:%s, title:%s", video_id,
+                save_content_item.get('title'))
     await BiliStoreFactory.create_store().store_content(content_item=save_content_item)
 
 
@@ -88,15 +93,14 @@ async def update_up_info(video_item: Dict):
         "user_rank": video_item_card.get("level_info").get("current_level"),
         "is_official": video_item_card.get("official_verify").get("type"),
     }
-    utils.logger.info(
-        f"[store.bilibili.update_up_info] bilibili user_id:{video_item_card.get('mid')}"
-    )
+    logger.info("[store.bilibili.update_up_info] bilibili user_id:%s", video_item_card.get('mid'))
     await BiliStoreFactory.create_store().store_creator(creator=saver_up_info)
 
 
 async def batch_update_bilibili_video_comments(video_id: str, comments: List[Dict]):
     if not comments:
         return
+    observe_batch("bili", "comments", comments)
     for comment_item in comments:
         await update_bilibili_video_comment(video_id, comment_item)
 
@@ -107,24 +111,23 @@ async def update_bilibili_video_comment(video_id: str, comment_item: Dict):
     content: Dict = comment_item.get("content")
     user_info: Dict = comment_item.get("member")
     like_count: int = comment_item.get("like", 0)
-    save_comment_item = {
-        "comment_id": comment_id,
-        "parent_comment_id": parent_comment_id,
-        "create_time": comment_item.get("ctime"),
-        "video_id": str(video_id),
-        "content": content.get("message"),
-        "user_id": user_info.get("mid"),
-        "nickname": user_info.get("uname"),
-        "sex": user_info.get("sex"),
-        "sign": user_info.get("sign"),
-        "avatar": user_info.get("avatar"),
-        "sub_comment_count": str(comment_item.get("rcount", 0)),
-        "like_count": like_count,
-        "last_modify_ts": utils.get_current_timestamp(),
-    }
-    utils.logger.info(
-        f"[store.bilibili.update_bilibili_video_comment] Bilibili video comment: {comment_id}, content: {save_comment_item.get('content')}"
+    save_comment_item = BilibiliVideoCommentRecord(
+        comment_id=comment_id,
+        parent_comment_id=parent_comment_id,
+        create_time=comment_item.get("ctime"),
+        video_id=str(video_id),
+        content=content.get("message"),
+        user_id=user_info.get("mid"),
+        nickname=user_info.get("uname"),
+        sex=user_info.get("sex"),
+        sign=user_info.get("sign"),
+        avatar=user_info.get("avatar"),
+        sub_comment_count=str(comment_item.get("rcount", 0)),
+        like_count=like_count,
+        last_modify_ts=utils.get_current_timestamp(),
     )
+    logger.info("[store.bilibili.update_bilibili_video_comment] Bilibili video comment: %s, content: %s", comment_id,
+                utils.log_payload(save_comment_item.get('content')))
     await BiliStoreFactory.create_store().store_comment(comment_item=save_comment_item)
 
 
@@ -148,6 +151,7 @@ async def store_video(aid, video_content, extension_file_name):
 async def batch_update_bilibili_creator_fans(creator_info: Dict, fans_list: List[Dict]):
     if not fans_list:
         return
+    observe_batch("bili", "contacts", fans_list)
     for fan_item in fans_list:
         fan_info: Dict = {
             "id": fan_item.get("mid"),
@@ -165,6 +169,7 @@ async def batch_update_bilibili_creator_followings(
 ):
     if not followings_list:
         return
+    observe_batch("bili", "contacts", followings_list)
     for following_item in followings_list:
         following_info: Dict = {
             "id": following_item.get("mid"),
@@ -182,6 +187,7 @@ async def batch_update_bilibili_creator_dynamics(
 ):
     if not dynamics_list:
         return
+    observe_batch("bili", "dynamics", dynamics_list)
     for dynamic_item in dynamics_list:
         dynamic_id: str = dynamic_item["id_str"]
         dynamic_text: str = ""
@@ -15,7 +15,6 @@
 # @Desc    : B站存储实现类
 import asyncio
 import csv
-import json
 import os
 import pathlib
 from typing import Dict
@@ -24,7 +23,8 @@ import aiofiles
 
 import config
 from base.base_crawler import AbstractStore
-from tools import utils, words
+from store.records import as_dict
+from tools import json_codec, utils, words
 from var import crawler_type_var
 
 
@@ -248,7 +248,6 @@ class BiliJsonStoreImplement(AbstractStore):
     words_store_path: str = "data/bilibili/words"
     lock = asyncio.Lock()
     file_count:int=calculate_number_of_files(json_store_path)
-    WordCloud = words.AsyncWordCloudGenerator()
 
 
     def make_save_file_name(self, store_type: str) -> (str,str):
@@ -283,16 +282,16 @@ class BiliJsonStoreImplement(AbstractStore):
 
         async with self.lock:
             if os.path.exists(save_file_name):
-                async with aiofiles.open(save_file_name, 'r', encoding='utf-8') as file:
-                    save_data = json.loads(await file.read())
+                async with aiofiles.open(save_file_name, 'rb') as file:
+                    save_data = json_codec.loads(await file.read())
 
-            save_data.append(save_item)
-            async with aiofiles.open(save_file_name, 'w', encoding='utf-8') as file:
-                await file.write(json.dumps(save_data, ensure_ascii=False))
+            save_data.append(as_dict(save_item))
+            async with aiofiles.open(save_file_name, 'wb') as file:
+                await file.write(json_codec.dumps_compat_bytes(save_data))
 
             if config.ENABLE_GET_COMMENTS and config.ENABLE_GET_WORDCLOUD:
                 try:
-                    await self.WordCloud.generate_word_frequency_and_cloud(save_data, words_file_name_prefix)
+                    await words.get_word_cloud_generator().add_items([save_item], words_file_name_prefix)
                 except:
                     pass
 
@@ -18,7 +18,9 @@ from typing import Dict
 
 import aiofiles
 
+import config
 from base.base_crawler import AbstractStoreImage
+from store.media_store import get_media_store
 from tools import utils
 
 
@@ -57,6 +59,9 @@ class BilibiliVideo(AbstractStoreImage):
         Returns:
 
         """
+        if config.ENABLE_MEDIA_DEDUP:
+            await get_media_store().save("bili", str(aid), extension_file_name, video_content)
+            return
         pathlib.Path(self.video_store_path + "/" + str(aid)).mkdir(parents=True, exist_ok=True)
         save_file_name = self.make_save_file_name(str(aid), extension_file_name)
         async with aiofiles.open(save_file_name, 'wb') as f:
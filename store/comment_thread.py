@@ -0,0 +1,197 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 评论楼层索引，写入时计算根评论、层级和路径，按内容ID一次查询即可还原完整的评论树
+import argparse
+import json
+import pathlib
+import sqlite3
+from typing import Dict, List, Optional
+
+import config
+from store.pipeline import PLATFORM_ITEM_FIELDS, AbstractStoreStage
+from store.records import as_dict
+from tools import utils
+
+PATH_SEPARATOR = "/"
+
+# 表示没有父评论的取值
+EMPTY_PARENT_IDS = {"", "0", "None"}
+
+
+class CommentThreadIndex:
+    """
+    评论楼层索引，path 为从根评论到当前评论的ID路径，
+    子评论先于父评论到达时先挂在父评论ID下，父评论到达后再把整棵子树的根评论、层级和路径修正过来
+    """
+
+    def __init__(self, index_file: str = ""):
+        self.index_file = index_file or f"{config.STORE_INDEX_PATH}/comment_thread.db"
+        pathlib.Path(self.index_file).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.index_file)
+        self._conn.executescript(
+            "PRAGMA journal_mode = WAL;"
+            "PRAGMA synchronous = NORMAL;"
+            "CREATE TABLE IF NOT EXISTS comment_thread ("
+            "seq INTEGER PRIMARY KEY AUTOINCREMENT, platform TEXT NOT NULL, content_id TEXT NOT NULL, "
+            "comment_id TEXT NOT NULL, parent_id TEXT NOT NULL DEFAULT '', root_id TEXT NOT NULL, "
+            "depth INTEGER NOT NULL DEFAULT 0, path TEXT NOT NULL, data TEXT NOT NULL, "
+            "UNIQUE (platform, comment_id));"
+            "CREATE INDEX IF NOT EXISTS idx_comment_thread_content ON comment_thread (platform, content_id, path);"
+            "CREATE INDEX IF NOT EXISTS idx_comment_thread_root ON comment_thread (platform, root_id);"
+        )
+        self._conn.commit()
+
+    def add(self, platform: str, content_id: str, comment_id: str, parent_id: str, comment_item: Dict):
+        """
+        写入或更新一条评论
+        Args:
+            platform: 平台
+            content_id: 评论所属的内容ID
+            comment_id: 评论ID
+            parent_id: 父评论ID，根评论为空
+            comment_item: 评论数据，查询评论树时原样返回
+
+        Returns:
+
+        """
+        parent_id = "" if parent_id in EMPTY_PARENT_IDS or parent_id == comment_id else parent_id
+        if parent_id:
+            parent = self._conn.execute(
+                "SELECT root_id, depth, path FROM comment_thread WHERE platform = ? AND comment_id = ?",
+                (platform, parent_id),
+            ).fetchone()
+            # 父评论还没有写入时，暂时把父评论当作根评论
+            root_id, parent_depth, parent_path = parent if parent else (parent_id, 0, parent_id)
+            depth, path = parent_depth + 1, f"{parent_path}{PATH_SEPARATOR}{comment_id}"
+        else:
+            root_id, depth, path = comment_id, 0, comment_id
+        data = json.dumps(as_dict(comment_item), ensure_ascii=False, default=str)
+        with self._conn:
+            self._conn.execute(
+                "INSERT INTO comment_thread (platform, content_id, comment_id, parent_id, root_id, depth, path, data) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT (platform, comment_id) DO UPDATE SET "
+                "content_id = excluded.content_id, parent_id = excluded.parent_id, data = excluded.data",
+                (platform, content_id, comment_id, parent_id, root_id, depth, path, data),
+            )
+            if root_id != comment_id:
+                # 先到达的子评论以当前评论为根，路径以 "当前评论ID/" 开头，修正为完整路径
+                self._conn.execute(
+                    "UPDATE comment_thread SET root_id = ?, depth = depth + ?, path = ? || substr(path, ?) "
+                    "WHERE platform = ? AND root_id = ? AND comment_id != ?",
+                    (root_id, depth, path, len(comment_id) + 1, platform, comment_id, comment_id),
+                )
+
+    def get_comment_tree(self, platform: str, content_id: str) -> List[Dict]:
+        """
+        获取一个内容的完整评论树
+        Args:
+            platform: 平台
+            content_id: 内容ID
+
+        Returns:
+            根评论列表，每条评论的 sub_comments 为子评论列表，同级评论按写入顺序排列
+        """
+        rows = self._conn.execute(
+            "SELECT comment_id, parent_id, depth, data FROM comment_thread "
+            "WHERE platform = ? AND content_id = ? ORDER BY depth, seq",
+            (platform, content_id),
+        ).fetchall()
+        nodes: Dict[str, Dict] = {}
+        roots: List[Dict] = []
+        for comment_id, parent_id, depth, data in rows:
+            node = {"comment": json.loads(data), "depth": depth, "sub_comments": []}
+            nodes[comment_id] = node
+            if parent_id in nodes:
+                nodes[parent_id]["sub_comments"].append(node)
+            else:
+                # 父评论没有爬到时作为根评论返回，避免丢失
+                roots.append(node)
+        return roots
+
+    def get_thread(self, platform: str, root_id: str) -> List[Dict]:
+        """
+        获取一条根评论下的所有评论（包括根评论），按楼层路径排列
+        """
+        cursor = self._conn.execute(
+            "SELECT comment_id, parent_id, depth, path, data FROM comment_thread "
+            "WHERE platform = ? AND root_id = ? ORDER BY path",
+            (platform, root_id),
+        )
+        return [{"comment_id": comment_id, "parent_id": parent_id, "depth": depth, "path": path,
+                 "comment": json.loads(data)} for comment_id, parent_id, depth, path, data in cursor.fetchall()]
+
+    def list_content_ids(self, platform: str) -> List[str]:
+        return [row[0] for row in self._conn.execute(
+            "SELECT DISTINCT content_id FROM comment_thread WHERE platform = ?", (platform,))]
+
+    def close(self):
+        self._conn.close()
+
+
+class CommentThreadStage(AbstractStoreStage):
+    """
+    存储阶段：评论写入前更新楼层索引
+    """
+
+    def __init__(self, index: Optional[CommentThreadIndex] = None):
+        self.index = index or CommentThreadIndex()
+
+    async def process(self, platform: str, item_type: str, item: Dict) -> Optional[Dict]:
+        if item_type != "comments":
+            return item
+        fields = PLATFORM_ITEM_FIELDS[platform]
+        comment_id = str(item.get(fields["comment_id"]) or "")
+        if comment_id:
+            parent_id = str(item.get(fields["comment_parent_id"]) or "") if fields["comment_parent_id"] else ""
+            self.index.add(platform, str(item.get(fields["comment_content_id"]) or ""), comment_id, parent_id, item)
+        return item
+
+    async def close(self):
+        self.index.close()
+
+
+def export_comment_trees(platform: str, output_file: str, content_ids: Optional[List[str]] = None,
+                         index_file: str = "") -> int:
+    """
+    导出评论树，每行一个内容：{"content_id": ..., "comments": [...]}
+    Args:
+        platform: 平台
+        output_file: jsonl 文件
+        content_ids: 需要导出的内容ID，为空时导出该平台所有内容
+        index_file: 索引文件，默认使用爬虫共用的索引
+
+    Returns:
+        导出的内容数
+    """
+    index = CommentThreadIndex(index_file)
+    try:
+        content_ids = content_ids or index.list_content_ids(platform)
+        with open(output_file, "w", encoding="utf-8") as f:
+            for content_id in content_ids:
+                tree = index.get_comment_tree(platform, content_id)
+                f.write(json.dumps({"content_id": content_id, "comments": tree}, ensure_ascii=False) + "\n")
+    finally:
+        index.close()
+    utils.logger.info(f"[export_comment_trees] export {len(content_ids)} {platform} comment trees to {output_file}")
+    return len(content_ids)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Export comment trees of crawled contents.')
+    parser.add_argument('--platform', type=str, required=True, choices=list(PLATFORM_ITEM_FIELDS.keys()),
+                        help='Media platform select (xhs | dy | ks | bili | wb | tieba | zhihu)')
+    parser.add_argument('--id', type=str, nargs='*', default=[], help='content ids, default is all contents')
+    parser.add_argument('--output', type=str, required=True, help='jsonl file to save comment trees')
+    parser.add_argument('--index', type=str, default="", help='index file, default is shared with crawler')
+    args = parser.parse_args()
+    export_comment_trees(args.platform, args.output, args.id, index_file=args.index)
@@ -16,11 +16,17 @@
 from typing import List
 
 import config
+from store.pipeline import observe_batch, wrap_store
+from store.records import DouyinAwemeCommentRecord, DouyinAwemeRecord
+from tools import utils
 from var import source_keyword_var
 
 from .douyin_store_impl import *
 
 
+logger = utils.get_logger("store.douyin", sampled=True)
+
+
 class DouyinStoreFactory:
     STORES = {
         "csv": DouyinCsvStoreImplement,
@@ -35,7 +41,7 @@ class DouyinStoreFactory:
             raise ValueError(
                 "[DouyinStoreFactory.create_store] Invalid save option only supported csv or db or json ..."
             )
-        return store_class()
+        return wrap_store("dy", store_class())
 
 
 def _extract_comment_image_list(comment_item: Dict) -> List[str]:
@@ -108,33 +114,32 @@ async def update_douyin_aweme(aweme_item: Dict):
     aweme_id = aweme_item.get("aweme_id")
     user_info = aweme_item.get("author", {})
     interact_info = aweme_item.get("statistics", {})
-    save_content_item = {
-        "aweme_id": aweme_id,
-        "aweme_type": str(aweme_item.get("aweme_type")),
-        "title": aweme_item.get("desc", ""),
-        "desc": aweme_item.get("desc", ""),
-        "create_time": aweme_item.get("create_time"),
-        "user_id": user_info.get("uid"),
-        "sec_uid": user_info.get("sec_uid"),
-        "short_user_id": user_info.get("short_id"),
-        "user_unique_id": user_info.get("unique_id"),
-        "user_signature": user_info.get("signature"),
-        "nickname": user_info.get("nickname"),
-        "avatar": user_info.get("avatar_thumb", {}).get("url_list", [""])[0],
-        "liked_count": str(interact_info.get("digg_count")),
-        "collected_count": str(interact_info.get("collect_count")),
-        "comment_count": str(interact_info.get("comment_count")),
-        "share_count": str(interact_info.get("share_count")),
-        "ip_location": aweme_item.get("ip_label", ""),
-        "last_modify_ts": utils.get_current_timestamp(),
-        "aweme_url": f"https://www.douyin.com/video/{aweme_id}",
-        "cover_url": _extract_content_cover_url(aweme_item),
-        "video_download_url": _extract_video_download_url(aweme_item),
-        "source_keyword": source_keyword_var.get(),
-    }
-    utils.logger.info(
-        f"[store.douyin.update_douyin_aweme] douyin aweme id:{aweme_id}, title:{save_content_item.get('title')}"
+    save_content_item = DouyinAwemeRecord(
+        aweme_id=aweme_id,
+        aweme_type=str(aweme_item.get("aweme_type")),
+        title=aweme_item.get("desc", ""),
+        desc=aweme_item.get("desc", ""),
+        create_time=aweme_item.get("create_time"),
+        user_id=user_info.get("uid"),
+        sec_uid=user_info.get("sec_uid"),
+        short_user_id=user_info.get("short_id"),
+        user_unique_id=user_info.get("unique_id"),
+        user_signature=user_info.get("signature"),
+        nickname=user_info.get("nickname"),
+        avatar=user_info.get("avatar_thumb", {}).get("url_list", [""])[0],
+        liked_count=str(interact_info.get("digg_count")),
+        collected_count=str(interact_info.get("collect_count")),
+        comment_count=str(interact_info.get("comment_count")),
+        share_count=str(interact_info.get("share_count")),
+        ip_location=aweme_item.get("ip_label", ""),
+        last_modify_ts=utils.get_current_timestamp(),
+        aweme_url=f"https://www.douyin.com/video/{aweme_id}",
+        cover_url=_extract_content_cover_url(aweme_item),
+        video_download_url=_extract_video_download_url(aweme_item),
+        source_keyword=source_keyword_var.get(),
     )
+    logger.info("[store.douyin.update_douyin_aweme] douyin aweme id:%s, title:%s", aweme_id,
+                save_content_item.get('title'))
     await DouyinStoreFactory.create_store().store_content(
         content_item=save_content_item
     )
@@ -143,6 +148,7 @@ async def update_douyin_aweme(aweme_item: Dict):
 async def batch_update_dy_aweme_comments(aweme_id: str, comments: List[Dict]):
     if not comments:
         return
+    observe_batch("dy", "comments", comments)
     for comment_item in comments:
         await update_dy_aweme_comment(aweme_id, comment_item)
 
@@ -164,30 +170,29 @@ async def update_dy_aweme_comment(aweme_id: str, comment_item: Dict):
             or user_info.get("avatar_thumb", {})
             or {}
     )
-    save_comment_item = {
-        "comment_id": comment_id,
-        "create_time": comment_item.get("create_time"),
-        "ip_location": comment_item.get("ip_label", ""),
-        "aweme_id": aweme_id,
-        "content": comment_item.get("text"),
-        "user_id": user_info.get("uid"),
-        "sec_uid": user_info.get("sec_uid"),
-        "short_user_id": user_info.get("short_id"),
-        "user_unique_id": user_info.get("unique_id"),
-        "user_signature": user_info.get("signature"),
-        "nickname": user_info.get("nickname"),
-        "avatar": avatar_info.get("url_list", [""])[0],
-        "sub_comment_count": str(comment_item.get("reply_comment_total", 0)),
-        "like_count": (
+    save_comment_item = DouyinAwemeCommentRecord(
+        comment_id=comment_id,
+        create_time=comment_item.get("create_time"),
+        ip_location=comment_item.get("ip_label", ""),
+        aweme_id=aweme_id,
+        content=comment_item.get("text"),
+        user_id=user_info.get("uid"),
+        sec_uid=user_info.get("sec_uid"),
+        short_user_id=user_info.get("short_id"),
+        user_unique_id=user_info.get("unique_id"),
+        user_signature=user_info.get("signature"),
+        nickname=user_info.get("nickname"),
+        avatar=avatar_info.get("url_list", [""])[0],
+        sub_comment_count=str(comment_item.get("reply_comment_total", 0)),
+        like_count=(
             comment_item.get("digg_count") if comment_item.get("digg_count") else 0
         ),
-        "last_modify_ts": utils.get_current_timestamp(),
-        "parent_comment_id": parent_comment_id,
-        "pictures": ",".join(_extract_comment_image_list(comment_item)),
-    }
-    utils.logger.info(
-        f"[store.douyin.update_dy_aweme_comment] douyin aweme comment: {comment_id}, content: {save_comment_item.get('content')}"
+        last_modify_ts=utils.get_current_timestamp(),
+        parent_comment_id=parent_comment_id,
+        pictures=",".join(_extract_comment_image_list(comment_item)),
     )
+    logger.info("[store.douyin.update_dy_aweme_comment] douyin aweme comment: %s, content: %s", comment_id,
+                utils.log_payload(save_comment_item.get('content')))
 
     await DouyinStoreFactory.create_store().store_comment(
         comment_item=save_comment_item
@@ -212,5 +217,5 @@ async def save_creator(user_id: str, creator: Dict):
         "videos_count": user_info.get("aweme_count", 0),
         "last_modify_ts": utils.get_current_timestamp(),
     }
-    utils.logger.info(f"[store.douyin.save_creator] creator:{local_db_item}")
+    logger.info("[store.douyin.save_creator] creator:%s", utils.log_payload(local_db_item))
     await DouyinStoreFactory.create_store().store_creator(local_db_item)
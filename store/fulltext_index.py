@@ -0,0 +1,278 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 本地全文检索索引，SQLite FTS5 + jieba 分词，跨平台检索已爬取的内容和评论
+import argparse
+import asyncio
+import json
+import logging
+import pathlib
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import config
+from store.pipeline import PLATFORM_ITEM_FIELDS, AbstractStoreStage, get_item_id, get_item_text
+from tools import utils
+
+# 只保留包含文字或数字的词
+WORD_PATTERN = re.compile(r"\w")
+
+_jieba_initialized = False
+
+
+def tokenize(text: str, for_search: bool = True) -> List[str]:
+    """
+    jieba 分词，索引时使用搜索引擎模式（长词再切出短词），查询时使用精确模式
+    Args:
+        text: 原始文本
+        for_search: 是否使用搜索引擎模式
+
+    Returns:
+
+    """
+    global _jieba_initialized
+    import jieba
+    if not _jieba_initialized:
+        logging.getLogger('jieba').setLevel(logging.WARNING)
+        for word in config.CUSTOM_WORDS.keys():
+            jieba.add_word(word)
+        _jieba_initialized = True
+    words = jieba.cut_for_search(text.lower()) if for_search else jieba.cut(text.lower())
+    return [word for word in (word.strip() for word in words) if word and WORD_PATTERN.search(word)]
+
+
+def build_match_query(query: str) -> str:
+    """
+    把用户输入的查询转换为 FTS5 的 MATCH 表达式，每个词作为短语，词之间为 AND 关系
+    Args:
+        query:
+
+    Returns:
+
+    """
+    return " ".join('"{}"'.format(word.replace('"', '""')) for word in tokenize(query, for_search=False))
+
+
+class FullTextIndex:
+    """
+    全文检索索引，分词结果用空格拼接后交给 FTS5 的 unicode61 分词器，
+    fulltext_doc 记录 (平台, 类型, ID) 到 FTS 行号的映射，同一条数据重复写入时替换旧的索引
+    """
+
+    def __init__(self, index_file: str = ""):
+        self.index_file = index_file or f"{config.STORE_INDEX_PATH}/fulltext.db"
+        pathlib.Path(self.index_file).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.index_file, check_same_thread=False)
+        self._conn.executescript(
+            "PRAGMA journal_mode = WAL;"
+            "CREATE TABLE IF NOT EXISTS fulltext_doc ("
+            "doc_id INTEGER PRIMARY KEY AUTOINCREMENT, platform TEXT NOT NULL, item_type TEXT NOT NULL, "
+            "item_id TEXT NOT NULL, content_id TEXT NOT NULL DEFAULT '', text TEXT NOT NULL, "
+            "add_ts INTEGER NOT NULL DEFAULT 0, UNIQUE (platform, item_type, item_id));"
+            "CREATE INDEX IF NOT EXISTS idx_fulltext_doc_content ON fulltext_doc (platform, content_id);"
+            "CREATE VIRTUAL TABLE IF NOT EXISTS fulltext_fts USING fts5(tokens, tokenize = 'unicode61');"
+        )
+        self._conn.commit()
+
+    def add_many(self, items: List[Tuple[str, str, str, str, str]]):
+        """
+        批量写入或更新索引，一个事务提交
+        Args:
+            items: [(平台, 类型, 数据ID, 内容ID, 文本)]
+
+        Returns:
+
+        """
+        now = utils.get_current_timestamp()
+        with self._conn:
+            for platform, item_type, item_id, content_id, text in items:
+                tokens = " ".join(tokenize(text))
+                row = self._conn.execute(
+                    "SELECT doc_id FROM fulltext_doc WHERE platform = ? AND item_type = ? AND item_id = ?",
+                    (platform, item_type, item_id),
+                ).fetchone()
+                if row is None:
+                    doc_id = self._conn.execute(
+                        "INSERT INTO fulltext_doc (platform, item_type, item_id, content_id, text, add_ts) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        (platform, item_type, item_id, content_id, text, now),
+                    ).lastrowid
+                else:
+                    doc_id = row[0]
+                    self._conn.execute(
+                        "UPDATE fulltext_doc SET content_id = ?, text = ?, add_ts = ? WHERE doc_id = ?",
+                        (content_id, text, now, doc_id),
+                    )
+                    self._conn.execute("DELETE FROM fulltext_fts WHERE rowid = ?", (doc_id,))
+                self._conn.execute("INSERT INTO fulltext_fts (rowid, tokens) VALUES (?, ?)", (doc_id, tokens))
+
+    def search(self, query: str, platforms: Optional[List[str]] = None, item_type: str = "",
+               limit: int = 20) -> List[Dict]:
+        """
+        检索内容或评论，按 bm25 相关度排序
+        Args:
+            query: 查询词，会先用 jieba 分词，所有词都需要命中
+            platforms: 限定平台，为空时检索所有平台
+            item_type: contents | comments，为空时都检索
+            limit: 返回条数
+
+        Returns:
+
+        """
+        match_query = build_match_query(query)
+        if not match_query:
+            return []
+        sql = ("SELECT d.platform, d.item_type, d.item_id, d.content_id, d.text, bm25(fulltext_fts) AS score "
+               "FROM fulltext_fts JOIN fulltext_doc d ON d.doc_id = fulltext_fts.rowid WHERE fulltext_fts MATCH ?")
+        params: List = [match_query]
+        if platforms:
+            sql += f" AND d.platform IN ({','.join('?' * len(platforms))})"
+            params.extend(platforms)
+        if item_type:
+            sql += " AND d.item_type = ?"
+            params.append(item_type)
+        sql += " ORDER BY score LIMIT ?"
+        params.append(limit)
+        cursor = self._conn.execute(sql, params)
+        columns = [column[0] for column in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def count(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM fulltext_doc").fetchone()[0]
+
+    def optimize(self):
+        """
+        合并 FTS5 的索引段，批量导入后执行可以加快查询
+        """
+        with self._conn:
+            self._conn.execute("INSERT INTO fulltext_fts (fulltext_fts) VALUES ('optimize')")
+
+    def close(self):
+        self._conn.close()
+
+
+def to_index_item(platform: str, item_type: str, item: Dict) -> Optional[Tuple[str, str, str, str, str]]:
+    """
+    从内容或评论数据中取出索引需要的字段，没有ID或文本时返回None
+    """
+    item_id = get_item_id(platform, item_type, item)
+    text = get_item_text(platform, item_type, item)
+    if not item_id or not text:
+        return None
+    fields = PLATFORM_ITEM_FIELDS[platform]
+    content_id = item.get(fields["content_id"] if item_type == "contents" else fields["comment_content_id"], "")
+    return platform, item_type, item_id, str(content_id or ""), text
+
+
+class FullTextIndexStage(AbstractStoreStage):
+    """
+    存储阶段：数据先缓存在内存中，攒够 config.FULLTEXT_BATCH_SIZE 条后在线程中分词并写入索引，不阻塞事件循环
+    """
+
+    def __init__(self, index: Optional[FullTextIndex] = None, batch_size: int = 0):
+        self.index = index or FullTextIndex()
+        self.batch_size = batch_size or config.FULLTEXT_BATCH_SIZE
+        self._pending: List[Tuple[str, str, str, str, str]] = []
+        # 同一时间只有一个线程写索引
+        self._write_lock = threading.Lock()
+
+    def _write(self, items: List[Tuple[str, str, str, str, str]]):
+        with self._write_lock:
+            self.index.add_many(items)
+
+    async def flush(self):
+        if not self._pending:
+            return
+        items, self._pending = self._pending, []
+        await asyncio.get_running_loop().run_in_executor(None, self._write, items)
+
+    async def process(self, platform: str, item_type: str, item: Dict) -> Optional[Dict]:
+        index_item = to_index_item(platform, item_type, item)
+        if index_item is not None:
+            self._pending.append(index_item)
+            if len(self._pending) >= self.batch_size:
+                await self.flush()
+        return item
+
+    async def close(self):
+        await self.flush()
+        self.index.close()
+
+
+def build_index_from_files(platform: str, item_type: str, source: str, path: str, index_file: str = "",
+                           chunksize: int = 10000) -> int:
+    """
+    把已保存的数据文件导入索引
+    Args:
+        platform: 平台
+        item_type: contents | comments
+        source: csv | json | jsonl | parquet
+        path: 文件、目录或通配符
+        index_file: 索引文件，默认使用爬虫共用的索引
+        chunksize: 每块读取的行数
+
+    Returns:
+        导入的条数
+    """
+    from tools.analytics import iter_file_chunks, resolve_files
+
+    fields = PLATFORM_ITEM_FIELDS[platform]
+    if item_type == "contents":
+        columns = [fields["content_id"]] + fields["content_text"]
+    else:
+        columns = [fields["comment_id"], fields["comment_content_id"], "content"]
+    index = FullTextIndex(index_file)
+    total = 0
+    try:
+        for file_path in resolve_files(path, source, item_type):
+            for chunk in iter_file_chunks(file_path, source, columns, chunksize):
+                items = [to_index_item(platform, item_type, item) for item in chunk.to_dict("records")]
+                items = [item for item in items if item is not None]
+                index.add_many(items)
+                total += len(items)
+        index.optimize()
+    finally:
+        index.close()
+    return total
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Search crawled contents and comments with the local full text index.')
+    parser.add_argument('query', type=str, nargs='?', default="", help='search words')
+    parser.add_argument('--platform', type=str, nargs='*', default=[], choices=list(PLATFORM_ITEM_FIELDS.keys()),
+                        help='limit to platforms (xhs | dy | ks | bili | wb | tieba | zhihu)')
+    parser.add_argument('--type', type=str, default="", choices=["", "contents", "comments"],
+                        help='limit to data type (contents | comments)')
+    parser.add_argument('--limit', type=int, default=20, help='max number of results')
+    parser.add_argument('--index', type=str, default="", help='index file, default is shared with crawler')
+    parser.add_argument('--build', type=str, default="", help='import stored data file, directory or glob pattern')
+    parser.add_argument('--source', type=str, default="json", choices=["csv", "json", "jsonl", "parquet"],
+                        help='data source of --build (csv | json | jsonl | parquet)')
+    args = parser.parse_args()
+
+    if args.build:
+        if len(args.platform) != 1 or not args.type:
+            parser.error("--build requires exactly one --platform and --type")
+        count = build_index_from_files(args.platform[0], args.type, args.source, args.build, index_file=args.index)
+        print(f"indexed {args.type}: {count}")
+    if args.query:
+        full_text_index = FullTextIndex(args.index)
+        start = time.perf_counter()
+        results = full_text_index.search(args.query, args.platform, args.type, args.limit)
+        elapsed = (time.perf_counter() - start) * 1000
+        for result in results:
+            print(json.dumps(result, ensure_ascii=False))
+        print(f"{len(results)} results in {elapsed:.1f} ms, {full_text_index.count()} documents indexed")
+        full_text_index.close()
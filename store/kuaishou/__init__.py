@@ -16,11 +16,17 @@
 from typing import List
 
 import config
+from store.pipeline import observe_batch, wrap_store
+from store.records import KuaishouVideoCommentRecord, KuaishouVideoRecord
+from tools import utils
 from var import source_keyword_var
 
 from .kuaishou_store_impl import *
 
 
+logger = utils.get_logger("store.kuaishou", sampled=True)
+
+
 class KuaishouStoreFactory:
     STORES = {
         "csv": KuaishouCsvStoreImplement,
@@ -34,7 +40,7 @@ class KuaishouStoreFactory:
         if not store_class:
             raise ValueError(
                 "[KuaishouStoreFactory.create_store] Invalid save option only supported csv or db or json ...")
-        return store_class()
+        return wrap_store("ks", store_class())
 
 
 async def update_kuaishou_video(video_item: Dict):
@@ -43,51 +49,53 @@ async def update_kuaishou_video(video_item: Dict):
     if not video_id:
         return
     user_info = video_item.get("author", {})
-    save_content_item = {
-        "video_id": video_id,
-        "video_type": str(video_item.get("type")),
-        "title": photo_info.get("caption", "")[:500],
-        "desc": photo_info.get("caption", "")[:500],
-        "create_time": photo_info.get("timestamp"),
-        "user_id": user_info.get("id"),
-        "nickname": user_info.get("name"),
-        "avatar": user_info.get("headerUrl", ""),
-        "liked_count": str(photo_info.get("realLikeCount")),
-        "viewd_count": str(photo_info.get("viewCount")),
-        "last_modify_ts": utils.get_current_timestamp(),
-        "video_url": f"https://www.kuaishou.com/short-video/{video_id}",
-        "video_cover_url": photo_info.get("coverUrl", ""),
-        "video_play_url": photo_info.get("photoUrl", ""),
-        "source_keyword": source_keyword_var.get(),
-    }
-    utils.logger.info(
-        f"[store.kuaishou.update_kuaishou_video] Kuaishou video id:{video_id}, title:{save_content_item.get('title')}")
+    save_content_item = KuaishouVideoRecord(
+        video_id=video_id,
+        video_type=str(video_item.get("type")),
+        title=photo_info.get("caption", "")[:500],
+        desc=photo_info.get("caption", "")[:500],
+        create_time=photo_info.get("timestamp"),
+        user_id=user_info.get("id"),
+        nickname=user_info.get("name"),
+        avatar=user_info.get("headerUrl", ""),
+        liked_count=str(photo_info.get("realLikeCount")),
+        viewd_count=str(photo_info.get("viewCount")),
+        last_modify_ts=utils.get_current_timestamp(),
+        video_url=f"https://www.kuaishou.com/short-video/{video_id}",
+        video_cover_url=photo_info.get("coverUrl", ""),
+        video_play_url=photo_info.get("photoUrl", ""),
+        source_keyword=source_keyword_var.get(),
+    )
+    logger.info("[store.kuaishou.update_kuaishou_video] Kuaishou video id:%s, title:%s", video_id,
+                save_content_item.get('title'))
     await KuaishouStoreFactory.create_store().store_content(content_item=save_content_item)
 
 
 async def batch_update_ks_video_comments(video_id: str, comments: List[Dict]):
-    utils.logger.info(f"[store.kuaishou.batch_update_ks_video_comments] video_id:{video_id}, comments:{comments}")
+    logger.debug("[store.kuaishou.batch_update_ks_video_comments] video_id:%s, comments:%s", video_id,
+                 utils.log_payload(comments))
     if not comments:
         return
+    observe_batch("ks", "comments", comments)
     for comment_item in comments:
         await update_ks_video_comment(video_id, comment_item)
 
 
 async def update_ks_video_comment(video_id: str, comment_item: Dict):
     comment_id = comment_item.get("commentId")
-    save_comment_item = {
-        "comment_id": comment_id,
-        "create_time": comment_item.get("timestamp"),
-        "video_id": video_id,
-        "content": comment_item.get("content"),
-        "user_id": comment_item.get("authorId"),
-        "nickname": comment_item.get("authorName"),
-        "avatar": comment_item.get("headurl"),
-        "sub_comment_count": str(comment_item.get("subCommentCount", 0)),
-        "last_modify_ts": utils.get_current_timestamp(),
-    }
-    utils.logger.info(
-        f"[store.kuaishou.update_ks_video_comment] Kuaishou video comment: {comment_id}, content: {save_comment_item.get('content')}")
+    save_comment_item = KuaishouVideoCommentRecord(
+        comment_id=comment_id,
+        create_time=comment_item.get("timestamp"),
+        video_id=video_id,
+        content=comment_item.get("content"),
+        user_id=comment_item.get("authorId"),
+        nickname=comment_item.get("authorName"),
+        avatar=comment_item.get("headurl"),
+        sub_comment_count=str(comment_item.get("subCommentCount", 0)),
+        last_modify_ts=utils.get_current_timestamp(),
+    )
+    logger.info("[store.kuaishou.update_ks_video_comment] Kuaishou video comment: %s, content: %s", comment_id,
+                utils.log_payload(save_comment_item.get('content')))
     await KuaishouStoreFactory.create_store().store_comment(comment_item=save_comment_item)
 
 async def save_creator(user_id: str, creator: Dict):
@@ -106,5 +114,5 @@ async def save_creator(user_id: str, creator: Dict):
         'interaction': ownerCount.get("photo_public"),
         "last_modify_ts": utils.get_current_timestamp(),
     }
-    utils.logger.info(f"[store.kuaishou.save_creator] creator:{local_db_item}")
+    logger.info("[store.kuaishou.save_creator] creator:%s", utils.log_payload(local_db_item))
     await KuaishouStoreFactory.create_store().store_creator(local_db_item)
\ No newline at end of file
@@ -0,0 +1,315 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 媒体文件内容寻址存储，同一张图片/同一个视频无论被多少个帖子引用只落盘一次
+import argparse
+import hashlib
+import os
+import pathlib
+import sqlite3
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+import aiofiles
+
+import config
+from tools import utils
+
+# 历史版本按帖子目录保存媒体文件的路径，用于迁移
+LEGACY_MEDIA_PATHS: Dict[str, str] = {
+    "xhs": "data/xhs/images",
+    "wb": "data/weibo/images",
+    "bili": "data/bilibili/videos",
+}
+
+
+class MediaIndex:
+    """
+    (平台, 帖子ID, 文件名) -> 内容hash 的映射索引，使用sqlite保存
+    """
+
+    def __init__(self, index_file: str):
+        pathlib.Path(index_file).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(index_file)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS media_index ("
+            "platform TEXT NOT NULL, note_id TEXT NOT NULL, slot TEXT NOT NULL, "
+            "content_hash TEXT NOT NULL, size INTEGER NOT NULL DEFAULT 0, "
+            "add_ts INTEGER NOT NULL DEFAULT 0, "
+            "PRIMARY KEY (platform, note_id, slot))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_media_index_hash ON media_index (content_hash)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS media_decision ("
+            "platform TEXT NOT NULL, note_id TEXT NOT NULL, slot TEXT NOT NULL, url TEXT NOT NULL, "
+            "size INTEGER, duration INTEGER, decision TEXT NOT NULL, reason TEXT NOT NULL DEFAULT '', "
+            "add_ts INTEGER NOT NULL DEFAULT 0, "
+            "PRIMARY KEY (platform, note_id, slot))"
+        )
+        self._conn.commit()
+
+    def get(self, platform: str, note_id: str, slot: str) -> Optional[str]:
+        """
+        查询某个帖子下某个媒体文件对应的内容hash
+        Args:
+            platform: 平台
+            note_id: 帖子ID
+            slot: 帖子下的文件名，例如 0.jpg
+
+        Returns:
+
+        """
+        row = self._conn.execute(
+            "SELECT content_hash FROM media_index WHERE platform=? AND note_id=? AND slot=?",
+            (platform, note_id, slot),
+        ).fetchone()
+        return row[0] if row else None
+
+    def put(self, platform: str, note_id: str, slot: str, content_hash: str, size: int):
+        """
+        写入或覆盖一条映射
+        Args:
+            platform: 平台
+            note_id: 帖子ID
+            slot: 帖子下的文件名
+            content_hash: 内容hash
+            size: 文件大小
+
+        Returns:
+
+        """
+        self._conn.execute(
+            "INSERT OR REPLACE INTO media_index (platform, note_id, slot, content_hash, size, add_ts) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (platform, note_id, slot, content_hash, size, utils.get_current_timestamp()),
+        )
+        self._conn.commit()
+
+    def count_references(self, content_hash: str) -> int:
+        """
+        统计一个内容hash被引用的次数
+        Args:
+            content_hash:
+
+        Returns:
+
+        """
+        row = self._conn.execute(
+            "SELECT COUNT(*) FROM media_index WHERE content_hash=?", (content_hash,)
+        ).fetchone()
+        return row[0]
+
+    def record_decision(self, platform: str, note_id: str, slot: str, url: str, size: Optional[int],
+                        duration: Optional[int], decision: str, reason: str):
+        """
+        记录一个媒体文件的下载前检查结果（skip | defer）
+        Args:
+            platform: 平台
+            note_id: 帖子ID
+            slot: 帖子下的文件名
+            url: 媒体文件地址
+            size: 文件大小，未知为None
+            duration: 时长（秒），未知为None
+            decision: skip | defer
+            reason: 原因描述
+
+        Returns:
+
+        """
+        self._conn.execute(
+            "INSERT OR REPLACE INTO media_decision (platform, note_id, slot, url, size, duration, decision, reason, add_ts) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (platform, note_id, slot, url, size, duration, decision, reason, utils.get_current_timestamp()),
+        )
+        self._conn.commit()
+
+    def list_decisions(self, platform: str, decision: str) -> List[Dict]:
+        """
+        查询某个平台下被跳过或者延后下载的媒体文件
+        Args:
+            platform: 平台
+            decision: skip | defer
+
+        Returns:
+
+        """
+        cursor = self._conn.execute(
+            "SELECT platform, note_id, slot, url, size, duration, decision, reason FROM media_decision "
+            "WHERE platform=? AND decision=? ORDER BY add_ts",
+            (platform, decision),
+        )
+        columns = [column[0] for column in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def delete_decision(self, platform: str, note_id: str, slot: str):
+        """
+        删除一个媒体文件的下载前检查结果，延后的文件重新加入下载队列后调用
+        Args:
+            platform: 平台
+            note_id: 帖子ID
+            slot: 帖子下的文件名
+
+        Returns:
+
+        """
+        self._conn.execute(
+            "DELETE FROM media_decision WHERE platform=? AND note_id=? AND slot=?", (platform, note_id, slot))
+        self._conn.commit()
+
+    def close(self):
+        self._conn.close()
+
+
+class ContentAddressedMediaStore:
+    """
+    内容寻址的媒体存储：文件按 sha256 命名，并按hash前缀两级分目录，避免单目录文件过多
+    eg: data/media/blobs/ab/cd/abcd....jpg
+    """
+
+    def __init__(self, store_path: str = ""):
+        self.store_path = store_path or config.MEDIA_STORE_PATH
+        self.blob_path = f"{self.store_path}/blobs"
+        self.index = MediaIndex(f"{self.store_path}/media_index.db")
+
+    @staticmethod
+    def hash_content(content: bytes) -> str:
+        return hashlib.sha256(content).hexdigest()
+
+    def make_blob_file_name(self, content_hash: str, slot: str) -> str:
+        """
+        根据内容hash生成blob文件路径，保留原始文件的扩展名
+        Args:
+            content_hash: 内容hash
+            slot: 原始文件名，用于提取扩展名
+
+        Returns:
+
+        """
+        extension = os.path.splitext(slot)[1].lower()
+        return f"{self.blob_path}/{content_hash[:2]}/{content_hash[2:4]}/{content_hash}{extension}"
+
+    def resolve(self, platform: str, note_id: str, slot: str) -> Optional[str]:
+        """
+        查询某个帖子下某个媒体文件实际的blob路径
+        Args:
+            platform: 平台
+            note_id: 帖子ID
+            slot: 帖子下的文件名
+
+        Returns:
+
+        """
+        content_hash = self.index.get(platform, str(note_id), slot)
+        if not content_hash:
+            return None
+        return self.make_blob_file_name(content_hash, slot)
+
+    async def save(self, platform: str, note_id: str, slot: str, content: bytes) -> str:
+        """
+        保存媒体文件，内容已存在时跳过写盘，只更新索引
+        Args:
+            platform: 平台
+            note_id: 帖子ID
+            slot: 帖子下的文件名，例如 0.jpg
+            content: 文件内容
+
+        Returns:
+            blob文件路径
+        """
+        content_hash = self.hash_content(content)
+        save_file_name = self.make_blob_file_name(content_hash, slot)
+        if os.path.exists(save_file_name):
+            utils.logger.info(
+                f"[ContentAddressedMediaStore.save] {platform} note {note_id} {slot} already stored as {save_file_name}, skip write")
+        else:
+            pathlib.Path(save_file_name).parent.mkdir(parents=True, exist_ok=True)
+            # 先写临时文件再重命名，避免并发写同一个blob时读到半截文件
+            tmp_file_name = f"{save_file_name}.{uuid.uuid4().hex}.tmp"
+            async with aiofiles.open(tmp_file_name, 'wb') as f:
+                await f.write(content)
+            os.replace(tmp_file_name, save_file_name)
+            utils.logger.info(f"[ContentAddressedMediaStore.save] save media {save_file_name} success ...")
+        self.index.put(platform, str(note_id), slot, content_hash, len(content))
+        return save_file_name
+
+    def migrate_legacy_dir(self, platform: str, source_dir: str, remove_source: bool = False) -> Tuple[int, int]:
+        """
+        把历史上按帖子目录保存的媒体文件迁移到内容寻址存储
+        支持两种目录结构：
+            source_dir/<note_id>/<slot>   (小红书、B站)
+            source_dir/<pic_id>.<ext>     (微博)
+        Args:
+            platform: 平台
+            source_dir: 历史目录
+            remove_source: 迁移完成后是否删除原文件
+
+        Returns:
+            (迁移的文件数, 去重节省的字节数)
+        """
+        migrated_count, saved_bytes = 0, 0
+        source_root = pathlib.Path(source_dir)
+        if not source_root.exists():
+            return migrated_count, saved_bytes
+
+        for file_path in sorted(source_root.rglob("*")):
+            if not file_path.is_file():
+                continue
+            if file_path.parent == source_root:
+                note_id = file_path.stem
+            else:
+                note_id = file_path.parent.name
+            content = file_path.read_bytes()
+            content_hash = self.hash_content(content)
+            blob_file_name = self.make_blob_file_name(content_hash, file_path.name)
+            if os.path.exists(blob_file_name):
+                saved_bytes += len(content)
+            else:
+                pathlib.Path(blob_file_name).parent.mkdir(parents=True, exist_ok=True)
+                with open(blob_file_name, 'wb') as f:
+                    f.write(content)
+            self.index.put(platform, note_id, file_path.name, content_hash, len(content))
+            migrated_count += 1
+            if remove_source:
+                file_path.unlink()
+
+        utils.logger.info(
+            f"[ContentAddressedMediaStore.migrate_legacy_dir] migrate {source_dir} done, files: {migrated_count}, dedup saved bytes: {saved_bytes}")
+        return migrated_count, saved_bytes
+
+
+_media_store: Optional[ContentAddressedMediaStore] = None
+
+
+def get_media_store() -> ContentAddressedMediaStore:
+    """
+    获取全局的内容寻址存储对象
+    Returns:
+
+    """
+    global _media_store
+    if _media_store is None:
+        _media_store = ContentAddressedMediaStore()
+    return _media_store
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Migrate legacy media directories to content addressed store.')
+    parser.add_argument('--platform', type=str, required=True, choices=list(LEGACY_MEDIA_PATHS.keys()),
+                        help='Media platform select (xhs | wb | bili)')
+    parser.add_argument('--source', type=str, default="",
+                        help='legacy media directory, default is the directory used by the platform store')
+    parser.add_argument('--remove_source', type=utils.str2bool, default=False,
+                        help='whether to delete the legacy files after migrate')
+    args = parser.parse_args()
+    files, saved = get_media_store().migrate_legacy_dir(
+        args.platform, args.source or LEGACY_MEDIA_PATHS[args.platform], remove_source=args.remove_source)
+    print(f"migrated files: {files}, dedup saved bytes: {saved}")
@@ -0,0 +1,238 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 互动数据历史，重复爬取时只记录发生变化的点赞/收藏/评论/分享数，保留每条内容的增长曲线
+import argparse
+import json
+import pathlib
+import re
+import sqlite3
+from typing import Dict, List, Optional, Tuple
+
+import config
+from store.pipeline import AbstractStoreStage, get_item_id
+from tools import utils
+
+# 各平台内容数据中需要记录历史的计数字段，与 store/<platform>/__init__.py 中生成的字段保持一致
+PLATFORM_METRIC_FIELDS: Dict[str, List[str]] = {
+    "xhs": ["liked_count", "collected_count", "comment_count", "share_count"],
+    "dy": ["liked_count", "collected_count", "comment_count", "share_count"],
+    "ks": ["liked_count", "viewd_count"],
+    "bili": ["liked_count", "video_play_count", "video_favorite_count", "video_share_count", "video_coin_count",
+             "video_danmaku", "video_comment"],
+    "wb": ["liked_count", "comments_count", "shared_count"],
+    "tieba": ["total_replay_num"],
+    "zhihu": ["voteup_count", "comment_count"],
+}
+
+COUNT_PATTERN = re.compile(r"[\d.]+")
+
+
+def parse_count_value(value) -> Optional[int]:
+    """
+    把计数字段转换成整数，兼容 "1.2万"、"10+" 这类平台展示的格式，无法解析时返回None
+    Args:
+        value:
+
+    Returns:
+
+    """
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    match = COUNT_PATTERN.search(str(value))
+    if not match:
+        return None
+    try:
+        number = float(match.group())
+    except ValueError:
+        return None
+    return int(number * 10000) if "万" in str(value) else int(number)
+
+
+class MetricsHistory:
+    """
+    计数历史存储，每个 (平台, 内容ID, 计数字段) 是一条序列，序列的数据点只在数值变化时写入，
+    metric_point 以 (series_id, ts) 为主键且不带 rowid，一个数据点只占几个变长整数
+    """
+
+    def __init__(self, history_file: str = ""):
+        self.history_file = history_file or f"{config.STORE_INDEX_PATH}/metrics_history.db"
+        pathlib.Path(self.history_file).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.history_file)
+        self._conn.executescript(
+            "PRAGMA journal_mode = WAL;"
+            "PRAGMA synchronous = NORMAL;"
+            "CREATE TABLE IF NOT EXISTS metric_series ("
+            "series_id INTEGER PRIMARY KEY, platform TEXT NOT NULL, content_id TEXT NOT NULL, metric TEXT NOT NULL, "
+            "UNIQUE (platform, content_id, metric));"
+            "CREATE INDEX IF NOT EXISTS idx_metric_series_metric ON metric_series (platform, metric);"
+            "CREATE TABLE IF NOT EXISTS metric_point ("
+            "series_id INTEGER NOT NULL, ts INTEGER NOT NULL, value INTEGER NOT NULL, "
+            "PRIMARY KEY (series_id, ts)) WITHOUT ROWID;"
+        )
+        self._conn.commit()
+        # (平台, 内容ID, 计数字段) -> (series_id, 最新值)，避免每次写入前都查询数据库
+        self._latest: Dict[Tuple[str, str, str], Tuple[int, Optional[int]]] = {}
+
+    def _get_series(self, platform: str, content_id: str, metric: str) -> Tuple[int, Optional[int]]:
+        key = (platform, content_id, metric)
+        if key in self._latest:
+            return self._latest[key]
+        row = self._conn.execute(
+            "SELECT series_id FROM metric_series WHERE platform = ? AND content_id = ? AND metric = ?", key
+        ).fetchone()
+        if row is None:
+            series_id = self._conn.execute(
+                "INSERT INTO metric_series (platform, content_id, metric) VALUES (?, ?, ?)", key
+            ).lastrowid
+            latest_value = None
+        else:
+            series_id = row[0]
+            point = self._conn.execute(
+                "SELECT value FROM metric_point WHERE series_id = ? ORDER BY ts DESC LIMIT 1", (series_id,)
+            ).fetchone()
+            latest_value = point[0] if point else None
+        self._latest[key] = (series_id, latest_value)
+        return self._latest[key]
+
+    def record(self, platform: str, content_id: str, metrics: Dict[str, int], ts: int = 0) -> int:
+        """
+        记录一次快照，只写入和上一次不同的计数
+        Args:
+            platform: 平台
+            content_id: 内容ID
+            metrics: 计数字段 -> 数值
+            ts: 快照时间（秒级时间戳），默认当前时间
+
+        Returns:
+            写入的数据点个数
+        """
+        ts = ts or utils.get_current_timestamp() // 1000
+        changed = 0
+        for metric, value in metrics.items():
+            series_id, latest_value = self._get_series(platform, content_id, metric)
+            if value == latest_value:
+                continue
+            self._conn.execute(
+                "INSERT OR REPLACE INTO metric_point (series_id, ts, value) VALUES (?, ?, ?)", (series_id, ts, value)
+            )
+            self._latest[(platform, content_id, metric)] = (series_id, value)
+            changed += 1
+        self._conn.commit()
+        return changed
+
+    def get_growth(self, platform: str, content_id: str, metrics: Optional[List[str]] = None) -> Dict[str, List[Tuple[int, int]]]:
+        """
+        查询一条内容的增长曲线
+        Args:
+            platform: 平台
+            content_id: 内容ID
+            metrics: 计数字段，为空时返回所有字段
+
+        Returns:
+            计数字段 -> [(时间戳, 数值)]，按时间升序，只包含数值发生变化的时间点
+        """
+        sql = ("SELECT s.metric, p.ts, p.value FROM metric_series s JOIN metric_point p ON p.series_id = s.series_id "
+               "WHERE s.platform = ? AND s.content_id = ?")
+        params: List = [platform, content_id]
+        if metrics:
+            sql += f" AND s.metric IN ({','.join('?' * len(metrics))})"
+            params.extend(metrics)
+        growth: Dict[str, List[Tuple[int, int]]] = {}
+        for metric, ts, value in self._conn.execute(sql + " ORDER BY s.metric, p.ts", params):
+            growth.setdefault(metric, []).append((ts, value))
+        return growth
+
+    def get_value_at(self, platform: str, content_id: str, metric: str, ts: int) -> Optional[int]:
+        """
+        查询某个时间点的计数，即该时间之前最后一次变化后的数值
+        """
+        row = self._conn.execute(
+            "SELECT p.value FROM metric_series s JOIN metric_point p ON p.series_id = s.series_id "
+            "WHERE s.platform = ? AND s.content_id = ? AND s.metric = ? AND p.ts <= ? ORDER BY p.ts DESC LIMIT 1",
+            (platform, content_id, metric, ts),
+        ).fetchone()
+        return row[0] if row else None
+
+    def top_growth(self, platform: str, metric: str, since_ts: int = 0, limit: int = 20) -> List[Dict]:
+        """
+        查询某个计数增长最多的内容
+        Args:
+            platform: 平台
+            metric: 计数字段
+            since_ts: 起始时间（秒级时间戳），以该时间点的数值为基准，没有更早的记录时以第一次记录为基准
+            limit: 返回条数
+
+        Returns:
+
+        """
+        cursor = self._conn.execute(
+            "SELECT content_id, latest, baseline, latest - baseline AS growth FROM ("
+            "SELECT s.content_id, "
+            "(SELECT value FROM metric_point p WHERE p.series_id = s.series_id ORDER BY ts DESC LIMIT 1) AS latest, "
+            "COALESCE((SELECT value FROM metric_point p WHERE p.series_id = s.series_id AND ts <= ? ORDER BY ts DESC LIMIT 1), "
+            "(SELECT value FROM metric_point p WHERE p.series_id = s.series_id ORDER BY ts LIMIT 1)) AS baseline "
+            "FROM metric_series s WHERE s.platform = ? AND s.metric = ?) ORDER BY growth DESC LIMIT ?",
+            (since_ts, platform, metric, limit),
+        )
+        columns = [column[0] for column in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def close(self):
+        self._conn.close()
+
+
+class MetricsHistoryStage(AbstractStoreStage):
+    """
+    存储阶段：内容数据写入前记录计数的变化，数据本身原样写入
+    """
+
+    def __init__(self, history: Optional[MetricsHistory] = None):
+        self.history = history or MetricsHistory()
+
+    async def process(self, platform: str, item_type: str, item: Dict) -> Optional[Dict]:
+        if item_type != "contents":
+            return item
+        content_id = get_item_id(platform, item_type, item)
+        metrics = {}
+        for metric in PLATFORM_METRIC_FIELDS[platform]:
+            value = parse_count_value(item.get(metric))
+            if value is not None:
+                metrics[metric] = value
+        if content_id and metrics:
+            self.history.record(platform, content_id, metrics)
+        return item
+
+    async def close(self):
+        self.history.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Query engagement growth of crawled contents.')
+    parser.add_argument('--platform', type=str, required=True, choices=list(PLATFORM_METRIC_FIELDS.keys()),
+                        help='Media platform select (xhs | dy | ks | bili | wb | tieba | zhihu)')
+    parser.add_argument('--id', type=str, default="", help='content id, print its growth curve')
+    parser.add_argument('--metric', type=str, default="", help='metric field, print contents with the most growth')
+    parser.add_argument('--since', type=int, default=0, help='timestamp in seconds, baseline of --metric')
+    parser.add_argument('--limit', type=int, default=20, help='max number of contents of --metric')
+    parser.add_argument('--history', type=str, default="", help='history file, default is shared with crawler')
+    args = parser.parse_args()
+
+    metrics_history = MetricsHistory(args.history)
+    if args.id:
+        print(json.dumps(metrics_history.get_growth(args.platform, args.id), ensure_ascii=False, indent=2))
+    if args.metric:
+        for row in metrics_history.top_growth(args.platform, args.metric, args.since, args.limit):
+            print(json.dumps(row, ensure_ascii=False))
+    metrics_history.close()
@@ -0,0 +1,321 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 基于 MinHash-LSH 的近似重复内容检测，识别跨关键词、跨平台的搬运帖和小幅改动的刷屏评论
+import argparse
+import csv
+import hashlib
+import pathlib
+import re
+import sqlite3
+import unicodedata
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+import config
+from store.pipeline import PLATFORM_ITEM_FIELDS, AbstractStoreStage, get_item_id, get_item_text
+from tools import utils
+
+# MinHash 哈希函数 (a * x + b) % p 使用的梅森素数
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64((1 << 32) - 1)
+
+# 链接、@用户、[表情] 以及所有标点空白，归一化时去掉
+NOISE_PATTERN = re.compile(r"https?://\S+|@\S+|\[[^\[\]]{1,8}\]")
+PUNCTUATION_PATTERN = re.compile(r"[\W_]+")
+
+
+def normalize_text(text: str) -> str:
+    """
+    文本归一化：全角转半角、转小写，去掉链接、@用户、表情和标点空白
+    Args:
+        text:
+
+    Returns:
+
+    """
+    text = unicodedata.normalize("NFKC", text).lower()
+    return PUNCTUATION_PATTERN.sub("", NOISE_PATTERN.sub("", text))
+
+
+def get_shingles(text: str, shingle_size: int = 3) -> Set[str]:
+    """
+    把文本切分为字符 n-gram 集合
+    Args:
+        text: 已归一化的文本
+        shingle_size: n-gram 长度
+
+    Returns:
+
+    """
+    if len(text) <= shingle_size:
+        return {text}
+    return {text[i:i + shingle_size] for i in range(len(text) - shingle_size + 1)}
+
+
+class MinHasher:
+    """
+    MinHash 签名计算，哈希函数参数使用固定的随机种子生成，保证不同批次、不同进程计算的签名可以相互比较
+    """
+
+    def __init__(self, num_perm: int = 64, seed: int = 1):
+        generator = np.random.RandomState(seed)
+        self.a = generator.randint(1, MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self.b = generator.randint(0, MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+
+    def signature(self, shingles: Set[str]) -> np.ndarray:
+        """
+        计算 n-gram 集合的 MinHash 签名，两个签名相同位置取值相等的比例即 Jaccard 相似度的估计
+        Args:
+            shingles:
+
+        Returns:
+            长度为 num_perm 的 uint32 数组
+        """
+        digests = b"".join(hashlib.blake2b(shingle.encode("utf-8"), digest_size=4).digest() for shingle in shingles)
+        hash_values = np.frombuffer(digests, dtype="<u4").astype(np.uint64)
+        permuted = (np.outer(hash_values, self.a) + self.b) % MERSENNE_PRIME & MAX_HASH
+        return permuted.min(axis=0).astype(np.uint32)
+
+
+def jaccard_similarity(signature: np.ndarray, other: np.ndarray) -> float:
+    return float(np.count_nonzero(signature == other)) / len(signature)
+
+
+class NearDuplicateIndex:
+    """
+    MinHash-LSH 索引，签名切分为 bands 段，任意一段完全相同的数据作为候选，再按估计的 Jaccard 相似度确认，
+    相似度越高成为候选的概率越大，无关文本几乎不会成为候选，查询不需要扫描整个索引
+    """
+
+    def __init__(self, index_file: str = "", threshold: float = -1, num_perm: int = 0, bands: int = 0):
+        self.index_file = index_file or f"{config.STORE_INDEX_PATH}/near_dup.db"
+        self.threshold = threshold if threshold >= 0 else config.NEAR_DUP_THRESHOLD
+        self.num_perm = num_perm or config.NEAR_DUP_NUM_PERM
+        self.bands = bands or config.NEAR_DUP_BANDS
+        if self.num_perm % self.bands:
+            raise ValueError(f"[NearDuplicateIndex] num_perm {self.num_perm} must be divisible by bands {self.bands}")
+        self.hasher = MinHasher(self.num_perm)
+        pathlib.Path(self.index_file).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.index_file)
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS near_dup_signature ("
+            "platform TEXT NOT NULL, item_type TEXT NOT NULL, item_id TEXT NOT NULL, signature BLOB NOT NULL, "
+            "PRIMARY KEY (platform, item_type, item_id));"
+            "CREATE TABLE IF NOT EXISTS near_dup_band ("
+            "item_type TEXT NOT NULL, band_key INTEGER NOT NULL, platform TEXT NOT NULL, item_id TEXT NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS idx_near_dup_band_key ON near_dup_band (item_type, band_key);"
+            "CREATE INDEX IF NOT EXISTS idx_near_dup_band_item ON near_dup_band (platform, item_type, item_id);"
+            "CREATE TABLE IF NOT EXISTS near_dup_match ("
+            "platform TEXT NOT NULL, item_type TEXT NOT NULL, item_id TEXT NOT NULL, "
+            "dup_platform TEXT NOT NULL, dup_item_id TEXT NOT NULL, similarity REAL NOT NULL, "
+            "add_ts INTEGER NOT NULL DEFAULT 0, PRIMARY KEY (platform, item_type, item_id));"
+        )
+        self._conn.commit()
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """
+        计算文本的签名，归一化后太短的文本返回None
+        """
+        normalized_text = normalize_text(text)
+        if len(normalized_text) < config.NEAR_DUP_MIN_TEXT_LENGTH:
+            return None
+        return self.hasher.signature(get_shingles(normalized_text, config.NEAR_DUP_SHINGLE_SIZE))
+
+    def band_keys(self, signature: np.ndarray) -> List[int]:
+        rows = self.num_perm // self.bands
+        band_keys = []
+        for band_no in range(self.bands):
+            digest = hashlib.blake2b(bytes([band_no]) + signature[band_no * rows:(band_no + 1) * rows].tobytes(),
+                                     digest_size=8).digest()
+            band_keys.append(int.from_bytes(digest, "big", signed=True))
+        return band_keys
+
+    def find(self, platform: str, item_type: str, item_id: str, signature: np.ndarray) -> Optional[Tuple[str, str, float]]:
+        """
+        查找相似度不低于阈值的最相似的已有数据，排除自己
+        Args:
+            platform: 平台
+            item_type: contents | comments
+            item_id: 数据ID
+            signature: MinHash 签名
+
+        Returns:
+            (平台, 数据ID, 相似度)，没有找到返回None
+        """
+        band_keys = self.band_keys(signature)
+        rows = self._conn.execute(
+            "SELECT DISTINCT s.platform, s.item_id, s.signature FROM near_dup_band b "
+            "JOIN near_dup_signature s ON s.platform = b.platform AND s.item_type = b.item_type AND s.item_id = b.item_id "
+            f"WHERE b.item_type = ? AND b.band_key IN ({','.join('?' * len(band_keys))})",
+            (item_type, *band_keys),
+        ).fetchall()
+        best_match = None
+        for candidate_platform, candidate_id, candidate_signature in rows:
+            if candidate_platform == platform and candidate_id == item_id:
+                continue
+            similarity = jaccard_similarity(signature, np.frombuffer(candidate_signature, dtype=np.uint32))
+            if similarity >= self.threshold and (best_match is None or similarity > best_match[2]):
+                best_match = (candidate_platform, candidate_id, similarity)
+        return best_match
+
+    def add(self, platform: str, item_type: str, item_id: str, signature: np.ndarray):
+        """
+        写入或更新一条数据的签名
+        """
+        self._conn.execute(
+            "DELETE FROM near_dup_band WHERE platform = ? AND item_type = ? AND item_id = ?",
+            (platform, item_type, item_id),
+        )
+        self._conn.execute(
+            "INSERT OR REPLACE INTO near_dup_signature (platform, item_type, item_id, signature) VALUES (?, ?, ?, ?)",
+            (platform, item_type, item_id, signature.tobytes()),
+        )
+        self._conn.executemany(
+            "INSERT INTO near_dup_band (item_type, band_key, platform, item_id) VALUES (?, ?, ?, ?)",
+            [(item_type, band_key, platform, item_id) for band_key in self.band_keys(signature)],
+        )
+
+    def check(self, platform: str, item_type: str, item_id: str, text: str) -> Optional[Tuple[str, str, float]]:
+        """
+        检查一条数据是否与已有数据近似重复，不重复时加入索引，重复时记录到 near_dup_match 表
+        Args:
+            platform: 平台
+            item_type: contents | comments
+            item_id: 数据ID
+            text: 原始文本
+
+        Returns:
+            重复的原始数据 (平台, 数据ID, 相似度)，不重复或文本太短返回None
+        """
+        signature = self.signature(text)
+        if not item_id or signature is None:
+            return None
+        match = self.find(platform, item_type, item_id, signature)
+        if match is None:
+            self.add(platform, item_type, item_id, signature)
+        else:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO near_dup_match "
+                "(platform, item_type, item_id, dup_platform, dup_item_id, similarity, add_ts) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (platform, item_type, item_id, *match, utils.get_current_timestamp()),
+            )
+        self._conn.commit()
+        return match
+
+    def list_matches(self, item_type: str, platform: str = "") -> List[Dict]:
+        """
+        查询已检测到的近似重复数据
+        Args:
+            item_type: contents | comments
+            platform: 平台，为空时查询所有平台
+
+        Returns:
+
+        """
+        sql = "SELECT platform, item_id, dup_platform, dup_item_id, similarity FROM near_dup_match WHERE item_type = ?"
+        params: Tuple = (item_type,)
+        if platform:
+            sql += " AND platform = ?"
+            params += (platform,)
+        cursor = self._conn.execute(sql + " ORDER BY add_ts", params)
+        columns = [column[0] for column in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def close(self):
+        self._conn.close()
+
+
+class NearDuplicateStage(AbstractStoreStage):
+    """
+    存储阶段：近似重复的数据按 config.NEAR_DUP_ACTION 只记录（tag）或者不再写入存储（suppress）
+    """
+
+    def __init__(self, index: Optional[NearDuplicateIndex] = None):
+        self.index = index or NearDuplicateIndex()
+
+    async def process(self, platform: str, item_type: str, item: Dict) -> Optional[Dict]:
+        item_id = get_item_id(platform, item_type, item)
+        match = self.index.check(platform, item_type, item_id, get_item_text(platform, item_type, item))
+        if match is None:
+            return item
+        dup_platform, dup_item_id, similarity = match
+        utils.logger.info(
+            f"[NearDuplicateStage.process] {platform} {item_type} {item_id} is near duplicate of "
+            f"{dup_platform} {dup_item_id}, similarity: {similarity:.2f}, action: {config.NEAR_DUP_ACTION}")
+        if config.NEAR_DUP_ACTION == "suppress":
+            return None
+        return item
+
+    async def close(self):
+        self.index.close()
+
+
+def detect_file_duplicates(platform: str, item_type: str, source: str, path: str, index_file: str = "",
+                           chunksize: int = 10000) -> List[Dict]:
+    """
+    批量检测已保存数据中的近似重复，按数据保存的顺序，先出现的视为原始数据
+    Args:
+        platform: 平台
+        item_type: contents | comments
+        source: csv | json | jsonl | parquet
+        path: 文件、目录或通配符
+        index_file: 签名索引文件，默认使用爬虫共用的索引
+        chunksize: 每块读取的行数
+
+    Returns:
+        本次检测到的近似重复数据
+    """
+    from tools.analytics import iter_file_chunks, resolve_files
+
+    fields = PLATFORM_ITEM_FIELDS[platform]
+    if item_type == "contents":
+        columns = [fields["content_id"]] + fields["content_text"]
+    else:
+        columns = [fields["comment_id"], "content"]
+    index = NearDuplicateIndex(index_file)
+    duplicates = []
+    try:
+        for file_path in resolve_files(path, source, item_type):
+            for chunk in iter_file_chunks(file_path, source, columns, chunksize):
+                for item in chunk.to_dict("records"):
+                    item_id = get_item_id(platform, item_type, item)
+                    match = index.check(platform, item_type, item_id, get_item_text(platform, item_type, item))
+                    if match is not None:
+                        duplicates.append({"item_id": item_id, "dup_platform": match[0], "dup_item_id": match[1],
+                                           "similarity": match[2]})
+    finally:
+        index.close()
+    return duplicates
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Detect near duplicate contents or comments in stored data.')
+    parser.add_argument('--platform', type=str, required=True, choices=list(PLATFORM_ITEM_FIELDS.keys()),
+                        help='Media platform select (xhs | dy | ks | bili | wb | tieba | zhihu)')
+    parser.add_argument('--type', type=str, default="contents", choices=["contents", "comments"],
+                        help='data type (contents | comments)')
+    parser.add_argument('--source', type=str, default="json", choices=["csv", "json", "jsonl", "parquet"],
+                        help='data source (csv | json | jsonl | parquet)')
+    parser.add_argument('--path', type=str, required=True, help='data file, directory or glob pattern')
+    parser.add_argument('--index', type=str, default="", help='signature index file, default is shared with crawler')
+    parser.add_argument('--output', type=str, default="", help='csv file to save detected duplicates')
+    args = parser.parse_args()
+
+    result = detect_file_duplicates(args.platform, args.type, args.source, args.path, index_file=args.index)
+    print(f"near duplicate {args.type}: {len(result)}")
+    if args.output and result:
+        with open(args.output, "w", encoding="utf-8-sig", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(result[0].keys()))
+            writer.writeheader()
+            writer.writerows(result)
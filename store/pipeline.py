@@ -0,0 +1,230 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 存储流水线，数据写入 csv/db/json 存储之前依次经过各个处理阶段（去重、索引等）
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+
+import config
+from base.base_crawler import AbstractStore
+from tools import metrics
+
+# 各平台 内容/评论 数据中的关键字段，与 store/<platform>/__init__.py 中生成的字段保持一致
+# content_id: 内容ID, content_text: 内容文本字段, comment_id: 评论ID,
+# comment_content_id: 评论所属的内容ID, comment_parent_id: 父评论ID（没有楼中楼的平台为空）
+PLATFORM_ITEM_FIELDS: Dict[str, Dict] = {
+    "xhs": {"content_id": "note_id", "content_text": ["title", "desc"], "comment_id": "comment_id",
+            "comment_content_id": "note_id", "comment_parent_id": "parent_comment_id"},
+    "dy": {"content_id": "aweme_id", "content_text": ["title", "desc"], "comment_id": "comment_id",
+           "comment_content_id": "aweme_id", "comment_parent_id": "parent_comment_id"},
+    "ks": {"content_id": "video_id", "content_text": ["title", "desc"], "comment_id": "comment_id",
+           "comment_content_id": "video_id", "comment_parent_id": ""},
+    "bili": {"content_id": "video_id", "content_text": ["title", "desc"], "comment_id": "comment_id",
+             "comment_content_id": "video_id", "comment_parent_id": "parent_comment_id"},
+    "wb": {"content_id": "note_id", "content_text": ["content"], "comment_id": "comment_id",
+           "comment_content_id": "note_id", "comment_parent_id": "parent_comment_id"},
+    "tieba": {"content_id": "note_id", "content_text": ["title", "desc"], "comment_id": "comment_id",
+              "comment_content_id": "note_id", "comment_parent_id": "parent_comment_id"},
+    "zhihu": {"content_id": "content_id", "content_text": ["title", "desc", "content_text"], "comment_id": "comment_id",
+              "comment_content_id": "content_id", "comment_parent_id": "parent_comment_id"},
+}
+
+
+def get_item_id(platform: str, item_type: str, item: Dict) -> str:
+    """
+    获取内容或评论的ID
+    Args:
+        platform: 平台
+        item_type: contents | comments
+        item:
+
+    Returns:
+
+    """
+    fields = PLATFORM_ITEM_FIELDS[platform]
+    id_field = fields["content_id"] if item_type == "contents" else fields["comment_id"]
+    return str(item.get(id_field, ""))
+
+
+def get_item_text(platform: str, item_type: str, item: Dict) -> str:
+    """
+    获取内容或评论的文本，内容拼接标题、描述等字段
+    Args:
+        platform: 平台
+        item_type: contents | comments
+        item:
+
+    Returns:
+
+    """
+    if item_type == "comments":
+        return str(item.get("content") or "")
+    return "\n".join(str(item.get(field) or "") for field in PLATFORM_ITEM_FIELDS[platform]["content_text"]).strip()
+
+
+class AbstractStoreStage(ABC):
+    """
+    存储处理阶段，返回None表示这条数据不再写入存储
+    """
+
+    @abstractmethod
+    async def process(self, platform: str, item_type: str, item: Dict) -> Optional[Dict]:
+        """
+        处理一条数据
+        Args:
+            platform: 平台
+            item_type: contents | comments
+            item: 数据
+
+        Returns:
+            处理后的数据，返回None表示丢弃
+        """
+        pass
+
+    async def close(self):
+        pass
+
+
+class StagedStore(AbstractStore):
+    """
+    包装实际的存储实现，内容和评论先依次经过各个处理阶段再写入
+    """
+
+    def __init__(self, platform: str, store: AbstractStore, stages: List[AbstractStoreStage]):
+        self.platform = platform
+        self.store = store
+        self.stages = stages
+
+    async def _process(self, item_type: str, item: Dict) -> Optional[Dict]:
+        for stage in self.stages:
+            item = await stage.process(self.platform, item_type, item)
+            if item is None:
+                return None
+        return item
+
+    async def store_content(self, content_item: Dict):
+        content_item = await self._process("contents", content_item)
+        if content_item is not None:
+            await self.store.store_content(content_item)
+
+    async def store_comment(self, comment_item: Dict):
+        comment_item = await self._process("comments", comment_item)
+        if comment_item is not None:
+            await self.store.store_comment(comment_item)
+
+    async def store_creator(self, creator: Dict):
+        await self.store.store_creator(creator)
+
+    def __getattr__(self, name):
+        # 平台特有的存储方法（例如B站的 store_contact、store_dynamic）直接交给实际的存储
+        if name == "store":
+            raise AttributeError(name)
+        return getattr(self.store, name)
+
+
+class TimedStore(AbstractStore):
+    """
+    包装实际的存储实现，统计每条数据的写入耗时
+    """
+
+    def __init__(self, platform: str, store: AbstractStore):
+        self.platform = platform
+        self.store = store
+
+    async def store_content(self, content_item: Dict):
+        with metrics.STORE_WRITE_SECONDS.time(platform=self.platform, backend=config.SAVE_DATA_OPTION,
+                                              item_type="contents"):
+            await self.store.store_content(content_item)
+
+    async def store_comment(self, comment_item: Dict):
+        with metrics.STORE_WRITE_SECONDS.time(platform=self.platform, backend=config.SAVE_DATA_OPTION,
+                                              item_type="comments"):
+            await self.store.store_comment(comment_item)
+
+    async def store_creator(self, creator: Dict):
+        with metrics.STORE_WRITE_SECONDS.time(platform=self.platform, backend=config.SAVE_DATA_OPTION,
+                                              item_type="creator"):
+            await self.store.store_creator(creator)
+
+    def __getattr__(self, name):
+        if name == "store":
+            raise AttributeError(name)
+        return getattr(self.store, name)
+
+
+def observe_batch(platform: str, item_type: str, items: List):
+    """
+    记录一批待存储数据的条数
+    Args:
+        platform: 平台
+        item_type: contents | comments | ...
+        items: 这一批数据
+
+    Returns:
+
+    """
+    metrics.STORE_BATCH_SIZE.observe(len(items), platform=platform, backend=config.SAVE_DATA_OPTION,
+                                     item_type=item_type)
+
+
+# 已创建的处理阶段，所有存储对象共用，保证跨帖子、跨平台的状态一致
+_stages: Dict[str, AbstractStoreStage] = {}
+
+
+def get_store_stages() -> List[AbstractStoreStage]:
+    """
+    根据配置获取开启的处理阶段，第一次使用时才创建
+    Returns:
+
+    """
+    if config.ENABLE_NEAR_DUP_DETECTION and "near_dup" not in _stages:
+        from store.near_duplicate import NearDuplicateStage
+        _stages["near_dup"] = NearDuplicateStage()
+    if config.ENABLE_FULLTEXT_INDEX and "fulltext" not in _stages:
+        from store.fulltext_index import FullTextIndexStage
+        _stages["fulltext"] = FullTextIndexStage()
+    if config.ENABLE_METRICS_HISTORY and "metrics_history" not in _stages:
+        from store.metrics_history import MetricsHistoryStage
+        _stages["metrics_history"] = MetricsHistoryStage()
+    if config.ENABLE_COMMENT_THREAD_INDEX and "comment_thread" not in _stages:
+        from store.comment_thread import CommentThreadStage
+        _stages["comment_thread"] = CommentThreadStage()
+    return list(_stages.values())
+
+
+def wrap_store(platform: str, store: AbstractStore) -> AbstractStore:
+    """
+    没有开启任何处理阶段和指标统计时直接返回原存储
+    Args:
+        platform: 平台
+        store: 实际的存储实现
+
+    Returns:
+
+    """
+    if config.ENABLE_METRICS:
+        store = TimedStore(platform, store)
+    stages = get_store_stages()
+    if not stages:
+        return store
+    return StagedStore(platform, store, stages)
+
+
+async def close_store_stages():
+    """
+    程序结束前调用，关闭所有处理阶段
+    Returns:
+
+    """
+    for stage in _stages.values():
+        await stage.close()
+    _stages.clear()
@@ -0,0 +1,238 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 存储记录类，每张表一个带 __slots__ 的记录类，字段顺序固定，代替 store 映射函数中临时拼的字典
+import os
+import re
+from operator import attrgetter
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple, Type
+
+SCHEMA_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "schema", "tables.sql")
+
+
+class Record:
+    """
+    记录基类，子类由 make_record 生成：
+    fields 为固定的字段顺序（也是 csv 的表头顺序），__init__ 和取值函数在生成类时编译好，写入时不需要再逐行处理字典的键。
+    记录实现了只读字典的接口（get/keys/values/items/[]），写入存储时可以直接当作字典使用；
+    字段之外的键（例如数据库存储补充的 add_ts）保存在 _extra 中
+    """
+    __slots__ = ("_extra",)
+    table: str = ""
+    fields: Tuple[str, ...] = ()
+    _get_values = staticmethod(lambda record: ())
+
+    def values(self) -> Tuple:
+        values = self._get_values(self)
+        if self._extra:
+            return values + tuple(self._extra.values())
+        return values
+
+    def keys(self) -> Tuple[str, ...]:
+        if self._extra:
+            return self.fields + tuple(self._extra.keys())
+        return self.fields
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        return zip(self.keys(), self.values())
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self.items())
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in self._field_set:
+            return getattr(self, key)
+        if self._extra:
+            return self._extra.get(key, default)
+        return default
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._field_set:
+            return getattr(self, key)
+        if self._extra and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any):
+        if key in self._field_set:
+            setattr(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._field_set or bool(self._extra and key in self._extra)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        return len(self.fields) + (len(self._extra) if self._extra else 0)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (Record, dict)):
+            return self.to_dict() == dict(other.items())
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({', '.join(f'{key}={value!r}' for key, value in self.items())})"
+
+
+def make_record(name: str, table: str, fields: Tuple[str, ...]) -> Type[Record]:
+    """
+    生成一张表的记录类
+    Args:
+        name: 类名
+        table: 对应的数据库表名
+        fields: 字段，按 csv/json 中的列顺序排列
+
+    Returns:
+
+    """
+    for field in fields:
+        if not field.isidentifier() or field.startswith("_"):
+            raise ValueError(f"[make_record] invalid field name {field} of {table}")
+    # 和 namedtuple/dataclass 一样生成 __init__ 的源码，参数全部为关键字参数，缺省为None
+    source = (
+        f"def __init__(self, *, {', '.join(f'{field}=None' for field in fields)}):\n"
+        + "".join(f"    self.{field} = {field}\n" for field in fields)
+        + "    self._extra = None\n"
+    )
+    namespace: Dict[str, Any] = {}
+    exec(source, namespace)
+    return type(name, (Record,), {
+        "__slots__": fields,
+        "__init__": namespace["__init__"],
+        "table": table,
+        "fields": fields,
+        "_field_set": frozenset(fields),
+        # attrgetter 只有一个字段时返回单个值，统一成元组
+        "_get_values": staticmethod(attrgetter(*fields) if len(fields) > 1 else lambda record: (getattr(record, fields[0]),)),
+    })
+
+
+def as_dict(item) -> Dict:
+    """
+    记录转换为普通字典（json 序列化时使用），字典原样返回
+    """
+    return item.to_dict() if isinstance(item, Record) else item
+
+
+XhsNoteRecord = make_record("XhsNoteRecord", "xhs_note", (
+    "note_id", "type", "title", "desc", "video_url", "time", "last_update_time", "user_id", "nickname", "avatar",
+    "liked_count", "collected_count", "comment_count", "share_count", "ip_location", "image_list", "tag_list",
+    "last_modify_ts", "note_url", "source_keyword", "xsec_token",
+))
+
+XhsNoteCommentRecord = make_record("XhsNoteCommentRecord", "xhs_note_comment", (
+    "comment_id", "create_time", "ip_location", "note_id", "content", "user_id", "nickname", "avatar",
+    "sub_comment_count", "pictures", "parent_comment_id", "last_modify_ts", "like_count",
+))
+
+DouyinAwemeRecord = make_record("DouyinAwemeRecord", "douyin_aweme", (
+    "aweme_id", "aweme_type", "title", "desc", "create_time", "user_id", "sec_uid", "short_user_id",
+    "user_unique_id", "user_signature", "nickname", "avatar", "liked_count", "collected_count", "comment_count",
+    "share_count", "ip_location", "last_modify_ts", "aweme_url", "cover_url", "video_download_url", "source_keyword",
+))
+
+DouyinAwemeCommentRecord = make_record("DouyinAwemeCommentRecord", "douyin_aweme_comment", (
+    "comment_id", "create_time", "ip_location", "aweme_id", "content", "user_id", "sec_uid", "short_user_id",
+    "user_unique_id", "user_signature", "nickname", "avatar", "sub_comment_count", "like_count", "last_modify_ts",
+    "parent_comment_id", "pictures",
+))
+
+KuaishouVideoRecord = make_record("KuaishouVideoRecord", "kuaishou_video", (
+    "video_id", "video_type", "title", "desc", "create_time", "user_id", "nickname", "avatar", "liked_count",
+    "viewd_count", "last_modify_ts", "video_url", "video_cover_url", "video_play_url", "source_keyword",
+))
+
+KuaishouVideoCommentRecord = make_record("KuaishouVideoCommentRecord", "kuaishou_video_comment", (
+    "comment_id", "create_time", "video_id", "content", "user_id", "nickname", "avatar", "sub_comment_count",
+    "last_modify_ts",
+))
+
+BilibiliVideoRecord = make_record("BilibiliVideoRecord", "bilibili_video", (
+    "video_id", "video_type", "title", "desc", "create_time", "user_id", "nickname", "avatar", "liked_count",
+    "disliked_count", "video_play_count", "video_favorite_count", "video_share_count", "video_coin_count",
+    "video_danmaku", "video_comment", "last_modify_ts", "video_url", "video_cover_url", "source_keyword",
+))
+
+BilibiliVideoCommentRecord = make_record("BilibiliVideoCommentRecord", "bilibili_video_comment", (
+    "comment_id", "parent_comment_id", "create_time", "video_id", "content", "user_id", "nickname", "sex", "sign",
+    "avatar", "sub_comment_count", "like_count", "last_modify_ts",
+))
+
+WeiboNoteRecord = make_record("WeiboNoteRecord", "weibo_note", (
+    "note_id", "content", "create_time", "create_date_time", "liked_count", "comments_count", "shared_count",
+    "last_modify_ts", "note_url", "ip_location", "user_id", "nickname", "gender", "profile_url", "avatar",
+    "source_keyword",
+))
+
+WeiboNoteCommentRecord = make_record("WeiboNoteCommentRecord", "weibo_note_comment", (
+    "comment_id", "create_time", "create_date_time", "note_id", "content", "sub_comment_count", "comment_like_count",
+    "last_modify_ts", "ip_location", "parent_comment_id", "user_id", "nickname", "gender", "profile_url", "avatar",
+))
+
+RECORD_CLASSES: List[Type[Record]] = [
+    XhsNoteRecord, XhsNoteCommentRecord, DouyinAwemeRecord, DouyinAwemeCommentRecord, KuaishouVideoRecord,
+    KuaishouVideoCommentRecord, BilibiliVideoRecord, BilibiliVideoCommentRecord, WeiboNoteRecord,
+    WeiboNoteCommentRecord,
+]
+
+CREATE_TABLE_PATTERN = re.compile(r"create\s+table\s+`?(\w+)`?\s*\((.*?)\)\s*engine", re.IGNORECASE | re.DOTALL)
+ADD_COLUMN_PATTERN = re.compile(r"alter\s+table\s+`?(\w+)`?\s+add\s+column\s+`?(\w+)`?", re.IGNORECASE)
+COLUMN_PATTERN = re.compile(r"^\s*`?(\w+)`?\s+\w+", re.MULTILINE)
+NOT_COLUMN_WORDS = {"primary", "key", "unique", "index", "constraint", "fulltext"}
+
+
+def load_table_columns(schema_file: str = SCHEMA_FILE) -> Dict[str, Set[str]]:
+    """
+    解析建表语句，返回 表名 -> 字段集合，包括后续 alter table 增加的字段
+    Args:
+        schema_file:
+
+    Returns:
+
+    """
+    with open(schema_file, encoding="utf-8") as f:
+        sql = f.read()
+    tables: Dict[str, Set[str]] = {}
+    for match in CREATE_TABLE_PATTERN.finditer(sql):
+        tables[match.group(1)] = {column for column in COLUMN_PATTERN.findall(match.group(2))
+                                  if column.lower() not in NOT_COLUMN_WORDS}
+    for table, column in ADD_COLUMN_PATTERN.findall(sql):
+        tables.setdefault(table, set()).add(column)
+    return tables
+
+
+def validate_records(record_classes: Optional[List[Type[Record]]] = None, schema_file: str = SCHEMA_FILE) -> List[str]:
+    """
+    检查记录类的字段在 schema/tables.sql 中都有对应的列
+    Args:
+        record_classes: 需要检查的记录类，默认检查所有记录类
+        schema_file:
+
+    Returns:
+        不一致的地方，全部一致时为空列表
+    """
+    tables = load_table_columns(schema_file)
+    errors = []
+    for record_class in record_classes or RECORD_CLASSES:
+        columns = tables.get(record_class.table)
+        if columns is None:
+            errors.append(f"{record_class.__name__}: table {record_class.table} not found")
+            continue
+        for field in record_class.fields:
+            if field not in columns:
+                errors.append(f"{record_class.__name__}: column {record_class.table}.{field} not found")
+    return errors
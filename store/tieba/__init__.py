@@ -13,12 +13,17 @@
 from typing import List
 
 from model.m_baidu_tieba import TiebaComment, TiebaCreator, TiebaNote
+from store.pipeline import observe_batch, wrap_store
+from tools import utils
 from var import source_keyword_var
 
 from . import tieba_store_impl
 from .tieba_store_impl import *
 
 
+logger = utils.get_logger("store.tieba", sampled=True)
+
+
 class TieBaStoreFactory:
     STORES = {
         "csv": TieBaCsvStoreImplement,
@@ -32,7 +37,7 @@ class TieBaStoreFactory:
         if not store_class:
             raise ValueError(
                 "[TieBaStoreFactory.create_store] Invalid save option only supported csv or db or json ...")
-        return store_class()
+        return wrap_store("tieba", store_class())
 
 
 async def batch_update_tieba_notes(note_list: List[TiebaNote]):
@@ -46,6 +51,7 @@ async def batch_update_tieba_notes(note_list: List[TiebaNote]):
     """
     if not note_list:
         return
+    observe_batch("tieba", "contents", note_list)
     for note_item in note_list:
         await update_tieba_note(note_item)
 
@@ -62,7 +68,7 @@ async def update_tieba_note(note_item: TiebaNote):
     note_item.source_keyword = source_keyword_var.get()
     save_note_item = note_item.model_dump()
     save_note_item.update({"last_modify_ts": utils.get_current_timestamp()})
-    utils.logger.info(f"[store.tieba.update_tieba_note] tieba note: {save_note_item}")
+    logger.info("[store.tieba.update_tieba_note] tieba note: %s", utils.log_payload(save_note_item))
 
     await TieBaStoreFactory.create_store().store_content(save_note_item)
 
@@ -79,6 +85,7 @@ async def batch_update_tieba_note_comments(note_id: str, comments: List[TiebaCom
     """
     if not comments:
         return
+    observe_batch("tieba", "comments", comments)
     for comment_item in comments:
         await update_tieba_note_comment(note_id, comment_item)
 
@@ -95,7 +102,8 @@ async def update_tieba_note_comment(note_id: str, comment_item: TiebaComment):
     """
     save_comment_item = comment_item.model_dump()
     save_comment_item.update({"last_modify_ts": utils.get_current_timestamp()})
-    utils.logger.info(f"[store.tieba.update_tieba_note_comment] tieba note id: {note_id} comment:{save_comment_item}")
+    logger.info("[store.tieba.update_tieba_note_comment] tieba note id: %s comment:%s", note_id,
+                utils.log_payload(save_comment_item))
     await TieBaStoreFactory.create_store().store_comment(save_comment_item)
 
 
@@ -110,5 +118,5 @@ async def save_creator(user_info: TiebaCreator):
     """
     local_db_item = user_info.model_dump()
     local_db_item["last_modify_ts"] = utils.get_current_timestamp()
-    utils.logger.info(f"[store.tieba.save_creator] creator:{local_db_item}")
+    logger.info("[store.tieba.save_creator] creator:%s", utils.log_payload(local_db_item))
     await TieBaStoreFactory.create_store().store_creator(local_db_item)
@@ -17,12 +17,18 @@
 import re
 from typing import List
 
+from store.pipeline import observe_batch, wrap_store
+from store.records import WeiboNoteCommentRecord, WeiboNoteRecord
+from tools import utils
 from var import source_keyword_var
 
 from .weibo_store_image import *
 from .weibo_store_impl import *
 
 
+logger = utils.get_logger("store.weibo", sampled=True)
+
+
 class WeibostoreFactory:
     STORES = {
         "csv": WeiboCsvStoreImplement,
@@ -36,7 +42,7 @@ class WeibostoreFactory:
         if not store_class:
             raise ValueError(
                 "[WeibotoreFactory.create_store] Invalid save option only supported csv or db or json ...")
-        return store_class()
+        return wrap_store("wb", store_class())
 
 
 async def batch_update_weibo_notes(note_list: List[Dict]):
@@ -50,6 +56,7 @@ async def batch_update_weibo_notes(note_list: List[Dict]):
     """
     if not note_list:
         return
+    observe_batch("wb", "contents", note_list)
     for note_item in note_list:
         await update_weibo_note(note_item)
 
@@ -71,30 +78,30 @@ async def update_weibo_note(note_item: Dict):
     note_id = mblog.get("id")
     content_text = mblog.get("text")
     clean_text = re.sub(r"<.*?>", "", content_text)
-    save_content_item = {
+    save_content_item = WeiboNoteRecord(
         # 微博信息
-        "note_id": note_id,
-        "content": clean_text,
-        "create_time": utils.rfc2822_to_timestamp(mblog.get("created_at")),
-        "create_date_time": str(utils.rfc2822_to_china_datetime(mblog.get("created_at"))),
-        "liked_count": str(mblog.get("attitudes_count", 0)),
-        "comments_count": str(mblog.get("comments_count", 0)),
-        "shared_count": str(mblog.get("reposts_count", 0)),
-        "last_modify_ts": utils.get_current_timestamp(),
-        "note_url": f"https://m.weibo.cn/detail/{note_id}",
-        "ip_location": mblog.get("region_name", "").replace("发布于 ", ""),
+        note_id=note_id,
+        content=clean_text,
+        create_time=utils.rfc2822_to_timestamp(mblog.get("created_at")),
+        create_date_time=str(utils.rfc2822_to_china_datetime(mblog.get("created_at"))),
+        liked_count=str(mblog.get("attitudes_count", 0)),
+        comments_count=str(mblog.get("comments_count", 0)),
+        shared_count=str(mblog.get("reposts_count", 0)),
+        last_modify_ts=utils.get_current_timestamp(),
+        note_url=f"https://m.weibo.cn/detail/{note_id}",
+        ip_location=mblog.get("region_name", "").replace("发布于 ", ""),
 
         # 用户信息
-        "user_id": str(user_info.get("id")),
-        "nickname": user_info.get("screen_name", ""),
-        "gender": user_info.get("gender", ""),
-        "profile_url": user_info.get("profile_url", ""),
-        "avatar": user_info.get("profile_image_url", ""),
-
-        "source_keyword": source_keyword_var.get(),
-    }
-    utils.logger.info(
-        f"[store.weibo.update_weibo_note] weibo note id:{note_id}, title:{save_content_item.get('content')[:24]} ...")
+        user_id=str(user_info.get("id")),
+        nickname=user_info.get("screen_name", ""),
+        gender=user_info.get("gender", ""),
+        profile_url=user_info.get("profile_url", ""),
+        avatar=user_info.get("profile_image_url", ""),
+
+        source_keyword=source_keyword_var.get(),
+    )
+    logger.info("[store.weibo.update_weibo_note] weibo note id:%s, title:%s", note_id,
+                utils.log_payload(save_content_item.get('content'), 24))
     await WeibostoreFactory.create_store().store_content(content_item=save_content_item)
 
 
@@ -110,6 +117,7 @@ async def batch_update_weibo_note_comments(note_id: str, comments: List[Dict]):
     """
     if not comments:
         return
+    observe_batch("wb", "comments", comments)
     for comment_item in comments:
         await update_weibo_note_comment(note_id, comment_item)
 
@@ -130,27 +138,27 @@ async def update_weibo_note_comment(note_id: str, comment_item: Dict):
     user_info: Dict = comment_item.get("user")
     content_text = comment_item.get("text")
     clean_text = re.sub(r"<.*?>", "", content_text)
-    save_comment_item = {
-        "comment_id": comment_id,
-        "create_time": utils.rfc2822_to_timestamp(comment_item.get("created_at")),
-        "create_date_time": str(utils.rfc2822_to_china_datetime(comment_item.get("created_at"))),
-        "note_id": note_id,
-        "content": clean_text,
-        "sub_comment_count": str(comment_item.get("total_number", 0)),
-        "comment_like_count": str(comment_item.get("like_count", 0)),
-        "last_modify_ts": utils.get_current_timestamp(),
-        "ip_location": comment_item.get("source", "").replace("来自", ""),
-        "parent_comment_id": comment_item.get("rootid", ""),
+    save_comment_item = WeiboNoteCommentRecord(
+        comment_id=comment_id,
+        create_time=utils.rfc2822_to_timestamp(comment_item.get("created_at")),
+        create_date_time=str(utils.rfc2822_to_china_datetime(comment_item.get("created_at"))),
+        note_id=note_id,
+        content=clean_text,
+        sub_comment_count=str(comment_item.get("total_number", 0)),
+        comment_like_count=str(comment_item.get("like_count", 0)),
+        last_modify_ts=utils.get_current_timestamp(),
+        ip_location=comment_item.get("source", "").replace("来自", ""),
+        parent_comment_id=comment_item.get("rootid", ""),
 
         # 用户信息
-        "user_id": str(user_info.get("id")),
-        "nickname": user_info.get("screen_name", ""),
-        "gender": user_info.get("gender", ""),
-        "profile_url": user_info.get("profile_url", ""),
-        "avatar": user_info.get("profile_image_url", ""),
-    }
-    utils.logger.info(
-        f"[store.weibo.update_weibo_note_comment] Weibo note comment: {comment_id}, content: {save_comment_item.get('content', '')[:24]} ...")
+        user_id=str(user_info.get("id")),
+        nickname=user_info.get("screen_name", ""),
+        gender=user_info.get("gender", ""),
+        profile_url=user_info.get("profile_url", ""),
+        avatar=user_info.get("profile_image_url", ""),
+    )
+    logger.info("[store.weibo.update_weibo_note_comment] Weibo note comment: %s, content: %s", comment_id,
+                utils.log_payload(save_comment_item.get('content', ''), 24))
     await WeibostoreFactory.create_store().store_comment(comment_item=save_comment_item)
 
 
@@ -191,5 +199,5 @@ async def save_creator(user_id: str, user_info: Dict):
         'tag_list': '',
         "last_modify_ts": utils.get_current_timestamp(),
     }
-    utils.logger.info(f"[store.weibo.save_creator] creator:{local_db_item}")
+    logger.info("[store.weibo.save_creator] creator:%s", utils.log_payload(local_db_item))
     await WeibostoreFactory.create_store().store_creator(local_db_item)
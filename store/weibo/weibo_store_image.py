@@ -18,8 +18,11 @@ from typing import Dict
 
 import aiofiles
 
+import config
 from base.base_crawler import AbstractStoreImage
+from store.media_store import get_media_store
 from tools import utils
+from tools.image_processor import get_image_processor
 
 
 class WeiboStoreImage(AbstractStoreImage):
@@ -57,8 +60,13 @@ class WeiboStoreImage(AbstractStoreImage):
         Returns:
 
         """
-        pathlib.Path(self.image_store_path).mkdir(parents=True, exist_ok=True)
-        save_file_name = self.make_save_file_name(picid, extension_file_name)
-        async with aiofiles.open(save_file_name, 'wb') as f:
-            await f.write(pic_content)
-            utils.logger.info(f"[WeiboImageStoreImplement.save_image] save image {save_file_name} success ...")
\ No newline at end of file
+        if config.ENABLE_MEDIA_DEDUP:
+            save_file_name = await get_media_store().save("wb", picid, f"{picid}.{extension_file_name}", pic_content)
+        else:
+            pathlib.Path(self.image_store_path).mkdir(parents=True, exist_ok=True)
+            save_file_name = self.make_save_file_name(picid, extension_file_name)
+            async with aiofiles.open(save_file_name, 'wb') as f:
+                await f.write(pic_content)
+                utils.logger.info(f"[WeiboImageStoreImplement.save_image] save image {save_file_name} success ...")
+        if config.ENABLE_IMAGE_POSTPROCESS:
+            await get_image_processor().submit("wb", picid, save_file_name)
\ No newline at end of file
@@ -13,9 +13,12 @@
 # @Author  : relakkes@gmail.com
 # @Time    : 2024/1/14 17:34
 # @Desc    :
-from typing import List
+from typing import Dict, List, Optional
 
 import config
+from store.pipeline import observe_batch, wrap_store
+from store.records import XhsNoteCommentRecord, XhsNoteRecord
+from tools import json_codec, utils
 from var import source_keyword_var
 
 from . import xhs_store_impl
@@ -23,6 +26,9 @@ from .xhs_store_image import *
 from .xhs_store_impl import *
 
 
+logger = utils.get_logger("store.xhs", sampled=True)
+
+
 class XhsStoreFactory:
     STORES = {
         "csv": XhsCsvStoreImplement,
@@ -35,7 +41,7 @@ class XhsStoreFactory:
         store_class = XhsStoreFactory.STORES.get(config.SAVE_DATA_OPTION)
         if not store_class:
             raise ValueError("[XhsStoreFactory.create_store] Invalid save option only supported csv or db or json ...")
-        return store_class()
+        return wrap_store("xhs", store_class())
 
 
 def get_video_url_arr(note_item: Dict) -> List:
@@ -65,6 +71,21 @@ def get_video_url_arr(note_item: Dict) -> List:
     return videoArr
 
 
+def get_video_duration(note_item: Dict) -> Optional[int]:
+    """
+    获取视频时长（秒），获取不到返回None
+    Args:
+        note_item:
+
+    Returns:
+
+    """
+    if note_item.get('type') != 'video':
+        return None
+    duration = note_item.get('video', {}).get('capa', {}).get('duration')
+    return int(duration) if duration else None
+
+
 async def update_xhs_note(note_item: Dict):
     """
     更新小红书笔记
@@ -86,30 +107,30 @@ async def update_xhs_note(note_item: Dict):
 
     video_url = ','.join(get_video_url_arr(note_item))
 
-    local_db_item = {
-        "note_id": note_item.get("note_id"), # 帖子id
-        "type": note_item.get("type"), # 帖子类型
-        "title": note_item.get("title") or note_item.get("desc", "")[:255], # 帖子标题
-        "desc": note_item.get("desc", ""), # 帖子描述
-        "video_url": video_url, # 帖子视频url
-        "time": note_item.get("time"), # 帖子发布时间
-        "last_update_time": note_item.get("last_update_time", 0), # 帖子最后更新时间
-        "user_id": user_info.get("user_id"), # 用户id
-        "nickname": user_info.get("nickname"), # 用户昵称
-        "avatar": user_info.get("avatar"), # 用户头像
-        "liked_count": interact_info.get("liked_count"), # 点赞数
-        "collected_count": interact_info.get("collected_count"), # 收藏数
-        "comment_count": interact_info.get("comment_count"), # 评论数
-        "share_count": interact_info.get("share_count"), # 分享数
-        "ip_location": note_item.get("ip_location", ""), # ip地址
-        "image_list": ','.join([img.get('url', '') for img in image_list]), # 图片url
-        "tag_list": ','.join([tag.get('name', '') for tag in tag_list if tag.get('type') == 'topic']), # 标签
-        "last_modify_ts": utils.get_current_timestamp(), # 最后更新时间戳（MediaCrawler程序生成的，主要用途在db存储的时候记录一条记录最新更新时间）
-        "note_url": f"https://www.xiaohongshu.com/explore/{note_id}?xsec_token={note_item.get('xsec_token')}&xsec_source=pc_search", # 帖子url
-        "source_keyword": source_keyword_var.get(), # 搜索关键词
-        "xsec_token": note_item.get("xsec_token"), # xsec_token
-    }
-    utils.logger.info(f"[store.xhs.update_xhs_note] xhs note: {local_db_item}")
+    local_db_item = XhsNoteRecord(
+        note_id=note_item.get("note_id"), # 帖子id
+        type=note_item.get("type"), # 帖子类型
+        title=note_item.get("title") or note_item.get("desc", "")[:255], # 帖子标题
+        desc=note_item.get("desc", ""), # 帖子描述
+        video_url=video_url, # 帖子视频url
+        time=note_item.get("time"), # 帖子发布时间
+        last_update_time=note_item.get("last_update_time", 0), # 帖子最后更新时间
+        user_id=user_info.get("user_id"), # 用户id
+        nickname=user_info.get("nickname"), # 用户昵称
+        avatar=user_info.get("avatar"), # 用户头像
+        liked_count=interact_info.get("liked_count"), # 点赞数
+        collected_count=interact_info.get("collected_count"), # 收藏数
+        comment_count=interact_info.get("comment_count"), # 评论数
+        share_count=interact_info.get("share_count"), # 分享数
+        ip_location=note_item.get("ip_location", ""), # ip地址
+        image_list=','.join([img.get('url', '') for img in image_list]), # 图片url
+        tag_list=','.join([tag.get('name', '') for tag in tag_list if tag.get('type') == 'topic']), # 标签
+        last_modify_ts=utils.get_current_timestamp(), # 最后更新时间戳（MediaCrawler程序生成的，主要用途在db存储的时候记录一条记录最新更新时间）
+        note_url=f"https://www.xiaohongshu.com/explore/{note_id}?xsec_token={note_item.get('xsec_token')}&xsec_source=pc_search", # 帖子url
+        source_keyword=source_keyword_var.get(), # 搜索关键词
+        xsec_token=note_item.get("xsec_token"), # xsec_token
+    )
+    logger.info("[store.xhs.update_xhs_note] xhs note id:%s, title:%s", note_id, local_db_item.title)
     await XhsStoreFactory.create_store().store_content(local_db_item)
 
 
@@ -125,6 +146,7 @@ async def batch_update_xhs_note_comments(note_id: str, comments: List[Dict]):
     """
     if not comments:
         return
+    observe_batch("xhs", "comments", comments)
     for comment_item in comments:
         await update_xhs_note_comment(note_id, comment_item)
 
@@ -143,22 +165,23 @@ async def update_xhs_note_comment(note_id: str, comment_item: Dict):
     comment_id = comment_item.get("id")
     comment_pictures = [item.get("url_default", "") for item in comment_item.get("pictures", [])]
     target_comment = comment_item.get("target_comment", {})
-    local_db_item = {
-        "comment_id": comment_id, # 评论id
-        "create_time": comment_item.get("create_time"), # 评论时间
-        "ip_location": comment_item.get("ip_location"), # ip地址
-        "note_id": note_id, # 帖子id
-        "content": comment_item.get("content"), # 评论内容
-        "user_id": user_info.get("user_id"), # 用户id
-        "nickname": user_info.get("nickname"), # 用户昵称
-        "avatar": user_info.get("image"), # 用户头像
-        "sub_comment_count": comment_item.get("sub_comment_count", 0), # 子评论数
-        "pictures": ",".join(comment_pictures), # 评论图片
-        "parent_comment_id": target_comment.get("id", 0), # 父评论id
-        "last_modify_ts": utils.get_current_timestamp(), # 最后更新时间戳（MediaCrawler程序生成的，主要用途在db存储的时候记录一条记录最新更新时间）
-        "like_count": comment_item.get("like_count", 0),
-    }
-    utils.logger.info(f"[store.xhs.update_xhs_note_comment] xhs note comment:{local_db_item}")
+    local_db_item = XhsNoteCommentRecord(
+        comment_id=comment_id, # 评论id
+        create_time=comment_item.get("create_time"), # 评论时间
+        ip_location=comment_item.get("ip_location"), # ip地址
+        note_id=note_id, # 帖子id
+        content=comment_item.get("content"), # 评论内容
+        user_id=user_info.get("user_id"), # 用户id
+        nickname=user_info.get("nickname"), # 用户昵称
+        avatar=user_info.get("image"), # 用户头像
+        sub_comment_count=comment_item.get("sub_comment_count", 0), # 子评论数
+        pictures=",".join(comment_pictures), # 评论图片
+        parent_comment_id=target_comment.get("id", 0), # 父评论id
+        last_modify_ts=utils.get_current_timestamp(), # 最后更新时间戳（MediaCrawler程序生成的，主要用途在db存储的时候记录一条记录最新更新时间）
+        like_count=comment_item.get("like_count", 0),
+    )
+    logger.info("[store.xhs.update_xhs_note_comment] xhs note comment: %s, content: %s", comment_id,
+                utils.log_payload(local_db_item.content))
     await XhsStoreFactory.create_store().store_comment(local_db_item)
 
 
@@ -203,11 +226,10 @@ async def save_creator(user_id: str, creator: Dict):
         'follows': follows, # 关注数
         'fans': fans,  # 粉丝数
         'interaction': interaction, # 互动数
-        'tag_list': json.dumps({tag.get('tagType'): tag.get('name') for tag in creator.get('tags')},
-                               ensure_ascii=False), # 标签
+        'tag_list': json_codec.dumps_compat({tag.get('tagType'): tag.get('name') for tag in creator.get('tags')}), # 标签
         "last_modify_ts": utils.get_current_timestamp(), # 最后更新时间戳（MediaCrawler程序生成的，主要用途在db存储的时候记录一条记录最新更新时间）
     }
-    utils.logger.info(f"[store.xhs.save_creator] creator:{local_db_item}")
+    logger.info("[store.xhs.save_creator] creator:%s", utils.log_payload(local_db_item))
     await XhsStoreFactory.create_store().store_creator(local_db_item)
 
 
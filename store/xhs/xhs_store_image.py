@@ -18,8 +18,11 @@ from typing import Dict
 
 import aiofiles
 
+import config
 from base.base_crawler import AbstractStoreImage
+from store.media_store import get_media_store
 from tools import utils
+from tools.image_processor import get_image_processor
 
 
 class XiaoHongShuImage(AbstractStoreImage):
@@ -59,8 +62,13 @@ class XiaoHongShuImage(AbstractStoreImage):
         Returns:
 
         """
-        pathlib.Path(self.image_store_path + "/" + notice_id).mkdir(parents=True, exist_ok=True)
-        save_file_name = self.make_save_file_name(notice_id, extension_file_name)
-        async with aiofiles.open(save_file_name, 'wb') as f:
-            await f.write(pic_content)
-            utils.logger.info(f"[XiaoHongShuImageStoreImplement.save_image] save image {save_file_name} success ...")
+        if config.ENABLE_MEDIA_DEDUP:
+            save_file_name = await get_media_store().save("xhs", notice_id, extension_file_name, pic_content)
+        else:
+            pathlib.Path(self.image_store_path + "/" + notice_id).mkdir(parents=True, exist_ok=True)
+            save_file_name = self.make_save_file_name(notice_id, extension_file_name)
+            async with aiofiles.open(save_file_name, 'wb') as f:
+                await f.write(pic_content)
+                utils.logger.info(f"[XiaoHongShuImageStoreImplement.save_image] save image {save_file_name} success ...")
+        if config.ENABLE_IMAGE_POSTPROCESS and not extension_file_name.endswith(".mp4"):
+            await get_image_processor().submit("xhs", notice_id, save_file_name)
@@ -15,6 +15,7 @@ from typing import List
 import config
 from base.base_crawler import AbstractStore
 from model.m_zhihu import ZhihuComment, ZhihuContent, ZhihuCreator
+from store.pipeline import observe_batch, wrap_store
 from store.zhihu.zhihu_store_impl import (ZhihuCsvStoreImplement,
                                           ZhihuDbStoreImplement,
                                           ZhihuJsonStoreImplement)
@@ -22,6 +23,9 @@ from tools import utils
 from var import source_keyword_var
 
 
+logger = utils.get_logger("store.zhihu", sampled=True)
+
+
 class ZhihuStoreFactory:
     STORES = {
         "csv": ZhihuCsvStoreImplement,
@@ -34,7 +38,7 @@ class ZhihuStoreFactory:
         store_class = ZhihuStoreFactory.STORES.get(config.SAVE_DATA_OPTION)
         if not store_class:
             raise ValueError("[ZhihuStoreFactory.create_store] Invalid save option only supported csv or db or json ...")
-        return store_class()
+        return wrap_store("zhihu", store_class())
 
 async def batch_update_zhihu_contents(contents: List[ZhihuContent]):
     """
@@ -47,6 +51,7 @@ async def batch_update_zhihu_contents(contents: List[ZhihuContent]):
     """
     if not contents:
         return
+    observe_batch("zhihu", "contents", contents)
 
     for content_item in contents:
         await update_zhihu_content(content_item)
@@ -63,7 +68,7 @@ async def update_zhihu_content(content_item: ZhihuContent):
     content_item.source_keyword = source_keyword_var.get()
     local_db_item = content_item.model_dump()
     local_db_item.update({"last_modify_ts": utils.get_current_timestamp()})
-    utils.logger.info(f"[store.zhihu.update_zhihu_content] zhihu content: {local_db_item}")
+    logger.info("[store.zhihu.update_zhihu_content] zhihu content: %s", utils.log_payload(local_db_item))
     await ZhihuStoreFactory.create_store().store_content(local_db_item)
 
 
@@ -79,6 +84,7 @@ async def batch_update_zhihu_note_comments(comments: List[ZhihuComment]):
     """
     if not comments:
         return
+    observe_batch("zhihu", "comments", comments)
     
     for comment_item in comments:
         await update_zhihu_content_comment(comment_item)
@@ -95,7 +101,7 @@ async def update_zhihu_content_comment(comment_item: ZhihuComment):
     """
     local_db_item = comment_item.model_dump()
     local_db_item.update({"last_modify_ts": utils.get_current_timestamp()})
-    utils.logger.info(f"[store.zhihu.update_zhihu_note_comment] zhihu content comment:{local_db_item}")
+    logger.info("[store.zhihu.update_zhihu_note_comment] zhihu content comment:%s", utils.log_payload(local_db_item))
     await ZhihuStoreFactory.create_store().store_comment(local_db_item)
 
 
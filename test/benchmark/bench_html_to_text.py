@@ -0,0 +1,58 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : HTML 转文本的速度，使用按知乎回答正文结构生成的长回答
+#            用法：python -m test.benchmark.bench_html_to_text
+import html
+import re
+
+from test.benchmark.bench_json_codec import calls
+from test.benchmark.bench_model_construct import timeit
+from test.benchmark.synthetic_data import make_zhihu_answer_html
+from tools.crawler_util import extract_text_from_html
+
+
+def previous_extract_text_from_html(html_content: str) -> str:
+    """
+    原来的实现：只去掉标签，不解码实体，不处理空白
+    """
+    if not html_content:
+        return ""
+    clean_html = re.sub(r'<(script|style)[^>]*>.*?</\1>', '', html_content, flags=re.DOTALL)
+    return re.sub(r'<[^>]+>', '', clean_html).strip()
+
+
+def naive_extract_text_from_html(html_content: str) -> str:
+    """
+    在原来的实现上直接补上实体解码和空白处理，作为同等输出的对照
+    """
+    text = re.sub(r"<br\s*/?>|</(?:p|div|li|h[1-6]|tr|blockquote|figure|figcaption|pre|section|ul|ol|table)\s*>",
+                  "\n", html_content, flags=re.IGNORECASE)
+    text = html.unescape(previous_extract_text_from_html(text))
+    text = re.sub(r"[ \t\r\f\v\xa0　]+", " ", text)
+    return re.sub(r"\s*\n\s*", "\n", text).strip()
+
+
+def run(seconds: float = 2.0):
+    answer = make_zhihu_answer_html()
+    short_texts = ["知乎回答的标题", "<em>搜索</em>结果的摘要&hellip;", "文章描述"] * 100
+    print(f"long answer: {len(answer) / 1024:.1f}KB")
+    for name, func in (("previous", previous_extract_text_from_html), ("naive", naive_extract_text_from_html),
+                       ("current", extract_text_from_html)):
+        count, cost = timeit(calls(func, answer), seconds)
+        short_count, short_cost = timeit(calls(lambda: [func(text) for text in short_texts]), seconds)
+        print(f"{name:<10} long answer {count / cost:>8,.0f}/s  "
+              f"short fields {short_count * len(short_texts) / short_cost:>12,.0f}/s")
+
+
+if __name__ == '__main__':
+    run()
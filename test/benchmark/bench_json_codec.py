@@ -0,0 +1,98 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 对比标准库 json 和 tools.json_codec 解析接口响应、写 json 存储的速度
+#            接口响应按小红书搜索、抖音视频列表、B站评论接口的结构生成
+#            用法：python -m test.benchmark.bench_json_codec
+import json
+import random
+from typing import Any, Callable, Dict, List
+
+from test.benchmark.bench_model_construct import timeit
+from tools import json_codec
+
+TEXT = "今天去了一家很好吃的店，推荐给大家 #美食# @小红薯 https://example.com/abc?x=1 😀"
+
+
+def make_xhs_search_payload(count: int = 20) -> Dict:
+    return {"code": 0, "success": True, "msg": "成功", "data": {"has_more": True, "items": [{
+        "id": f"{random.getrandbits(64):016x}", "model_type": "note", "xsec_token": "AB" + "x" * 40,
+        "note_card": {
+            "type": "normal", "display_title": TEXT[:20],
+            "user": {"user_id": f"{random.getrandbits(64):016x}", "nickname": "小红薯", "avatar": "https://a/b.jpg"},
+            "interact_info": {"liked": False, "liked_count": str(random.randint(0, 10000))},
+            "cover": {"width": 1080, "height": 1440, "url_default": "https://sns-img/abc", "info_list": [
+                {"image_scene": "WB_PRV", "url": "https://sns-img/abc!prv"},
+                {"image_scene": "WB_DFT", "url": "https://sns-img/abc!dft"}]},
+        }} for _ in range(count)]}}
+
+
+def make_douyin_aweme_payload(count: int = 20) -> Dict:
+    return {"status_code": 0, "has_more": 1, "cursor": 20, "aweme_list": [{
+        "aweme_id": str(random.getrandbits(62)), "desc": TEXT, "create_time": 1720000000 + index,
+        "author": {"uid": str(random.getrandbits(62)), "sec_uid": "MS4wLjABAAAA" + "x" * 40, "nickname": "抖音用户",
+                   "avatar_thumb": {"url_list": ["https://p3/a.jpeg", "https://p6/a.jpeg"]}},
+        "statistics": {"digg_count": random.randint(0, 10 ** 6), "comment_count": random.randint(0, 10 ** 4),
+                       "collect_count": random.randint(0, 10 ** 4), "share_count": random.randint(0, 10 ** 4)},
+        "video": {"play_addr": {"url_list": ["https://v26/a.mp4", "https://v3/a.mp4"]}, "duration": 15000},
+        "ip_label": "广东",
+    } for index in range(count)]}
+
+
+def make_bilibili_comment_payload(count: int = 20) -> Dict:
+    return {"code": 0, "message": "0", "data": {"cursor": {"is_end": False, "next": 2}, "replies": [{
+        "rpid": random.getrandbits(40), "oid": random.getrandbits(40), "parent": 0, "ctime": 1720000000,
+        "like": random.randint(0, 1000), "rcount": random.randint(0, 10),
+        "member": {"mid": str(random.getrandbits(30)), "uname": "B站用户", "sex": "保密", "sign": TEXT[:10],
+                   "avatar": "https://i0.hdslb.com/a.jpg"},
+        "content": {"message": TEXT, "emote": {}},
+        "replies": [{"rpid": random.getrandbits(40), "content": {"message": TEXT[:15]}} for _ in range(3)],
+    } for _ in range(count)]}}
+
+
+def calls(func: Callable[..., Any], *args, **kwargs) -> Callable[[], int]:
+    """
+    包装成 timeit 需要的函数，每次调用计数 1
+    """
+
+    def call() -> int:
+        func(*args, **kwargs)
+        return 1
+
+    return call
+
+
+def run(seconds: float = 1.0):
+    print(f"json_codec backend: {'orjson' if json_codec.HAS_ORJSON else 'json (orjson not installed)'}")
+    payloads = {
+        "xhs search": make_xhs_search_payload(),
+        "douyin aweme list": make_douyin_aweme_payload(),
+        "bilibili comments": make_bilibili_comment_payload(),
+    }
+    for name, payload in payloads.items():
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        count, cost = timeit(calls(lambda: json.loads(body.decode("utf-8"))), seconds)
+        stdlib_rate = count / cost
+        count, cost = timeit(calls(json_codec.loads, body), seconds)
+        print(f"[loads] {name:<20} {len(body) / 1024:>6.1f}KB  json {stdlib_rate:>9,.0f}/s  "
+              f"json_codec {count / cost:>9,.0f}/s")
+
+    # 录制文件、指标和性能分析结果等内部文件的序列化；json 存储为了保持数据文件的格式仍然使用标准库
+    records: List[Dict] = [aweme for _ in range(50) for aweme in payloads["douyin aweme list"]["aweme_list"]]
+    count, cost = timeit(calls(lambda: json.dumps(records, ensure_ascii=False, indent=4).encode("utf-8")), seconds)
+    stdlib_rate = count / cost
+    count, cost = timeit(calls(json_codec.dumps_bytes, records, indent=True), seconds)
+    print(f"[dumps] {len(records)} records indent      json {stdlib_rate:>9,.1f}/s  json_codec {count / cost:>9,.1f}/s")
+
+
+if __name__ == '__main__':
+    run()
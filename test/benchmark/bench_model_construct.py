@@ -0,0 +1,64 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 对比贴吧解析时数据模型 完整校验 / model_construct 两种构造方式的速度
+#            用法：python -m test.benchmark.bench_model_construct
+import time
+from typing import Callable, List, Tuple
+
+import config
+from media_platform.tieba.help import TieBaExtractor
+from model import build_model
+from test.fixtures import load_test_data
+
+
+def extract_all(extractor: TieBaExtractor) -> List:
+    """
+    用 test_data 下的页面跑一遍所有的解析函数，返回解析出来的数据模型
+    """
+    models = []
+    models.extend(extractor.extract_search_note_list(load_test_data("search_keyword_notes.html")))
+    models.extend(extractor.extract_tieba_note_list(load_test_data("tieba_note_list.html")))
+    models.append(extractor.extract_note_detail(load_test_data("note_detail.html")))
+    comments = extractor.extract_tieba_note_parment_comments(load_test_data("note_comments.html"), "123456")
+    models.extend(comments)
+    models.extend(extractor.extract_tieba_note_sub_comments(load_test_data("note_sub_comments.html"), comments[0]))
+    return models
+
+
+def timeit(func: Callable[[], int], seconds: float = 2.0) -> Tuple[int, float]:
+    count, start = 0, time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        count += func()
+    return count, time.perf_counter() - start
+
+
+def run(seconds: float = 2.0):
+    extractor = TieBaExtractor()
+    validate_parsed_models = config.VALIDATE_PARSED_MODELS
+    try:
+        models = extract_all(extractor)
+        samples = [(type(model), model.model_dump()) for model in models]
+        for validate in (True, False):
+            config.VALIDATE_PARSED_MODELS = validate
+            label = "validate" if validate else "construct"
+            count, cost = timeit(lambda: len([build_model(model_class, **values) for model_class, values in samples]),
+                                 seconds)
+            print(f"[model only]  {label:<10} {count / cost:>12,.0f} objects/s")
+            count, cost = timeit(lambda: len(extract_all(extractor)), seconds)
+            print(f"[parse+model] {label:<10} {count / cost:>12,.0f} objects/s")
+    finally:
+        config.VALIDATE_PARSED_MODELS = validate_parsed_models
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,336 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 离线回放各平台的爬取流程，统计每秒完成的流程数、单个流程耗时的 p50/p95 和内存峰值，不访问网络
+#            贴吧：搜索 -> 帖子详情 -> 一级评论 -> 子评论
+#            小红书、B站、微博、快手、知乎：搜索 -> 前几条结果的详情 -> 第一个作者的信息 -> 作者的作品列表
+#            爬虫的 start() 需要启动 Playwright 浏览器并登录，没法离线回放，这里直接调用各平台 client 的接口方法，
+#            签名需要的页面脚本和 localStorage 由 StandInPage 代替；响应按 synthetic_data 生成并录制成 cassette
+#            微博的作者信息需要访问用户主页拿到的 M_WEIBOCN_PARAMS cookie，cassette 不录制 set-cookie，只回放作者的微博列表
+#            用法：python -m test.benchmark.bench_replay_flows [--platforms xhs zhihu] [--flows 50]
+import argparse
+import asyncio
+import json
+import statistics
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+import config
+from media_platform.bilibili.client import BilibiliClient
+from media_platform.kuaishou.client import KuaiShouClient
+from media_platform.tieba.client import BaiduTieBaClient
+from media_platform.weibo.client import WeiboClient
+from media_platform.xhs.client import XiaoHongShuClient
+from media_platform.zhihu.client import ZhiHuClient
+from test.benchmark import synthetic_data
+from test.fixtures import load_test_data
+from tools import http_cassette, utils
+
+# 请求路径 -> 响应的页面
+FIXTURE_PAGES = {
+    "/f/search/res": "search_keyword_notes.html",
+    "/p/comment": "note_sub_comments.html",
+}
+NOTE_DETAIL_ID = "9117905169"
+KEYWORD = "编程"
+# 搜索结果中获取详情的条数
+DETAIL_COUNT = 5
+SEARCH_COUNT = 20
+CREATOR_NOTES_COUNT = 30
+WEIBO_PAGE_SIZE = 10
+XHS_SEARCH_ID = "2e9n6b8a1c0d4f7g3h5j"
+USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) " \
+             "Chrome/126.0.0.0 Safari/537.36"
+
+# 请求方法, URL, 请求体 -> 响应的 content-type 和内容
+Responder = Callable[[str, str, bytes], Tuple[str, bytes]]
+
+
+class StandInPage:
+    """
+    代替 Playwright 的页面，返回签名用到的 localStorage 和小红书 window._webmsxyw 的结果
+    """
+    LOCAL_STORAGE = {
+        "b1": "I38rHdgsjopgIvesdVwgIC+oIELmBZ5e3VwXLgFTIxS3bqwErFeexd0ekncAzMFYnqthIhJeSnMDKutRI3KQJ",
+        "wbi_img_urls": "https://i0.hdslb.com/bfs/wbi/7cd084941338484aae1ad9425b84077c.png-"
+                        "https://i0.hdslb.com/bfs/wbi/4932caff0ff746eab6f01bf08b70ac45.png",
+    }
+
+    async def evaluate(self, expression: str, arg: Any = None) -> Dict:
+        if "localStorage" in expression:
+            return self.LOCAL_STORAGE
+        return {"X-s": "XYW_eyJzaWduU3ZuIjoiNTEiLCJzaWduVHlwZSI6IngxIn0=", "X-t": 1720000000000}
+
+
+class FixtureCassette(http_cassette.Cassette):
+    """
+    没有录制的请求由 responder 生成响应并写入 cassette，相当于对着一个本地的平台录制一次
+    """
+
+    def __init__(self, cassette_file: str, respond: Responder):
+        super().__init__(cassette_file)
+        self.respond = respond
+
+    def replay(self, method: str, url: str, body: bytes = b""):
+        try:
+            return super().replay(method, url, body)
+        except http_cassette.CassetteMissError:
+            content_type, content = self.respond(method, url, body)
+            self.add(method, url, body, 200, [["content-type", content_type]], content)
+            return super().replay(method, url, body)
+
+
+def json_response(payload: Dict) -> Tuple[str, bytes]:
+    return "application/json", json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
+
+def html_response(html: str) -> Tuple[str, bytes]:
+    return "text/html; charset=utf-8", html.encode("utf-8")
+
+
+def query_param(url: str, name: str) -> str:
+    return parse_qs(urlsplit(url).query).get(name, [""])[0]
+
+
+def respond_tieba(method: str, url: str, body: bytes) -> Tuple[str, bytes]:
+    file_name = FIXTURE_PAGES.get(urlsplit(url).path) or ("note_comments.html" if "pn=" in url else "note_detail.html")
+    return html_response(load_test_data(file_name))
+
+
+def respond_xhs(method: str, url: str, body: bytes) -> Tuple[str, bytes]:
+    path = urlsplit(url).path
+    if path.startswith("/user/profile/"):
+        return html_response(synthetic_data.make_xhs_creator_page(path.rsplit("/", 1)[1]))
+    if path == "/api/sns/web/v1/search/notes":
+        return json_response(synthetic_data.make_xhs_search_payload(SEARCH_COUNT))
+    if path == "/api/sns/web/v1/feed":
+        return json_response(synthetic_data.make_xhs_note_payload(json.loads(body)["source_note_id"]))
+    return json_response(synthetic_data.make_xhs_creator_notes_payload(CREATOR_NOTES_COUNT))
+
+
+def respond_bilibili(method: str, url: str, body: bytes) -> Tuple[str, bytes]:
+    path = urlsplit(url).path
+    if path == "/x/web-interface/wbi/search/type":
+        return json_response(synthetic_data.make_bilibili_search_payload(SEARCH_COUNT))
+    if path == "/x/web-interface/view/detail":
+        return json_response(synthetic_data.make_bilibili_video_payload(int(query_param(url, "aid"))))
+    if path == "/x/space/wbi/acc/info":
+        return json_response(synthetic_data.make_bilibili_creator_payload(int(query_param(url, "mid"))))
+    return json_response(synthetic_data.make_bilibili_creator_videos_payload(int(query_param(url, "mid")),
+                                                                             CREATOR_NOTES_COUNT))
+
+
+def respond_weibo(method: str, url: str, body: bytes) -> Tuple[str, bytes]:
+    path = urlsplit(url).path
+    if path.startswith("/detail/"):
+        return html_response(synthetic_data.make_weibo_detail_page(path.rsplit("/", 1)[1]))
+    if query_param(url, "containerid").startswith("107603"):
+        # 用户微博列表每页 10 条，since_id 是下一页第一条微博的序号
+        start = int(query_param(url, "since_id") or 0)
+        return json_response(synthetic_data.make_weibo_cards_payload(WEIBO_PAGE_SIZE, seed=start, start=start,
+                                                                     since_id=str(start + WEIBO_PAGE_SIZE),
+                                                                     total=CREATOR_NOTES_COUNT))
+    return json_response(synthetic_data.make_weibo_cards_payload(SEARCH_COUNT))
+
+
+def respond_kuaishou(method: str, url: str, body: bytes) -> Tuple[str, bytes]:
+    post_data = json.loads(body)
+    operation_name, variables = post_data["operationName"], post_data["variables"]
+    if operation_name == "visionSearchPhoto":
+        return json_response(synthetic_data.make_kuaishou_search_payload(SEARCH_COUNT))
+    if operation_name == "visionVideoDetail":
+        return json_response(synthetic_data.make_kuaishou_video_payload(variables["photoId"]))
+    if operation_name == "visionProfile":
+        return json_response(synthetic_data.make_kuaishou_creator_payload(variables["userId"]))
+    return json_response(synthetic_data.make_kuaishou_creator_videos_payload(CREATOR_NOTES_COUNT))
+
+
+def respond_zhihu(method: str, url: str, body: bytes) -> Tuple[str, bytes]:
+    path_parts = urlsplit(url).path.strip("/").split("/")
+    if path_parts[0] == "question":
+        return html_response(synthetic_data.make_zhihu_answer_page(path_parts[1], path_parts[3]))
+    if path_parts[0] == "people":
+        return html_response(synthetic_data.make_zhihu_creator_page(path_parts[1]))
+    if path_parts[-1] == "answers":
+        return json_response(synthetic_data.make_zhihu_creator_answers(path_parts[3], CREATOR_NOTES_COUNT))
+    return json_response(synthetic_data.make_zhihu_search_payload(SEARCH_COUNT))
+
+
+def new_xhs_client() -> XiaoHongShuClient:
+    return XiaoHongShuClient(headers={"User-Agent": USER_AGENT, "Cookie": "a1=18f0a2b3c4d; webId=5e6f7a8b"},
+                             playwright_page=StandInPage(), cookie_dict={"a1": "18f0a2b3c4d", "webId": "5e6f7a8b"})
+
+
+def new_bilibili_client() -> BilibiliClient:
+    return BilibiliClient(headers={"User-Agent": USER_AGENT, "Cookie": "buvid3=5E6F7A8B"},
+                          playwright_page=StandInPage(), cookie_dict={"buvid3": "5E6F7A8B"})
+
+
+def new_weibo_client() -> WeiboClient:
+    return WeiboClient(headers={"User-Agent": USER_AGENT, "Cookie": "SUB=_2A25L"},
+                       playwright_page=StandInPage(), cookie_dict={"SUB": "_2A25L"})
+
+
+def new_kuaishou_client() -> KuaiShouClient:
+    return KuaiShouClient(headers={"User-Agent": USER_AGENT, "Cookie": "did=web_5e6f7a8b"},
+                          playwright_page=StandInPage(), cookie_dict={"did": "web_5e6f7a8b"})
+
+
+def new_zhihu_client() -> ZhiHuClient:
+    d_c0 = "AGDTrLqVpBiPTqYWGQvHqbB8oLSIe3G9Xu0=|1720000000"
+    return ZhiHuClient(headers={"user-agent": USER_AGENT, "cookie": f"d_c0={d_c0}"},
+                       playwright_page=StandInPage(), cookie_dict={"d_c0": d_c0})
+
+
+async def run_tieba_flow(client: BaiduTieBaClient) -> int:
+    """
+    一次完整的爬取流程
+    Returns:
+        解析出来的数据条数
+    """
+    notes = await client.get_notes_by_keyword(KEYWORD)
+    note_detail = await client.get_note_by_id(NOTE_DETAIL_ID)
+    comments = await client.get_note_all_comments(note_detail, crawl_interval=0, max_count=30)
+    return len(notes) + 1 + len(comments)
+
+
+async def run_xhs_flow(client: XiaoHongShuClient) -> int:
+    search_res = await client.get_note_by_keyword(KEYWORD, search_id=XHS_SEARCH_ID)
+    notes = [await client.get_note_by_id(item["id"], item.get("xsec_source", ""), item["xsec_token"])
+             for item in search_res["items"][:DETAIL_COUNT]]
+    user_id = notes[0]["user"]["user_id"]
+    await client.get_creator_info(user_id)
+    creator_notes = await client.get_all_notes_by_creator(user_id, crawl_interval=0)
+    return len(search_res["items"]) + len(notes) + 1 + len(creator_notes)
+
+
+async def run_bilibili_flow(client: BilibiliClient) -> int:
+    search_res = await client.search_video_by_keyword(KEYWORD)
+    videos = [await client.get_video_info(aid=item["aid"]) for item in search_res["result"][:DETAIL_COUNT]]
+    mid = videos[0]["View"]["owner"]["mid"]
+    await client.get_creator_info(mid)
+    creator_videos = await client.get_creator_videos(mid, pn=1)
+    return len(search_res["result"]) + len(videos) + 1 + len(creator_videos["list"]["vlist"])
+
+
+async def run_weibo_flow(client: WeiboClient) -> int:
+    search_res = await client.get_note_by_keyword(KEYWORD)
+    mblogs = [card["mblog"] for card in search_res["cards"] if card.get("card_type") == 9]
+    notes = [await client.get_note_info_by_id(mblog["id"]) for mblog in mblogs[:DETAIL_COUNT]]
+    creator_id = str(notes[0]["mblog"]["user"]["id"])
+    creator_notes = await client.get_all_notes_by_creator_id(creator_id, f"107603{creator_id}", crawl_interval=0)
+    return len(mblogs) + len(notes) + len(creator_notes)
+
+
+async def run_kuaishou_flow(client: KuaiShouClient) -> int:
+    search_res = await client.search_info_by_keyword(KEYWORD, pcursor="")
+    feeds = search_res["visionSearchPhoto"]["feeds"]
+    videos = [await client.get_video_info(feed["photo"]["id"]) for feed in feeds[:DETAIL_COUNT]]
+    user_id = videos[0]["visionVideoDetail"]["author"]["id"]
+    await client.get_creator_info(user_id)
+    creator_videos = await client.get_all_videos_by_creator(user_id, crawl_interval=0)
+    return len(feeds) + len(videos) + 1 + len(creator_videos)
+
+
+async def run_zhihu_flow(client: ZhiHuClient) -> int:
+    contents = await client.get_note_by_keyword(KEYWORD)
+    answers = [await client.get_answer_info(content.question_id, content.content_id)
+               for content in contents if content.content_type == "answer"][:DETAIL_COUNT]
+    creator = await client.get_creator_info(answers[0].user_url_token)
+    creator_answers = await client.get_all_anwser_by_creator(creator, crawl_interval=0)
+    return len(contents) + len(answers) + 1 + len(creator_answers)
+
+
+class ReplayFlow(NamedTuple):
+    new_client: Callable[[], Any]
+    respond: Responder
+    run_flow: Callable[[Any], Awaitable[int]]
+
+
+REPLAY_FLOWS: Dict[str, ReplayFlow] = {
+    "tieba": ReplayFlow(BaiduTieBaClient, respond_tieba, run_tieba_flow),
+    "xhs": ReplayFlow(new_xhs_client, respond_xhs, run_xhs_flow),
+    "bili": ReplayFlow(new_bilibili_client, respond_bilibili, run_bilibili_flow),
+    "wb": ReplayFlow(new_weibo_client, respond_weibo, run_weibo_flow),
+    "ks": ReplayFlow(new_kuaishou_client, respond_kuaishou, run_kuaishou_flow),
+    "zhihu": ReplayFlow(new_zhihu_client, respond_zhihu, run_zhihu_flow),
+}
+
+
+async def record(replay_flow: ReplayFlow, cassette_file: str) -> Tuple[int, int]:
+    """
+    跑一次流程，把所有请求的响应录制到 cassette 文件
+    Returns:
+        录制的请求数和每个流程解析出来的数据条数
+    """
+    seed_cassette = FixtureCassette(cassette_file, replay_flow.respond)
+    http_cassette.set_cassette(seed_cassette)
+    objects = await replay_flow.run_flow(replay_flow.new_client())
+    return len(seed_cassette), objects
+
+
+async def bench(replay_flow: ReplayFlow, cassette_file: str, flows: int) -> List[float]:
+    latencies = []
+    for _ in range(flows):
+        # 每个流程都从 cassette 文件重新加载，和一次独立的爬虫运行一致
+        http_cassette.set_cassette(http_cassette.Cassette(cassette_file))
+        client = replay_flow.new_client()
+        start = time.perf_counter()
+        await replay_flow.run_flow(client)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+async def run_all(platforms: List[str], flows: int):
+    for platform in platforms:
+        replay_flow = REPLAY_FLOWS[platform]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cassette_file = f"{tmp_dir}/{platform}.jsonl"
+            requests, objects = await record(replay_flow, cassette_file)
+
+            await bench(replay_flow, cassette_file, 3)
+            start = time.perf_counter()
+            latencies = await bench(replay_flow, cassette_file, flows)
+            cost = time.perf_counter() - start
+
+            # tracemalloc 会拖慢执行，内存峰值单独再跑一次统计
+            tracemalloc.start()
+            await bench(replay_flow, cassette_file, 5)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        http_cassette.set_cassette(None)
+
+        quantiles = statistics.quantiles(latencies, n=20)
+        print(f"{platform:<6} flow {flows / cost:>8,.2f} flows/s  p50 {quantiles[9] * 1000:>8.1f} ms  "
+              f"p95 {quantiles[18] * 1000:>8.1f} ms  peak memory {peak / 1024 / 1024:>6.1f} MB  "
+              f"({requests} requests, {objects} objects per flow)")
+
+
+def run(flows: int = 50, platforms: List[str] = None):
+    config.HTTP_CASSETTE_MODE = http_cassette.MODE_REPLAY
+    config.ENABLE_GET_SUB_COMMENTS = True
+    # 翻页的 INFO 日志每个流程都会打印，不计入耗时
+    config.LOG_LEVEL = "WARNING"
+    utils.configure_logging()
+    asyncio.run(run_all(platforms or list(REPLAY_FLOWS), flows))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Replay crawl flows of each platform from recorded cassettes.')
+    parser.add_argument('--platforms', type=str, nargs='+', choices=list(REPLAY_FLOWS), default=list(REPLAY_FLOWS),
+                        help='platforms to replay')
+    parser.add_argument('--flows', type=int, default=50, help='number of timed flows per platform')
+    args = parser.parse_args()
+    run(args.flows, args.platforms)
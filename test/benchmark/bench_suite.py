@@ -0,0 +1,295 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 性能测试集：页面解析、各存储后端（CSV / JSON / DB）、本地缓存、词云词频统计，
+#            用 1k ~ 1M 条合成数据测试，结果保存为 json（默认在 data/benchmark，已加入 .gitignore），
+#            和之前提交的结果对比即可发现性能回退
+#            用法：python -m test.benchmark.bench_suite [--sizes 1000 10000] [--only store] [--compare 旧结果.json]
+import argparse
+import asyncio
+import pathlib
+import platform
+import sqlite3
+import subprocess
+import tempfile
+import time
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional, Sequence, Union
+
+import config
+from cache.local_cache import ExpiringLocalCache
+from media_platform.tieba.help import TieBaExtractor
+from media_platform.zhihu.help import ZhihuExtractor
+from model.m_zhihu import ZhihuContent
+from store.records import load_table_columns
+from store.tieba.tieba_store_impl import (TieBaCsvStoreImplement, TieBaDbStoreImplement,
+                                          TieBaJsonStoreImplement)
+from store.zhihu.zhihu_store_impl import (ZhihuCsvStoreImplement, ZhihuDbStoreImplement,
+                                          ZhihuJsonStoreImplement)
+from test.benchmark.synthetic_data import (make_table_items, make_texts, make_tieba_search_page,
+                                           make_zhihu_comments, make_zhihu_search_payload)
+from tools import json_codec, utils
+from var import media_crawler_db_var
+
+SIZES = (1_000, 10_000, 100_000, 1_000_000)
+RESULT_PATH = "data/benchmark"
+
+# 解析测试每页的数据条数，和平台真实的分页大小接近
+PAGE_SIZE = 100
+
+# DB 存储按这些字段查询是否已存在，SQLite 替身给这些字段建索引（和 MySQL 表上的索引对应）
+LOOKUP_COLUMNS = {"note_id", "comment_id", "content_id", "user_id"}
+
+Runner = Callable[[], Union[None, Awaitable[None]]]
+
+
+class BenchCase(NamedTuple):
+    name: str
+    # 超过这个数据量不再测试，例如 JSON 存储每写一条都要重写整个文件，耗时和数据量的平方成正比
+    max_size: int
+    # prepare(size, work_dir) 准备数据，返回被计时的函数
+    prepare: Callable[[int, str], Awaitable[Runner]]
+
+
+class SqliteStandInDB:
+    """
+    本地测试用的 AsyncMysqlDB 替身，接口和 AsyncMysqlDB 一致，表结构取自 schema/tables.sql（只保留字段名）
+    """
+
+    def __init__(self, db_file: str, tables: Sequence[str]):
+        self._conn = sqlite3.connect(db_file, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute("PRAGMA synchronous = NORMAL")
+        table_columns = load_table_columns()
+        for table in tables:
+            columns = sorted(table_columns[table])
+            self._conn.execute(f"CREATE TABLE {table} ({', '.join(f'`{column}`' for column in columns)})")
+            for column in LOOKUP_COLUMNS.intersection(columns):
+                self._conn.execute(f"CREATE INDEX idx_{table}_{column} ON {table} (`{column}`)")
+
+    async def query(self, sql: str, *args: Union[str, int]) -> List[Dict[str, Any]]:
+        return [dict(row) for row in self._conn.execute(sql.replace("%s", "?"), args).fetchall()]
+
+    async def get_first(self, sql: str, *args: Union[str, int]) -> Optional[Dict[str, Any]]:
+        row = self._conn.execute(sql.replace("%s", "?"), args).fetchone()
+        return dict(row) if row else None
+
+    async def item_to_table(self, table_name: str, item: Dict[str, Any]) -> int:
+        fields = ",".join(f"`{field}`" for field in item.keys())
+        sql = f"INSERT INTO {table_name} ({fields}) VALUES({','.join('?' * len(item))})"
+        return self._conn.execute(sql, list(item.values())).lastrowid
+
+    async def update_table(self, table_name: str, updates: Dict[str, Any], field_where: str,
+                           value_where: Union[str, int, float]) -> int:
+        upsets = ",".join(f"`{field}`=?" for field in updates.keys())
+        sql = f"UPDATE {table_name} SET {upsets} WHERE `{field_where}`=?"
+        return self._conn.execute(sql, [*updates.values(), value_where]).rowcount
+
+    async def execute(self, sql: str, *args: Union[str, int]) -> int:
+        return self._conn.execute(sql.replace("%s", "?"), args).rowcount
+
+    def close(self):
+        self._conn.close()
+
+
+def repeat_page(parse_page: Callable[[], Any], size: int) -> Runner:
+    """
+    解析 size / PAGE_SIZE 次同一个页面
+    """
+
+    def run():
+        for _ in range(max(size // PAGE_SIZE, 1)):
+            parse_page()
+
+    return run
+
+
+async def prepare_tieba_search(size: int, work_dir: str) -> Runner:
+    extractor, page = TieBaExtractor(), make_tieba_search_page(min(size, PAGE_SIZE))
+    return repeat_page(lambda: extractor.extract_search_note_list(page), size)
+
+
+async def prepare_zhihu_search(size: int, work_dir: str) -> Runner:
+    extractor, payload = ZhihuExtractor(), make_zhihu_search_payload(min(size, PAGE_SIZE))
+    return repeat_page(lambda: extractor.extract_contents_from_search(payload), size)
+
+
+async def prepare_zhihu_comments(size: int, work_dir: str) -> Runner:
+    extractor, comments = ZhihuExtractor(), make_zhihu_comments(min(size, PAGE_SIZE))
+    page_content = ZhihuContent(content_id="1000000000", content_type="answer")
+    return repeat_page(lambda: extractor.extract_comments(page_content, comments), size)
+
+
+def make_store_case(name: str, store_class, table: str, max_size: int) -> BenchCase:
+    """
+    存储测试：逐条调用 store_comment 写入 size 条评论
+    """
+
+    async def prepare(size: int, work_dir: str) -> Runner:
+        store = store_class()
+        if hasattr(store, "csv_store_path"):
+            store.csv_store_path = f"{work_dir}/csv"
+        if hasattr(store, "json_store_path"):
+            store.json_store_path, store.words_store_path = f"{work_dir}/json", f"{work_dir}/words"
+        if store_class in (TieBaDbStoreImplement, ZhihuDbStoreImplement):
+            media_crawler_db_var.set(SqliteStandInDB(f"{work_dir}/{table}.db", [table]))
+        items = list(make_table_items(table, size))
+
+        async def run():
+            for item in items:
+                await store.store_comment(item)
+
+        return run
+
+    return BenchCase(name, max_size, prepare)
+
+
+async def prepare_local_cache(size: int, work_dir: str) -> Runner:
+    keys = [f"xhs_note_{index}" for index in range(size)]
+
+    async def run():
+        cache = ExpiringLocalCache(cron_interval=60)
+        for key in keys:
+            cache.set(key, key, 600)
+        for key in keys:
+            cache.get(key)
+        cache.keys("xhs_note_1*")
+        await cache.stop()
+
+    return run
+
+
+async def prepare_word_cloud(size: int, work_dir: str) -> Runner:
+    from tools.words import AsyncWordCloudGenerator
+    from tools.word_segment import shutdown_segmentation_service
+
+    items = [{"content": text} for text in make_texts(size)]
+    generator = AsyncWordCloudGenerator()
+
+    async def run():
+        prefix = f"{work_dir}/comments"
+        for start in range(0, len(items), PAGE_SIZE):
+            await generator.add_items(items[start:start + PAGE_SIZE], prefix)
+        # 只统计分词和词频累加，词云图只取前 20 个词绘制，耗时和数据量无关
+        await generator.flush_all(render=False)
+        shutdown_segmentation_service()
+
+    return run
+
+
+BENCH_CASES: List[BenchCase] = [
+    BenchCase("parser.tieba.search_notes", 1_000_000, prepare_tieba_search),
+    BenchCase("parser.zhihu.search_contents", 1_000_000, prepare_zhihu_search),
+    BenchCase("parser.zhihu.comments", 1_000_000, prepare_zhihu_comments),
+    make_store_case("store.tieba.csv", TieBaCsvStoreImplement, "tieba_comment", 100_000),
+    make_store_case("store.tieba.json", TieBaJsonStoreImplement, "tieba_comment", 1_000),
+    make_store_case("store.tieba.db", TieBaDbStoreImplement, "tieba_comment", 100_000),
+    make_store_case("store.zhihu.csv", ZhihuCsvStoreImplement, "zhihu_comment", 100_000),
+    make_store_case("store.zhihu.json", ZhihuJsonStoreImplement, "zhihu_comment", 1_000),
+    make_store_case("store.zhihu.db", ZhihuDbStoreImplement, "zhihu_comment", 100_000),
+    BenchCase("cache.local_cache", 1_000_000, prepare_local_cache),
+    BenchCase("words.word_cloud", 100_000, prepare_word_cloud),
+]
+
+
+async def run_case(case: BenchCase, size: int) -> Dict:
+    with tempfile.TemporaryDirectory() as work_dir:
+        run = await case.prepare(size, work_dir)
+        start = time.perf_counter()
+        result = run()
+        if asyncio.iscoroutine(result):
+            await result
+        cost = time.perf_counter() - start
+    return {"name": case.name, "size": size, "seconds": round(cost, 6), "records_per_sec": round(size / cost, 2)}
+
+
+async def run_suite(sizes: Sequence[int] = SIZES, only: str = "") -> List[Dict]:
+    """
+    运行性能测试，超过用例 max_size 的数据量跳过
+    Args:
+        sizes: 数据量
+        only: 只运行名称以此开头的用例
+
+    Returns:
+        每个用例、每个数据量的耗时和每秒处理的数据条数
+    """
+    enable_get_wordcloud = config.ENABLE_GET_WORDCLOUD
+    render_interval = config.WORDCLOUD_RENDER_INTERVAL_SEC
+    config.ENABLE_GET_WORDCLOUD, config.WORDCLOUD_RENDER_INTERVAL_SEC = False, 0
+    results = []
+    try:
+        for case in BENCH_CASES:
+            if not case.name.startswith(only):
+                continue
+            for size in sizes:
+                if size > case.max_size:
+                    continue
+                result = await run_case(case, size)
+                print(f"{case.name:<30} {size:>10,} {result['seconds']:>10.3f} s "
+                      f"{result['records_per_sec']:>14,.0f} records/s")
+                results.append(result)
+    finally:
+        config.ENABLE_GET_WORDCLOUD, config.WORDCLOUD_RENDER_INTERVAL_SEC = enable_get_wordcloud, render_interval
+    return results
+
+
+def get_git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def save_results(results: List[Dict], result_path: str = RESULT_PATH) -> str:
+    """
+    保存测试结果，文件名包含日期和当前提交
+    Returns:
+        结果文件
+    """
+    commit = get_git_commit()
+    pathlib.Path(result_path).mkdir(parents=True, exist_ok=True)
+    result_file = f"{result_path}/{utils.get_current_date()}_{commit}.json"
+    with open(result_file, "wb") as f:
+        f.write(json_codec.dumps_bytes({
+            "commit": commit,
+            "time": utils.get_current_time(),
+            "python": platform.python_version(),
+            "json_backend": "orjson" if json_codec.HAS_ORJSON else "json",
+            "results": results,
+        }, indent=True))
+    return result_file
+
+
+def compare_results(results: List[Dict], baseline_file: str):
+    """
+    和之前保存的结果对比，打印每秒处理数据条数的变化
+    """
+    with open(baseline_file, "rb") as f:
+        baseline = {(result["name"], result["size"]): result for result in json_codec.loads(f.read())["results"]}
+    for result in results:
+        old_result = baseline.get((result["name"], result["size"]))
+        if old_result:
+            change = result["records_per_sec"] / old_result["records_per_sec"] - 1
+            print(f"{result['name']:<30} {result['size']:>10,} {change:>+8.1%}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run parser / store / cache benchmarks on synthetic data.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(SIZES), help='number of records')
+    parser.add_argument('--only', type=str, default="", help='only run cases whose name starts with this prefix')
+    parser.add_argument('--compare', type=str, default="", help='result file of a previous run')
+    args = parser.parse_args()
+    bench_results = asyncio.run(run_suite(args.sizes, args.only))
+    print(f"results saved to {save_results(bench_results)}")
+    if args.compare:
+        compare_results(bench_results, args.compare)
@@ -0,0 +1,58 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 贴吧页面解析速度，按 test_data 下的每种页面统计每秒解析的页面数
+#            用法：python -m test.benchmark.bench_tieba_extractor
+from typing import Callable, Dict
+
+from media_platform.tieba.help import TieBaExtractor
+from model.m_baidu_tieba import TiebaComment
+from test.benchmark.bench_model_construct import timeit
+from test.fixtures import load_test_data
+
+
+def get_page_parsers(extractor: TieBaExtractor) -> Dict[str, Callable[[], int]]:
+    """
+    页面文件 -> 解析一次该页面的函数（返回值为解析出来的数据条数）
+    """
+    pages = {file_name: load_test_data(file_name) for file_name in (
+        "search_keyword_notes.html", "tieba_note_list.html", "note_detail.html", "note_comments.html",
+        "note_sub_comments.html",
+    )}
+    parent_comment = TiebaComment(comment_id="123456", content="content", note_id="note_id", note_url="note_url",
+                                  tieba_id="tieba_id", tieba_name="tieba_name", tieba_link="tieba_link")
+    return {
+        "search_keyword_notes.html": lambda: len(
+            extractor.extract_search_note_list(pages["search_keyword_notes.html"])),
+        "tieba_note_list.html": lambda: len(extractor.extract_tieba_note_list(pages["tieba_note_list.html"])),
+        "note_detail.html": lambda: int(bool(extractor.extract_note_detail(pages["note_detail.html"]))),
+        "note_comments.html": lambda: len(
+            extractor.extract_tieba_note_parment_comments(pages["note_comments.html"], "123456")),
+        "note_sub_comments.html": lambda: len(
+            extractor.extract_tieba_note_sub_comments(pages["note_sub_comments.html"], parent_comment)),
+    }
+
+
+def run(seconds: float = 2.0):
+    for file_name, parse_page in get_page_parsers(TieBaExtractor()).items():
+        objects = parse_page()
+
+        def parse_one_page() -> int:
+            parse_page()
+            return 1
+
+        pages, cost = timeit(parse_one_page, seconds)
+        print(f"{file_name:<28} {pages / cost:>10,.1f} pages/s {pages * objects / cost:>12,.0f} objects/s")
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,79 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 小红书笔记详情页 __INITIAL_STATE__ 解析速度，对比原来的递归实现（每层 json 序列化再解析）
+#            用法：python -m test.benchmark.bench_xhs_note_html
+import json
+import os
+import re
+from typing import Dict
+
+from media_platform.xhs.help import get_note_dict
+from test.benchmark.bench_json_codec import calls
+from test.benchmark.bench_model_construct import timeit
+from tools.crawler_util import transform_json_keys
+
+TEST_DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                             "media_platform", "xhs", "test_data")
+
+NOTE_ID = "66fad51c000000001b0224b8"
+
+
+def load_note_html() -> str:
+    with open(os.path.join(TEST_DATA_DIR, "note_detail.html"), encoding="utf-8") as f:
+        return f.read()
+
+
+def recursive_transform_json_keys(json_data: str) -> Dict:
+    """
+    原来的实现，作为对比和正确性的参照
+    """
+    data_dict = json.loads(json_data)
+    dict_new = {}
+    for key, value in data_dict.items():
+        new_key = re.sub(r"(?<!^)(?=[A-Z])", "_", key).lower()
+        if not value:
+            dict_new[new_key] = value
+        elif isinstance(value, dict):
+            dict_new[new_key] = recursive_transform_json_keys(json.dumps(value))
+        elif isinstance(value, list):
+            dict_new[new_key] = [
+                recursive_transform_json_keys(json.dumps(item)) if (item and isinstance(item, dict)) else item
+                for item in value
+            ]
+        else:
+            dict_new[new_key] = value
+    return dict_new
+
+
+def recursive_get_note_dict(html: str, note_id: str) -> Dict:
+    state = re.findall(r"window.__INITIAL_STATE__=({.*})</script>", html)[0].replace("undefined", '""')
+    if state != "{}":
+        return recursive_transform_json_keys(state)["note"]["note_detail_map"][note_id]["note"]
+    return {}
+
+
+def run(seconds: float = 2.0):
+    html = load_note_html()
+    state = re.findall(r"window.__INITIAL_STATE__=({.*})</script>", html)[0].replace("undefined", '""')
+    for name, func in (
+            ("[transform] recursive", calls(recursive_transform_json_keys, state)),
+            ("[transform] iterative", calls(lambda: transform_json_keys(json.loads(state)))),
+            ("[note html] recursive", calls(recursive_get_note_dict, html, NOTE_ID)),
+            ("[note html] current  ", calls(get_note_dict, html, NOTE_ID)),
+    ):
+        count, cost = timeit(func, seconds)
+        print(f"{name} {count / cost:>10,.0f} pages/s")
+
+
+if __name__ == '__main__':
+    run()
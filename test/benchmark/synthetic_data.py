@@ -0,0 +1,396 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 性能测试用的合成数据，数据量可以从几条到上百万条，同样的 seed 生成同样的数据
+import json
+import random
+import re
+from typing import Dict, Iterator, List, Set
+
+from store.records import load_table_columns
+from test.fixtures import load_test_data
+
+TEXTS = [
+    "今天去了一家很好吃的店，推荐给大家 #美食# 环境也不错",
+    "楼主说得对，编程副业确实需要坚持，我做了半年才开始有收入",
+    "<p>这个回答很有帮助，<b>收藏</b>了 &amp; 转发给同事</p>",
+    "请问有没有Python爬虫的入门教程？想学一下数据分析",
+    "兼职接单要注意甄别，很多都是骗子，先付款的一律不要做",
+    "周末去爬山了，风景很好，就是人太多了😀",
+]
+
+SEARCH_POST_PATTERN = re.compile(r'<div class="s_post">.*?(?=<div class="s_post">|\Z)', re.DOTALL)
+DATA_TID_PATTERN = re.compile(r'data-tid="\d+"')
+
+
+def make_texts(count: int, seed: int = 0) -> List[str]:
+    rand = random.Random(seed)
+    return [f"{rand.choice(TEXTS)} {rand.choice(TEXTS)} {index}" for index in range(count)]
+
+
+def make_tieba_search_page(count: int) -> str:
+    """
+    贴吧搜索结果页，复制 test_data 中的帖子并替换帖子ID，生成 count 个帖子
+    """
+    posts = SEARCH_POST_PATTERN.findall(load_test_data("search_keyword_notes.html"))
+    body = "".join(DATA_TID_PATTERN.sub(f'data-tid="{9000000000 + index}"', posts[index % len(posts)], count=1)
+                   for index in range(count))
+    return f'<div class="s_post_list">{body}</div>'
+
+
+def make_zhihu_search_payload(count: int, seed: int = 0) -> Dict:
+    """
+    知乎搜索接口响应，回答和文章各占一半
+    """
+    rand = random.Random(seed)
+    items = []
+    for index in range(count):
+        content_type = "answer" if index % 2 == 0 else "article"
+        item = {
+            "id": str(1000000000 + index), "type": content_type, "content": rand.choice(TEXTS),
+            "title": f"<em>编程</em>副业 {index}", "excerpt": rand.choice(TEXTS),
+            "created_time": 1720000000 + index, "updated_time": 1720000000 + index,
+            "voteup_count": rand.randint(0, 10000), "comment_count": rand.randint(0, 1000),
+            "author": {"id": f"{rand.getrandbits(64):016x}", "url_token": f"user-{index}", "name": "知乎用户",
+                       "avatar_url": "https://picx.zhimg.com/a.jpg"},
+        }
+        if content_type == "answer":
+            item["question"] = {"id": str(2000000000 + index)}
+        items.append({"type": "search_result", "object": item})
+    return {"paging": {"is_end": False}, "data": items}
+
+
+def make_zhihu_answer_html(paragraphs: int = 300) -> str:
+    """
+    生成知乎长回答的正文：段落、加粗、站内链接、图片、引用、列表和实体
+    """
+    parts = []
+    for index in range(paragraphs):
+        parts.append(f'<p data-pid="p{index}">第{index}段：回答内容&quot;引用&quot;，包含 <b>加粗</b> 和 '
+                     f'<a href="https://www.zhihu.com/question/{index}" class="internal">链接</a>&nbsp;以及&amp;符号。'
+                     f'  多个   空格。</p>')
+        if index % 10 == 0:
+            parts.append('<figure data-size="normal"><img src="https://pic1.zhimg.com/v2-abc.jpg" data-size="normal" '
+                         'data-rawwidth="1080" data-rawheight="720" class="origin_image zh-lightbox-thumb" '
+                         'width="1080" data-original="https://pic1.zhimg.com/v2-abc_r.jpg"/>'
+                         '<figcaption>图片说明</figcaption></figure>')
+        if index % 25 == 0:
+            parts.append('<blockquote>引用一段话<br/>第二行</blockquote><ul><li>要点一</li><li>要点二</li></ul>')
+    return "".join(parts)
+
+
+def make_zhihu_answer_page(question_id: str, answer_id: str, paragraphs: int = 30, seed: int = 0) -> str:
+    """
+    知乎回答详情页，回答数据在 js-initialData 中
+    """
+    rand = random.Random(seed)
+    answer = {
+        "id": answer_id, "type": "answer", "content": make_zhihu_answer_html(paragraphs),
+        "excerpt": rand.choice(TEXTS), "question": {"id": question_id, "title": "编程副业怎么做"},
+        "created_time": 1720000000, "updated_time": 1720000000,
+        "voteup_count": rand.randint(0, 10000), "comment_count": rand.randint(0, 1000),
+        "author": {"id": f"{rand.getrandbits(64):016x}", "url_token": "user-0", "name": "知乎用户",
+                   "avatar_url": "https://picx.zhimg.com/a.jpg"},
+    }
+    init_data = {"initialState": {"entities": {"answers": {answer_id: answer}}}}
+    return (f'<html><head><title>知乎</title></head><body><div id="root"></div>'
+            f'<script id="js-initialData" type="text/json">{json.dumps(init_data, ensure_ascii=False)}</script>'
+            f'</body></html>')
+
+
+def make_zhihu_creator_page(url_token: str, seed: int = 0) -> str:
+    """
+    知乎用户主页，用户数据在 js-initialData 中，字段是驼峰命名
+    """
+    rand = random.Random(seed)
+    user = {
+        "id": f"{rand.getrandbits(64):016x}", "urlToken": url_token, "name": "知乎用户",
+        "avatarUrl": "https://picx.zhimg.com/a.jpg", "gender": rand.choice([0, 1, -1]), "ipInfo": "IP 属地广东",
+        "followingCount": rand.randint(0, 1000), "followerCount": rand.randint(0, 100000),
+        "answerCount": rand.randint(0, 1000), "zvideoCount": 0, "questionCount": rand.randint(0, 100),
+        "articlesCount": rand.randint(0, 100), "columnsCount": 0, "voteupCount": rand.randint(0, 100000),
+    }
+    init_data = {"initialState": {"entities": {"users": {url_token: user}}}}
+    return (f'<html><body><div id="root"></div>'
+            f'<script id="js-initialData" type="text/json">{json.dumps(init_data, ensure_ascii=False)}</script>'
+            f'</body></html>')
+
+
+def make_zhihu_creator_answers(url_token: str, count: int, seed: int = 0) -> Dict:
+    """
+    知乎用户回答列表接口响应，只有一页
+    """
+    items = [item["object"] for item in make_zhihu_search_payload(count * 2, seed)["data"]
+             if item["object"]["type"] == "answer"][:count]
+    for item in items:
+        item["author"]["url_token"] = url_token
+    return {"paging": {"is_end": True}, "data": items}
+
+
+def make_zhihu_comments(count: int, seed: int = 0) -> List[Dict]:
+    rand = random.Random(seed)
+    return [{
+        "id": 3000000000 + index, "type": "comment", "content": rand.choice(TEXTS),
+        "reply_comment_id": "0" if index % 5 == 0 else str(3000000000 + index - 1),
+        "created_time": 1720000000 + index, "child_comment_count": rand.randint(0, 5),
+        "like_count": rand.randint(0, 100), "dislike_count": 0,
+        "comment_tag": [{"type": "ip_info", "text": "IP 属地广东"}],
+        "author": {"id": f"{rand.getrandbits(64):016x}", "url_token": f"user-{index}", "name": "知乎用户",
+                   "avatar_url": "https://picx.zhimg.com/a.jpg"},
+    } for index in range(count)]
+
+
+def _xhs_note(note_id: str, rand: random.Random) -> Dict:
+    return {
+        "note_id": note_id, "type": rand.choice(["normal", "video"]), "title": "编程副业分享",
+        "desc": f"{rand.choice(TEXTS)} #编程[话题]# #副业[话题]#", "time": 1720000000000, "last_update_time": 1720000000000,
+        "ip_location": "广东", "xsec_token": f"AB{note_id}",
+        "user": {"user_id": f"{rand.getrandbits(96):024x}", "nickname": "小红薯",
+                 "avatar": "https://sns-avatar.xhscdn.com/a.jpg"},
+        "interact_info": {"liked_count": str(rand.randint(0, 10000)), "collected_count": str(rand.randint(0, 1000)),
+                          "comment_count": str(rand.randint(0, 1000)), "share_count": str(rand.randint(0, 100))},
+        "image_list": [{"url_default": f"https://sns-webpic.xhscdn.com/{note_id}/{index}.jpg", "width": 1080,
+                        "height": 1440} for index in range(rand.randint(1, 9))],
+        "tag_list": [{"id": "5be00", "name": "编程", "type": "topic"}, {"id": "5be01", "name": "副业", "type": "topic"}],
+    }
+
+
+def make_xhs_search_payload(count: int, seed: int = 0) -> Dict:
+    """
+    小红书搜索接口响应
+    """
+    rand = random.Random(seed)
+    items = []
+    for index in range(count):
+        note_id = f"66{index:022x}"
+        items.append({"id": note_id, "model_type": "note", "xsec_token": f"AB{note_id}",
+                      "note_card": _xhs_note(note_id, rand)})
+    return {"success": True, "data": {"has_more": True, "items": items}}
+
+
+def make_xhs_note_payload(note_id: str, seed: int = 0) -> Dict:
+    """
+    小红书笔记详情接口响应
+    """
+    return {"success": True, "data": {"items": [{"id": note_id, "note_card": _xhs_note(note_id, random.Random(seed))}]}}
+
+
+def make_xhs_creator_page(user_id: str, seed: int = 0) -> str:
+    """
+    小红书用户主页，用户数据在一行 window.__INITIAL_STATE__ 中，和网页一样包含 undefined
+    """
+    rand = random.Random(seed)
+    user_page_data = {
+        "basicInfo": {"nickname": "小红薯", "desc": rand.choice(TEXTS), "gender": rand.choice([0, 1]),
+                      "ipLocation": "广东", "images": "https://sns-avatar.xhscdn.com/a.jpg", "redId": user_id[:10]},
+        "interactions": [{"type": "follows", "count": str(rand.randint(0, 1000))},
+                         {"type": "fans", "count": str(rand.randint(0, 100000))},
+                         {"type": "interaction", "count": str(rand.randint(0, 100000))}],
+        "tags": [{"tagType": "location", "name": "广东"}],
+    }
+    state = json.dumps({"user": {"userPageData": user_page_data, "notes": []}}, ensure_ascii=False,
+                       separators=(",", ":"))
+    state = state.replace('"notes":[]', '"notes":[],"activeTab":undefined')
+    return f'<html><body><div id="app"></div><script>window.__INITIAL_STATE__={state}</script></body></html>'
+
+
+def make_xhs_creator_notes_payload(count: int, seed: int = 0) -> Dict:
+    """
+    小红书用户笔记列表接口响应，只有一页
+    """
+    rand = random.Random(seed)
+    notes = [{"note_id": f"67{index:022x}", "type": "normal", "display_title": rand.choice(TEXTS),
+              "xsec_token": f"AB67{index:022x}", "user": {"user_id": f"{rand.getrandbits(96):024x}", "nickname": "小红薯"},
+              "interact_info": {"liked_count": str(rand.randint(0, 10000))}} for index in range(count)]
+    return {"success": True, "data": {"has_more": False, "cursor": "", "notes": notes}}
+
+
+def _bilibili_video(aid: int, rand: random.Random) -> Dict:
+    return {
+        "aid": aid, "bvid": f"BV1{aid:09d}", "cid": aid + 1, "title": f"编程副业教程 {aid}", "desc": rand.choice(TEXTS),
+        "pubdate": 1720000000, "duration": rand.randint(60, 3600), "pic": "https://i0.hdslb.com/bfs/archive/a.jpg",
+        "owner": {"mid": 10000 + aid % 100, "name": "UP主", "face": "https://i0.hdslb.com/bfs/face/a.jpg"},
+        "stat": {"view": rand.randint(0, 100000), "danmaku": rand.randint(0, 1000), "reply": rand.randint(0, 1000),
+                 "favorite": rand.randint(0, 1000), "coin": rand.randint(0, 1000), "share": rand.randint(0, 100),
+                 "like": rand.randint(0, 10000)},
+    }
+
+
+def make_bilibili_search_payload(count: int, seed: int = 0) -> Dict:
+    """
+    B站视频搜索接口响应
+    """
+    rand = random.Random(seed)
+    result = [{"type": "video", "aid": 100000 + index, "bvid": f"BV1{100000 + index:09d}", "mid": 10000 + index % 100,
+               "title": '<em class="keyword">编程</em>副业教程', "description": rand.choice(TEXTS), "author": "UP主",
+               "play": rand.randint(0, 100000), "video_review": rand.randint(0, 1000), "pubdate": 1720000000,
+               "duration": "12:34", "pic": "//i0.hdslb.com/bfs/archive/a.jpg"} for index in range(count)]
+    return {"code": 0, "message": "0", "data": {"numPages": 50, "result": result}}
+
+
+def make_bilibili_video_payload(aid: int, seed: int = 0) -> Dict:
+    """
+    B站视频详情接口响应
+    """
+    rand = random.Random(seed)
+    view = _bilibili_video(aid, rand)
+    return {"code": 0, "message": "0", "data": {"View": view, "Card": {"card": view["owner"], "follower": 1000},
+                                                 "Tags": [{"tag_name": "编程"}, {"tag_name": "副业"}]}}
+
+
+def make_bilibili_creator_payload(mid: int, seed: int = 0) -> Dict:
+    """
+    B站用户信息接口响应
+    """
+    rand = random.Random(seed)
+    return {"code": 0, "message": "0", "data": {"mid": mid, "name": "UP主", "sex": rand.choice(["男", "女", "保密"]),
+                                                 "face": "https://i0.hdslb.com/bfs/face/a.jpg",
+                                                 "sign": rand.choice(TEXTS), "level": rand.randint(0, 6)}}
+
+
+def make_bilibili_creator_videos_payload(mid: int, count: int, seed: int = 0) -> Dict:
+    """
+    B站用户投稿视频接口响应，只有一页
+    """
+    rand = random.Random(seed)
+    vlist = [{"aid": 200000 + index, "bvid": f"BV1{200000 + index:09d}", "mid": mid, "title": rand.choice(TEXTS),
+              "created": 1720000000 + index, "play": rand.randint(0, 100000), "comment": rand.randint(0, 1000)}
+             for index in range(count)]
+    return {"code": 0, "message": "0",
+            "data": {"list": {"vlist": vlist}, "page": {"pn": 1, "ps": count, "count": count}}}
+
+
+def _weibo_mblog(mid: str, rand: random.Random) -> Dict:
+    return {
+        "id": mid, "mid": mid, "created_at": "Mon Jul 01 12:00:00 +0800 2024",
+        "text": f'{rand.choice(TEXTS)}<a href="/status/{mid}">全文</a><br />',
+        "attitudes_count": rand.randint(0, 10000), "comments_count": rand.randint(0, 1000),
+        "reposts_count": rand.randint(0, 100), "region_name": "发布于 广东", "source": "iPhone客户端",
+        "user": {"id": 5000000000 + int(mid) % 100, "screen_name": "微博用户", "gender": rand.choice(["m", "f"]),
+                 "profile_image_url": "https://tvax1.sinaimg.cn/a.jpg"},
+        "pics": [{"url": f"https://wx1.sinaimg.cn/orj360/{mid}.jpg",
+                  "large": {"url": f"https://wx1.sinaimg.cn/large/{mid}.jpg"}}],
+    }
+
+
+def make_weibo_cards_payload(count: int, seed: int = 0, start: int = 0, since_id: str = "", total: int = 0) -> Dict:
+    """
+    微博搜索和用户微博列表接口响应，card_type 为 9 的卡片是微博
+    Args:
+        count: 这一页的微博条数
+        seed: 随机数种子
+        start: 这一页第一条微博的序号
+        since_id: 下一页的分页参数
+        total: 微博总数，为 0 时等于 count
+
+    Returns:
+
+    """
+    rand = random.Random(seed)
+    cards = [{"card_type": 9, "mblog": _weibo_mblog(str(5000000000000000 + index), rand)}
+             for index in range(start, start + count)]
+    cards.insert(0, {"card_type": 11, "card_group": []})
+    return {"ok": 1, "data": {"cards": cards,
+                              "cardlistInfo": {"page": 2, "since_id": since_id, "total": total or count}}}
+
+
+def make_weibo_detail_page(mid: str, seed: int = 0) -> str:
+    """
+    微博详情页，数据在页面脚本的 $render_data 变量中
+    """
+    render_data = json.dumps([{"status": _weibo_mblog(mid, random.Random(seed)), "call": "1"}], ensure_ascii=False)
+    return (f'<html><body><div id="app"></div><script>var $render_data = {render_data}[0] || {{}};\n'
+            f'var __wb_performance_data={{v:"v8"}};</script></body></html>')
+
+
+def _kuaishou_feed(photo_id: str, rand: random.Random) -> Dict:
+    return {
+        "type": 1,
+        "author": {"id": f"3x{rand.getrandbits(48):012x}", "name": "快手用户",
+                   "headerUrl": "https://p1.a.yximgs.com/a.jpg"},
+        "photo": {"id": photo_id, "caption": rand.choice(TEXTS), "duration": rand.randint(10000, 600000),
+                  "likeCount": str(rand.randint(0, 10000)), "realLikeCount": rand.randint(0, 10000),
+                  "viewCount": str(rand.randint(0, 100000)), "timestamp": 1720000000000,
+                  "coverUrl": f"https://p1.a.yximgs.com/{photo_id}.jpg",
+                  "photoUrl": f"https://v1.a.yximgs.com/{photo_id}.mp4"},
+    }
+
+
+def make_kuaishou_search_payload(count: int, seed: int = 0) -> Dict:
+    """
+    快手搜索 GraphQL 响应
+    """
+    rand = random.Random(seed)
+    feeds = [_kuaishou_feed(f"3x{index:013x}", rand) for index in range(count)]
+    return {"data": {"visionSearchPhoto": {"result": 1, "pcursor": "1", "searchSessionId": "MTRfMjcwOTMy",
+                                           "feeds": feeds}}}
+
+
+def make_kuaishou_video_payload(photo_id: str, seed: int = 0) -> Dict:
+    """
+    快手视频详情 GraphQL 响应
+    """
+    detail = dict(_kuaishou_feed(photo_id, random.Random(seed)), status=1, tags=[{"name": "编程"}])
+    return {"data": {"visionVideoDetail": detail}}
+
+
+def make_kuaishou_creator_payload(user_id: str, seed: int = 0) -> Dict:
+    """
+    快手用户主页 GraphQL 响应
+    """
+    rand = random.Random(seed)
+    profile = {"ownerCount": {"fan": str(rand.randint(0, 100000)), "follow": rand.randint(0, 1000),
+                              "photo_public": rand.randint(0, 1000)},
+               "profile": {"user_id": user_id, "user_name": "快手用户", "gender": rand.choice(["M", "F"]),
+                           "headurl": "https://p1.a.yximgs.com/a.jpg", "user_text": rand.choice(TEXTS)},
+               "isFollowing": False}
+    return {"data": {"visionProfile": {"result": 1, "hostName": "", "userProfile": profile}}}
+
+
+def make_kuaishou_creator_videos_payload(count: int, seed: int = 0) -> Dict:
+    """
+    快手用户作品列表 GraphQL 响应，只有一页
+    """
+    rand = random.Random(seed)
+    feeds = [_kuaishou_feed(f"3y{index:013x}", rand) for index in range(count)]
+    return {"data": {"visionProfilePhotoList": {"result": 1, "pcursor": "no_more", "feeds": feeds}}}
+
+
+def _column_value(column: str, index: int, rand: random.Random):
+    if column.endswith("_id"):
+        return str(10 ** 12 + index)
+    if column.endswith("_count") or column.endswith("_num") or column.endswith("_page"):
+        return rand.randint(0, 10000)
+    if column.endswith("_time") or column.endswith("_ts"):
+        return 1720000000 + index
+    if column.endswith("_url") or column.endswith("_link") or column.endswith("_avatar"):
+        return f"https://example.com/{column}/{index}"
+    return rand.choice(TEXTS)
+
+
+def make_table_items(table: str, count: int, seed: int = 0, skip_columns: Set[str] = frozenset(
+        {"id", "add_ts", "last_modify_ts"})) -> Iterator[Dict]:
+    """
+    按 schema/tables.sql 中的表结构生成待存储的数据，_id 结尾的字段每条数据唯一
+    Args:
+        table: 表名
+        count: 数据条数
+        seed: 随机数种子
+        skip_columns: 不需要生成的字段（自增ID和存储时补充的字段）
+
+    Returns:
+
+    """
+    rand = random.Random(seed)
+    columns = sorted(load_table_columns()[table] - skip_columns)
+    for index in range(count):
+        yield {column: _column_value(column, index, rand) for column in columns}
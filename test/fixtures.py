@@ -0,0 +1,30 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 测试和性能测试共用的测试数据读取
+import os
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_test_data(file_name: str, platform: str = "tieba") -> str:
+    """
+    读取 media_platform/<platform>/test_data 下保存的页面
+    Args:
+        file_name: 文件名
+        platform: 平台目录名
+
+    Returns:
+        页面内容
+    """
+    with open(os.path.join(PROJECT_DIR, "media_platform", platform, "test_data", file_name), encoding="utf-8") as f:
+        return f.read()
@@ -0,0 +1,112 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+import csv
+import json
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+import config
+from store.douyin import DouyinStoreFactory
+from tools.analytics import analyze, parse_count, parse_day
+
+NOTES = [
+    {"note_id": "n1", "nickname": "alice", "time": 1704067200000, "liked_count": "1.2万", "comment_count": "3",
+     "source_keyword": "咖啡"},
+    {"note_id": "n2", "nickname": "bob", "time": 1704153600000, "liked_count": "10", "comment_count": "0",
+     "source_keyword": "咖啡"},
+    {"note_id": "n1", "nickname": "alice", "time": 1704067200000, "liked_count": "1.2万", "comment_count": "30",
+     "source_keyword": "拿铁"},
+    {"note_id": "n3", "nickname": "alice", "time": 1704153600000, "liked_count": "100+", "comment_count": "120",
+     "source_keyword": "拿铁"},
+]
+
+
+class TestAnalytics(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def write_csv(self, file_name, items):
+        with open(os.path.join(self.tmp_dir.name, file_name), "w", encoding="utf-8-sig", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(items[0].keys()))
+            writer.writeheader()
+            writer.writerows(items)
+
+    def test_parse_helpers(self):
+        self.assertEqual(parse_count(pd.Series(["1.2万", "10+", "", 7])).tolist(), [12000, 10, 0, 7])
+        days = parse_day(pd.Series([1704067200, 1704067200000, "2024-01-03 12:00"]))
+        self.assertEqual(days.dt.strftime("%Y-%m-%d").tolist(), ["2024-01-01", "2024-01-01", "2024-01-03"])
+
+    def test_contents_summary_in_chunks(self):
+        self.write_csv("1_search_contents_2024-01-01.csv", NOTES)
+        results = analyze("xhs", "contents", "csv", self.tmp_dir.name, top_n=2, chunksize=1)
+
+        keyword_summary = results["keyword_summary"]
+        self.assertEqual(keyword_summary.loc["咖啡", "count"], 2)
+        self.assertEqual(keyword_summary.loc["咖啡", "liked_sum"], 12010)
+        self.assertEqual(results["creator_summary"].loc["alice", "count"], 3)
+        self.assertEqual(results["daily_summary"]["count"].tolist(), [2, 2])
+        self.assertEqual(results["top_liked"]["id"].tolist(), ["n1", "n3"])
+
+        histogram = results["comment_histogram"].set_index("bucket")["contents"]
+        self.assertEqual(histogram["[0, 1)"], 1)
+        self.assertEqual(histogram["[20, 50)"], 1)
+        self.assertEqual(histogram["[100, 200)"], 1)
+
+        cooccurrence = results["keyword_cooccurrence"]
+        self.assertEqual(cooccurrence.to_dict("records"), [{"keyword_a": "咖啡", "keyword_b": "拿铁", "contents": 1}])
+
+    def test_comments_histogram_from_jsonl(self):
+        comments = [{"comment_id": str(i), "note_id": "n1" if i < 5 else "n2", "nickname": "u", "create_time": 0,
+                     "like_count": i} for i in range(6)]
+        with open(os.path.join(self.tmp_dir.name, "search_comments.jsonl"), "w", encoding="utf-8") as f:
+            for comment in comments:
+                f.write(json.dumps(comment) + "\n")
+        results = analyze("xhs", "comments", "jsonl", self.tmp_dir.name, chunksize=4)
+        histogram = results["comment_histogram"].set_index("bucket")["contents"]
+        self.assertEqual(histogram["[1, 2)"], 1)
+        self.assertEqual(histogram["[5, 10)"], 1)
+        self.assertEqual(results["top_liked"]["id"].tolist()[0], "5")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+
+class TestAnalyticsDefaultPath(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.origin_cwd = os.getcwd()
+        self.origin_word_cloud = config.ENABLE_GET_WORDCLOUD
+        config.ENABLE_GET_WORDCLOUD = False
+        # 存储写入的是相对路径 data/douyin，切换到临时目录避免写入项目目录
+        os.chdir(self.tmp_dir.name)
+
+    def tearDown(self):
+        os.chdir(self.origin_cwd)
+        config.ENABLE_GET_WORDCLOUD = self.origin_word_cloud
+        self.tmp_dir.cleanup()
+
+    async def test_read_store_output(self):
+        awemes = [{"aweme_id": str(i), "nickname": "u", "create_time": 1704067200, "liked_count": str(i),
+                   "comment_count": "1", "source_keyword": "咖啡"} for i in range(3)]
+        for source in ("csv", "json"):
+            store = DouyinStoreFactory.STORES[source]()
+            for aweme in awemes:
+                await store.store_content(aweme)
+            results = analyze("dy", "contents", source)
+            self.assertEqual(results["keyword_summary"].loc["咖啡", "count"], 3, source)
+            self.assertEqual(results["top_liked"]["id"].tolist()[0], "2", source)
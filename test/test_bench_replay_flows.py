@@ -0,0 +1,43 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+import tempfile
+from unittest import IsolatedAsyncioTestCase
+
+import config
+from test.benchmark.bench_replay_flows import REPLAY_FLOWS, bench, record
+from tools import http_cassette
+
+
+class TestBenchReplayFlows(IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.origin_cassette_mode = config.HTTP_CASSETTE_MODE
+        config.HTTP_CASSETTE_MODE = http_cassette.MODE_REPLAY
+
+    def tearDown(self):
+        config.HTTP_CASSETTE_MODE = self.origin_cassette_mode
+        http_cassette.set_cassette(None)
+        self.tmp_dir.cleanup()
+
+    async def test_replay_flows(self):
+        for platform, replay_flow in REPLAY_FLOWS.items():
+            with self.subTest(platform=platform):
+                cassette_file = f"{self.tmp_dir.name}/{platform}.jsonl"
+                requests, objects = await record(replay_flow, cassette_file)
+                self.assertGreater(requests, 0)
+                self.assertGreater(objects, 0)
+                # 只从录制的文件回放，没有录制的请求会抛出 CassetteMissError
+                latencies = await bench(replay_flow, cassette_file, 1)
+                self.assertEqual(len(latencies), 1)
+                self.assertEqual(http_cassette.get_cassette().miss_count, 0)
@@ -0,0 +1,49 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+import asyncio
+import json
+import tempfile
+from unittest import IsolatedAsyncioTestCase
+
+from test.benchmark.bench_suite import (BENCH_CASES, SqliteStandInDB, compare_results, run_suite,
+                                        save_results)
+
+
+class TestBenchSuite(IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    async def test_sqlite_stand_in(self):
+        db = SqliteStandInDB(f"{self.tmp_dir.name}/test.db", ["tieba_comment"])
+        await db.item_to_table("tieba_comment", {"comment_id": "1", "content": "hello"})
+        self.assertEqual(await db.update_table("tieba_comment", {"content": "world"}, "comment_id", "1"), 1)
+        rows = await db.query("select * from tieba_comment where comment_id = %s", "1")
+        self.assertEqual(rows[0]["content"], "world")
+        self.assertIsNone(await db.get_first("select * from tieba_comment where comment_id = '2'"))
+        db.close()
+
+    async def test_run_suite(self):
+        results = await run_suite(sizes=[20])
+        self.assertEqual([result["name"] for result in results], [case.name for case in BENCH_CASES])
+        self.assertTrue(all(result["records_per_sec"] > 0 for result in results))
+        # 本地缓存的定时清理任务、词云的延迟写入任务都已经结束
+        self.assertEqual(asyncio.all_tasks(), {asyncio.current_task()})
+
+        result_file = save_results(results, f"{self.tmp_dir.name}/benchmark")
+        with open(result_file, encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["results"], results)
+        compare_results(results, result_file)
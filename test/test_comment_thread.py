@@ -0,0 +1,72 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+import json
+import tempfile
+from typing import Dict, List
+from unittest import IsolatedAsyncioTestCase
+
+from store.comment_thread import CommentThreadIndex, CommentThreadStage, export_comment_trees
+
+
+def tree_ids(nodes: List[Dict], id_field: str = "comment_id") -> List:
+    return [(node["comment"][id_field], tree_ids(node["sub_comments"], id_field)) for node in nodes]
+
+
+class TestCommentThreadIndex(IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.index = CommentThreadIndex(f"{self.tmp_dir.name}/comment_thread.db")
+        self.stage = CommentThreadStage(self.index)
+
+    def tearDown(self):
+        self.index.close()
+        self.tmp_dir.cleanup()
+
+    async def add_comment(self, comment_id: str, parent_id, note_id: str = "n1"):
+        await self.stage.process("xhs", "comments", {"comment_id": comment_id, "note_id": note_id,
+                                                     "parent_comment_id": parent_id, "content": comment_id})
+
+    async def test_build_tree(self):
+        await self.add_comment("c1", 0)
+        await self.add_comment("c2", "")
+        await self.add_comment("c3", "c1")
+        await self.add_comment("c4", "c3")
+        await self.add_comment("c5", "c1")
+        await self.add_comment("x1", 0, note_id="n2")
+        self.assertEqual(tree_ids(self.index.get_comment_tree("xhs", "n1")),
+                         [("c1", [("c3", [("c4", [])]), ("c5", [])]), ("c2", [])])
+        self.assertEqual([(row["comment_id"], row["depth"], row["path"]) for row in self.index.get_thread("xhs", "c1")],
+                         [("c1", 0, "c1"), ("c3", 1, "c1/c3"), ("c4", 2, "c1/c3/c4"), ("c5", 1, "c1/c5")])
+
+    async def test_children_before_parent(self):
+        await self.add_comment("c4", "c3")
+        await self.add_comment("c3", "c1")
+        await self.add_comment("c1", 0)
+        self.assertEqual([(row["comment_id"], row["depth"], row["path"]) for row in self.index.get_thread("xhs", "c1")],
+                         [("c1", 0, "c1"), ("c3", 1, "c1/c3"), ("c4", 2, "c1/c3/c4")])
+        self.assertEqual(tree_ids(self.index.get_comment_tree("xhs", "n1")), [("c1", [("c3", [("c4", [])])])])
+
+    async def test_missing_parent_is_kept_as_root(self):
+        await self.add_comment("c2", "deleted")
+        self.assertEqual(tree_ids(self.index.get_comment_tree("xhs", "n1")), [("c2", [])])
+
+    async def test_export_comment_trees(self):
+        await self.add_comment("c1", 0)
+        await self.add_comment("c2", "c1")
+        await self.add_comment("x1", 0, note_id="n2")
+        output_file = f"{self.tmp_dir.name}/trees.jsonl"
+        self.assertEqual(export_comment_trees("xhs", output_file, index_file=self.index.index_file), 2)
+        with open(output_file, encoding="utf-8") as f:
+            trees = {line["content_id"]: tree_ids(line["comments"]) for line in map(json.loads, f)}
+        self.assertEqual(trees, {"n1": [("c1", [("c2", [])])], "n2": [("x1", [])]})
@@ -0,0 +1,52 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+import json
+from unittest import IsolatedAsyncioTestCase
+
+from media_platform.tieba.help import TieBaExtractor
+from media_platform.xhs.help import get_note_dict
+from test.fixtures import load_test_data
+from tools.extract_executor import ExtractExecutor
+
+
+class TestExtractExecutor(IsolatedAsyncioTestCase):
+
+    async def test_inline_and_offload_same_result(self):
+        extractor = TieBaExtractor()
+        page_content = load_test_data("tieba_note_list.html")
+        executor = ExtractExecutor(max_workers=1, min_size=len(page_content), enable=True)
+        try:
+            offload_notes = await executor.run(extractor.extract_tieba_note_list, page_content)
+            comments = await executor.run(extractor.extract_tieba_note_parment_comments,
+                                          load_test_data("note_comments.html"), "123456")
+            # 小于 min_size 的页面直接解析
+            search_notes = await executor.run(extractor.extract_search_note_list,
+                                              load_test_data("search_keyword_notes.html"))
+        finally:
+            executor.shutdown()
+        self.assertEqual((executor.offload_count, executor.inline_count), (2, 1))
+        self.assertEqual([note.model_dump() for note in offload_notes],
+                         [note.model_dump() for note in extractor.extract_tieba_note_list(page_content)])
+        self.assertEqual(len(comments), 30)
+        self.assertEqual(len(search_notes), 10)
+
+    async def test_disabled_runs_inline(self):
+        executor = ExtractExecutor(min_size=0, enable=False)
+        state = {"note": {"noteDetailMap": {"n1": {"note": {"noteId": "n1", "interactInfo": {"likedCount": "1"},
+                                                             "imageList": [{"urlDefault": "u"}], "desc": ""}}}}}
+        html = f"<script>window.__INITIAL_STATE__={json.dumps(state)}</script>"
+        self.assertEqual(await executor.run(get_note_dict, html, "n1"),
+                         {"note_id": "n1", "interact_info": {"liked_count": "1"}, "image_list": [{"url_default": "u"}],
+                          "desc": ""})
+        self.assertIsNone(executor._executor)
+        self.assertEqual(executor.inline_count, 1)
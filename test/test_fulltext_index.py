@@ -0,0 +1,66 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+import json
+import tempfile
+from unittest import IsolatedAsyncioTestCase
+
+from store.fulltext_index import FullTextIndex, FullTextIndexStage, build_index_from_files, build_match_query
+
+
+class TestFullTextIndex(IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.index = FullTextIndex(index_file=f"{self.tmp_dir.name}/fulltext.db")
+
+    def tearDown(self):
+        self.index.close()
+        self.tmp_dir.cleanup()
+
+    def test_build_match_query(self):
+        self.assertEqual(build_match_query("红烧肉 好吃！"), '"红烧肉" "好吃"')
+        self.assertEqual(build_match_query("！！"), "")
+
+    async def test_stage_indexes_across_platforms(self):
+        stage = FullTextIndexStage(self.index, batch_size=2)
+        await stage.process("xhs", "comments", {"comment_id": "c1", "note_id": "n1", "content": "这家的红烧肉真好吃"})
+        await stage.process("wb", "comments", {"comment_id": "c2", "note_id": "n2", "content": "红烧肉太油腻了"})
+        await stage.process("zhihu", "contents", {"content_id": "z1", "title": "如何做红烧肉", "desc": "",
+                                                  "content_text": "五花肉切块"})
+        # 攒够一批才写入，剩下的在 close 时写入
+        self.assertEqual(self.index.count(), 2)
+        await stage.flush()
+
+        results = self.index.search("红烧肉")
+        self.assertEqual({result["item_id"] for result in results}, {"c1", "c2", "z1"})
+        results = self.index.search("红烧肉", platforms=["xhs", "zhihu"], item_type="comments")
+        self.assertEqual([(result["item_id"], result["content_id"]) for result in results], [("c1", "n1")])
+        self.assertEqual(self.index.search("五花肉")[0]["platform"], "zhihu")
+
+    def test_update_replaces_old_tokens(self):
+        self.index.add_many([("xhs", "comments", "c1", "n1", "红烧肉好吃")])
+        self.index.add_many([("xhs", "comments", "c1", "n1", "糖醋排骨好吃")])
+        self.assertEqual(self.index.count(), 1)
+        self.assertEqual(self.index.search("红烧肉"), [])
+        self.assertEqual(self.index.search("排骨")[0]["text"], "糖醋排骨好吃")
+
+    def test_build_index_from_files(self):
+        data_file = f"{self.tmp_dir.name}/search_comments_2024-01-01.json"
+        with open(data_file, "w", encoding="utf-8") as f:
+            json.dump([
+                {"comment_id": "1", "note_id": "n1", "content": "周末去爬山，风景很好"},
+                {"comment_id": "2", "note_id": "n1", "content": ""},
+            ], f, ensure_ascii=False)
+        count = build_index_from_files("xhs", "comments", "json", data_file, index_file=self.index.index_file)
+        self.assertEqual(count, 1)
+        self.assertEqual(self.index.search("爬山")[0]["item_id"], "1")
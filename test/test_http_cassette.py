@@ -0,0 +1,105 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+import os
+import tempfile
+from unittest import IsolatedAsyncioTestCase
+from urllib.parse import urlencode
+
+import httpx
+
+import config
+from media_platform.tieba.client import BaiduTieBaClient
+from media_platform.tieba.help import TieBaExtractor
+from test.fixtures import load_test_data
+from tools import http_cassette
+from tools.http_cassette import Cassette, CassetteMissError, create_async_client
+
+
+class TestHttpCassette(IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cassette_file = f"{self.tmp_dir.name}/cassette.jsonl"
+        self.origin_mode = config.HTTP_CASSETTE_MODE
+
+    def tearDown(self):
+        config.HTTP_CASSETTE_MODE = self.origin_mode
+        http_cassette.set_cassette(None)
+        self.tmp_dir.cleanup()
+
+    def test_request_key(self):
+        cassette = Cassette(self.cassette_file, ignore_params=["w_rid", "wts"])
+        self.assertEqual(
+            cassette.request_key("get", "https://api.bilibili.com/x/v2/reply?oid=1&type=1&wts=100&w_rid=abc"),
+            cassette.request_key("GET", "https://api.bilibili.com/x/v2/reply?type=1&oid=1&wts=200&w_rid=def"),
+        )
+        self.assertNotEqual(
+            cassette.request_key("POST", "https://edith.xiaohongshu.com/api", b'{"page":1}'),
+            cassette.request_key("POST", "https://edith.xiaohongshu.com/api", b'{"page":2}'),
+        )
+
+    async def test_record_then_replay(self):
+        counter = {"count": 0}
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            counter["count"] += 1
+            return httpx.Response(200, json={"page": request.url.params["page"], "count": counter["count"]},
+                                  headers={"set-cookie": "a=1"})
+
+        config.HTTP_CASSETTE_MODE = http_cassette.MODE_RECORD
+        http_cassette.set_cassette(Cassette(self.cassette_file))
+        async with create_async_client(transport=httpx.MockTransport(handler)) as client:
+            for page in (1, 1, 2):
+                await client.get("https://www.zhihu.com/api/v4/search_v3", params={"page": page})
+        self.assertEqual(counter["count"], 3)
+
+        config.HTTP_CASSETTE_MODE = http_cassette.MODE_REPLAY
+        cassette = Cassette(self.cassette_file)
+        http_cassette.set_cassette(cassette)
+        self.assertEqual(len(cassette), 3)
+        async with create_async_client(proxies="http://127.0.0.1:1") as client:
+            responses = [(await client.get("https://www.zhihu.com/api/v4/search_v3", params={"page": page})).json()
+                         for page in (1, 1, 1, 2)]
+            # 同一个请求按录制顺序回放，录制的响应用完后重复最后一次
+            self.assertEqual([response["count"] for response in responses], [1, 2, 2, 3])
+            self.assertEqual(responses[3]["page"], "2")
+            with self.assertRaises(CassetteMissError):
+                await client.get("https://www.zhihu.com/api/v4/search_v3", params={"page": 3})
+        self.assertEqual(counter["count"], 3)
+        self.assertEqual((cassette.hit_count, cassette.miss_count), (4, 1))
+
+    async def test_skip_recording_media(self):
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(200, content=b"x" * 1024)
+
+        config.HTTP_CASSETTE_MODE = http_cassette.MODE_RECORD
+        cassette = Cassette(self.cassette_file)
+        http_cassette.set_cassette(cassette)
+        async with create_async_client(record=False, transport=httpx.MockTransport(handler)) as client:
+            async with client.stream("GET", "https://sns-video-bd.xhscdn.com/video.mp4") as response:
+                self.assertEqual(len(await response.aread()), 1024)
+        self.assertEqual(len(cassette), 0)
+        self.assertFalse(os.path.exists(self.cassette_file))
+
+    async def test_replay_client_flow(self):
+        page_content = load_test_data("search_keyword_notes.html")
+        params = {"isnew": 1, "qw": "编程", "rn": 10, "pn": 1, "sm": 1, "only_thread": 0}
+        cassette = Cassette(self.cassette_file)
+        cassette.add("GET", f"https://tieba.baidu.com/f/search/res?{urlencode(params)}", b"", 200,
+                     [["content-type", "text/html; charset=utf-8"]], page_content.encode("utf-8"))
+
+        config.HTTP_CASSETTE_MODE = http_cassette.MODE_REPLAY
+        http_cassette.set_cassette(Cassette(self.cassette_file))
+        notes = await BaiduTieBaClient().get_notes_by_keyword("编程")
+        self.assertEqual(notes, TieBaExtractor().extract_search_note_list(page_content))
+        self.assertTrue(notes)
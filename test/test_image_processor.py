@@ -0,0 +1,52 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+import os
+import tempfile
+from unittest import IsolatedAsyncioTestCase
+
+from PIL import Image
+
+import config
+from tools.image_processor import ImagePostProcessor, process_image
+
+
+class TestImagePostProcessor(IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.source_file = os.path.join(self.tmp_dir.name, "0.webp")
+        Image.new("RGBA", (800, 400), (255, 0, 0, 128)).save(self.source_file, format="WEBP")
+
+    def test_process_image(self):
+        output_dir = os.path.join(self.tmp_dir.name, "out")
+        output_files = process_image(self.source_file, output_dir, (320, 320), "JPEG")
+        self.assertEqual(output_files, [os.path.join(output_dir, "0.jpg"), os.path.join(output_dir, "0_320x320.jpg")])
+        with Image.open(output_files[1]) as thumbnail:
+            self.assertEqual(thumbnail.format, "JPEG")
+            self.assertEqual(thumbnail.size, (320, 160))
+
+    async def test_submit_and_shutdown(self):
+        origin_config = (config.IMAGE_THUMBNAIL_SIZE, config.IMAGE_NORMALIZE_FORMAT)
+        config.IMAGE_THUMBNAIL_SIZE, config.IMAGE_NORMALIZE_FORMAT = (100, 100), None
+        try:
+            processor = ImagePostProcessor(max_workers=1, output_path=os.path.join(self.tmp_dir.name, "thumbnails"))
+            await processor.submit("xhs", "note1", self.source_file)
+            await processor.submit("xhs", "note1", os.path.join(self.tmp_dir.name, "missing.jpg"))
+            await processor.shutdown()
+        finally:
+            config.IMAGE_THUMBNAIL_SIZE, config.IMAGE_NORMALIZE_FORMAT = origin_config
+        self.assertEqual((processor.done_count, processor.failed_count), (1, 1))
+        self.assertTrue(os.path.exists(os.path.join(self.tmp_dir.name, "thumbnails/xhs/note1/0_100x100.webp")))
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
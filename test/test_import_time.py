@@ -0,0 +1,58 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# 用 python -X importtime 检查启动时没有加载不需要的重量级依赖
+import os
+import subprocess
+import sys
+import unittest
+from typing import Dict
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ["pandas", "jieba", "matplotlib", "wordcloud", "aiomysql"]
+
+
+def import_time(code: str) -> Dict[str, int]:
+    """
+    在子进程中执行代码，返回 模块名 -> 累计导入耗时(微秒)
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, check=True,
+    )
+    modules = {}
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = int(cumulative)
+    return modules
+
+
+class TestImportTime(unittest.TestCase):
+
+    def test_import_main(self):
+        modules = import_time("import main")
+        for module in HEAVY_MODULES + ["media_platform.xhs.core", "media_platform.douyin.core", "execjs"]:
+            self.assertNotIn(module, modules, f"import main: {modules['main'] / 1000:.1f} ms")
+
+    def test_create_selected_crawler_only(self):
+        modules = import_time("import main; main.CrawlerFactory.create_crawler('bili')")
+        self.assertIn("media_platform.bilibili.core", modules)
+        for module in HEAVY_MODULES + ["media_platform.xhs.core", "media_platform.douyin.core", "store.xhs.xhs_store_impl"]:
+            self.assertNotIn(module, modules)
+
+
+if __name__ == '__main__':
+    unittest.main()
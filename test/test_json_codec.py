@@ -0,0 +1,81 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+import json
+import pickle
+import tempfile
+import unittest
+from unittest import IsolatedAsyncioTestCase
+
+import httpx
+
+from cache.redis_cache import deserialize_value, serialize_value
+from config import db_config
+from store.tieba.tieba_store_impl import TieBaJsonStoreImplement
+from test.benchmark.bench_json_codec import make_douyin_aweme_payload
+from tools import json_codec
+
+
+class TestJsonCodec(unittest.TestCase):
+
+    def test_dumps_and_loads(self):
+        payload = make_douyin_aweme_payload(3)
+        self.assertEqual(json_codec.loads(json_codec.dumps(payload)), payload)
+        self.assertEqual(json_codec.loads(json_codec.dumps_bytes(payload, indent=True)), payload)
+        self.assertEqual(json_codec.dumps({"name": "程序员", "list": [1, None]}), '{"name":"程序员","list":[1,null]}')
+        self.assertEqual(json_codec.dumps({"a": [1]}, indent=True), '{\n  "a": [\n    1\n  ]\n}')
+        # 超过 64 位的整数
+        self.assertEqual(json_codec.loads(json_codec.dumps(2 ** 70)), 2 ** 70)
+        self.assertEqual(json_codec.dumps({"ts": object()}, default=lambda value: "obj"), '{"ts":"obj"}')
+
+    def test_dumps_compat(self):
+        payload = make_douyin_aweme_payload(3)
+        self.assertEqual(json_codec.dumps_compat(payload), json.dumps(payload, ensure_ascii=False))
+        self.assertEqual(json_codec.dumps_compat_bytes(payload, indent=4),
+                         json.dumps(payload, ensure_ascii=False, indent=4).encode("utf-8"))
+        self.assertEqual(json_codec.dumps_compat({"location": "广东", "age": "18"}), '{"location": "广东", "age": "18"}')
+
+    def test_response_json(self):
+        response = httpx.Response(200, content='{"msg": "成功"}'.encode("utf-8"),
+                                  headers={"content-type": "application/json; charset=utf-8"})
+        self.assertEqual(json_codec.response_json(response), {"msg": "成功"})
+        response = httpx.Response(200, content='{"msg": "成功"}'.encode("gbk"),
+                                  headers={"content-type": "application/json; charset=gbk"})
+        self.assertEqual(json_codec.response_json(response), {"msg": "成功"})
+
+    def test_cache_serializer(self):
+        self.assertEqual(serialize_value({"ip": "127.0.0.1"})[:1], b"J")
+        self.assertEqual(deserialize_value(serialize_value({"ip": "127.0.0.1"})), {"ip": "127.0.0.1"})
+        self.assertEqual(deserialize_value(serialize_value(b"raw")), b"raw")
+        # 旧版本写入的 pickle 数据
+        self.assertEqual(deserialize_value(pickle.dumps([1, 2])), [1, 2])
+
+        origin_serializer = db_config.CACHE_SERIALIZER
+        db_config.CACHE_SERIALIZER = "pickle"
+        try:
+            self.assertEqual(deserialize_value(serialize_value((1, 2))), (1, 2))
+        finally:
+            db_config.CACHE_SERIALIZER = origin_serializer
+
+
+class TestJsonStore(IsolatedAsyncioTestCase):
+
+    async def test_json_store_appends(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            store = TieBaJsonStoreImplement()
+            store.json_store_path = f"{tmp_dir}/json"
+            store.words_store_path = f"{tmp_dir}/words"
+            await store.store_content({"note_id": "1", "title": "标题"})
+            await store.store_content({"note_id": "2", "title": "标题2"})
+            with open(store.make_save_file_name("contents")[0], encoding="utf-8") as f:
+                # 数据文件的格式和原来的 json.dumps(save_data, ensure_ascii=False) 一致
+                self.assertEqual(f.read(), '[{"note_id": "1", "title": "标题"}, {"note_id": "2", "title": "标题2"}]')
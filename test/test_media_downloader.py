@@ -0,0 +1,195 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+import asyncio
+import os
+import tempfile
+import time
+from typing import Dict, Optional
+from unittest import IsolatedAsyncioTestCase
+
+import config
+from store import media_store
+from tools import http_cassette
+from tools.http_cassette import Cassette
+from tools.media_downloader import (MediaDownloadPipeline, MediaTask, MediaTaskJournal, fetch_media,
+                                    preflight_media)
+
+
+class TestMediaDownloadPipeline(IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.saved: Dict[str, bytes] = {}
+
+    async def fetch(self, url: str, on_chunk) -> Optional[bytes]:
+        await asyncio.sleep(0.01)
+        if url.endswith("404"):
+            return None
+        await on_chunk(len(url))
+        return url.encode()
+
+    async def save(self, task: MediaTask, content: bytes):
+        self.saved[task.key] = content
+
+    async def test_download_all_submitted_tasks(self):
+        pipeline = MediaDownloadPipeline("xhs", self.fetch, self.save, workers=3, max_bytes_per_sec=0,
+                                         queue_dir=self.tmp_dir.name)
+        await pipeline.start()
+        for i in range(10):
+            await pipeline.submit(MediaTask(platform="xhs", note_id="n1", url=f"http://a/{i}", slot=f"{i}.jpg"))
+        await pipeline.submit(MediaTask(platform="xhs", note_id="n1", url="http://a/404", slot="10.jpg"))
+        await pipeline.close()
+
+        self.assertEqual(len(self.saved), 10)
+        self.assertEqual(pipeline.progress()["failed"], 1)
+        self.assertEqual(pipeline.progress()["pending"], 0)
+        # 失败的任务留在日志中，下次启动时重试
+        self.assertEqual([task.slot for task in pipeline.journal.load_pending()], ["10.jpg"])
+
+    async def test_clear_journal_when_all_done(self):
+        pipeline = MediaDownloadPipeline("xhs", self.fetch, self.save, workers=1, max_bytes_per_sec=0,
+                                         queue_dir=self.tmp_dir.name)
+        await pipeline.start()
+        await pipeline.submit(MediaTask(platform="xhs", note_id="n1", url="http://a/0", slot="0.jpg"))
+        await pipeline.close()
+        self.assertFalse(os.path.exists(pipeline.journal.journal_file))
+
+    async def test_spill_to_journal_when_queue_full(self):
+        pipeline = MediaDownloadPipeline("xhs", self.fetch, self.save, workers=2, max_bytes_per_sec=0,
+                                         queue_dir=self.tmp_dir.name, queue_size=3)
+        await pipeline.start()
+        tasks = [MediaTask(platform="xhs", note_id="n1", url=f"http://a/{i}", slot=f"{i}.jpg") for i in range(20)]
+        for task in tasks:
+            await pipeline.submit(task)
+        self.assertEqual(pipeline._queue.qsize(), 3)
+        self.assertEqual(len(pipeline._spilled_keys), 17)
+        await pipeline.close()
+        self.assertEqual(list(self.saved.keys()), [task.key for task in tasks])
+        self.assertEqual(pipeline.progress()["done"], 20)
+
+    async def test_limit_bandwidth_while_streaming(self):
+        chunk_times = []
+
+        async def fetch(url: str, on_chunk) -> Optional[bytes]:
+            for _ in range(5):
+                await on_chunk(1000)
+                chunk_times.append(time.monotonic())
+            return b"x" * 5000
+
+        pipeline = MediaDownloadPipeline("xhs", fetch, self.save, workers=1, max_bytes_per_sec=50000,
+                                         queue_dir=self.tmp_dir.name)
+        await pipeline.start()
+        await pipeline.submit(MediaTask(platform="xhs", note_id="n1", url="http://a/0", slot="0.jpg"))
+        await pipeline.close()
+        # 每块 1000 字节占用 20ms 带宽，限速发生在读取每一块时而不是下载完成后
+        self.assertGreaterEqual(chunk_times[-1] - chunk_times[0], 0.07)
+
+    async def test_fetch_media_reports_chunks(self):
+        origin_mode = config.HTTP_CASSETTE_MODE
+        cassette = Cassette(f"{self.tmp_dir.name}/media.jsonl")
+        cassette.add("GET", "http://a/video.mp4", b"", 200, [], b"x" * 2048)
+        cassette.add("GET", "http://a/missing.mp4", b"", 404, [], b"not found")
+        config.HTTP_CASSETTE_MODE = "replay"
+        http_cassette.set_cassette(cassette)
+        chunk_sizes = []
+
+        async def on_chunk(size: int):
+            chunk_sizes.append(size)
+
+        try:
+            self.assertEqual(await fetch_media("http://a/video.mp4", on_chunk=on_chunk), b"x" * 2048)
+            self.assertIsNone(await fetch_media("http://a/missing.mp4", on_chunk=on_chunk))
+        finally:
+            config.HTTP_CASSETTE_MODE = origin_mode
+            http_cassette.set_cassette(None)
+        self.assertEqual(sum(chunk_sizes), 2048)
+
+    async def test_resume_pending_tasks_from_journal(self):
+        journal = MediaTaskJournal(f"{self.tmp_dir.name}/xhs_pending.jsonl")
+        finished = MediaTask(platform="xhs", note_id="n1", url="http://a/0", slot="0.jpg")
+        unfinished = MediaTask(platform="xhs", note_id="n1", url="http://a/1", slot="1.jpg")
+        journal.add(finished)
+        journal.add(unfinished)
+        journal.done(finished)
+
+        pipeline = MediaDownloadPipeline("xhs", self.fetch, self.save, workers=1, max_bytes_per_sec=0,
+                                         queue_dir=self.tmp_dir.name)
+        await pipeline.start()
+        await pipeline.close()
+        self.assertEqual(list(self.saved.keys()), [unfinished.key])
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+
+class TestPreflightMedia(IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.origin_config = (config.MEDIA_MAX_BYTES, config.MEDIA_MAX_DURATION_SEC,
+                              config.ENABLE_MEDIA_SIZE_PROBE, config.MEDIA_OVERSIZE_ACTION, config.MEDIA_RESUME_DEFERRED)
+        config.MEDIA_MAX_BYTES = 100
+        config.MEDIA_MAX_DURATION_SEC = 60
+        config.ENABLE_MEDIA_SIZE_PROBE = False
+        media_store._media_store = media_store.ContentAddressedMediaStore(store_path=self.tmp_dir.name)
+
+    async def test_allow_media_within_limits(self):
+        task = MediaTask(platform="bili", note_id="1", url="http://a/1", slot="video.mp4")
+        self.assertTrue(await preflight_media(task, size=100, duration=60))
+        self.assertTrue(await preflight_media(task))
+
+    async def test_record_oversize_media(self):
+        config.MEDIA_OVERSIZE_ACTION = "defer"
+        too_large = MediaTask(platform="bili", note_id="1", url="http://a/1", slot="video.mp4")
+        too_long = MediaTask(platform="bili", note_id="2", url="http://a/2", slot="video.mp4")
+        self.assertFalse(await preflight_media(too_large, size=101))
+        self.assertFalse(await preflight_media(too_long, duration=61))
+
+        deferred = media_store.get_media_store().index.list_decisions("bili", "defer")
+        self.assertEqual([item["note_id"] for item in deferred], ["1", "2"])
+        self.assertEqual(deferred[0]["size"], 101)
+        self.assertEqual(deferred[1]["duration"], 61)
+
+    async def test_resume_deferred_media(self):
+        config.MEDIA_OVERSIZE_ACTION = "defer"
+        small = MediaTask(platform="bili", note_id="1", url="http://a/1", slot="video.mp4")
+        large = MediaTask(platform="bili", note_id="2", url="http://a/2", slot="video.mp4")
+        self.assertFalse(await preflight_media(small, size=150))
+        self.assertFalse(await preflight_media(large, size=1000))
+
+        # 调大上限后，符合新上限的文件重新加入下载队列
+        config.MEDIA_MAX_BYTES = 500
+        saved = {}
+
+        async def fetch(url: str, on_chunk) -> Optional[bytes]:
+            return url.encode()
+
+        async def save(task: MediaTask, content: bytes):
+            saved[task.key] = content
+
+        config.MEDIA_RESUME_DEFERRED = True
+        pipeline = MediaDownloadPipeline("bili", fetch, save, workers=1, max_bytes_per_sec=0,
+                                         queue_dir=self.tmp_dir.name)
+        await pipeline.start()
+        await pipeline.close()
+        self.assertEqual(list(saved.keys()), [small.key])
+        self.assertEqual(pipeline.progress()["total"], 1)
+        deferred = media_store.get_media_store().index.list_decisions("bili", "defer")
+        self.assertEqual([item["note_id"] for item in deferred], ["2"])
+
+    def tearDown(self):
+        media_store._media_store.index.close()
+        media_store._media_store = None
+        (config.MEDIA_MAX_BYTES, config.MEDIA_MAX_DURATION_SEC,
+         config.ENABLE_MEDIA_SIZE_PROBE, config.MEDIA_OVERSIZE_ACTION, config.MEDIA_RESUME_DEFERRED) = self.origin_config
+        self.tmp_dir.cleanup()
@@ -0,0 +1,60 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+import os
+import pathlib
+import tempfile
+from unittest import IsolatedAsyncioTestCase
+
+from store.media_store import ContentAddressedMediaStore
+
+
+class TestContentAddressedMediaStore(IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.media_store = ContentAddressedMediaStore(store_path=f"{self.tmp_dir.name}/media")
+
+    async def test_save_dedup_across_notes(self):
+        path1 = await self.media_store.save("xhs", "note1", "0.jpg", b"same image")
+        path2 = await self.media_store.save("xhs", "note2", "3.jpg", b"same image")
+        self.assertEqual(path1, path2)
+        self.assertTrue(os.path.exists(path1))
+        self.assertEqual(self.media_store.resolve("xhs", "note2", "3.jpg"), path1)
+        self.assertEqual(self.media_store.index.count_references(self.media_store.hash_content(b"same image")), 2)
+
+        blob_files = [p for p in pathlib.Path(self.media_store.blob_path).rglob("*") if p.is_file()]
+        self.assertEqual(len(blob_files), 1)
+
+    async def test_blob_layout_is_sharded(self):
+        content_hash = self.media_store.hash_content(b"video")
+        path = await self.media_store.save("bili", "123", "video.mp4", b"video")
+        self.assertTrue(path.endswith(f"/{content_hash[:2]}/{content_hash[2:4]}/{content_hash}.mp4"))
+
+    def test_migrate_legacy_dir(self):
+        legacy_dir = pathlib.Path(self.tmp_dir.name) / "images"
+        (legacy_dir / "note1").mkdir(parents=True)
+        (legacy_dir / "note2").mkdir(parents=True)
+        (legacy_dir / "note1" / "0.jpg").write_bytes(b"a")
+        (legacy_dir / "note2" / "0.jpg").write_bytes(b"a")
+        (legacy_dir / "pic1.jpg").write_bytes(b"b")
+
+        files, saved = self.media_store.migrate_legacy_dir("xhs", str(legacy_dir), remove_source=True)
+        self.assertEqual(files, 3)
+        self.assertEqual(saved, 1)
+        self.assertIsNotNone(self.media_store.resolve("xhs", "note2", "0.jpg"))
+        self.assertIsNotNone(self.media_store.resolve("xhs", "pic1", "pic1.jpg"))
+        self.assertFalse((legacy_dir / "note1" / "0.jpg").exists())
+
+    def tearDown(self):
+        self.media_store.index.close()
+        self.tmp_dir.cleanup()
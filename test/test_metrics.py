@@ -0,0 +1,177 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+import json
+import socket
+import tempfile
+from typing import Dict
+from unittest import IsolatedAsyncioTestCase
+
+import httpx
+
+import config
+from base.base_crawler import AbstractStore
+from store.pipeline import wrap_store
+from tools import metrics
+from tools.http_cassette import create_async_client
+from tools.metrics import MetricsExporter, MetricsRegistry, TimedSemaphore, normalize_endpoint
+
+
+class MemoryStore(AbstractStore):
+    def __init__(self):
+        self.items = []
+
+    async def store_content(self, content_item: Dict):
+        self.items.append(content_item)
+
+    async def store_comment(self, comment_item: Dict):
+        self.items.append(comment_item)
+
+    async def store_creator(self, creator: Dict):
+        self.items.append(creator)
+
+
+class TestMetrics(IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.origin_enable_metrics = config.ENABLE_METRICS
+        config.ENABLE_METRICS = True
+        metrics.REGISTRY.reset()
+
+    def tearDown(self):
+        config.ENABLE_METRICS = self.origin_enable_metrics
+        metrics.REGISTRY.reset()
+        self.tmp_dir.cleanup()
+
+    def test_disabled(self):
+        config.ENABLE_METRICS = False
+        registry = MetricsRegistry()
+        counter = registry.counter("test_total", "test", ("status",))
+        histogram = registry.histogram("test_seconds", "test")
+        counter.inc(status=200)
+        histogram.observe(0.1)
+        with histogram.time():
+            pass
+        self.assertEqual(counter.snapshot(), [])
+        self.assertEqual(histogram.snapshot(), [])
+
+    def test_render_prometheus(self):
+        registry = MetricsRegistry()
+        counter = registry.counter("test_requests_total", "requests", ("endpoint", "status"))
+        gauge = registry.gauge("test_in_use", "in use")
+        histogram = registry.histogram("test_seconds", "latency", ("endpoint",), buckets=(0.1, 1))
+        counter.inc(endpoint='/a"b', status=200)
+        counter.inc(2, endpoint='/a"b', status=200)
+        gauge.inc()
+        gauge.inc()
+        gauge.dec()
+        histogram.observe(0.05, endpoint="/a")
+        histogram.observe(0.5, endpoint="/a")
+        histogram.observe(5, endpoint="/a")
+
+        lines = registry.render_prometheus().splitlines()
+        self.assertIn("# TYPE test_requests_total counter", lines)
+        self.assertIn('test_requests_total{endpoint="/a\\"b",status="200"} 3', lines)
+        self.assertIn("test_in_use 1", lines)
+        self.assertIn('test_seconds_bucket{endpoint="/a",le="0.1"} 1', lines)
+        self.assertIn('test_seconds_bucket{endpoint="/a",le="1"} 2', lines)
+        self.assertIn('test_seconds_bucket{endpoint="/a",le="+Inf"} 3', lines)
+        self.assertIn('test_seconds_count{endpoint="/a"} 3', lines)
+        self.assertEqual(registry.snapshot()["metrics"]["test_seconds"]["samples"][0]["buckets"],
+                         {"0.1": 1, "1": 1, "+Inf": 1})
+
+    def test_normalize_endpoint(self):
+        self.assertEqual(normalize_endpoint("tieba.baidu.com", "/p/9117905169"), "tieba.baidu.com/p/:id")
+        self.assertEqual(normalize_endpoint("www.zhihu.com", "/api/v4/comment_v5/zvideos/1424368906836807681/root_comment"),
+                         "www.zhihu.com/api/v4/comment_v5/zvideos/:id/root_comment")
+        self.assertEqual(normalize_endpoint("edith.xiaohongshu.com", "/api/sns/web/v1/feed"),
+                         "edith.xiaohongshu.com/api/sns/web/v1/feed")
+
+    async def test_http_hooks(self):
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(404 if request.url.path.endswith("missing") else 200, content=b"x" * 100)
+
+        async with create_async_client(transport=httpx.MockTransport(handler)) as client:
+            await client.get("https://tieba.baidu.com/p/123456")
+            await client.get("https://tieba.baidu.com/p/654321")
+            await client.get("https://tieba.baidu.com/missing")
+
+        requests = {tuple(sample["labels"].values()): sample["value"] for sample in metrics.HTTP_REQUESTS.snapshot()}
+        self.assertEqual(requests[(config.PLATFORM, "GET", "tieba.baidu.com/p/:id", "200")], 2)
+        self.assertEqual(requests[(config.PLATFORM, "GET", "tieba.baidu.com/missing", "404")], 1)
+        self.assertEqual(sum(sample["value"] for sample in metrics.HTTP_RESPONSE_BYTES.snapshot()), 300)
+        self.assertEqual(sum(sample["count"] for sample in metrics.HTTP_REQUEST_SECONDS.snapshot()), 3)
+
+    async def test_http_hooks_keep_streaming(self):
+        class ChunkStream(httpx.AsyncByteStream):
+            async def __aiter__(self):
+                for _ in range(4):
+                    yield b"x" * 50000
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(200, stream=ChunkStream())
+
+        chunk_sizes = []
+        async with create_async_client(transport=httpx.MockTransport(handler)) as client:
+            async with client.stream("GET", "https://sns-video-bd.xhscdn.com/video.mp4") as response:
+                async for chunk in response.aiter_bytes():
+                    chunk_sizes.append(len(chunk))
+                    # 读到第一块时响应还没有读完，字节数要等响应关闭时才统计
+                    self.assertEqual(metrics.HTTP_RESPONSE_BYTES.snapshot(), [])
+
+        self.assertGreater(len(chunk_sizes), 1)
+        self.assertEqual(sum(chunk_sizes), 200000)
+        self.assertEqual(sum(sample["value"] for sample in metrics.HTTP_RESPONSE_BYTES.snapshot()), 200000)
+        self.assertEqual(sum(sample["count"] for sample in metrics.HTTP_REQUEST_SECONDS.snapshot()), 1)
+
+    async def test_semaphore_and_store(self):
+        semaphore = TimedSemaphore(2)
+        async with semaphore:
+            async with semaphore:
+                self.assertEqual(metrics.SEMAPHORE_IN_USE.snapshot()[0]["value"], 2)
+        self.assertEqual(metrics.SEMAPHORE_IN_USE.snapshot()[0]["value"], 0)
+        self.assertEqual(metrics.SEMAPHORE_WAIT_SECONDS.snapshot()[0]["count"], 2)
+
+        memory_store = MemoryStore()
+        store = wrap_store("xhs", memory_store)
+        await store.store_content({"note_id": "1"})
+        await store.store_comment({"comment_id": "1"})
+        await store.store_comment({"comment_id": "2"})
+        self.assertEqual(len(memory_store.items), 3)
+        counts = {sample["labels"]["item_type"]: sample["count"] for sample in metrics.STORE_WRITE_SECONDS.snapshot()}
+        self.assertEqual(counts, {"contents": 1, "comments": 2})
+
+    async def test_exporter(self):
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        dump_file = f"{self.tmp_dir.name}/metrics.json"
+        metrics.EXTRACT_SECONDS.observe(0.01, parser="extract_note_detail", mode="inline")
+
+        exporter = MetricsExporter(http_port=port, dump_file=dump_file)
+        await exporter.start()
+        try:
+            async with httpx.AsyncClient() as client:
+                response = await client.get(f"http://127.0.0.1:{port}/metrics")
+                self.assertEqual(response.status_code, 200)
+                self.assertIn('crawler_extract_seconds_count{parser="extract_note_detail",mode="inline"} 1',
+                              response.text)
+                response = await client.get(f"http://127.0.0.1:{port}/metrics.json")
+                self.assertIn("crawler_extract_seconds", response.json()["metrics"])
+                self.assertEqual((await client.get(f"http://127.0.0.1:{port}/")).status_code, 404)
+        finally:
+            await exporter.stop()
+
+        with open(dump_file, encoding="utf-8") as f:
+            samples = json.load(f)["metrics"]["crawler_extract_seconds"]["samples"]
+        self.assertEqual(samples[0]["count"], 1)
@@ -0,0 +1,70 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+import tempfile
+from unittest import IsolatedAsyncioTestCase
+
+from store.metrics_history import MetricsHistory, MetricsHistoryStage, parse_count_value
+
+
+class TestMetricsHistory(IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.history_file = f"{self.tmp_dir.name}/metrics_history.db"
+        self.history = MetricsHistory(self.history_file)
+
+    def tearDown(self):
+        self.history.close()
+        self.tmp_dir.cleanup()
+
+    def test_parse_count_value(self):
+        self.assertEqual(parse_count_value("1.2万"), 12000)
+        self.assertEqual(parse_count_value("10+"), 10)
+        self.assertEqual(parse_count_value(35), 35)
+        self.assertIsNone(parse_count_value(""))
+        self.assertIsNone(parse_count_value(None))
+
+    def test_record_only_changes(self):
+        self.assertEqual(self.history.record("xhs", "n1", {"liked_count": 10, "comment_count": 1}, ts=100), 2)
+        self.assertEqual(self.history.record("xhs", "n1", {"liked_count": 10, "comment_count": 1}, ts=200), 0)
+        self.assertEqual(self.history.record("xhs", "n1", {"liked_count": 25, "comment_count": 1}, ts=300), 1)
+        self.assertEqual(self.history.get_growth("xhs", "n1"),
+                         {"comment_count": [(100, 1)], "liked_count": [(100, 10), (300, 25)]})
+        self.assertEqual(self.history.get_value_at("xhs", "n1", "liked_count", 250), 10)
+        self.assertIsNone(self.history.get_value_at("xhs", "n1", "liked_count", 50))
+
+    def test_latest_value_survives_restart(self):
+        self.history.record("dy", "a1", {"liked_count": 10}, ts=100)
+        self.history.close()
+        self.history = MetricsHistory(self.history_file)
+        self.assertEqual(self.history.record("dy", "a1", {"liked_count": 10}, ts=200), 0)
+
+    def test_top_growth(self):
+        self.history.record("xhs", "n1", {"liked_count": 10}, ts=100)
+        self.history.record("xhs", "n1", {"liked_count": 20}, ts=200)
+        self.history.record("xhs", "n2", {"liked_count": 5}, ts=100)
+        self.history.record("xhs", "n2", {"liked_count": 500}, ts=300)
+        self.assertEqual([(row["content_id"], row["growth"]) for row in self.history.top_growth("xhs", "liked_count")],
+                         [("n2", 495), ("n1", 10)])
+        self.assertEqual(self.history.top_growth("xhs", "liked_count", since_ts=250)[0]["growth"], 495)
+        self.assertEqual(self.history.top_growth("xhs", "liked_count", since_ts=250)[1]["growth"], 0)
+
+    async def test_stage_records_contents_only(self):
+        stage = MetricsHistoryStage(self.history)
+        item = {"note_id": "n1", "liked_count": "1万", "collected_count": "3", "comment_count": "", "share_count": None}
+        self.assertIs(await stage.process("xhs", "contents", item), item)
+        await stage.process("xhs", "comments", {"comment_id": "c1", "like_count": 3})
+        growth = self.history.get_growth("xhs", "n1")
+        self.assertEqual({metric: [value for _, value in points] for metric, points in growth.items()},
+                         {"collected_count": [3], "liked_count": [10000]})
+        self.assertEqual(self.history.get_growth("xhs", "c1"), {})
@@ -0,0 +1,107 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+import json
+import tempfile
+from typing import Dict, List
+from unittest import IsolatedAsyncioTestCase
+
+import config
+from base.base_crawler import AbstractStore
+from store.near_duplicate import (MinHasher, NearDuplicateIndex, NearDuplicateStage, detect_file_duplicates,
+                                  get_shingles, jaccard_similarity, normalize_text)
+from store.pipeline import StagedStore
+
+TEXT = "这家店的红烧肉真的太好吃了，肥而不腻，入口即化，下次还要带朋友一起来吃，强烈推荐给大家"
+
+
+class MemoryStore(AbstractStore):
+
+    def __init__(self):
+        self.contents: List[Dict] = []
+        self.comments: List[Dict] = []
+
+    async def store_content(self, content_item: Dict):
+        self.contents.append(content_item)
+
+    async def store_comment(self, comment_item: Dict):
+        self.comments.append(comment_item)
+
+    async def store_creator(self, creator: Dict):
+        pass
+
+
+class TestMinHash(IsolatedAsyncioTestCase):
+
+    def test_normalize_text(self):
+        self.assertEqual(normalize_text("Hello，World！[笑哭R] @小明 http://t.cn/abc"), "helloworld")
+
+    def test_similar_texts_are_close(self):
+        hasher = MinHasher(num_perm=128)
+
+        def signature(text):
+            return hasher.signature(get_shingles(normalize_text(text)))
+
+        self.assertEqual(jaccard_similarity(signature(TEXT), signature(TEXT + "!!! [赞R]")), 1.0)
+        self.assertGreater(jaccard_similarity(signature(TEXT), signature(TEXT + "哦")), 0.8)
+        self.assertLess(jaccard_similarity(signature(TEXT), signature("今天去爬山了，山顶的风景特别好，拍了很多照片")), 0.2)
+        # 固定随机种子，不同实例的签名可以相互比较
+        self.assertTrue((signature(TEXT) == MinHasher(num_perm=128).signature(get_shingles(normalize_text(TEXT)))).all())
+
+
+class TestNearDuplicateStage(IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.index = NearDuplicateIndex(index_file=f"{self.tmp_dir.name}/near_dup.db", threshold=0.7)
+        self.action = config.NEAR_DUP_ACTION
+
+    def tearDown(self):
+        config.NEAR_DUP_ACTION = self.action
+        self.index.close()
+        self.tmp_dir.cleanup()
+
+    async def test_tag_keeps_item_and_records_match(self):
+        config.NEAR_DUP_ACTION = "tag"
+        store = MemoryStore()
+        staged_store = StagedStore("xhs", store, [NearDuplicateStage(self.index)])
+        await staged_store.store_comment({"comment_id": "1", "content": TEXT})
+        await staged_store.store_comment({"comment_id": "2", "content": TEXT + "!!"})
+        # 同一条评论再次保存不算重复
+        await staged_store.store_comment({"comment_id": "1", "content": TEXT})
+        self.assertEqual(len(store.comments), 3)
+        matches = self.index.list_matches("comments")
+        self.assertEqual(len(matches), 1)
+        self.assertEqual((matches[0]["item_id"], matches[0]["dup_item_id"]), ("2", "1"))
+
+    async def test_suppress_drops_duplicates_across_platforms(self):
+        config.NEAR_DUP_ACTION = "suppress"
+        stage = NearDuplicateStage(self.index)
+        xhs_store, dy_store = MemoryStore(), MemoryStore()
+        await StagedStore("xhs", xhs_store, [stage]).store_content({"note_id": "n1", "title": "红烧肉", "desc": TEXT})
+        await StagedStore("dy", dy_store, [stage]).store_content({"aweme_id": "a1", "title": "红烧肉！", "desc": TEXT})
+        await StagedStore("dy", dy_store, [stage]).store_content({"aweme_id": "a2", "title": "短", "desc": ""})
+        self.assertEqual(len(xhs_store.contents), 1)
+        self.assertEqual([item["aweme_id"] for item in dy_store.contents], ["a2"])
+        self.assertEqual(self.index.list_matches("contents", platform="dy")[0]["dup_platform"], "xhs")
+
+    def test_detect_file_duplicates(self):
+        data_file = f"{self.tmp_dir.name}/search_comments_2024-01-01.json"
+        with open(data_file, "w", encoding="utf-8") as f:
+            json.dump([
+                {"comment_id": "1", "content": TEXT},
+                {"comment_id": "2", "content": "今天去爬山了，山顶的风景特别好，拍了很多照片"},
+                {"comment_id": "3", "content": "【转】" + TEXT},
+            ], f, ensure_ascii=False)
+        duplicates = detect_file_duplicates("xhs", "comments", "json", data_file,
+                                            index_file=f"{self.tmp_dir.name}/batch.db")
+        self.assertEqual([(item["item_id"], item["dup_item_id"]) for item in duplicates], [("3", "1")])
@@ -0,0 +1,57 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+import unittest
+
+import config
+from media_platform.tieba.help import TieBaExtractor
+from model import build_model
+from model.m_baidu_tieba import TiebaComment, TiebaNote
+from model.m_zhihu import ZhihuContent
+from test.benchmark.bench_model_construct import extract_all
+
+
+class TestParsedModels(unittest.TestCase):
+
+    def setUp(self):
+        self.validate_parsed_models = config.VALIDATE_PARSED_MODELS
+
+    def tearDown(self):
+        config.VALIDATE_PARSED_MODELS = self.validate_parsed_models
+
+    def extract_dumps(self, validate: bool):
+        config.VALIDATE_PARSED_MODELS = validate
+        return [(type(model), model.model_dump()) for model in extract_all(TieBaExtractor())]
+
+    def test_construct_same_as_validate(self):
+        validated = self.extract_dumps(True)
+        constructed = self.extract_dumps(False)
+        self.assertEqual(len(validated), 99)
+        self.assertEqual(constructed, validated)
+        # 字段顺序决定 csv 的表头，也要一致
+        self.assertEqual([list(values) for _, values in constructed], [list(values) for _, values in validated])
+
+    def test_build_model(self):
+        config.VALIDATE_PARSED_MODELS = False
+        note = build_model(TiebaNote, note_id="1", title="t", note_url="u", tieba_name="n", tieba_link="l")
+        self.assertEqual(note.model_dump(), TiebaNote(note_id="1", title="t", note_url="u", tieba_name="n",
+                                                      tieba_link="l").model_dump())
+        self.assertEqual(note.model_fields_set, {"note_id", "title", "note_url", "tieba_name", "tieba_link"})
+        note.title = "changed"
+        self.assertEqual(note.title, "changed")
+        self.assertEqual(build_model(ZhihuContent).model_dump(), ZhihuContent().model_dump())
+        # 缺少必填字段时退回 model_construct，不报错
+        self.assertEqual(build_model(TiebaComment, comment_id="c1").comment_id, "c1")
+
+        config.VALIDATE_PARSED_MODELS = True
+        with self.assertRaises(ValueError):
+            build_model(TiebaNote, note_id="1")
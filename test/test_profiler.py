@@ -0,0 +1,95 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+import asyncio
+import glob
+import json
+import tempfile
+import time
+from unittest import IsolatedAsyncioTestCase
+
+import config
+from tools import profiler
+from tools.metrics import TimedSemaphore
+from tools.profiler import ProfileSession
+
+
+async def busy_task(semaphore: asyncio.Semaphore):
+    async with semaphore:
+        deadline = time.perf_counter() + 0.02
+        while time.perf_counter() < deadline:
+            pass
+        await asyncio.sleep(0.01)
+
+
+class TestProfiler(IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.origin_profile_mode, self.origin_task_trace = config.PROFILE_MODE, config.ENABLE_TASK_TRACE
+
+    def tearDown(self):
+        config.PROFILE_MODE, config.ENABLE_TASK_TRACE = self.origin_profile_mode, self.origin_task_trace
+        self.tmp_dir.cleanup()
+
+    async def test_trace_tasks(self):
+        config.PROFILE_MODE, config.ENABLE_TASK_TRACE = "", True
+        config_path = config.PROFILE_PATH
+        config.PROFILE_PATH = self.tmp_dir.name
+        try:
+            profiler.start_profiling()
+            semaphore = TimedSemaphore(2)
+            await asyncio.gather(*[busy_task(semaphore) for _ in range(4)])
+            tracer = profiler.get_task_tracer()
+            self.assertEqual(tracer.live_tasks, 0)
+            self.assertEqual(tracer.max_live_tasks, 4)
+            profiler.stop_profiling()
+        finally:
+            config.PROFILE_PATH = config_path
+        self.assertIsNone(profiler.get_task_tracer())
+        self.assertIsNone(asyncio.get_running_loop().get_task_factory())
+
+        summary_file, = glob.glob(f"{self.tmp_dir.name}/*_tasks.json")
+        with open(summary_file, encoding="utf-8") as f:
+            summary = json.load(f)
+        stats = summary["coroutines"][0]
+        self.assertEqual(stats["name"], "busy_task")
+        self.assertEqual(stats["count"], 4)
+        self.assertEqual(stats["semaphore_waits"], 4)
+        # 4 个任务每个占用 CPU 20ms，并发数为 2，后两个任务开始等待时前两个任务还要 sleep 10ms 才释放信号量
+        self.assertGreaterEqual(stats["cpu_seconds"], 0.06)
+        self.assertGreaterEqual(stats["semaphore_wait_seconds"], 0.015)
+        self.assertGreater(stats["wall_seconds"], stats["run_seconds"])
+
+        with open(summary_file.replace("_tasks.json", "_tasks.trace.json"), encoding="utf-8") as f:
+            events = json.load(f)["traceEvents"]
+        self.assertEqual(sum(event["cat"] == "task" for event in events), 4)
+        self.assertEqual(sum(event["cat"] == "semaphore" for event in events), 4)
+
+    async def test_sample(self):
+        session = ProfileSession(profile_mode="sample", trace_tasks=False, output_prefix=f"{self.tmp_dir.name}/run")
+        session.start()
+        await busy_task(asyncio.Semaphore(1))
+        self.assertEqual(session.stop(), [f"{self.tmp_dir.name}/run.folded"])
+        with open(f"{self.tmp_dir.name}/run.folded", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        self.assertTrue(lines)
+        self.assertTrue(any("busy_task (" in line for line in lines))
+        self.assertTrue(all(int(line.rsplit(" ", 1)[1]) > 0 for line in lines))
+
+    async def test_cprofile(self):
+        session = ProfileSession(profile_mode="cprofile", trace_tasks=False, output_prefix=f"{self.tmp_dir.name}/run")
+        session.start()
+        await busy_task(asyncio.Semaphore(1))
+        session.stop()
+        with open(f"{self.tmp_dir.name}/run_cprofile.txt", encoding="utf-8") as f:
+            self.assertIn("busy_task", f.read())
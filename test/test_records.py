@@ -0,0 +1,73 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+import csv
+import json
+import tempfile
+from unittest import IsolatedAsyncioTestCase
+
+from store.records import XhsNoteCommentRecord, as_dict, load_table_columns, validate_records
+from store.xhs.xhs_store_impl import XhsCsvStoreImplement, XhsJsonStoreImplement
+
+
+class TestRecords(IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_records_match_schema(self):
+        self.assertEqual(validate_records(), [])
+        # alter table 增加的字段也要解析出来
+        self.assertIn("like_count", load_table_columns()["xhs_note_comment"])
+
+    def test_mapping_interface(self):
+        record = XhsNoteCommentRecord(comment_id="c1", note_id="n1", content="hello")
+        self.assertEqual(record.keys(), XhsNoteCommentRecord.fields)
+        self.assertEqual(record.get("content"), "hello")
+        self.assertIsNone(record.get("pictures"))
+        self.assertEqual(record.get("unknown", "default"), "default")
+        self.assertFalse(hasattr(record, "__dict__"))
+        with self.assertRaises(KeyError):
+            _ = record["add_ts"]
+
+        # 数据库存储会补充 add_ts，追加在固定字段之后
+        record["add_ts"] = 1
+        self.assertEqual(record.keys()[-1], "add_ts")
+        self.assertEqual(list(record.values())[-1], 1)
+        self.assertEqual(as_dict(record)["add_ts"], 1)
+        self.assertEqual(len(record), len(XhsNoteCommentRecord.fields) + 1)
+
+        with self.assertRaises(TypeError):
+            XhsNoteCommentRecord(comment_idd="c1")
+
+    async def test_writers_consume_records(self):
+        record = XhsNoteCommentRecord(comment_id="c1", note_id="n1", content="hello", like_count=3)
+
+        csv_store = XhsCsvStoreImplement()
+        csv_store.csv_store_path = self.tmp_dir.name
+        await csv_store.store_comment(record)
+        await csv_store.store_comment(record)
+        with open(csv_store.make_save_file_name("comments"), encoding="utf-8-sig") as f:
+            rows = list(csv.reader(f))
+        self.assertEqual(rows[0], list(XhsNoteCommentRecord.fields))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(dict(zip(rows[0], rows[1]))["content"], "hello")
+
+        json_store = XhsJsonStoreImplement()
+        json_store.json_store_path = f"{self.tmp_dir.name}/json"
+        json_store.words_store_path = f"{self.tmp_dir.name}/words"
+        await json_store.store_comment(record)
+        with open(json_store.make_save_file_name("comments")[0], encoding="utf-8") as f:
+            self.assertEqual(json.load(f), [as_dict(record)])
@@ -0,0 +1,75 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+import unittest
+
+from media_platform.tieba.help import TieBaExtractor
+from test.fixtures import load_test_data
+
+CREATOR_PAGE = (
+    '<html><body><p class="space"><a href="/home/main?un=abc&id=tb.1.x&fr=home">x</a></p>'
+    '<span class="userinfo_username ">  nick </span>'
+    '<div class="userinfo_left_head"><a><img src="http://a/b.jpg"></a></div>'
+    '<div class="userinfo_userdata"><span class="sex_female"></span><span>IP属地:广东</span></div>'
+    '<span class="concern_num">(<a href="/x">12</a>)</span><span class="concern_num">(<a href="/y">34</a>)</span>'
+    '<ul class="new_list clearfix"><li><div class="thread_name"><a href="/p/111?fr=x">t</a><a href="/p/999">z</a>'
+    '</div></li><li><div class="thread_name"><a href="/p/222">t</a></div></li></ul></body></html>'
+)
+
+
+class TestTieBaExtractor(unittest.TestCase):
+
+    def setUp(self):
+        self.extractor = TieBaExtractor()
+
+    def test_extract_search_note_list(self):
+        notes = self.extractor.extract_search_note_list(load_test_data("search_keyword_notes.html"))
+        self.assertEqual(len(notes), 10)
+        self.assertEqual(notes[0].note_id, "9117888152")
+        self.assertEqual(notes[0].user_nickname, "VR虚拟达人")
+        self.assertEqual(notes[0].publish_time, "2024-08-05 16:45")
+        self.assertIs(type(notes[0].title), str)
+
+    def test_extract_tieba_note_list(self):
+        notes = self.extractor.extract_tieba_note_list(load_test_data("tieba_note_list.html"))
+        self.assertEqual(len(notes), 48)
+        self.assertEqual((notes[0].note_id, notes[0].title, notes[0].total_replay_num),
+                         ("9079949995", "盗墓笔记全集+txt小说，已整理", 18))
+
+    def test_extract_note_detail(self):
+        note = self.extractor.extract_note_detail(load_test_data("note_detail.html"))
+        self.assertEqual((note.note_id, note.title, note.tieba_name),
+                         ("9117905169", "对于一个父亲来说，这个女儿14岁就死了", "以太比特吧"))
+        self.assertEqual((note.total_replay_num, note.total_replay_page), (786, 13))
+        self.assertEqual((note.ip_location, note.publish_time), ("广东", "2024-08-05 16:56"))
+        self.assertEqual(note.user_nickname, "章景轩")
+
+    def test_extract_comments(self):
+        comments = self.extractor.extract_tieba_note_parment_comments(load_test_data("note_comments.html"), "123456")
+        self.assertEqual(len(comments), 30)
+        self.assertEqual({comment.tieba_name for comment in comments}, {"网球风云吧"})
+        self.assertEqual((comments[0].comment_id, comments[0].content, comments[0].ip_location),
+                         ("150726491368", "中国队第22金！无悬念！", "福建"))
+
+        sub_comments = self.extractor.extract_tieba_note_sub_comments(load_test_data("note_sub_comments.html"),
+                                                                      comments[0])
+        self.assertEqual(len(sub_comments), 10)
+        self.assertEqual({comment.parent_comment_id for comment in sub_comments}, {"150726491368"})
+        self.assertEqual((sub_comments[0].user_nickname, sub_comments[0].publish_time),
+                         ("heinzfrentzen", "2024-8-6 22:11"))
+
+    def test_extract_creator_info(self):
+        creator = self.extractor.extract_creator_info(CREATOR_PAGE)
+        self.assertEqual((creator.user_id, creator.user_name, creator.nickname, creator.avatar),
+                         ("tb.1.x", "abc", "nick", "http://a/b.jpg"))
+        self.assertEqual((creator.gender, creator.ip_location, creator.follows, creator.fans), ("女", "广东", 12, 34))
+        self.assertEqual(self.extractor.extract_tieba_thread_id_list_from_creator_page(CREATOR_PAGE), ["111", "222"])
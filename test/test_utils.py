@@ -11,6 +11,13 @@
 
 # -*- coding: utf-8 -*-
 
+import argparse
+import asyncio
+import logging
+
+import pytest
+
+import config
 from tools import utils
 
 
@@ -19,3 +26,100 @@ def test_convert_cookies():
     cookie_dict = utils.convert_str_cookie_to_dict(xhs_cookies)
     assert cookie_dict.get("webId") == "1190c4d3cxxxx125xxx"
     assert cookie_dict.get("a1") == "x000101360"
+
+
+def test_extract_text_from_html():
+    assert utils.extract_text_from_html("") == ""
+    assert utils.extract_text_from_html("纯文本") == "纯文本"
+    assert utils.extract_text_from_html("<p>第一段 <b>加粗</b></p>\n\n<p>第二段<br/>换行</p>") == "第一段 加粗\n第二段\n换行"
+    assert utils.extract_text_from_html("<script>var a = '<p>';</script><style>p {}</style><!-- c -->正文") == "正文"
+    assert utils.extract_text_from_html("&quot;引用&quot;&nbsp;&nbsp;a &amp; b") == '"引用" a & b'
+    # &amp;lt; 只解码一次
+    assert utils.extract_text_from_html("a&amp;lt;b") == "a&lt;b"
+    assert utils.extract_text_from_html("&copy; &#x4e2d; &hellip;") == "© 中 …"
+    assert utils.extract_text_from_html("  多个 \t  空格  ") == "多个 空格"
+    # 正文中的 ">" 不是换行，有没有标签结果都一样
+    assert utils.extract_text_from_html("<p>5 > 3</p>") == "5 > 3"
+    assert utils.extract_text_from_html("<p>a -> b</p><p>c</p>") == "a -> b\nc"
+    assert utils.extract_text_from_html("5 > 3") == "5 > 3"
+    # 标签名不区分大小写
+    assert utils.extract_text_from_html("<P>a</P><P>b</P>") == "a\nb"
+    assert utils.extract_text_from_html("a<BR>b<Br />c") == "a\nb\nc"
+    assert utils.extract_text_from_html("<SCRIPT>var a = '<p>';</SCRIPT><Style>p {}</Style>正文") == "正文"
+
+
+def test_log_payload():
+    assert str(utils.log_payload("a" * 10, 20)) == "a" * 10
+    assert str(utils.log_payload("a" * 30, 20)) == "a" * 20 + "...(truncated, 30 chars)"
+    assert str(utils.log_payload("a" * 30, 0)) == "a" * 30
+
+    class Payload:
+        formatted = 0
+
+        def __str__(self):
+            Payload.formatted += 1
+            return "payload"
+
+    logger = utils.get_logger("test.payload")
+    logger.setLevel(logging.INFO)
+    logger.debug("payload: %s", utils.log_payload(Payload()))
+    assert Payload.formatted == 0
+    logger.setLevel(logging.NOTSET)
+
+
+def test_sample_filter():
+    origin_sample_every = config.LOG_ITEM_SAMPLE_EVERY
+    config.LOG_ITEM_SAMPLE_EVERY = 3
+    try:
+        sample_filter = utils.SampleFilter()
+
+        def make_record(msg: str, level: int = logging.INFO) -> logging.LogRecord:
+            return logging.LogRecord("MediaCrawler.store.xhs", level, __file__, 0, msg, ("x",), None)
+
+        assert [sample_filter.filter(make_record("a: %s")) for _ in range(6)] == [True, False, False] * 2
+        assert sample_filter.filter(make_record("b: %s"))
+        assert all(sample_filter.filter(make_record("a: %s", logging.WARNING)) for _ in range(3))
+    finally:
+        config.LOG_ITEM_SAMPLE_EVERY = origin_sample_every
+
+    logger = utils.get_logger("test.sampled", sampled=True)
+    utils.get_logger("test.sampled", sampled=True)
+    assert len(logger.filters) == 1
+
+
+def test_configure_logging():
+    origin_log_level, origin_log_levels = config.LOG_LEVEL, config.LOG_LEVELS
+    config.LOG_LEVEL, config.LOG_LEVELS = "WARNING", {"test.component": "debug"}
+    try:
+        utils.configure_logging()
+        assert not utils.get_logger("test.other").isEnabledFor(logging.INFO)
+        assert utils.get_logger("test.component").isEnabledFor(logging.DEBUG)
+    finally:
+        config.LOG_LEVEL, config.LOG_LEVELS = origin_log_level, origin_log_levels
+        utils.get_logger("test.component").setLevel(logging.NOTSET)
+        utils.configure_logging()
+
+
+def test_str2log_levels():
+    assert utils.str2log_levels("") == {}
+    assert utils.str2log_levels("store=warning, store.xhs=DEBUG,") == {"store": "WARNING", "store.xhs": "DEBUG"}
+    for value in ["store", "store=VERBOSE", "=DEBUG"]:
+        with pytest.raises(argparse.ArgumentTypeError):
+            utils.str2log_levels(value)
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--log_levels", type=utils.str2log_levels, default="")
+    assert parser.parse_args([]).log_levels == {}
+    with pytest.raises(SystemExit) as exc_info:
+        parser.parse_args(["--log_levels", "store=VERBOSE"])
+    assert exc_info.value.code == 2
+
+
+def test_parse_cmd_rejects_invalid_log_levels(monkeypatch, capsys):
+    from cmd_arg.arg import parse_cmd
+
+    monkeypatch.setattr("sys.argv", ["main.py", "--log_levels", "store"])
+    with pytest.raises(SystemExit) as exc_info:
+        asyncio.run(parse_cmd())
+    assert exc_info.value.code == 2
+    assert "invalid component log level 'store'" in capsys.readouterr().err
@@ -0,0 +1,106 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+import asyncio
+import json
+import os
+import tempfile
+from unittest import IsolatedAsyncioTestCase
+
+import config
+from tools.word_segment import SegmentationService, read_texts
+from tools.words import AsyncWordCloudGenerator
+
+
+class TestIncrementalWordFrequency(IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.prefix = os.path.join(self.tmp_dir.name, "search_comments_2024-01-01")
+        self.origin_interval = config.WORDCLOUD_FLUSH_INTERVAL_SEC
+        config.WORDCLOUD_FLUSH_INTERVAL_SEC = 0.1
+        self.generator = AsyncWordCloudGenerator()
+        self.rendered = []
+
+        async def generate_word_cloud(word_freq, save_words_prefix):
+            self.rendered.append(save_words_prefix)
+
+        self.generator.generate_word_cloud = generate_word_cloud
+
+    def read_freq_file(self):
+        with open(f"{self.prefix}_word_freq.json", encoding="utf-8") as f:
+            return json.load(f)
+
+    async def test_add_items_is_debounced(self):
+        await self.generator.add_items([{"content": "小红书 评论"}], self.prefix)
+        await self.generator.add_items([{"content": "小红书 笔记"}], self.prefix)
+        self.assertFalse(os.path.exists(f"{self.prefix}_word_freq.json"))
+
+        await asyncio.sleep(0.3)
+        word_freq = self.read_freq_file()
+        self.assertEqual(word_freq["小红书"], 2)
+        self.assertEqual(word_freq["笔记"], 1)
+        self.assertEqual(self.rendered, [self.prefix])
+
+    async def test_flush_all_and_resume_from_file(self):
+        await self.generator.add_items([{"content": "小红书 评论"}], self.prefix)
+        await self.generator.flush_all()
+        self.assertEqual(self.read_freq_file()["评论"], 1)
+
+        generator = AsyncWordCloudGenerator()
+        generator.generate_word_cloud = self.generator.generate_word_cloud
+        await generator.add_items([{"content": "评论"}], self.prefix)
+        await generator.flush_all()
+        self.assertEqual(self.read_freq_file()["评论"], 2)
+
+    async def test_render_at_most_once_per_interval(self):
+        origin_render_config = (config.WORDCLOUD_RENDER_INTERVAL_SEC, config.FONT_PATH)
+        # 使用 wordcloud 自带的字体
+        config.WORDCLOUD_RENDER_INTERVAL_SEC, config.FONT_PATH = 100, None
+        generator = AsyncWordCloudGenerator()
+        try:
+            for content in ["小红书 评论", "小红书 笔记", "评论"]:
+                await generator.add_items([{"content": content}], self.prefix)
+                await generator.flush(self.prefix)
+            await asyncio.sleep(0)
+            self.assertEqual(generator._pending_renders, {self.prefix})
+            # 程序结束时生成最终的词云图
+            await generator.flush_all()
+        finally:
+            config.WORDCLOUD_RENDER_INTERVAL_SEC, config.FONT_PATH = origin_render_config
+        self.assertEqual(generator._pending_renders, set())
+        self.assertTrue(os.path.exists(f"{self.prefix}_word_cloud.png"))
+
+    def tearDown(self):
+        config.WORDCLOUD_FLUSH_INTERVAL_SEC = self.origin_interval
+        self.tmp_dir.cleanup()
+
+
+class TestSegmentationService(IsolatedAsyncioTestCase):
+
+    async def test_count_words_in_chunks(self):
+        service = SegmentationService(max_workers=2, chunk_size=2)
+        try:
+            word_freq = await service.count_words(["小红书 评论", "小红书 笔记", "评论 高频词", "小红书"])
+        finally:
+            service.shutdown()
+        self.assertEqual(word_freq["小红书"], 3)
+        self.assertEqual(word_freq["评论"], 2)
+        # 子进程中加载了 config.CUSTOM_WORDS
+        self.assertEqual(word_freq["高频词"], 1)
+
+    def test_read_texts(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            input_file = os.path.join(tmp_dir, "comments.json")
+            with open(input_file, "w", encoding="utf-8") as f:
+                json.dump([{"content": "a"}, {"content": ""}, {"content": "b"}], f)
+            self.assertEqual(read_texts(input_file, "content"), ["a", "b"])
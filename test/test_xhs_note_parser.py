@@ -0,0 +1,60 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+import json
+import re
+import unittest
+
+from media_platform.xhs.help import get_note_dict
+from test.benchmark.bench_xhs_note_html import (NOTE_ID, load_note_html, recursive_get_note_dict,
+                                                recursive_transform_json_keys)
+from tools.crawler_util import camel_to_underscore, transform_json_keys
+
+
+class TestXhsNoteParser(unittest.TestCase):
+
+    def test_camel_to_underscore(self):
+        self.assertEqual(camel_to_underscore("noteDetailMap"), "note_detail_map")
+        self.assertEqual(camel_to_underscore("XsecToken"), "xsec_token")
+        self.assertEqual(camel_to_underscore("note_id"), "note_id")
+        self.assertEqual(camel_to_underscore("urlDefault"), "url_default")
+
+    def test_transform_json_keys(self):
+        data = {"noteId": "1", "emptyList": [], "emptyDict": {}, "zero": 0,
+                "imageList": [{"urlDefault": "u", "infoList": [{"imageScene": "PRV"}]}, None, "text"],
+                "nestedList": [[{"keepMe": 1}]], "userInfo": {"nickName": "a", "tags": {"tagType": "b"}},
+                "user_id": "first", "userId": "second"}
+        self.assertEqual(transform_json_keys(data), recursive_transform_json_keys(json.dumps(data)))
+        # 列表中的列表不转换，重复的键保留最后一个
+        self.assertEqual(transform_json_keys(data)["nested_list"], [[{"keepMe": 1}]])
+        self.assertEqual(transform_json_keys(data)["user_id"], "second")
+        # 原字典不变
+        self.assertIn("noteId", data)
+
+    def test_note_fixture(self):
+        html = load_note_html()
+        state = re.findall(r"window.__INITIAL_STATE__=({.*})</script>", html)[0].replace("undefined", '""')
+        self.assertEqual(json.dumps(transform_json_keys(json.loads(state))),
+                         json.dumps(recursive_transform_json_keys(state)))
+
+        note = get_note_dict(html, NOTE_ID)
+        self.assertEqual(json.dumps(note), json.dumps(recursive_get_note_dict(html, NOTE_ID)))
+        self.assertEqual(note["note_id"], NOTE_ID)
+        self.assertEqual(len(note["image_list"]), 9)
+        self.assertEqual(note["interact_info"]["liked_count"], "13608")
+        self.assertEqual(note["image_list"][0]["info_list"][0]["image_scene"], "WB_PRV")
+        self.assertEqual(note["video"], "")
+
+    def test_missing_note(self):
+        with self.assertRaises(KeyError):
+            get_note_dict(load_note_html(), "not_exists")
+        self.assertEqual(get_note_dict("<script>window.__INITIAL_STATE__={}</script>", NOTE_ID), {})
@@ -0,0 +1,430 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 离线数据分析，按块读取已保存的数据（csv | json | jsonl | db | parquet），用 pandas/NumPy 向量化聚合
+#            eg: python -m tools.analytics --platform xhs --type contents --source csv
+import argparse
+import glob
+import importlib
+import itertools
+import json
+import os
+import warnings
+from collections import Counter
+from typing import Dict, Iterator, List, Optional, Set
+
+import numpy as np
+import pandas as pd
+
+import config
+from tools import utils
+
+KEYWORD_FIELD = "source_keyword"
+
+# 各平台 内容/评论 数据的字段映射
+# table: 数据库表名, id: 主键字段, content_id: 评论所属内容的字段, creator: 作者字段,
+# time: 发布时间字段, liked: 点赞数字段, comments: 内容的评论数字段
+PLATFORM_FIELDS: Dict[str, Dict[str, Dict[str, str]]] = {
+    "xhs": {
+        "contents": {"table": "xhs_note", "id": "note_id", "creator": "nickname", "time": "time",
+                     "liked": "liked_count", "comments": "comment_count"},
+        "comments": {"table": "xhs_note_comment", "id": "comment_id", "content_id": "note_id",
+                     "creator": "nickname", "time": "create_time", "liked": "like_count"},
+    },
+    "dy": {
+        "contents": {"table": "douyin_aweme", "id": "aweme_id", "creator": "nickname", "time": "create_time",
+                     "liked": "liked_count", "comments": "comment_count"},
+        "comments": {"table": "douyin_aweme_comment", "id": "comment_id", "content_id": "aweme_id",
+                     "creator": "nickname", "time": "create_time", "liked": "like_count"},
+    },
+    "bili": {
+        "contents": {"table": "bilibili_video", "id": "video_id", "creator": "nickname", "time": "create_time",
+                     "liked": "liked_count", "comments": "video_comment"},
+        "comments": {"table": "bilibili_video_comment", "id": "comment_id", "content_id": "video_id",
+                     "creator": "nickname", "time": "create_time", "liked": "like_count"},
+    },
+    "ks": {
+        "contents": {"table": "kuaishou_video", "id": "video_id", "creator": "nickname", "time": "create_time",
+                     "liked": "liked_count"},
+        "comments": {"table": "kuaishou_video_comment", "id": "comment_id", "content_id": "video_id",
+                     "creator": "nickname", "time": "create_time"},
+    },
+    "wb": {
+        "contents": {"table": "weibo_note", "id": "note_id", "creator": "nickname", "time": "create_time",
+                     "liked": "liked_count", "comments": "comments_count"},
+        "comments": {"table": "weibo_note_comment", "id": "comment_id", "content_id": "note_id",
+                     "creator": "nickname", "time": "create_time", "liked": "comment_like_count"},
+    },
+    "tieba": {
+        "contents": {"table": "tieba_note", "id": "note_id", "creator": "user_nickname", "time": "publish_time",
+                     "comments": "total_replay_num"},
+        "comments": {"table": "tieba_comment", "id": "comment_id", "content_id": "note_id",
+                     "creator": "user_nickname", "time": "publish_time"},
+    },
+    "zhihu": {
+        "contents": {"table": "zhihu_content", "id": "content_id", "creator": "user_nickname", "time": "created_time",
+                     "liked": "voteup_count", "comments": "comment_count"},
+        "comments": {"table": "zhihu_comment", "id": "comment_id", "content_id": "content_id",
+                     "creator": "user_nickname", "time": "publish_time", "liked": "like_count"},
+    },
+}
+
+# 评论数直方图的分桶
+COMMENT_HISTOGRAM_BINS = [0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 5000, np.inf]
+
+# 各平台的存储工厂，csv/json 数据默认从对应存储写入的目录读取
+PLATFORM_STORE_FACTORIES = {
+    "xhs": "store.xhs:XhsStoreFactory",
+    "dy": "store.douyin:DouyinStoreFactory",
+    "ks": "store.kuaishou:KuaishouStoreFactory",
+    "bili": "store.bilibili:BiliStoreFactory",
+    "wb": "store.weibo:WeibostoreFactory",
+    "tieba": "store.tieba:TieBaStoreFactory",
+    "zhihu": "store.zhihu:ZhihuStoreFactory",
+}
+
+FILE_EXTENSIONS = {
+    "csv": "csv",
+    "json": "json",
+    "jsonl": "jsonl",
+    "parquet": "parquet",
+}
+
+
+def parse_count(series: pd.Series) -> pd.Series:
+    """
+    把点赞数等计数字段转换成数字，兼容 "1.2万"、"10+" 这类平台展示的格式
+    Args:
+        series:
+
+    Returns:
+
+    """
+    text = series.astype(str).str.strip()
+    multiplier = np.where(text.str.contains("万", regex=False), 10000, 1)
+    numbers = pd.to_numeric(text.str.replace(r"[^\d.]", "", regex=True), errors="coerce").fillna(0)
+    return numbers * multiplier
+
+
+def parse_day(series: pd.Series) -> pd.Series:
+    """
+    把发布时间转换成日期（北京时间），兼容秒/毫秒时间戳和日期字符串
+    Args:
+        series:
+
+    Returns:
+
+    """
+    numeric = pd.to_numeric(series, errors="coerce")
+    seconds = numeric.where(numeric < 1e11, numeric / 1000)
+    days = pd.to_datetime(seconds, unit="s", errors="coerce", utc=True).dt.tz_convert("Asia/Shanghai").dt.tz_localize(None)
+    text_mask = numeric.isna() & series.notna()
+    if text_mask.any():
+        days = days.where(~text_mask, pd.to_datetime(series.where(text_mask), errors="coerce", format="mixed"))
+    return days.dt.normalize()
+
+
+def default_data_path(platform: str, source: str) -> str:
+    """
+    平台 csv/json 存储写入数据的目录，jsonl 和 parquet 不是爬虫直接写出的格式，需要指定路径
+    Args:
+        platform: 平台
+        source: csv | json
+
+    Returns:
+
+    """
+    if source not in ("csv", "json"):
+        raise ValueError(f"path is required for {source} source, only csv and json have a default path")
+    module_name, factory_name = PLATFORM_STORE_FACTORIES[platform].split(":")
+    store_class = getattr(importlib.import_module(module_name), factory_name).STORES[source]
+    return store_class.csv_store_path if source == "csv" else store_class.json_store_path
+
+
+def resolve_files(path: str, source: str, store_type: str) -> List[str]:
+    """
+    解析数据文件路径，path 可以是文件、目录或者通配符，目录时只取文件名包含 store_type 的文件
+    Args:
+        path:
+        source:
+        store_type:
+
+    Returns:
+
+    """
+    extension = FILE_EXTENSIONS[source]
+    if os.path.isdir(path):
+        return sorted(glob.glob(os.path.join(path, f"*{store_type}*.{extension}")))
+    return sorted(glob.glob(path))
+
+
+def iter_file_chunks(file_path: str, source: str, columns: List[str], chunksize: int) -> Iterator[pd.DataFrame]:
+    """
+    按块读取一个数据文件，只保留需要的列
+    Args:
+        file_path:
+        source: csv | json | jsonl | parquet
+        columns: 需要的列
+        chunksize: 每块的行数
+
+    Returns:
+
+    """
+    if source == "csv":
+        yield from pd.read_csv(file_path, chunksize=chunksize, dtype=str, encoding="utf-8-sig",
+                               usecols=lambda column: column in columns)
+    elif source == "jsonl":
+        for chunk in pd.read_json(file_path, lines=True, chunksize=chunksize, dtype=False):
+            yield chunk[[column for column in columns if column in chunk.columns]]
+    elif source == "json":
+        # json 存储保存的是一个完整的数组，只能整体解析，之后再按块转换成 DataFrame
+        with open(file_path, "r", encoding="utf-8") as f:
+            items = json.load(f)
+        for start in range(0, len(items), chunksize):
+            chunk = pd.DataFrame.from_records(items[start:start + chunksize])
+            yield chunk[[column for column in columns if column in chunk.columns]]
+    elif source == "parquet":
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("read parquet files requires pyarrow, please run: pip install pyarrow")
+        parquet_file = pq.ParquetFile(file_path)
+        read_columns = [column for column in columns if column in parquet_file.schema_arrow.names]
+        for batch in parquet_file.iter_batches(batch_size=chunksize, columns=read_columns):
+            yield batch.to_pandas()
+    else:
+        raise ValueError(f"Invalid source {source}, only supported csv | json | jsonl | parquet | db")
+
+
+def iter_db_chunks(table: str, columns: List[str], chunksize: int) -> Iterator[pd.DataFrame]:
+    """
+    使用流式游标按块读取 MySQL 表，避免把整张表加载到内存
+    Args:
+        table: 表名
+        columns: 需要的列
+        chunksize: 每块的行数
+
+    Returns:
+
+    """
+    import pymysql
+
+    conn = pymysql.connect(
+        host=config.RELATION_DB_HOST,
+        port=int(config.RELATION_DB_PORT),
+        user=config.RELATION_DB_USER,
+        password=config.RELATION_DB_PWD,
+        database=config.RELATION_DB_NAME,
+        charset="utf8mb4",
+        cursorclass=pymysql.cursors.SSCursor,
+    )
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(f"SHOW COLUMNS FROM `{table}`")
+            table_columns = {row[0] for row in cursor.fetchall()}
+        select_columns = ", ".join(f"`{column}`" for column in columns if column in table_columns)
+        with warnings.catch_warnings():
+            # pandas 只对 SQLAlchemy 连接做过完整测试，pymysql 连接可以正常使用
+            warnings.simplefilter("ignore", UserWarning)
+            yield from pd.read_sql(f"SELECT {select_columns} FROM `{table}`", conn, chunksize=chunksize)
+    finally:
+        conn.close()
+
+
+def add_frames(total: Optional[pd.DataFrame], partial: pd.DataFrame) -> pd.DataFrame:
+    if total is None:
+        return partial
+    return total.add(partial, fill_value=0)
+
+
+class EngagementAnalyzer:
+    """
+    流式聚合器：每读取一块数据就把它聚合成部分结果并合并，内存只和分组数量（关键词、作者、日期、内容ID）有关，和数据行数无关
+    """
+
+    def __init__(self, fields: Dict[str, str], top_n: int = 20):
+        self.fields = fields
+        self.top_n = top_n
+        self.total_rows = 0
+        self._keyword_summary: Optional[pd.DataFrame] = None
+        self._creator_summary: Optional[pd.DataFrame] = None
+        self._daily_summary: Optional[pd.DataFrame] = None
+        self._top_liked: Optional[pd.DataFrame] = None
+        self._comment_counts: Optional[pd.Series] = None
+        self._id_keywords: Dict[str, Set[str]] = {}
+
+    @property
+    def columns(self) -> List[str]:
+        columns = [self.fields[name] for name in ("id", "content_id", "creator", "time", "liked", "comments")
+                   if self.fields.get(name)]
+        return list(dict.fromkeys(columns + [KEYWORD_FIELD]))
+
+    def update(self, chunk: pd.DataFrame):
+        """
+        合并一块数据
+        Args:
+            chunk:
+
+        Returns:
+
+        """
+        if chunk.empty:
+            return
+        self.total_rows += len(chunk)
+        id_field = self.fields["id"]
+        frame = pd.DataFrame({"id": chunk[id_field].astype(str)})
+        frame["liked"] = parse_count(chunk[self.fields["liked"]]) if self.fields.get("liked") in chunk else 0
+        if self.fields.get("creator") in chunk:
+            frame["creator"] = chunk[self.fields["creator"]].fillna("")
+        if KEYWORD_FIELD in chunk:
+            frame["keyword"] = chunk[KEYWORD_FIELD].fillna("")
+        if self.fields.get("time") in chunk:
+            frame["day"] = parse_day(chunk[self.fields["time"]])
+
+        if "keyword" in frame:
+            self._keyword_summary = add_frames(self._keyword_summary, self._summary(frame, "keyword"))
+            keyword_pairs = frame.loc[frame["keyword"] != "", ["id", "keyword"]].drop_duplicates()
+            for content_id, keyword in zip(keyword_pairs["id"].values, keyword_pairs["keyword"].values):
+                self._id_keywords.setdefault(content_id, set()).add(keyword)
+        if "creator" in frame:
+            self._creator_summary = add_frames(self._creator_summary, self._summary(frame, "creator"))
+        if "day" in frame:
+            self._daily_summary = add_frames(self._daily_summary, self._summary(frame.dropna(subset=["day"]), "day"))
+
+        top_columns = [column for column in ("id", "creator", "keyword", "liked") if column in frame]
+        candidates = frame[top_columns] if self._top_liked is None else pd.concat([self._top_liked, frame[top_columns]])
+        self._top_liked = candidates.sort_values("liked", ascending=False, kind="stable") \
+            .drop_duplicates("id").head(self.top_n)
+
+        if self.fields.get("content_id") in chunk:
+            # 评论数据：统计每个内容下的评论条数
+            counts = chunk[self.fields["content_id"]].astype(str).value_counts()
+            self._comment_counts = counts if self._comment_counts is None else self._comment_counts.add(counts, fill_value=0)
+        elif self.fields.get("comments") in chunk:
+            # 内容数据：直接使用内容上的评论数字段，同一个内容只保留最后一次的记录
+            counts = pd.Series(parse_count(chunk[self.fields["comments"]]).values, index=frame["id"].values)
+            counts = counts[~counts.index.duplicated(keep="last")]
+            if self._comment_counts is None:
+                self._comment_counts = counts
+            else:
+                self._comment_counts = pd.concat([self._comment_counts, counts])
+                self._comment_counts = self._comment_counts[~self._comment_counts.index.duplicated(keep="last")]
+
+    @staticmethod
+    def _summary(frame: pd.DataFrame, group_field: str) -> pd.DataFrame:
+        return frame.groupby(group_field).agg(count=("id", "size"), liked_sum=("liked", "sum"))
+
+    @staticmethod
+    def _finish_summary(summary: Optional[pd.DataFrame], sort_by_count: bool = True) -> pd.DataFrame:
+        if summary is None:
+            return pd.DataFrame(columns=["count", "liked_sum", "liked_mean"])
+        summary = summary.copy()
+        summary["count"] = summary["count"].astype(np.int64)
+        summary["liked_mean"] = (summary["liked_sum"] / summary["count"]).round(2)
+        if sort_by_count:
+            return summary.sort_values("count", ascending=False, kind="stable")
+        return summary.sort_index()
+
+    def comment_histogram(self) -> pd.DataFrame:
+        """
+        每个内容下评论数的分布
+        Returns:
+
+        """
+        if self._comment_counts is None:
+            return pd.DataFrame(columns=["bucket", "contents"])
+        hist, edges = np.histogram(self._comment_counts.values, bins=COMMENT_HISTOGRAM_BINS)
+        buckets = [f"[{int(low)}, {'inf' if np.isinf(high) else int(high)})" for low, high in zip(edges[:-1], edges[1:])]
+        return pd.DataFrame({"bucket": buckets, "contents": hist})
+
+    def keyword_cooccurrence(self) -> pd.DataFrame:
+        """
+        关键词共现：同一个内容被多个关键词搜索到时，统计关键词两两共现的次数
+        Returns:
+
+        """
+        pair_counts = Counter()
+        for keywords in self._id_keywords.values():
+            if len(keywords) > 1:
+                pair_counts.update(itertools.combinations(sorted(keywords), 2))
+        if not pair_counts:
+            return pd.DataFrame(columns=["keyword_a", "keyword_b", "contents"])
+        rows = [(keyword_a, keyword_b, count) for (keyword_a, keyword_b), count in sorted(pair_counts.items())]
+        return pd.DataFrame(rows, columns=["keyword_a", "keyword_b", "contents"]) \
+            .sort_values("contents", ascending=False, kind="stable").reset_index(drop=True)
+
+    def result(self) -> Dict[str, pd.DataFrame]:
+        return {
+            "keyword_summary": self._finish_summary(self._keyword_summary),
+            "creator_summary": self._finish_summary(self._creator_summary),
+            "daily_summary": self._finish_summary(self._daily_summary, sort_by_count=False),
+            "top_liked": pd.DataFrame() if self._top_liked is None else self._top_liked.reset_index(drop=True),
+            "comment_histogram": self.comment_histogram(),
+            "keyword_cooccurrence": self.keyword_cooccurrence(),
+        }
+
+
+def analyze(platform: str, store_type: str, source: str, path: str = "", top_n: int = 20,
+            chunksize: int = 100000) -> Dict[str, pd.DataFrame]:
+    """
+    分析一个平台的内容或评论数据
+    Args:
+        platform: 平台
+        store_type: contents | comments
+        source: csv | json | jsonl | db | parquet
+        path: 文件、目录或通配符，source 为 db 时不需要，csv/json 默认为对应平台存储写入的目录
+        top_n: 点赞数排行的条数
+        chunksize: 每块的行数
+
+    Returns:
+
+    """
+    fields = PLATFORM_FIELDS[platform][store_type]
+    analyzer = EngagementAnalyzer(fields, top_n=top_n)
+    if source == "db":
+        for chunk in iter_db_chunks(fields["table"], analyzer.columns, chunksize):
+            analyzer.update(chunk)
+    else:
+        path = path or default_data_path(platform, source)
+        files = resolve_files(path, source, store_type)
+        if not files:
+            utils.logger.warning(f"[analyze] no {source} files found in {path}")
+        for file_path in files:
+            for chunk in iter_file_chunks(file_path, source, analyzer.columns, chunksize):
+                analyzer.update(chunk)
+    utils.logger.info(f"[analyze] analyze {platform} {store_type} done, rows: {analyzer.total_rows}")
+    return analyzer.result()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Engagement analytics over crawled data.')
+    parser.add_argument('--platform', type=str, required=True, choices=list(PLATFORM_FIELDS.keys()),
+                        help='Media platform select (xhs | dy | ks | bili | wb | tieba | zhihu)')
+    parser.add_argument('--type', type=str, default="contents", choices=["contents", "comments"],
+                        help='data type (contents | comments)')
+    parser.add_argument('--source', type=str, default="csv", choices=["csv", "json", "jsonl", "db", "parquet"],
+                        help='data source (csv | json | jsonl | db | parquet)')
+    parser.add_argument('--path', type=str, default="",
+                        help='data file, directory or glob pattern, default is the csv/json store directory of the platform')
+    parser.add_argument('--top', type=int, default=20, help='top N contents by liked count')
+    parser.add_argument('--chunksize', type=int, default=100000, help='rows per chunk')
+    parser.add_argument('--output', type=str, default="", help='directory to save result csv files')
+    args = parser.parse_args()
+
+    results = analyze(args.platform, args.type, args.source, args.path, top_n=args.top, chunksize=args.chunksize)
+    if args.output:
+        os.makedirs(args.output, exist_ok=True)
+    for name, frame in results.items():
+        print(f"\n===== {name} =====")
+        print(frame.head(args.top).to_string())
+        if args.output:
+            frame.to_csv(os.path.join(args.output, f"{args.platform}_{args.type}_{name}.csv"), encoding="utf-8-sig")
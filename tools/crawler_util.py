@@ -15,6 +15,8 @@
 # @Desc    : 爬虫相关的工具函数
 
 import base64
+import functools
+import html as html_lib
 import json
 import random
 import re
@@ -184,16 +186,58 @@ def format_proxy_info(ip_proxy_info) -> Tuple[Optional[Dict], Optional[Dict]]:
     return playwright_proxy, httpx_proxy
 
 
+# <br> 和块级元素的结束标签换成换行，标签名不区分大小写（标签名都是 ASCII，re.ASCII 让忽略大小写的匹配更快）
+HTML_BREAK_PATTERN = re.compile(
+    r"<(?:br\s*/?|/(?:p|div|li|h[1-6]|tr|blockquote|figure|figcaption|pre|section|ul|ol|table)\s*)>",
+    re.IGNORECASE | re.ASCII)
+# 一次扫描去掉其余的标签：脚本、样式和注释整段去掉
+HTML_TAG_PATTERN = re.compile(
+    r"<(?:script\b.*?</script\s*>|style\b.*?</style\s*>|!--.*?-->|[^>]+>)", re.IGNORECASE | re.ASCII | re.DOTALL)
+# 常见实体直接替换，其他实体交给 html.unescape；&amp; 不在这里，最后单独替换
+HTML_COMMON_ENTITIES = (("&nbsp;", " "), ("&quot;", '"'), ("&lt;", "<"), ("&gt;", ">"), ("&#39;", "'"))
+# 除换行以外需要合并成空格的空白字符
+HTML_OTHER_SPACES = "\t\r\f\v\xa0\u3000"
+
+
 def extract_text_from_html(html: str) -> str:
-    """Extract text from HTML, removing all tags."""
+    """
+    提取HTML中的文本：去掉脚本、样式和标签，解码实体，
+    <br> 和块级元素转换为换行，每行内连续的空白合并为一个空格，去掉空行
+    Args:
+        html: HTML 片段
+
+    Returns:
+
+    """
     if not html:
         return ""
 
-    # Remove script and style elements
-    clean_html = re.sub(r'<(script|style)[^>]*>.*?</\1>', '', html, flags=re.DOTALL)
-    # Remove all other tags
-    clean_text = re.sub(r'<[^>]+>', '', clean_html).strip()
-    return clean_text
+    if "<" in html:
+        html = HTML_TAG_PATTERN.sub("", HTML_BREAK_PATTERN.sub("\n", html))
+    if "&" in html:
+        html = unescape_html_entities(html)
+    if "\n" not in html:
+        return " ".join(html.split())
+    for space in HTML_OTHER_SPACES:
+        if space in html:
+            html = html.replace(space, " ")
+    while "  " in html:
+        html = html.replace("  ", " ")
+    return "\n".join(filter(None, map(str.strip, html.split("\n"))))
+
+
+def unescape_html_entities(text: str) -> str:
+    """
+    解码HTML实体，只有常见实体时直接替换（&amp; 最后替换，避免 &amp;lt; 被解码两次），比 html.unescape 快
+    """
+    for entity, char in HTML_COMMON_ENTITIES:
+        text = text.replace(entity, char)
+    if "&" not in text:
+        return text
+    if text.count("&") == text.count("&amp;"):
+        return text.replace("&amp;", "&")
+    return html_lib.unescape(text)
+
 
 def extract_url_params_to_dict(url: str) -> Dict:
     """Extract URL parameters to dict"""
@@ -203,3 +247,48 @@ def extract_url_params_to_dict(url: str) -> Dict:
     parsed_url = urllib.parse.urlparse(url)
     url_params_dict = dict(urllib.parse.parse_qsl(parsed_url.query))
     return url_params_dict
+
+
+CAMEL_BOUNDARY_PATTERN = re.compile(r"(?<!^)(?=[A-Z])")
+
+
+@functools.lru_cache(maxsize=8192)
+def camel_to_underscore(key: str) -> str:
+    """
+    驼峰转下划线：noteDetailMap -> note_detail_map，
+    同一个页面/接口里的键大量重复，转换结果缓存起来
+    """
+    return CAMEL_BOUNDARY_PATTERN.sub("_", key).lower()
+
+
+def transform_json_keys(data: Dict) -> Dict:
+    """
+    字典（包括嵌套的字典、列表中的字典）所有的键由驼峰转换为下划线，返回新的字典，不修改原字典。
+    用栈代替递归，每个字典只遍历一次；值为空的字典/列表原样保留，列表中的列表不做转换
+    Args:
+        data: json 解析出来的字典
+
+    Returns:
+
+    """
+    result: Dict = {}
+    stack = [(data, result)]
+    while stack:
+        source, target = stack.pop()
+        for key, value in source.items():
+            if value and isinstance(value, dict):
+                new_value = {}
+                stack.append((value, new_value))
+            elif value and isinstance(value, list):
+                new_value = []
+                for item in value:
+                    if item and isinstance(item, dict):
+                        new_item = {}
+                        stack.append((item, new_item))
+                        new_value.append(new_item)
+                    else:
+                        new_value.append(item)
+            else:
+                new_value = value
+            target[camel_to_underscore(key)] = new_value
+    return result
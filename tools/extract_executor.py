@@ -0,0 +1,97 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 页面解析执行器，大页面的 HTML/JSON 解析放到进程池中执行，小页面直接在事件循环中解析
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Optional, TypeVar
+
+import config
+from tools import metrics, utils
+
+ResultType = TypeVar("ResultType")
+
+
+class ExtractExecutor:
+    """
+    页面解析执行器，解析函数必须可以被 pickle（模块级函数或无状态对象的方法），
+    进程间只传递页面原文和解析出来的数据，不传递解析过程中的文档对象
+    """
+
+    def __init__(self, max_workers: int = 0, min_size: int = -1, enable: Optional[bool] = None):
+        self.max_workers = max_workers or config.EXTRACT_PROCESS_WORKERS
+        self.min_size = min_size if min_size >= 0 else config.EXTRACT_PROCESS_MIN_SIZE
+        self.enable = config.ENABLE_EXTRACT_PROCESS_POOL if enable is None else enable
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.inline_count = 0
+        self.offload_count = 0
+
+    async def run(self, func: Callable[..., ResultType], document: str, *args) -> ResultType:
+        """
+        解析页面，页面大于 min_size 时在进程池中执行，否则直接调用
+        Args:
+            func: 解析函数，第一个参数为页面原文
+            document: 页面原文（HTML 或 JSON 字符串）
+            *args: 解析函数的其他参数
+
+        Returns:
+            解析函数的返回值
+        """
+        parser_name = getattr(func, "__name__", None) or getattr(getattr(func, "func", None), "__name__", "")
+        if not self.enable or len(document) < self.min_size:
+            self.inline_count += 1
+            with metrics.EXTRACT_SECONDS.time(parser=parser_name, mode="inline"):
+                return func(document, *args)
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        self.offload_count += 1
+        with metrics.EXTRACT_SECONDS.time(parser=parser_name, mode="offload"):
+            return await asyncio.get_running_loop().run_in_executor(self._executor, func, document, *args)
+
+    def shutdown(self):
+        """
+        关闭进程池
+        Returns:
+
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        utils.logger.info(
+            f"[ExtractExecutor.shutdown] inline: {self.inline_count}, offload: {self.offload_count}")
+
+
+_extract_executor: Optional[ExtractExecutor] = None
+
+
+def get_extract_executor() -> ExtractExecutor:
+    """
+    获取全局的页面解析执行器
+    Returns:
+
+    """
+    global _extract_executor
+    if _extract_executor is None:
+        _extract_executor = ExtractExecutor()
+    return _extract_executor
+
+
+def shutdown_extract_executor():
+    """
+    程序结束前调用，关闭解析进程池
+    Returns:
+
+    """
+    global _extract_executor
+    if _extract_executor is not None:
+        _extract_executor.shutdown()
+        _extract_executor = None
@@ -0,0 +1,206 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : HTTP 录制/回放，record 模式把平台接口的请求和响应保存到本地的 cassette 文件，
+#            replay 模式不访问网络，直接用 cassette 中的响应回放，用于离线跑通爬虫流程和做性能测试
+import base64
+import hashlib
+import pathlib
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import httpx
+
+import config
+from tools import json_codec, metrics, utils
+
+MODE_RECORD = "record"
+MODE_REPLAY = "replay"
+
+# 响应内容保存的是解压后的内容，回放时不能再带上这些头
+SKIP_RESPONSE_HEADERS = {"content-encoding", "transfer-encoding", "content-length", "set-cookie"}
+
+
+class CassetteMissError(Exception):
+    """回放时 cassette 中没有对应的请求"""
+
+
+class Cassette:
+    """
+    cassette 文件为 jsonl，每行一对请求和响应。
+    请求按 方法 + 去掉易变参数并排序后的URL + 请求体摘要 匹配，同一个请求录制了多次时按录制顺序回放，最后一次的响应重复使用
+    """
+
+    def __init__(self, cassette_file: str, ignore_params: Optional[Iterable[str]] = None):
+        self.cassette_file = cassette_file
+        self.ignore_params = set(config.HTTP_CASSETTE_IGNORE_PARAMS if ignore_params is None else ignore_params)
+        self._interactions: Dict[str, List[Dict]] = defaultdict(list)
+        self._replay_index: Dict[str, int] = defaultdict(int)
+        self.hit_count = 0
+        self.miss_count = 0
+        if pathlib.Path(cassette_file).exists():
+            with open(cassette_file, "rb") as f:
+                for line in f:
+                    if line.strip():
+                        interaction = json_codec.loads(line)
+                        self._interactions[interaction["key"]].append(interaction["response"])
+
+    def __len__(self) -> int:
+        return sum(len(responses) for responses in self._interactions.values())
+
+    def request_key(self, method: str, url: str, body: bytes = b"") -> str:
+        """
+        请求的匹配键
+        Args:
+            method: 请求方法
+            url: 完整的请求URL
+            body: 请求体
+
+        Returns:
+
+        """
+        parts = urlsplit(url)
+        query = urlencode(sorted((key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+                                 if key not in self.ignore_params))
+        normalized_url = urlunsplit((parts.scheme, parts.netloc, parts.path, query, ""))
+        body_digest = hashlib.sha1(body).hexdigest()[:16] if body else ""
+        return f"{method.upper()} {normalized_url} {body_digest}".rstrip()
+
+    def add(self, method: str, url: str, body: bytes, status_code: int, headers: List[List[str]], content: bytes):
+        """
+        录制一对请求和响应，同时追加写入 cassette 文件
+        Args:
+            method: 请求方法
+            url: 请求URL
+            body: 请求体
+            status_code: 响应状态码
+            headers: 响应头 [[name, value], ...]
+            content: 解压后的响应内容
+
+        Returns:
+
+        """
+        try:
+            body_text, body_encoding = content.decode("utf-8"), "utf-8"
+        except UnicodeDecodeError:
+            body_text, body_encoding = base64.b64encode(content).decode("ascii"), "base64"
+        key = self.request_key(method, url, body)
+        response = {
+            "status_code": status_code,
+            "headers": [[name, value] for name, value in headers if name.lower() not in SKIP_RESPONSE_HEADERS],
+            "body": body_text,
+            "body_encoding": body_encoding,
+        }
+        self._interactions[key].append(response)
+        pathlib.Path(self.cassette_file).parent.mkdir(parents=True, exist_ok=True)
+        with open(self.cassette_file, "ab") as f:
+            f.write(json_codec.dumps_bytes({"key": key, "url": url, "response": response}) + b"\n")
+
+    def add_response(self, response: httpx.Response):
+        """
+        录制 httpx 的响应（响应内容需要已经读取）
+        """
+        request = response.request
+        self.add(request.method, str(request.url), request.content, response.status_code,
+                 [[name, value] for name, value in response.headers.items()], response.content)
+
+    def replay(self, method: str, url: str, body: bytes = b"") -> httpx.Response:
+        """
+        回放一个请求的响应
+        Args:
+            method: 请求方法
+            url: 请求URL
+            body: 请求体
+
+        Returns:
+
+        """
+        key = self.request_key(method, url, body)
+        responses = self._interactions.get(key)
+        if not responses:
+            self.miss_count += 1
+            raise CassetteMissError(f"[Cassette.replay] request not recorded: {key}")
+        self.hit_count += 1
+        index = self._replay_index[key]
+        self._replay_index[key] = index + 1
+        response = responses[min(index, len(responses) - 1)]
+        content = response["body"].encode("utf-8") if response["body_encoding"] == "utf-8" \
+            else base64.b64decode(response["body"])
+        return httpx.Response(response["status_code"], headers=response["headers"], content=content)
+
+
+class CassetteTransport(httpx.AsyncBaseTransport):
+    """
+    回放用的 httpx 传输层，请求不会发到网络
+    """
+
+    def __init__(self, cassette: Cassette):
+        self.cassette = cassette
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await request.aread()
+        return self.cassette.replay(request.method, str(request.url), request.content)
+
+
+_cassette: Optional[Cassette] = None
+
+
+def get_cassette() -> Cassette:
+    """
+    获取全局的 cassette，文件默认按平台区分
+    Returns:
+
+    """
+    global _cassette
+    if _cassette is None:
+        _cassette = Cassette(config.HTTP_CASSETTE_FILE or f"{config.HTTP_CASSETTE_PATH}/{config.PLATFORM}.jsonl")
+    return _cassette
+
+
+def set_cassette(cassette: Optional[Cassette]):
+    """
+    替换全局的 cassette，测试和性能测试中使用
+    """
+    global _cassette
+    _cassette = cassette
+
+
+async def _record_response(response: httpx.Response):
+    await response.aread()
+    get_cassette().add_response(response)
+
+
+def create_async_client(record: bool = True, **kwargs) -> httpx.AsyncClient:
+    """
+    创建平台接口请求使用的 httpx.AsyncClient，参数同 httpx.AsyncClient：
+    record 模式在响应钩子中录制响应，replay 模式使用回放的传输层（忽略代理），开启了指标统计时加上统计钩子
+    Args:
+        record: record 模式下是否录制，媒体下载传 False，录制要读取整个响应内容，会破坏流式下载，cassette 也会变得很大
+
+    Returns:
+
+    """
+    if config.ENABLE_METRICS:
+        event_hooks = kwargs.setdefault("event_hooks", {})
+        event_hooks["request"] = list(event_hooks.get("request", [])) + [metrics.on_http_request]
+        event_hooks["response"] = list(event_hooks.get("response", [])) + [metrics.on_http_response]
+    mode = config.HTTP_CASSETTE_MODE
+    if mode == MODE_REPLAY:
+        kwargs.pop("proxies", None)
+        kwargs["transport"] = CassetteTransport(get_cassette())
+    elif mode == MODE_RECORD and record:
+        event_hooks = kwargs.setdefault("event_hooks", {})
+        event_hooks["response"] = list(event_hooks.get("response", [])) + [_record_response]
+    elif mode and mode != MODE_RECORD:
+        utils.logger.warning(f"[create_async_client] unknown HTTP_CASSETTE_MODE {mode}, ignored")
+    return httpx.AsyncClient(**kwargs)
@@ -0,0 +1,162 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 图片后处理（缩略图/格式转换），在独立的进程池中执行，避免图片解码占用爬虫的事件循环
+import asyncio
+import os
+import pathlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Set, Tuple
+
+from PIL import Image
+
+import config
+from tools import utils
+
+# 不同格式保存时使用的扩展名
+FORMAT_EXTENSIONS = {
+    "JPEG": "jpg",
+    "PNG": "png",
+    "WEBP": "webp",
+}
+
+
+def process_image(
+    source_file: str,
+    output_dir: str,
+    thumbnail_size: Optional[Tuple[int, int]],
+    normalize_format: Optional[str],
+) -> List[str]:
+    """
+    处理单张图片，运行在子进程中，参数全部显式传入，不依赖子进程里的config
+    Args:
+        source_file: 原图路径
+        output_dir: 输出目录
+        thumbnail_size: 缩略图最大宽高，None表示不生成缩略图
+        normalize_format: 统一转换成的格式，None表示不转换
+
+    Returns:
+        生成的文件列表
+    """
+    pathlib.Path(output_dir).mkdir(parents=True, exist_ok=True)
+    stem = pathlib.Path(source_file).stem
+    output_files = []
+    with Image.open(source_file) as image:
+        image.load()
+        save_format = (normalize_format or image.format or "JPEG").upper()
+        extension = FORMAT_EXTENSIONS.get(save_format, save_format.lower())
+        if save_format == "JPEG" and image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+
+        if normalize_format:
+            normalize_file = os.path.join(output_dir, f"{stem}.{extension}")
+            image.save(normalize_file, format=save_format)
+            output_files.append(normalize_file)
+
+        if thumbnail_size:
+            thumbnail = image.copy()
+            thumbnail.thumbnail(tuple(thumbnail_size))
+            thumbnail_file = os.path.join(output_dir, f"{stem}_{thumbnail_size[0]}x{thumbnail_size[1]}.{extension}")
+            thumbnail.save(thumbnail_file, format=save_format)
+            output_files.append(thumbnail_file)
+    return output_files
+
+
+class ImagePostProcessor:
+    """
+    图片后处理器，图片保存后投递到进程池处理，程序结束前调用 shutdown 等待处理完成
+    """
+
+    def __init__(self, max_workers: int = 0, output_path: str = ""):
+        self.max_workers = max_workers or config.IMAGE_POSTPROCESS_WORKERS
+        self.output_path = output_path or config.IMAGE_POSTPROCESS_PATH
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pending: Set[asyncio.Future] = set()
+        self.done_count = 0
+        self.failed_count = 0
+
+    async def submit(self, platform: str, note_id: str, source_file: str):
+        """
+        投递一张已保存的图片，立即返回
+        Args:
+            platform: 平台
+            note_id: 帖子ID
+            source_file: 已保存的原图路径
+
+        Returns:
+
+        """
+        if not config.IMAGE_THUMBNAIL_SIZE and not config.IMAGE_NORMALIZE_FORMAT:
+            return
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        output_dir = f"{self.output_path}/{platform}/{note_id}"
+        future = asyncio.get_running_loop().run_in_executor(
+            self._executor, process_image, source_file, output_dir,
+            config.IMAGE_THUMBNAIL_SIZE, config.IMAGE_NORMALIZE_FORMAT,
+        )
+        self._pending.add(future)
+        future.add_done_callback(lambda f: self._on_done(f, source_file))
+
+    def _on_done(self, future: asyncio.Future, source_file: str):
+        self._pending.discard(future)
+        if future.cancelled():
+            return
+        exception = future.exception()
+        if exception:
+            self.failed_count += 1
+            utils.logger.error(f"[ImagePostProcessor] process image {source_file} error: {exception}")
+            return
+        self.done_count += 1
+        utils.logger.info(f"[ImagePostProcessor] process image {source_file} success, output: {future.result()}")
+
+    async def shutdown(self):
+        """
+        等待所有已投递的图片处理完成后关闭进程池
+        Returns:
+
+        """
+        if self._pending:
+            utils.logger.info(f"[ImagePostProcessor.shutdown] wait for {len(self._pending)} images ...")
+            await asyncio.gather(*self._pending, return_exceptions=True)
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        utils.logger.info(
+            f"[ImagePostProcessor.shutdown] done: {self.done_count}, failed: {self.failed_count}")
+
+
+_image_processor: Optional[ImagePostProcessor] = None
+
+
+def get_image_processor() -> ImagePostProcessor:
+    """
+    获取全局的图片后处理器
+    Returns:
+
+    """
+    global _image_processor
+    if _image_processor is None:
+        _image_processor = ImagePostProcessor()
+    return _image_processor
+
+
+async def shutdown_image_processor():
+    """
+    程序结束前调用，等待图片后处理完成
+    Returns:
+
+    """
+    global _image_processor
+    if _image_processor is not None:
+        await _image_processor.shutdown()
+        _image_processor = None
@@ -0,0 +1,113 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : JSON 编解码，安装了 orjson 时使用 orjson，否则使用标准库 json，两种实现的输出格式保持一致：
+#            不转义非 ASCII 字符、紧凑分隔符、缩进固定为 2 个空格
+#            接口签名用到的 json 字符串格式由各平台决定，不走这里
+#            存储的数据文件保持原来的格式（json.dumps 的默认分隔符），使用 dumps_compat / dumps_compat_bytes
+import json
+from typing import Any, Callable, Optional, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+HAS_ORJSON = orjson is not None
+
+_ORJSON_OPTION = orjson.OPT_NON_STR_KEYS if HAS_ORJSON else 0
+_ORJSON_INDENT_OPTION = _ORJSON_OPTION | orjson.OPT_INDENT_2 if HAS_ORJSON else 0
+
+
+def loads(data: Union[str, bytes, bytearray]) -> Any:
+    """
+    解析 JSON
+    Args:
+        data: JSON 字符串或 UTF-8 编码的字节串
+
+    Returns:
+
+    """
+    if HAS_ORJSON:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps_bytes(obj: Any, indent: bool = False, default: Optional[Callable[[Any], Any]] = None) -> bytes:
+    """
+    序列化为 UTF-8 编码的 JSON，写文件时直接以二进制方式写入，省去一次编码
+    Args:
+        obj: 需要序列化的对象
+        indent: 是否缩进（2 个空格）
+        default: 无法序列化的对象的转换函数，和 json.dumps 的 default 参数相同
+
+    Returns:
+
+    """
+    if HAS_ORJSON:
+        try:
+            return orjson.dumps(obj, default=default, option=_ORJSON_INDENT_OPTION if indent else _ORJSON_OPTION)
+        except TypeError:
+            # orjson 不支持超过 64 位的整数等少数情况，交给标准库处理
+            pass
+    return _stdlib_dumps(obj, indent, default).encode("utf-8")
+
+
+def dumps(obj: Any, indent: bool = False, default: Optional[Callable[[Any], Any]] = None) -> str:
+    """
+    序列化为 JSON 字符串，参数同 dumps_bytes
+    """
+    if HAS_ORJSON:
+        return dumps_bytes(obj, indent, default).decode("utf-8")
+    return _stdlib_dumps(obj, indent, default)
+
+
+def dumps_compat(obj: Any, indent: Optional[int] = None) -> str:
+    """
+    按 json.dumps(obj, ensure_ascii=False, indent=indent) 的格式序列化，用于已有的数据文件和字段，
+    下游按原来的格式比较、解析这些数据；orjson 只支持紧凑分隔符和 2 个空格缩进，这里总是使用标准库
+    Args:
+        obj: 需要序列化的对象
+        indent: 缩进的空格数，None 表示不换行
+
+    Returns:
+
+    """
+    return json.dumps(obj, ensure_ascii=False, indent=indent)
+
+
+def dumps_compat_bytes(obj: Any, indent: Optional[int] = None) -> bytes:
+    """
+    同 dumps_compat，返回 UTF-8 编码的字节串，写文件时直接以二进制方式写入
+    """
+    return dumps_compat(obj, indent).encode("utf-8")
+
+
+def _stdlib_dumps(obj: Any, indent: bool, default: Optional[Callable[[Any], Any]]) -> str:
+    if indent:
+        return json.dumps(obj, ensure_ascii=False, indent=2, default=default)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=default)
+
+
+def response_json(response) -> Any:
+    """
+    解析 httpx 响应的 JSON，代替 response.json()，UTF-8 编码的响应直接解析原始字节，省去解码
+    Args:
+        response: httpx.Response
+
+    Returns:
+
+    """
+    charset = response.charset_encoding
+    if charset is None or charset.lower().replace("_", "-") in ("utf-8", "utf8"):
+        return loads(response.content)
+    return loads(response.text)
@@ -0,0 +1,472 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 独立的媒体下载流水线，图片/视频在后台worker中下载，不阻塞元数据爬取
+import asyncio
+import json
+import os
+import pathlib
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+import httpx
+from pydantic import BaseModel, Field
+
+import config
+from tools import metrics, utils
+from tools.http_cassette import create_async_client
+
+
+class MediaTask(BaseModel):
+    """
+    一个待下载的媒体文件
+    """
+    platform: str = Field(..., description="平台")
+    note_id: str = Field(..., description="帖子ID")
+    url: str = Field(..., description="媒体文件地址")
+    slot: str = Field(..., description="帖子下的文件名，例如 0.jpg")
+
+    @property
+    def key(self) -> str:
+        return f"{self.platform}:{self.note_id}:{self.slot}"
+
+
+# 每读到一块数据时调用，参数为这块数据的字节数
+ChunkCallback = Callable[[int], Awaitable[None]]
+MediaFetcher = Callable[[str, ChunkCallback], Awaitable[Optional[bytes]]]
+MediaSaver = Callable[[MediaTask, bytes], Awaitable[None]]
+
+
+class MediaTaskJournal:
+    """
+    待下载任务的持久化日志，追加写入 add/done 记录，启动时回放得到未完成的任务
+    """
+
+    def __init__(self, journal_file: str):
+        self.journal_file = journal_file
+        pathlib.Path(journal_file).parent.mkdir(parents=True, exist_ok=True)
+
+    def load_pending(self) -> List[MediaTask]:
+        """
+        回放日志，返回未完成的任务，并压缩日志只保留未完成的任务
+        Returns:
+
+        """
+        if not os.path.exists(self.journal_file):
+            return []
+        pending: Dict[str, MediaTask] = {}
+        with open(self.journal_file, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record: Dict = json.loads(line)
+                except ValueError:
+                    # 程序被强制中断时最后一行可能不完整
+                    continue
+                if record.get("op") == "add":
+                    task = MediaTask(**record["task"])
+                    pending[task.key] = task
+                elif record.get("op") == "done":
+                    pending.pop(record.get("key"), None)
+        tasks = list(pending.values())
+        with open(self.journal_file, "w", encoding="utf-8") as f:
+            for task in tasks:
+                f.write(json.dumps({"op": "add", "task": task.model_dump()}, ensure_ascii=False) + "\n")
+        return tasks
+
+    def read_added(self, offset: int, keys: Set[str], limit: int) -> Tuple[List[MediaTask], int]:
+        """
+        从 offset 开始按顺序读取 key 在 keys 中的 add 记录，用于把溢出内存队列的任务读回来
+        Args:
+            offset: 开始读取的文件位置
+            keys: 需要读取的任务 key
+            limit: 最多读取的任务数
+
+        Returns:
+            (任务列表, 下次开始读取的文件位置)
+        """
+        tasks: List[MediaTask] = []
+        with open(self.journal_file, "rb") as f:
+            f.seek(offset)
+            while len(tasks) < limit:
+                line = f.readline()
+                if not line:
+                    break
+                offset = f.tell()
+                try:
+                    record: Dict = json.loads(line)
+                except ValueError:
+                    continue
+                if record.get("op") == "add":
+                    task = MediaTask(**record["task"])
+                    if task.key in keys:
+                        tasks.append(task)
+        return tasks, offset
+
+    def add(self, task: MediaTask):
+        self._append({"op": "add", "task": task.model_dump()})
+
+    def done(self, task: MediaTask):
+        self._append({"op": "done", "key": task.key})
+
+    def clear(self):
+        if os.path.exists(self.journal_file):
+            os.remove(self.journal_file)
+
+    def _append(self, record: Dict):
+        with open(self.journal_file, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+class BandwidthLimiter:
+    """
+    简单的带宽限制器，每下载 n 字节需要占用 n / max_bytes_per_sec 秒的带宽时间，
+    下载时每读到一块数据调用一次，限速时暂停读取，服务端的发送也会被 TCP 流控减慢
+    """
+
+    def __init__(self, max_bytes_per_sec: int):
+        self.max_bytes_per_sec = max_bytes_per_sec
+        self._next_available_time = 0.0
+        self._lock = asyncio.Lock()
+
+    async def consume(self, size: int):
+        if self.max_bytes_per_sec <= 0 or size <= 0:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            start_time = max(now, self._next_available_time)
+            self._next_available_time = start_time + size / self.max_bytes_per_sec
+            wait_time = self._next_available_time - now
+        if wait_time > 0:
+            await asyncio.sleep(wait_time)
+
+
+class MediaDownloadPipeline:
+    """
+    媒体下载流水线：爬虫只负责投递下载任务，由独立的worker池异步下载并保存
+    """
+
+    def __init__(
+        self,
+        platform: str,
+        fetcher: MediaFetcher,
+        saver: MediaSaver,
+        workers: int = 0,
+        max_bytes_per_sec: int = -1,
+        queue_dir: str = "",
+        queue_size: int = 0,
+    ):
+        """
+        Args:
+            platform: 平台，用于区分持久化的队列文件
+            fetcher: 下载函数，传入url和每读到一块数据时的回调（带宽限制），返回文件内容，失败返回None
+            saver: 保存函数，传入任务和文件内容
+            workers: worker数量，默认取 config.MEDIA_DOWNLOAD_WORKERS
+            max_bytes_per_sec: 带宽限制，默认取 config.MEDIA_DOWNLOAD_MAX_BYTES_PER_SEC
+            queue_dir: 队列持久化目录，默认取 config.MEDIA_DOWNLOAD_QUEUE_DIR
+            queue_size: 内存队列长度上限，默认取 config.MEDIA_DOWNLOAD_QUEUE_SIZE
+        """
+        self.platform = platform
+        self.fetcher = fetcher
+        self.saver = saver
+        self.workers = workers or config.MEDIA_DOWNLOAD_WORKERS
+        self.bandwidth_limiter = BandwidthLimiter(
+            max_bytes_per_sec if max_bytes_per_sec >= 0 else config.MEDIA_DOWNLOAD_MAX_BYTES_PER_SEC)
+        self.journal = MediaTaskJournal(f"{queue_dir or config.MEDIA_DOWNLOAD_QUEUE_DIR}/{platform}_pending.jsonl")
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size or config.MEDIA_DOWNLOAD_QUEUE_SIZE)
+        # 内存队列满时溢出的任务只记录 key，任务本身从持久化日志中读回
+        self._spilled_keys: Set[str] = set()
+        self._journal_offset = 0
+        self._worker_tasks: List[asyncio.Task] = []
+        self._submitted_keys = set()
+        self.total_count = 0
+        self.done_count = 0
+        self.failed_count = 0
+        self.downloaded_bytes = 0
+        self._start_time = 0.0
+        self._last_progress_time = 0.0
+
+    async def start(self):
+        """
+        启动worker，并恢复上次未完成的下载任务
+        Returns:
+
+        """
+        self._start_time = time.monotonic()
+        pending_tasks = self.journal.load_pending()
+        self._journal_offset = 0
+        if pending_tasks:
+            utils.logger.info(
+                f"[MediaDownloadPipeline.start] resume {len(pending_tasks)} pending {self.platform} media tasks")
+        for task in pending_tasks:
+            self._enqueue(task)
+        if config.MEDIA_RESUME_DEFERRED:
+            await self.resume_deferred()
+        for index in range(self.workers):
+            self._worker_tasks.append(
+                asyncio.create_task(self._worker(), name=f"media_download_worker_{self.platform}_{index}"))
+
+    async def submit(self, task: MediaTask):
+        """
+        投递一个下载任务，立即返回
+        Args:
+            task:
+
+        Returns:
+
+        """
+        if task.key in self._submitted_keys:
+            return
+        self.journal.add(task)
+        self._enqueue(task)
+
+    async def resume_deferred(self) -> int:
+        """
+        把之前因超过上限被延后（defer）的媒体文件中，符合当前上限的重新加入下载队列，并删除对应的 defer 记录
+        Returns:
+            重新加入的任务数
+        """
+        from store.media_store import get_media_store
+        index = get_media_store().index
+        resumed_count = 0
+        for item in index.list_decisions(self.platform, "defer"):
+            if check_media_limits(item["size"], item["duration"]):
+                continue
+            await self.submit(
+                MediaTask(platform=item["platform"], note_id=item["note_id"], url=item["url"], slot=item["slot"]))
+            index.delete_decision(item["platform"], item["note_id"], item["slot"])
+            resumed_count += 1
+        if resumed_count:
+            utils.logger.info(
+                f"[MediaDownloadPipeline.resume_deferred] resume {resumed_count} deferred {self.platform} media tasks")
+        return resumed_count
+
+    async def close(self):
+        """
+        等待所有已投递的任务下载完成后停止worker
+        Returns:
+
+        """
+        if self._queue.qsize() or self.done_count + self.failed_count < self.total_count:
+            utils.logger.info(
+                f"[MediaDownloadPipeline.close] wait for {self.total_count - self.done_count - self.failed_count} media tasks ...")
+        await self._queue.join()
+        for worker_task in self._worker_tasks:
+            worker_task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks.clear()
+        if self.failed_count:
+            # 下载失败的任务留在日志中，下次启动时重试
+            failed_tasks = self.journal.load_pending()
+            utils.logger.warning(
+                f"[MediaDownloadPipeline.close] {len(failed_tasks)} failed media tasks are kept in {self.journal.journal_file} for retry")
+        else:
+            self.journal.clear()
+        self.report_progress(force=True)
+
+    def progress(self) -> Dict:
+        """
+        当前下载进度
+        Returns:
+
+        """
+        elapsed = max(time.monotonic() - self._start_time, 1e-6)
+        return {
+            "platform": self.platform,
+            "total": self.total_count,
+            "done": self.done_count,
+            "failed": self.failed_count,
+            "pending": self.total_count - self.done_count - self.failed_count,
+            "downloaded_bytes": self.downloaded_bytes,
+            "bytes_per_sec": int(self.downloaded_bytes / elapsed),
+        }
+
+    def report_progress(self, force: bool = False):
+        now = time.monotonic()
+        if not force and now - self._last_progress_time < config.MEDIA_DOWNLOAD_PROGRESS_INTERVAL:
+            return
+        self._last_progress_time = now
+        utils.logger.info(f"[MediaDownloadPipeline] progress: {self.progress()}")
+
+    def _enqueue(self, task: MediaTask):
+        self._submitted_keys.add(task.key)
+        self.total_count += 1
+        if self._spilled_keys or self._queue.full():
+            # 已经有溢出的任务时新任务也排在后面，保持投递顺序
+            self._spilled_keys.add(task.key)
+        else:
+            self._queue.put_nowait((task, time.perf_counter()))
+        metrics.MEDIA_QUEUE_SIZE.set(self._queue.qsize() + len(self._spilled_keys), platform=self.platform)
+
+    def _refill(self):
+        """
+        内存队列有空位时从日志中读回溢出的任务
+        Returns:
+
+        """
+        if not self._spilled_keys or self._queue.full():
+            return
+        tasks, self._journal_offset = self.journal.read_added(
+            self._journal_offset, self._spilled_keys, self._queue.maxsize - self._queue.qsize())
+        for task in tasks:
+            self._spilled_keys.discard(task.key)
+            self._queue.put_nowait((task, time.perf_counter()))
+        if not tasks:
+            utils.logger.error(
+                f"[MediaDownloadPipeline._refill] {len(self._spilled_keys)} spilled media tasks not found in {self.journal.journal_file}")
+            self.failed_count += len(self._spilled_keys)
+            self._spilled_keys.clear()
+
+    async def _worker(self):
+        while True:
+            task, enqueue_time = await self._queue.get()
+            metrics.MEDIA_QUEUE_WAIT_SECONDS.observe(time.perf_counter() - enqueue_time, platform=self.platform)
+            metrics.MEDIA_QUEUE_SIZE.set(self._queue.qsize() + len(self._spilled_keys), platform=self.platform)
+            try:
+                if await self._download(task):
+                    self.journal.done(task)
+            finally:
+                # 先补充队列再 task_done，保证还有溢出任务时 close 中的 join 不会提前返回
+                self._refill()
+                self._queue.task_done()
+                self.report_progress()
+
+    async def _download(self, task: MediaTask) -> bool:
+        try:
+            content = await self.fetcher(task.url, self.bandwidth_limiter.consume)
+            if content is None:
+                self.failed_count += 1
+                return False
+            await self.saver(task, content)
+            self.downloaded_bytes += len(content)
+            metrics.MEDIA_DOWNLOAD_BYTES.inc(len(content), platform=self.platform)
+            self.done_count += 1
+            return True
+        except Exception as e:
+            self.failed_count += 1
+            utils.logger.error(f"[MediaDownloadPipeline._download] download {task.key} url: {task.url} error: {e}")
+            return False
+
+
+async def fetch_media(url: str, headers: Optional[Dict] = None, proxies=None, timeout: int = 10,
+                      on_chunk: Optional[ChunkCallback] = None) -> Optional[bytes]:
+    """
+    流式下载媒体文件
+    Args:
+        url: 媒体文件地址
+        headers: 请求头
+        proxies: 代理
+        timeout: 超时时间
+        on_chunk: 每读到一块数据时先调用，媒体下载流水线用它限制带宽
+
+    Returns:
+        文件内容，请求失败返回None
+    """
+    async with create_async_client(record=False, proxies=proxies) as client:
+        async with client.stream("GET", url, headers=headers, timeout=timeout) as response:
+            if not response.reason_phrase == "OK":
+                await response.aread()
+                utils.logger.error(f"[fetch_media] request {url} err, res:{response.text}")
+                return None
+            content = bytearray()
+            async for chunk in response.aiter_bytes():
+                if on_chunk is not None:
+                    await on_chunk(len(chunk))
+                content += chunk
+            return bytes(content)
+
+
+async def probe_media_size(url: str, headers: Optional[Dict] = None, proxies=None, timeout: int = 10) -> Optional[int]:
+    """
+    下载前探测媒体文件大小，优先使用HEAD请求，服务端不支持时退化为只取第一个字节的Range请求
+    Args:
+        url: 媒体文件地址
+        headers: 请求头
+        proxies: 代理
+        timeout: 超时时间
+
+    Returns:
+        文件大小，探测失败返回None
+    """
+    try:
+        async with httpx.AsyncClient(proxies=proxies, follow_redirects=True) as client:
+            response = await client.head(url, headers=headers, timeout=timeout)
+            content_length = response.headers.get("Content-Length")
+            if response.status_code < 400 and content_length and content_length.isdigit():
+                return int(content_length)
+
+            range_headers = dict(headers or {})
+            range_headers["Range"] = "bytes=0-0"
+            async with client.stream("GET", url, headers=range_headers, timeout=timeout) as response:
+                # Content-Range: bytes 0-0/123456
+                content_range = response.headers.get("Content-Range", "")
+                total = content_range.rsplit("/", 1)[-1]
+                if response.status_code == 206 and total.isdigit():
+                    return int(total)
+    except httpx.HTTPError as e:
+        utils.logger.warning(f"[probe_media_size] probe {url} error: {e}")
+    return None
+
+
+def check_media_limits(size: Optional[int], duration: Optional[int]) -> str:
+    """
+    检查媒体文件是否超过配置的大小和时长上限
+    Args:
+        size: 文件大小，单位字节，未知为None
+        duration: 时长，单位秒，未知为None
+
+    Returns:
+        超限原因，没有超限返回空字符串
+    """
+    if config.MEDIA_MAX_BYTES and size and size > config.MEDIA_MAX_BYTES:
+        return f"size {size} > {config.MEDIA_MAX_BYTES}"
+    if config.MEDIA_MAX_DURATION_SEC and duration and duration > config.MEDIA_MAX_DURATION_SEC:
+        return f"duration {duration}s > {config.MEDIA_MAX_DURATION_SEC}s"
+    return ""
+
+
+async def preflight_media(
+    task: MediaTask,
+    size: Optional[int] = None,
+    duration: Optional[int] = None,
+    headers: Optional[Dict] = None,
+    proxies=None,
+) -> bool:
+    """
+    媒体文件下载前检查，超过上限的文件按 config.MEDIA_OVERSIZE_ACTION 跳过或延后，并把结果记录到媒体索引中，
+    延后的文件在开启 MEDIA_RESUME_DEFERRED 后由 MediaDownloadPipeline.resume_deferred 重新加入下载队列
+    Args:
+        task: 待下载的媒体文件
+        size: 平台接口返回的文件大小，未知为None
+        duration: 平台接口返回的时长（秒），未知为None
+        headers: 探测文件大小时使用的请求头
+        proxies: 探测文件大小时使用的代理
+
+    Returns:
+        是否继续下载
+    """
+    if not config.MEDIA_MAX_BYTES and not config.MEDIA_MAX_DURATION_SEC:
+        return True
+    if size is None and config.MEDIA_MAX_BYTES and config.ENABLE_MEDIA_SIZE_PROBE:
+        size = await probe_media_size(task.url, headers=headers, proxies=proxies)
+    reason = check_media_limits(size, duration)
+    if not reason:
+        return True
+
+    from store.media_store import get_media_store
+    decision = "defer" if config.MEDIA_OVERSIZE_ACTION == "defer" else "skip"
+    get_media_store().index.record_decision(
+        task.platform, task.note_id, task.slot, task.url, size, duration, decision, reason)
+    utils.logger.info(f"[preflight_media] {decision} media {task.key}, reason: {reason}")
+    return False
@@ -0,0 +1,445 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 进程内的运行指标（计数器、直方图、仪表盘），统计接口请求、页面解析、存储写入、并发等待和下载字节数，
+#            可以通过 Prometheus 文本格式的 HTTP 接口查看，也可以定期写入 json 文件
+#            ENABLE_METRICS 关闭时所有埋点直接返回
+import asyncio
+import bisect
+import pathlib
+import re
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+import httpx
+
+import config
+from tools import json_codec, profiler, utils
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (1, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+# 接口路径中的ID（纯数字、长十六进制串、长随机串）统一替换掉，避免每个帖子一个 endpoint
+ID_SEGMENT_PATTERN = re.compile(r"^(\d+|[0-9a-fA-F]{16,}|[\w-]{24,})$")
+
+
+class Metric:
+    metric_type = ""
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._values: Dict[Tuple[str, ...], Any] = {}
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(label_name, "")) for label_name in self.label_names)
+
+    def reset(self):
+        self._values.clear()
+
+    def samples(self) -> List[Tuple[str, Dict[str, str], float]]:
+        """
+        Returns:
+            [(指标名, 标签, 数值), ...]，直方图展开为 _bucket / _sum / _count
+        """
+        return [(self.name, dict(zip(self.label_names, key)), value) for key, value in self._values.items()]
+
+    def snapshot(self) -> List[Dict]:
+        return [{"labels": dict(zip(self.label_names, key)), "value": value} for key, value in self._values.items()]
+
+
+class Counter(Metric):
+    metric_type = "counter"
+
+    def inc(self, value: float = 1, **labels):
+        if not config.ENABLE_METRICS:
+            return
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + value
+
+
+class Gauge(Metric):
+    metric_type = "gauge"
+
+    def set(self, value: float, **labels):
+        if not config.ENABLE_METRICS:
+            return
+        self._values[self._key(labels)] = value
+
+    def inc(self, value: float = 1, **labels):
+        if not config.ENABLE_METRICS:
+            return
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + value
+
+    def dec(self, value: float = 1, **labels):
+        self.inc(-value, **labels)
+
+
+class _Timer:
+    __slots__ = ("histogram", "labels", "start")
+
+    def __init__(self, histogram: "Histogram", labels: Dict[str, Any]):
+        self.histogram = histogram
+        self.labels = labels
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.histogram.observe(time.perf_counter() - self.start, **self.labels)
+
+
+class _NullTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+
+NULL_TIMER = _NullTimer()
+
+
+class Histogram(Metric):
+    metric_type = "histogram"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, **labels):
+        if not config.ENABLE_METRICS:
+            return
+        key = self._key(labels)
+        state = self._values.get(key)
+        if state is None:
+            # [每个桶的数量（最后一个为 +Inf）, 总和, 总数]
+            state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        state[0][bisect.bisect_left(self.buckets, value)] += 1
+        state[1] += value
+        state[2] += 1
+
+    def time(self, **labels):
+        """
+        统计 with 代码块的耗时（秒）
+        """
+        if not config.ENABLE_METRICS:
+            return NULL_TIMER
+        return _Timer(self, labels)
+
+    def samples(self) -> List[Tuple[str, Dict[str, str], float]]:
+        samples = []
+        for key, (bucket_counts, total, count) in self._values.items():
+            labels = dict(zip(self.label_names, key))
+            cumulative = 0
+            for upper_bound, bucket_count in zip(self.buckets + (float("inf"),), bucket_counts):
+                cumulative += bucket_count
+                samples.append((f"{self.name}_bucket", {**labels, "le": _format_value(upper_bound)}, cumulative))
+            samples.append((f"{self.name}_sum", labels, total))
+            samples.append((f"{self.name}_count", labels, count))
+        return samples
+
+    def snapshot(self) -> List[Dict]:
+        snapshot = []
+        for key, (bucket_counts, total, count) in self._values.items():
+            snapshot.append({
+                "labels": dict(zip(self.label_names, key)),
+                "count": count,
+                "sum": total,
+                "buckets": dict(zip([_format_value(upper_bound) for upper_bound in self.buckets] + ["+Inf"],
+                                    bucket_counts)),
+            })
+        return snapshot
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def _register(self, metric: Metric) -> Any:
+        return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, label_names))
+
+    def gauge(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, label_names))
+
+    def histogram(self, name: str, documentation: str, label_names: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, label_names, buckets))
+
+    def get(self, name: str) -> Optional[Metric]:
+        return self._metrics.get(name)
+
+    def reset(self):
+        for metric in self._metrics.values():
+            metric.reset()
+
+    def render_prometheus(self) -> str:
+        """
+        Prometheus 文本格式
+        Returns:
+
+        """
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.metric_type}")
+            for sample_name, labels, value in metric.samples():
+                if labels:
+                    label_text = ",".join(f'{name}="{_escape_label_value(label_value)}"'
+                                          for name, label_value in labels.items())
+                    lines.append(f"{sample_name}{{{label_text}}} {_format_value(value)}")
+                else:
+                    lines.append(f"{sample_name} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> Dict:
+        """
+        json 格式的指标快照
+        Returns:
+
+        """
+        return {
+            "time": utils.get_current_time(),
+            "metrics": {metric.name: {"type": metric.metric_type, "help": metric.documentation,
+                                      "samples": metric.snapshot()} for metric in self._metrics.values()},
+        }
+
+
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUESTS = REGISTRY.counter(
+    "crawler_http_requests_total", "平台接口请求数", ("platform", "method", "endpoint", "status"))
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "crawler_http_request_seconds", "平台接口请求耗时（包括读取响应内容）", ("platform", "method", "endpoint"))
+HTTP_RESPONSE_BYTES = REGISTRY.counter(
+    "crawler_http_response_bytes_total", "平台接口下载的字节数", ("platform", "endpoint"))
+EXTRACT_SECONDS = REGISTRY.histogram(
+    "crawler_extract_seconds", "页面解析耗时，mode 为 inline（事件循环中解析）或 offload（进程池中解析）",
+    ("parser", "mode"))
+STORE_WRITE_SECONDS = REGISTRY.histogram(
+    "crawler_store_write_seconds", "单条数据的存储耗时", ("platform", "backend", "item_type"))
+STORE_BATCH_SIZE = REGISTRY.histogram(
+    "crawler_store_batch_size", "每批存储的数据条数", ("platform", "backend", "item_type"), SIZE_BUCKETS)
+SEMAPHORE_WAIT_SECONDS = REGISTRY.histogram(
+    "crawler_semaphore_wait_seconds", "等待并发信号量的时间", ("platform",))
+SEMAPHORE_IN_USE = REGISTRY.gauge(
+    "crawler_semaphore_in_use", "正在执行的并发任务数", ("platform",))
+MEDIA_QUEUE_WAIT_SECONDS = REGISTRY.histogram(
+    "crawler_media_queue_wait_seconds", "媒体下载任务在队列中的等待时间", ("platform",))
+MEDIA_QUEUE_SIZE = REGISTRY.gauge(
+    "crawler_media_queue_size", "媒体下载队列中等待的任务数", ("platform",))
+MEDIA_DOWNLOAD_BYTES = REGISTRY.counter(
+    "crawler_media_download_bytes_total", "媒体文件下载的字节数", ("platform",))
+
+
+def normalize_endpoint(host: str, path: str) -> str:
+    """
+    接口地址去掉路径中的ID
+    Args:
+        host: 域名
+        path: 路径
+
+    Returns:
+
+    """
+    segments = [":id" if ID_SEGMENT_PATTERN.match(segment) else segment for segment in path.split("/")]
+    return f"{host}{'/'.join(segments)}"
+
+
+async def on_http_request(request):
+    """
+    httpx 请求钩子，记录请求开始时间
+    """
+    request.extensions["metrics_start_time"] = time.perf_counter()
+
+
+async def on_http_response(response: httpx.Response):
+    """
+    httpx 响应钩子，统计请求数；不读取响应内容，字节数和耗时在响应内容读完、响应关闭时统计，流式下载仍然按块读取
+    """
+    request = response.request
+    endpoint = normalize_endpoint(request.url.host, request.url.path)
+    HTTP_REQUESTS.inc(platform=config.PLATFORM, method=request.method, endpoint=endpoint,
+                      status=response.status_code)
+    if response.is_closed:
+        # 回放等不经过网络的响应创建时内容已经读取
+        _observe_response(request, endpoint, response.num_bytes_downloaded or len(response.content))
+    else:
+        response.stream = MeteredByteStream(response.stream, request, endpoint)
+
+
+class MeteredByteStream(httpx.AsyncByteStream):
+    """
+    包装响应的数据流，统计实际读到的字节数（压缩后），关闭时记录字节数和耗时
+    """
+
+    def __init__(self, stream: httpx.AsyncByteStream, request: httpx.Request, endpoint: str):
+        self._stream = stream
+        self._request = request
+        self._endpoint = endpoint
+        self.num_bytes = 0
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            self.num_bytes += len(chunk)
+            yield chunk
+
+    async def aclose(self):
+        await self._stream.aclose()
+        _observe_response(self._request, self._endpoint, self.num_bytes)
+
+
+def _observe_response(request: httpx.Request, endpoint: str, num_bytes: int):
+    HTTP_RESPONSE_BYTES.inc(num_bytes, platform=config.PLATFORM, endpoint=endpoint)
+    start_time = request.extensions.get("metrics_start_time")
+    if start_time is not None:
+        HTTP_REQUEST_SECONDS.observe(time.perf_counter() - start_time, platform=config.PLATFORM,
+                                     method=request.method, endpoint=endpoint)
+
+
+class TimedSemaphore(asyncio.Semaphore):
+    """
+    统计等待时间的并发信号量，用法和 asyncio.Semaphore 相同，开启了任务追踪时同时上报给 TaskTracer
+    """
+
+    async def acquire(self):
+        tracer = profiler.get_task_tracer()
+        if not config.ENABLE_METRICS and tracer is None:
+            return await super().acquire()
+        start_time = time.perf_counter()
+        result = await super().acquire()
+        wait_seconds = time.perf_counter() - start_time
+        SEMAPHORE_WAIT_SECONDS.observe(wait_seconds, platform=config.PLATFORM)
+        SEMAPHORE_IN_USE.inc(platform=config.PLATFORM)
+        if tracer is not None:
+            tracer.observe_semaphore_wait(start_time, wait_seconds)
+        return result
+
+    def release(self):
+        super().release()
+        SEMAPHORE_IN_USE.dec(platform=config.PLATFORM)
+
+
+class MetricsExporter:
+    """
+    指标导出：Prometheus 文本格式的 HTTP 接口（/metrics，/metrics.json 为 json 格式）和定期写入的 json 文件
+    """
+
+    def __init__(self, registry: MetricsRegistry = REGISTRY, http_port: int = -1, dump_file: Optional[str] = None):
+        self.registry = registry
+        self.http_host = config.METRICS_HTTP_HOST
+        self.http_port = config.METRICS_HTTP_PORT if http_port < 0 else http_port
+        self.dump_file = config.METRICS_DUMP_FILE if dump_file is None else dump_file
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._dump_task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        if self.http_port:
+            self._server = await asyncio.start_server(self._handle_http, self.http_host, self.http_port)
+            utils.logger.info(
+                f"[MetricsExporter.start] metrics endpoint: http://{self.http_host}:{self.http_port}/metrics")
+        if self.dump_file:
+            self._dump_task = asyncio.create_task(self._dump_periodically())
+
+    async def stop(self):
+        if self._dump_task is not None:
+            self._dump_task.cancel()
+            self._dump_task = None
+        if self.dump_file:
+            self.dump()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    def dump(self):
+        pathlib.Path(self.dump_file).parent.mkdir(parents=True, exist_ok=True)
+        with open(self.dump_file, "wb") as f:
+            f.write(json_codec.dumps_bytes(self.registry.snapshot(), indent=True))
+
+    async def _dump_periodically(self):
+        while True:
+            await asyncio.sleep(config.METRICS_DUMP_INTERVAL_SEC)
+            try:
+                self.dump()
+            except OSError as e:
+                utils.logger.error(f"[MetricsExporter._dump_periodically] dump metrics error: {e}")
+
+    async def _handle_http(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = await reader.readline()
+            # 丢弃请求头
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            parts = request_line.decode("latin-1").split()
+            path = parts[1].split("?")[0] if len(parts) > 1 else ""
+            if path == "/metrics":
+                status, content_type = "200 OK", "text/plain; version=0.0.4; charset=utf-8"
+                body = self.registry.render_prometheus().encode("utf-8")
+            elif path == "/metrics.json":
+                status, content_type = "200 OK", "application/json"
+                body = json_codec.dumps_bytes(self.registry.snapshot())
+            else:
+                status, content_type, body = "404 Not Found", "text/plain", b"not found\n"
+            writer.write(f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+                         f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode("latin-1") + body)
+            await writer.drain()
+        finally:
+            writer.close()
+
+
+_exporter: Optional[MetricsExporter] = None
+
+
+async def start_metrics_exporter():
+    """
+    程序启动时调用，开启了指标统计并配置了端口或 json 文件时启动导出
+    Returns:
+
+    """
+    global _exporter
+    if not config.ENABLE_METRICS or _exporter is not None:
+        return
+    _exporter = MetricsExporter()
+    await _exporter.start()
+
+
+async def stop_metrics_exporter():
+    """
+    程序结束前调用，写入最后一次 json 快照并关闭 HTTP 接口
+    Returns:
+
+    """
+    global _exporter
+    if _exporter is not None:
+        await _exporter.stop()
+        _exporter = None
@@ -0,0 +1,382 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : 性能分析模式，命令行 --profile / --trace_tasks 开启：
+#            cprofile 确定性分析整次运行，sample 定时采样主线程调用栈生成火焰图用的折叠栈，
+#            任务追踪记录每个 asyncio 任务的生命周期、执行时间、CPU 时间和信号量等待时间，用来判断 MAX_CONCURRENCY_NUM 调到多大不再有收益
+import asyncio
+import collections.abc
+import cProfile
+import functools
+import io
+import os
+import pathlib
+import pstats
+import sys
+import threading
+import time
+import weakref
+from collections import defaultdict
+from typing import Any, Coroutine, Dict, List, Optional, Tuple
+
+import config
+from tools import json_codec, utils
+
+MODE_CPROFILE = "cprofile"
+MODE_SAMPLE = "sample"
+
+
+class TaskRecord:
+    """
+    一个 asyncio 任务的追踪记录，时间均为 time.perf_counter() 的值
+    """
+    __slots__ = ("task_id", "name", "created", "finished", "cancelled", "steps", "run_seconds", "cpu_seconds",
+                 "semaphore_waits")
+
+    def __init__(self, task_id: int, name: str, created: float):
+        self.task_id = task_id
+        self.name = name
+        self.created = created
+        self.finished: Optional[float] = None
+        self.cancelled = False
+        self.steps = 0
+        self.run_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.semaphore_waits: List[Tuple[float, float]] = []
+
+
+class TracedCoroutine(collections.abc.Coroutine):
+    """
+    包装任务的协程，统计每次被事件循环调度（send / throw）时的执行时间和 CPU 时间，
+    其余属性（cr_frame、cr_await 等）转给原协程
+    """
+    __slots__ = ("_coro", "_record")
+
+    def __init__(self, coro: Coroutine, record: TaskRecord):
+        self._coro = coro
+        self._record = record
+
+    def send(self, value):
+        return self._step(self._coro.send, value)
+
+    def throw(self, *args):
+        return self._step(self._coro.throw, *args)
+
+    def close(self):
+        return self._coro.close()
+
+    def __await__(self):
+        return self._coro.__await__()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._coro, name)
+
+    def _step(self, method, *args):
+        record = self._record
+        wall_start, cpu_start = time.perf_counter(), time.thread_time()
+        try:
+            return method(*args)
+        finally:
+            record.cpu_seconds += time.thread_time() - cpu_start
+            record.run_seconds += time.perf_counter() - wall_start
+            record.steps += 1
+
+
+def _coroutine_name(coro: Any) -> str:
+    return getattr(coro, "__qualname__", None) or type(coro).__name__
+
+
+class TaskTracer:
+    """
+    通过事件循环的 task factory 追踪之后创建的所有任务，信号量等待时间由 TimedSemaphore 上报
+    """
+
+    def __init__(self):
+        self.records: List[TaskRecord] = []
+        self.started = time.perf_counter()
+        self.stopped: Optional[float] = None
+        self.live_tasks = 0
+        self.max_live_tasks = 0
+        self._task_records: "weakref.WeakKeyDictionary[asyncio.Task, TaskRecord]" = weakref.WeakKeyDictionary()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._origin_task_factory = None
+
+    def install(self, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+        self._origin_task_factory = loop.get_task_factory()
+        loop.set_task_factory(self._task_factory)
+
+    def uninstall(self):
+        self.stopped = time.perf_counter()
+        if self._loop is not None:
+            self._loop.set_task_factory(self._origin_task_factory)
+            self._loop = None
+
+    def _task_factory(self, loop: asyncio.AbstractEventLoop, coro: Coroutine) -> asyncio.Future:
+        record = TaskRecord(len(self.records) + 1, _coroutine_name(coro), time.perf_counter())
+        self.records.append(record)
+        traced_coro = TracedCoroutine(coro, record)
+        if self._origin_task_factory is None:
+            task = asyncio.Task(traced_coro, loop=loop)
+        else:
+            task = self._origin_task_factory(loop, traced_coro)
+        self._task_records[task] = record
+        self.live_tasks += 1
+        self.max_live_tasks = max(self.max_live_tasks, self.live_tasks)
+        task.add_done_callback(self._on_task_done)
+        return task
+
+    def _on_task_done(self, task: asyncio.Future):
+        record = self._task_records.pop(task, None)
+        if record is not None:
+            record.finished = time.perf_counter()
+            record.cancelled = task.cancelled()
+            self.live_tasks -= 1
+
+    def observe_semaphore_wait(self, start_time: float, wait_seconds: float):
+        """
+        记录当前任务一次获取信号量的等待
+        Args:
+            start_time: 开始等待的 time.perf_counter()
+            wait_seconds: 等待时长
+
+        Returns:
+
+        """
+        record = self._task_records.get(asyncio.current_task())
+        if record is not None:
+            record.semaphore_waits.append((start_time, wait_seconds))
+
+    def summary(self) -> Dict:
+        """
+        按协程汇总：任务数、生命周期（创建到结束的墙钟时间）、实际执行时间、CPU 时间、信号量等待时间
+        Returns:
+
+        """
+        end_time = self.stopped or time.perf_counter()
+        coroutines: Dict[str, Dict] = {}
+        for record in self.records:
+            wall_seconds = (record.finished or end_time) - record.created
+            stats = coroutines.setdefault(record.name, {
+                "name": record.name, "count": 0, "unfinished": 0, "wall_seconds": 0.0, "max_wall_seconds": 0.0,
+                "run_seconds": 0.0, "cpu_seconds": 0.0, "semaphore_waits": 0, "semaphore_wait_seconds": 0.0,
+            })
+            stats["count"] += 1
+            stats["unfinished"] += record.finished is None
+            stats["wall_seconds"] += wall_seconds
+            stats["max_wall_seconds"] = max(stats["max_wall_seconds"], wall_seconds)
+            stats["run_seconds"] += record.run_seconds
+            stats["cpu_seconds"] += record.cpu_seconds
+            stats["semaphore_waits"] += len(record.semaphore_waits)
+            stats["semaphore_wait_seconds"] += sum(wait_seconds for _, wait_seconds in record.semaphore_waits)
+        return {
+            "platform": config.PLATFORM,
+            "max_concurrency_num": config.MAX_CONCURRENCY_NUM,
+            "elapsed_seconds": end_time - self.started,
+            "task_count": len(self.records),
+            "max_live_tasks": self.max_live_tasks,
+            "coroutines": sorted(coroutines.values(), key=lambda item: item["cpu_seconds"], reverse=True),
+        }
+
+    def chrome_trace(self) -> Dict:
+        """
+        Chrome trace 事件格式，每个任务一行，任务生命周期和其中的信号量等待各为一个事件
+        Returns:
+
+        """
+        end_time = self.stopped or time.perf_counter()
+
+        def to_us(seconds: float) -> int:
+            return int(seconds * 1_000_000)
+
+        events = []
+        for record in self.records:
+            events.append({
+                "name": record.name, "cat": "task", "ph": "X", "pid": 1, "tid": record.task_id,
+                "ts": to_us(record.created - self.started),
+                "dur": to_us((record.finished or end_time) - record.created),
+                "args": {"steps": record.steps, "run_ms": record.run_seconds * 1000,
+                         "cpu_ms": record.cpu_seconds * 1000, "cancelled": record.cancelled,
+                         "unfinished": record.finished is None},
+            })
+            for start_time, wait_seconds in record.semaphore_waits:
+                events.append({
+                    "name": "semaphore_wait", "cat": "semaphore", "ph": "X", "pid": 1, "tid": record.task_id,
+                    "ts": to_us(start_time - self.started), "dur": to_us(wait_seconds),
+                })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+@functools.lru_cache(maxsize=None)
+def _frame_label(co_name: str, filename: str, first_line: int) -> str:
+    try:
+        filename = os.path.relpath(filename)
+    except ValueError:
+        pass
+    if filename.startswith(".."):
+        filename = os.path.basename(filename)
+    return f"{co_name} ({filename}:{first_line})"
+
+
+class StackSampler:
+    """
+    后台线程定时采样指定线程的调用栈，按折叠栈（根;...;叶 次数）计数，每次采样代表一个采样间隔的墙钟时间，
+    事件循环空闲时栈顶是 select，可以直接看出等待网络和执行代码各占多少
+    """
+
+    def __init__(self, interval: float, thread_id: Optional[int] = None):
+        self.interval = interval
+        self.thread_id = threading.get_ident() if thread_id is None else thread_id
+        self.stacks: Dict[str, int] = defaultdict(int)
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            labels = []
+            while frame is not None:
+                code = frame.f_code
+                labels.append(_frame_label(code.co_name, code.co_filename, code.co_firstlineno))
+                frame = frame.f_back
+            if labels:
+                self.stacks[";".join(reversed(labels))] += 1
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(self.stacks.items()))
+
+
+class ProfileSession:
+    """
+    一次运行的性能分析，stop 时把结果写到 输出前缀 + 后缀 的文件中：
+    .prof / _cprofile.txt（cprofile），.folded（sample），_tasks.json / _tasks.trace.json（任务追踪）
+    """
+
+    def __init__(self, profile_mode: Optional[str] = None, trace_tasks: Optional[bool] = None,
+                 output_prefix: Optional[str] = None):
+        self.profile_mode = config.PROFILE_MODE if profile_mode is None else profile_mode
+        self.trace_tasks = config.ENABLE_TASK_TRACE if trace_tasks is None else trace_tasks
+        self.output_prefix = output_prefix or \
+            f"{config.PROFILE_PATH}/{config.PLATFORM}_{config.CRAWLER_TYPE}_{time.strftime('%Y%m%d_%H%M%S')}"
+        self.tracer: Optional[TaskTracer] = None
+        self._profiler: Optional[cProfile.Profile] = None
+        self._sampler: Optional[StackSampler] = None
+
+    def start(self):
+        """
+        在事件循环中调用，任务追踪只对之后创建的任务生效
+        Returns:
+
+        """
+        if self.profile_mode == MODE_CPROFILE:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        elif self.profile_mode == MODE_SAMPLE:
+            self._sampler = StackSampler(config.PROFILE_SAMPLE_INTERVAL_SEC)
+            self._sampler.start()
+        elif self.profile_mode:
+            utils.logger.warning(f"[ProfileSession.start] unknown PROFILE_MODE {self.profile_mode}, ignored")
+        if self.trace_tasks:
+            self.tracer = TaskTracer()
+            self.tracer.install(asyncio.get_running_loop())
+
+    def stop(self) -> List[str]:
+        """
+        停止分析并写入结果文件
+        Returns:
+            写入的文件列表
+        """
+        pathlib.Path(self.output_prefix).parent.mkdir(parents=True, exist_ok=True)
+        output_files = []
+        if self._profiler is not None:
+            self._profiler.disable()
+            self._profiler.dump_stats(f"{self.output_prefix}.prof")
+            stats_text = io.StringIO()
+            pstats.Stats(self._profiler, stream=stats_text).sort_stats(pstats.SortKey.CUMULATIVE).print_stats(50)
+            with open(f"{self.output_prefix}_cprofile.txt", "w", encoding="utf-8") as f:
+                f.write(stats_text.getvalue())
+            output_files += [f"{self.output_prefix}.prof", f"{self.output_prefix}_cprofile.txt"]
+            self._profiler = None
+        if self._sampler is not None:
+            self._sampler.stop()
+            with open(f"{self.output_prefix}.folded", "w", encoding="utf-8") as f:
+                f.write(self._sampler.folded())
+            output_files.append(f"{self.output_prefix}.folded")
+            self._sampler = None
+        if self.tracer is not None:
+            self.tracer.uninstall()
+            summary = self.tracer.summary()
+            with open(f"{self.output_prefix}_tasks.json", "wb") as f:
+                f.write(json_codec.dumps_bytes(summary, indent=True))
+            with open(f"{self.output_prefix}_tasks.trace.json", "wb") as f:
+                f.write(json_codec.dumps_bytes(self.tracer.chrome_trace()))
+            output_files += [f"{self.output_prefix}_tasks.json", f"{self.output_prefix}_tasks.trace.json"]
+            self._log_summary(summary)
+        for output_file in output_files:
+            utils.logger.info(f"[ProfileSession.stop] profile result saved to {output_file}")
+        return output_files
+
+    @staticmethod
+    def _log_summary(summary: Dict, top: int = 10):
+        utils.logger.info(
+            f"[ProfileSession] {summary['task_count']} tasks in {summary['elapsed_seconds']:.1f}s, "
+            f"max live tasks {summary['max_live_tasks']}, MAX_CONCURRENCY_NUM {summary['max_concurrency_num']}")
+        for stats in summary["coroutines"][:top]:
+            utils.logger.info(
+                f"[ProfileSession] {stats['name']}: count {stats['count']}, wall {stats['wall_seconds']:.2f}s, "
+                f"run {stats['run_seconds']:.2f}s, cpu {stats['cpu_seconds']:.2f}s, "
+                f"semaphore wait {stats['semaphore_wait_seconds']:.2f}s")
+
+
+_session: Optional[ProfileSession] = None
+
+
+def get_task_tracer() -> Optional[TaskTracer]:
+    """
+    当前运行的任务追踪，没有开启时为 None
+    """
+    return _session.tracer if _session is not None else None
+
+
+def start_profiling():
+    """
+    程序启动时调用，开启了 PROFILE_MODE 或 ENABLE_TASK_TRACE 时开始分析
+    Returns:
+
+    """
+    global _session
+    if not (config.PROFILE_MODE or config.ENABLE_TASK_TRACE) or _session is not None:
+        return
+    _session = ProfileSession()
+    _session.start()
+
+
+def stop_profiling():
+    """
+    程序结束前调用，写入分析结果
+    Returns:
+
+    """
+    global _session
+    if _session is not None:
+        _session.stop()
+        _session = None
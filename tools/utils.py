@@ -11,26 +11,103 @@
 
 import argparse
 import logging
+from typing import Any, Dict, Optional
+
+import config
 
 from .crawler_util import *
 from .slider_util import *
 from .time_util import *
 
+LOGGER_NAME = "MediaCrawler"
+
 
 def init_loging_config():
-    level = logging.INFO
+    level = logging.getLevelName(config.LOG_LEVEL.upper())
     logging.basicConfig(
         level=level,
         format="%(asctime)s %(name)s %(levelname)s (%(filename)s:%(lineno)d) - %(message)s",
         datefmt='%Y-%m-%d %H:%M:%S'
     )
-    _logger = logging.getLogger("MediaCrawler")
+    _logger = logging.getLogger(LOGGER_NAME)
     _logger.setLevel(level)
     return _logger
 
 
 logger = init_loging_config()
 
+
+class LogPayload:
+    """
+    日志中的大对象（接口响应、待存储的数据），只有日志真正输出时才转成字符串，并截断到 LOG_PAYLOAD_MAX_CHARS
+    用法：logger.info("xxx: %s", utils.log_payload(data))
+    """
+    __slots__ = ("payload", "max_chars")
+
+    def __init__(self, payload: Any, max_chars: Optional[int] = None):
+        self.payload = payload
+        self.max_chars = max_chars
+
+    def __str__(self) -> str:
+        text = str(self.payload)
+        max_chars = config.LOG_PAYLOAD_MAX_CHARS if self.max_chars is None else self.max_chars
+        if 0 < max_chars < len(text):
+            return f"{text[:max_chars]}...(truncated, {len(text)} chars)"
+        return text
+
+    __repr__ = __str__
+
+
+def log_payload(payload: Any, max_chars: Optional[int] = None) -> LogPayload:
+    return LogPayload(payload, max_chars)
+
+
+class SampleFilter(logging.Filter):
+    """
+    每条数据一条的日志按日志模板采样，同一个模板每 LOG_ITEM_SAMPLE_EVERY 条只输出 1 条，WARNING 及以上不采样
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._counts: Dict[str, int] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        sample_every = config.LOG_ITEM_SAMPLE_EVERY
+        if sample_every <= 1 or record.levelno >= logging.WARNING:
+            return True
+        count = self._counts.get(record.msg, 0)
+        self._counts[record.msg] = count + 1
+        return count % sample_every == 0
+
+
+def get_logger(component: str, sampled: bool = False) -> logging.Logger:
+    """
+    获取组件的 logger（MediaCrawler.组件），日志级别可以在 LOG_LEVELS 中按组件配置，没有配置时和 MediaCrawler 相同
+    日志参数使用 % 占位符延迟格式化，级别不够时不会格式化参数
+    Args:
+        component: 组件名，例如 store.xhs、xhs.core
+        sampled: 是否为每条数据一条的日志，是的话按 LOG_ITEM_SAMPLE_EVERY 采样（同一个组件只需要指定一次）
+
+    Returns:
+
+    """
+    component_logger = logging.getLogger(f"{LOGGER_NAME}.{component}")
+    if sampled and not any(isinstance(log_filter, SampleFilter) for log_filter in component_logger.filters):
+        component_logger.addFilter(SampleFilter())
+    return component_logger
+
+
+def configure_logging():
+    """
+    按配置设置日志级别，命令行参数覆盖配置后调用
+    Returns:
+
+    """
+    logger.setLevel(config.LOG_LEVEL.upper())
+    for component, level in config.LOG_LEVELS.items():
+        logging.getLogger(f"{LOGGER_NAME}.{component}").setLevel(level.upper())
+
+
 def str2bool(v):
     if isinstance(v, bool):
         return v
@@ -40,3 +117,27 @@ def str2bool(v):
         return False
     else:
         raise argparse.ArgumentTypeError('Boolean value expected.')
+
+
+LOG_LEVEL_NAMES = ("DEBUG", "INFO", "WARNING", "ERROR")
+
+
+def str2log_levels(v: str) -> Dict[str, str]:
+    """
+    解析命令行的组件日志级别，例如 store=WARNING,store.xhs=DEBUG，格式不对时抛出 ArgumentTypeError，由 argparse 报告用法错误
+    Args:
+        v: 逗号分隔的 组件=级别
+
+    Returns:
+        组件 -> 日志级别（大写）
+    """
+    log_levels = {}
+    for component_level in filter(None, (item.strip() for item in v.split(","))):
+        component, _, level = component_level.partition("=")
+        component, level = component.strip(), level.strip().upper()
+        if not component or level not in LOG_LEVEL_NAMES:
+            raise argparse.ArgumentTypeError(
+                f"invalid component log level '{component_level}', expected component=LEVEL "
+                f"with LEVEL one of {' | '.join(LOG_LEVEL_NAMES)}")
+        log_levels[component] = level
+    return log_levels
@@ -0,0 +1,177 @@
+# 声明：本代码仅供学习和研究目的使用。使用者应遵守以下原则：
+# 1. 不得用于任何商业用途。
+# 2. 使用时应遵守目标平台的使用条款和robots.txt规则。
+# 3. 不得进行大规模爬取或对平台造成运营干扰。
+# 4. 应合理控制请求频率，避免给目标平台带来不必要的负担。
+# 5. 不得用于任何非法或不当的用途。
+#
+# 详细许可条款请参阅项目根目录下的LICENSE文件。
+# 使用本代码即表示您同意遵守上述原则和LICENSE中的所有条款。
+
+
+# -*- coding: utf-8 -*-
+# @Desc    : jieba 分词服务，在进程池中分词，避免大批量文本分词阻塞爬虫的事件循环
+import argparse
+import asyncio
+import csv
+import json
+import logging
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Set
+
+import config
+from tools import utils
+
+# 子进程中的停用词，由 _init_worker 初始化
+_stop_words: Set[str] = set()
+
+
+def load_stop_words(stop_words_file: str) -> Set[str]:
+    with open(stop_words_file, 'r', encoding='utf-8') as f:
+        return set(f.read().strip().split('\n'))
+
+
+def _init_worker(custom_words: List[str], stop_words_file: str):
+    """
+    子进程初始化：加载jieba词典、自定义词语和停用词，每个子进程只执行一次
+    """
+    global _stop_words
+    import jieba
+    logging.getLogger('jieba').setLevel(logging.WARNING)
+    jieba.initialize()
+    for word in custom_words:
+        jieba.add_word(word)
+    _stop_words = load_stop_words(stop_words_file)
+
+
+def count_chunk(texts: List[str], stop_words: Optional[Set[str]] = None) -> Counter:
+    """
+    对一批文本分词并统计词频，在子进程中执行时使用子进程初始化好的停用词
+    Args:
+        texts: 文本列表
+        stop_words: 停用词，默认使用子进程初始化的停用词
+
+    Returns:
+
+    """
+    import jieba
+    stop_words = _stop_words if stop_words is None else stop_words
+    all_text = ' '.join(texts)
+    return Counter(word for word in jieba.lcut(all_text) if word not in stop_words and len(word.strip()) > 0)
+
+
+class SegmentationService:
+    """
+    分词服务：把文本按批切分后投递到进程池，再合并各批次的词频
+    """
+
+    def __init__(self, max_workers: int = 0, chunk_size: int = 0):
+        self.max_workers = max_workers or config.WORD_SEGMENT_WORKERS
+        self.chunk_size = chunk_size or config.WORD_SEGMENT_CHUNK_SIZE
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=_init_worker,
+                initargs=(list(config.CUSTOM_WORDS.keys()), config.STOP_WORDS_FILE),
+            )
+        return self._executor
+
+    def split_chunks(self, texts: List[str]) -> List[List[str]]:
+        return [texts[i:i + self.chunk_size] for i in range(0, len(texts), self.chunk_size)]
+
+    async def count_words(self, texts: List[str]) -> Counter:
+        """
+        统计一批文本的词频
+        Args:
+            texts: 文本列表
+
+        Returns:
+
+        """
+        word_freq = Counter()
+        if not texts:
+            return word_freq
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        partial_freqs = await asyncio.gather(
+            *[loop.run_in_executor(executor, count_chunk, chunk) for chunk in self.split_chunks(texts)]
+        )
+        for partial_freq in partial_freqs:
+            word_freq.update(partial_freq)
+        return word_freq
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+_segmentation_service: Optional[SegmentationService] = None
+
+
+def get_segmentation_service() -> SegmentationService:
+    """
+    获取全局的分词服务
+    Returns:
+
+    """
+    global _segmentation_service
+    if _segmentation_service is None:
+        _segmentation_service = SegmentationService()
+    return _segmentation_service
+
+
+def shutdown_segmentation_service():
+    global _segmentation_service
+    if _segmentation_service is not None:
+        _segmentation_service.shutdown()
+        _segmentation_service = None
+
+
+def read_texts(input_file: str, field: str) -> List[str]:
+    """
+    从存储的数据文件中读取文本，支持 json（存储生成的列表格式）、jsonl 和 csv
+    Args:
+        input_file: 数据文件
+        field: 文本字段名
+
+    Returns:
+
+    """
+    items: Iterable[Dict]
+    with open(input_file, 'r', encoding='utf-8-sig') as f:
+        if input_file.endswith(".csv"):
+            items = list(csv.DictReader(f))
+        elif input_file.endswith(".jsonl"):
+            items = [json.loads(line) for line in f if line.strip()]
+        else:
+            items = json.load(f)
+    return [str(item[field]) for item in items if item.get(field)]
+
+
+async def segment_file(input_file: str, output_file: str, field: str):
+    texts = read_texts(input_file, field)
+    service = get_segmentation_service()
+    try:
+        word_freq = await service.count_words(texts)
+    finally:
+        shutdown_segmentation_service()
+    with open(output_file, 'w', encoding='utf-8') as f:
+        f.write(json.dumps(word_freq, ensure_ascii=False, indent=4))
+    utils.logger.info(f"[segment_file] segment {len(texts)} texts from {input_file}, words: {len(word_freq)}, save to {output_file}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Count word frequency of crawled data with jieba in a process pool.')
+    parser.add_argument('--input', type=str, required=True, help='data file saved by the crawler (json | jsonl | csv)')
+    parser.add_argument('--output', type=str, required=True, help='word frequency json file')
+    parser.add_argument('--field', type=str, default="content", help='text field name, default is content')
+    parser.add_argument('--workers', type=int, default=0, help='process number, default is config.WORD_SEGMENT_WORKERS')
+    args = parser.parse_args()
+    if args.workers:
+        config.WORD_SEGMENT_WORKERS = args.workers
+    asyncio.run(segment_file(args.input, args.output, args.field))
@@ -12,20 +12,24 @@
 import asyncio
 import json
 import logging
+import os
+import time
 from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Set
 
 import aiofiles
-import jieba
-import matplotlib.pyplot as plt
-from wordcloud import WordCloud
 
 import config
 from tools import utils
+from tools.word_segment import count_chunk, get_segmentation_service, shutdown_segmentation_service
+
+# jieba、matplotlib、wordcloud 加载很慢，只在真正生成词云时才导入
 
-plot_lock = asyncio.Lock()
 
 class AsyncWordCloudGenerator:
     def __init__(self):
+        import jieba
         logging.getLogger('jieba').setLevel(logging.WARNING)
         self.stop_words_file = config.STOP_WORDS_FILE
         self.lock = asyncio.Lock()
@@ -33,51 +37,226 @@ class AsyncWordCloudGenerator:
         self.custom_words = config.CUSTOM_WORDS
         for word, group in self.custom_words.items():
             jieba.add_word(word)
+        # 每个词频文件对应一个持续累加的 Counter，新数据只对新增的条目分词
+        self.word_freqs: Dict[str, Counter] = {}
+        self._dirty_prefixes = set()
+        self._flush_tasks: Dict[str, asyncio.Task] = {}
+        # 词云图在单独的子进程中生成，每个前缀最多每 WORDCLOUD_RENDER_INTERVAL_SEC 秒生成一次
+        self._render_executor: Optional[ProcessPoolExecutor] = None
+        self._render_tasks: Set[asyncio.Task] = set()
+        self._pending_renders: Set[str] = set()
+        self._rendering_prefixes: Set[str] = set()
+        self._last_render_times: Dict[str, float] = {}
 
     def load_stop_words(self):
         with open(self.stop_words_file, 'r', encoding='utf-8') as f:
             return set(f.read().strip().split('\n'))
 
+    async def count_words(self, texts: List[str]) -> Counter:
+        """
+        对文本分词并统计词频，配置了 WORD_SEGMENT_WORKERS 时在进程池中分词，不阻塞事件循环
+        Args:
+            texts:
+
+        Returns:
+
+        """
+        if config.WORD_SEGMENT_WORKERS > 0:
+            return await get_segmentation_service().count_words(texts)
+        return count_chunk(texts, self.stop_words)
+
+    def get_word_freq(self, save_words_prefix: str) -> Counter:
+        """
+        获取某个词频文件的累计词频，第一次使用时从已有的词频文件恢复，保证程序重启后继续累加
+        Args:
+            save_words_prefix:
+
+        Returns:
+
+        """
+        word_freq = self.word_freqs.get(save_words_prefix)
+        if word_freq is None:
+            word_freq = Counter()
+            freq_file = f"{save_words_prefix}_word_freq.json"
+            if os.path.exists(freq_file):
+                with open(freq_file, 'r', encoding='utf-8') as f:
+                    word_freq.update(json.load(f))
+            self.word_freqs[save_words_prefix] = word_freq
+        return word_freq
+
+    async def add_items(self, items: List[Dict], save_words_prefix: str):
+        """
+        增量统计新增条目的词频，词频文件由定时任务延迟写入，多次新增合并成一次写入
+        Args:
+            items: 新增的条目，每个条目需要包含 content 字段
+            save_words_prefix: 词频文件前缀
+
+        Returns:
+
+        """
+        texts = [item['content'] for item in items]
+        word_freq = self.get_word_freq(save_words_prefix)
+        word_freq.update(await self.count_words(texts))
+        self._dirty_prefixes.add(save_words_prefix)
+        if save_words_prefix not in self._flush_tasks:
+            self._flush_tasks[save_words_prefix] = asyncio.create_task(self._delay_flush(save_words_prefix))
+
+    async def _delay_flush(self, save_words_prefix: str):
+        try:
+            await asyncio.sleep(config.WORDCLOUD_FLUSH_INTERVAL_SEC)
+        finally:
+            self._flush_tasks.pop(save_words_prefix, None)
+        await self.flush(save_words_prefix)
+
+    async def flush(self, save_words_prefix: str):
+        """
+        把累计词频写入文件，距离上次生成词云图超过 WORDCLOUD_RENDER_INTERVAL_SEC 时在后台重新生成词云图
+        Args:
+            save_words_prefix:
+
+        Returns:
+
+        """
+        if save_words_prefix not in self._dirty_prefixes:
+            return
+        self._dirty_prefixes.discard(save_words_prefix)
+        word_freq = self.word_freqs[save_words_prefix]
+        try:
+            async with aiofiles.open(f"{save_words_prefix}_word_freq.json", 'w', encoding='utf-8') as file:
+                await file.write(json.dumps(word_freq, ensure_ascii=False, indent=4))
+        except Exception as e:
+            utils.logger.error(f"[AsyncWordCloudGenerator.flush] flush {save_words_prefix} error: {e}")
+            return
+
+        self._pending_renders.add(save_words_prefix)
+        if self._can_render(save_words_prefix):
+            render_task = asyncio.create_task(self.generate_word_cloud(word_freq, save_words_prefix))
+            self._render_tasks.add(render_task)
+            render_task.add_done_callback(self._render_tasks.discard)
+
+    def _can_render(self, save_words_prefix: str) -> bool:
+        if not config.WORDCLOUD_RENDER_INTERVAL_SEC or save_words_prefix in self._rendering_prefixes:
+            return False
+        last_render_time = self._last_render_times.get(save_words_prefix)
+        return last_render_time is None or time.monotonic() - last_render_time >= config.WORDCLOUD_RENDER_INTERVAL_SEC
+
+    async def flush_all(self, render: bool = True):
+        """
+        程序结束前调用，取消等待中的定时任务，立即写入所有未写入的词频并生成最终的词云图
+        Args:
+            render: 为 False 时只写入词频文件，不生成最终的词云图
+
+        Returns:
+
+        """
+        for flush_task in list(self._flush_tasks.values()):
+            flush_task.cancel()
+        self._flush_tasks.clear()
+        for save_words_prefix in list(self._dirty_prefixes):
+            await self.flush(save_words_prefix)
+        if self._render_tasks:
+            await asyncio.gather(*self._render_tasks, return_exceptions=True)
+        if render:
+            for save_words_prefix in list(self._pending_renders):
+                await self.generate_word_cloud(self.word_freqs[save_words_prefix], save_words_prefix)
+        if self._render_executor is not None:
+            self._render_executor.shutdown(wait=True)
+            self._render_executor = None
+
     async def generate_word_frequency_and_cloud(self, data, save_words_prefix):
-        all_text = ' '.join(item['content'] for item in data)
-        words = [word for word in jieba.lcut(all_text) if word not in self.stop_words and len(word.strip()) > 0]
-        word_freq = Counter(words)
+        word_freq = await self.count_words([item['content'] for item in data])
 
         # Save word frequency to file
         freq_file = f"{save_words_prefix}_word_freq.json"
         async with aiofiles.open(freq_file, 'w', encoding='utf-8') as file:
             await file.write(json.dumps(word_freq, ensure_ascii=False, indent=4))
 
-        # Try to acquire the plot lock without waiting
-        if plot_lock.locked():
-            utils.logger.info("Skipping word cloud generation as the lock is held.")
-            return
-
         await self.generate_word_cloud(word_freq, save_words_prefix)
 
     async def generate_word_cloud(self, word_freq, save_words_prefix):
-        await plot_lock.acquire()
+        """
+        在独立的子进程中生成词云图，不占用爬虫的事件循环
+        Args:
+            word_freq: 词频
+            save_words_prefix: 词云图文件前缀
+
+        Returns:
+
+        """
+        self._pending_renders.discard(save_words_prefix)
+        self._rendering_prefixes.add(save_words_prefix)
+        self._last_render_times[save_words_prefix] = time.monotonic()
         top_20_word_freq = {word: freq for word, freq in
                             sorted(word_freq.items(), key=lambda item: item[1], reverse=True)[:20]}
-        wordcloud = WordCloud(
-            font_path=config.FONT_PATH,
-            width=800,
-            height=400,
-            background_color='white',
-            max_words=200,
-            stopwords=self.stop_words,
-            colormap='viridis',
-            contour_color='steelblue',
-            contour_width=1
-        ).generate_from_frequencies(top_20_word_freq)
-
-        # Save word cloud image
-        plt.figure(figsize=(10, 5), facecolor='white')
-        plt.imshow(wordcloud, interpolation='bilinear')
-
-        plt.axis('off')
-        plt.tight_layout(pad=0)
-        plt.savefig(f"{save_words_prefix}_word_cloud.png", format='png', dpi=300)
-        plt.close()
-
-        plot_lock.release()
\ No newline at end of file
+        try:
+            if self._render_executor is None:
+                self._render_executor = ProcessPoolExecutor(max_workers=1)
+            await asyncio.get_running_loop().run_in_executor(
+                self._render_executor, render_word_cloud, top_20_word_freq, save_words_prefix, config.FONT_PATH)
+        except Exception as e:
+            utils.logger.error(f"[AsyncWordCloudGenerator.generate_word_cloud] render {save_words_prefix} error: {e}")
+        finally:
+            self._rendering_prefixes.discard(save_words_prefix)
+
+
+def render_word_cloud(word_freq: Dict[str, int], save_words_prefix: str, font_path: str):
+    """
+    生成词云图，在子进程中执行，使用不依赖图形界面的 Agg 后端
+    Args:
+        word_freq: 词频
+        save_words_prefix: 词云图文件前缀
+        font_path: 字体文件
+
+    Returns:
+
+    """
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    from wordcloud import WordCloud
+
+    wordcloud = WordCloud(
+        font_path=font_path,
+        width=800,
+        height=400,
+        background_color='white',
+        max_words=200,
+        colormap='viridis',
+        contour_color='steelblue',
+        contour_width=1
+    ).generate_from_frequencies(word_freq)
+
+    # Save word cloud image
+    plt.figure(figsize=(10, 5), facecolor='white')
+    plt.imshow(wordcloud, interpolation='bilinear')
+
+    plt.axis('off')
+    plt.tight_layout(pad=0)
+    plt.savefig(f"{save_words_prefix}_word_cloud.png", format='png', dpi=300)
+    plt.close()
+
+
+_word_cloud_generator = None
+
+
+def get_word_cloud_generator() -> AsyncWordCloudGenerator:
+    """
+    获取全局的词云生成器，第一次使用时才创建（加载停用词、自定义词典）
+    Returns:
+
+    """
+    global _word_cloud_generator
+    if _word_cloud_generator is None:
+        _word_cloud_generator = AsyncWordCloudGenerator()
+    return _word_cloud_generator
+
+
+async def flush_word_cloud():
+    """
+    程序结束前调用，写入还没有写入的词频文件和词云图
+    Returns:
+
+    """
+    if _word_cloud_generator is not None:
+        await _word_cloud_generator.flush_all()
+    shutdown_segmentation_service()
@@ -11,15 +11,17 @@
 
 from asyncio.tasks import Task
 from contextvars import ContextVar
-from typing import List
+from typing import TYPE_CHECKING, List
 
-import aiomysql
+# 只在类型检查时导入，不选择 db 存储时不需要加载 aiomysql
+if TYPE_CHECKING:
+    import aiomysql
 
-from async_db import AsyncMysqlDB
+    from async_db import AsyncMysqlDB
 
 request_keyword_var: ContextVar[str] = ContextVar("request_keyword", default="")
 crawler_type_var: ContextVar[str] = ContextVar("crawler_type", default="")
 comment_tasks_var: ContextVar[List[Task]] = ContextVar("comment_tasks", default=[])
-media_crawler_db_var: ContextVar[AsyncMysqlDB] = ContextVar("media_crawler_db_var")
-db_conn_pool_var: ContextVar[aiomysql.Pool] = ContextVar("db_conn_pool_var")
+media_crawler_db_var: ContextVar["AsyncMysqlDB"] = ContextVar("media_crawler_db_var")
+db_conn_pool_var: ContextVar["aiomysql.Pool"] = ContextVar("db_conn_pool_var")
 source_keyword_var: ContextVar[str] = ContextVar("source_keyword", default="")
\ No newline at end of file